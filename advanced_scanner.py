@@ -1,14 +1,14 @@
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
 from rich.console import Console
 from core_scanner import CoreScanner
+from target_routing import RoutingPlan
 import json
 from datetime import datetime
 
 class AdvancedScanner(CoreScanner):
     """Advanced scanning capabilities with premium intelligence sources"""
 
-    def analyze_blockchain(self, target: str) -> Dict[str, Any]:
+    def analyze_blockchain(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Premium blockchain intelligence analysis"""
         results = {
             "transaction_analysis": {},
@@ -21,57 +21,9 @@ class AdvancedScanner(CoreScanner):
             "smart_contract_interaction": {}
         }
 
-        if "BLOCKCHAIN_ANALYTICS" in self.api_keys:
-            for provider, key in self.api_keys["BLOCKCHAIN_ANALYTICS"].items():
-                try:
-                    if provider == "chainalysis":
-                        # Chainalysis KYT and Reactor
-                        headers = {"Token": key}
-                        endpoints = {
-                            "risk": f"https://api.chainalysis.com/api/kyt/v1/address/{target}",
-                            "exposure": f"https://api.chainalysis.com/api/exposure/v1/address/{target}",
-                            "clusters": f"https://api.chainalysis.com/api/clusters/v1/address/{target}"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(url, headers=headers)
-                            if response.status_code == 200:
-                                results["transaction_analysis"][f"chainalysis_{endpoint_name}"] = response.json()
+        return self._run_adapters("BLOCKCHAIN_ANALYTICS", target, results, plan)
 
-                    elif provider == "elliptic":
-                        # Elliptic Forensics
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "wallet": f"https://api.elliptic.co/v2/wallet/{target}",
-                            "transactions": f"https://api.elliptic.co/v2/transactions/{target}",
-                            "risk": f"https://api.elliptic.co/v2/risk/{target}"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(url, headers=headers)
-                            if response.status_code == 200:
-                                results["risk_assessment"][f"elliptic_{endpoint_name}"] = response.json()
-
-                    elif provider == "crystal":
-                        # Crystal Blockchain Analytics
-                        headers = {"X-Auth-Token": key}
-                        endpoints = {
-                            "entity": f"https://api.crystalblockchain.com/v1/entities/{target}",
-                            "flow": f"https://api.crystalblockchain.com/v1/flow/{target}",
-                            "risk": f"https://api.crystalblockchain.com/v1/risk/{target}"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(url, headers=headers)
-                            if response.status_code == 200:
-                                results["entity_clustering"][f"crystal_{endpoint_name}"] = response.json()
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
-
-        return results
-
-    def analyze_social_intelligence(self, target: str) -> Dict[str, Any]:
+    def analyze_social_intelligence(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Advanced social media intelligence gathering"""
         results = {
             "profile_analysis": {},
@@ -84,51 +36,9 @@ class AdvancedScanner(CoreScanner):
             "platform_presence": {}
         }
 
-        if "SOCIAL_INTELLIGENCE" in self.api_keys:
-            for provider, key in self.api_keys["SOCIAL_INTELLIGENCE"].items():
-                try:
-                    if provider == "brandwatch":
-                        # Brandwatch Consumer Research
-                        headers = {"X-Auth-Token": key}
-                        endpoints = {
-                            "mentions": "https://api.brandwatch.com/analytics/mentions",
-                            "authors": "https://api.brandwatch.com/analytics/authors",
-                            "sentiment": "https://api.brandwatch.com/analytics/sentiment"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={"query": target}
-                            )
-                            if response.status_code == 200:
-                                results["content_analysis"][f"brandwatch_{endpoint_name}"] = response.json()
-
-                    elif provider == "synthesio":
-                        # Synthesio Social Listening
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "posts": "https://api.synthesio.com/v1/posts",
-                            "profiles": "https://api.synthesio.com/v1/profiles",
-                            "metrics": "https://api.synthesio.com/v1/metrics"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={"query": target}
-                            )
-                            if response.status_code == 200:
-                                results["profile_analysis"][f"synthesio_{endpoint_name}"] = response.json()
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
-
-        return results
+        return self._run_adapters("SOCIAL_INTELLIGENCE", target, results, plan)
 
-    def analyze_financial_intelligence(self, target: str) -> Dict[str, Any]:
+    def analyze_financial_intelligence(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Premium financial intelligence analysis"""
         results = {
             "transaction_patterns": {},
@@ -141,53 +51,12 @@ class AdvancedScanner(CoreScanner):
             "sanctions_screening": {}
         }
 
-        if "FINANCIAL_INTELLIGENCE" in self.api_keys:
-            for provider, key in self.api_keys["FINANCIAL_INTELLIGENCE"].items():
-                try:
-                    if provider == "refinitiv":
-                        # Refinitiv World-Check
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "screening": "https://api.refinitiv.com/screening/v2/screen",
-                            "entities": "https://api.refinitiv.com/entities/v2/search",
-                            "relationships": "https://api.refinitiv.com/relationships/v2/search"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.post(
-                                url,
-                                headers=headers,
-                                json={"query": target}
-                            )
-                            if response.status_code == 200:
-                                results["financial_connections"][f"refinitiv_{endpoint_name}"] = response.json()
-
-                    elif provider == "lexisnexis":
-                        # LexisNexis Risk Solutions
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "risk": "https://api.lexisnexis.com/risk/v1/search",
-                            "business": "https://api.lexisnexis.com/business/v1/search",
-                            "compliance": "https://api.lexisnexis.com/compliance/v1/search"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.post(
-                                url,
-                                headers=headers,
-                                json={"query": target}
-                            )
-                            if response.status_code == 200:
-                                results["risk_indicators"][f"lexisnexis_{endpoint_name}"] = response.json()
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
-
-        return results
+        return self._run_adapters("FINANCIAL_INTELLIGENCE", target, results, plan)
 
-    def comprehensive_scan(self, target: str) -> Dict[str, Any]:
+    def comprehensive_scan(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Execute comprehensive intelligence gathering"""
         self.console.print(f"[green]Starting advanced comprehensive scan for target: {target}[/green]")
+        plan = plan or RoutingPlan(target)
         
         results = {
             "scan_metadata": {
@@ -198,23 +67,32 @@ class AdvancedScanner(CoreScanner):
         }
 
         # Core Analysis
-        results.update({
-            "threat_intelligence": self.analyze_threat_intelligence(target),
-            "dark_web_exposure": self.analyze_dark_web(target)
-        })
+        results.update(self._run_routed_analyzers(target, plan, {
+            "threat_intelligence": self.analyze_threat_intelligence,
+            "dark_web_exposure": self.analyze_dark_web
+        }))
 
         # Advanced Analysis
-        results.update({
-            "blockchain_intelligence": self.analyze_blockchain(target),
-            "social_intelligence": self.analyze_social_intelligence(target),
-            "financial_intelligence": self.analyze_financial_intelligence(target)
-        })
+        results.update(self._run_routed_analyzers(target, plan, {
+            "blockchain_intelligence": self.analyze_blockchain,
+            "social_intelligence": self.analyze_social_intelligence,
+            "financial_intelligence": self.analyze_financial_intelligence
+        }))
 
         # Cross-correlation Analysis
         results["correlation_analysis"] = self._correlate_intelligence(results)
+        results["scan_metadata"].update(plan.to_metadata())
 
         return results
 
+    def _run_routed_analyzers(self, target: str, plan: RoutingPlan, analyzers: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the analyzers that accept the target type, skipping the rest"""
+        return {
+            section: analyzer(target, plan)
+            for section, analyzer in analyzers.items()
+            if plan.allows_analyzer(analyzer.__name__)
+        }
+
     def _correlate_intelligence(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform advanced correlation across all intelligence sources"""
         return {
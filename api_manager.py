@@ -9,16 +9,35 @@ from api_config import (
     get_api_key, get_api_url, get_rate_limit,
     get_capabilities
 )
+from streaming_json import FieldSpec, read_json
+from transport import Transport
+
+# Cap on bytes read from a single provider response
+MAX_RESPONSE_BYTES = 8 * 1024 * 1024
 
 class APIManager:
     """Manages API interactions and rate limiting"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[Transport] = None):
         self.rate_limits = {}
         self.request_counts = {}
+        self.transport = transport if transport is not None else Transport.default()
         
-    def make_request(self, service: str, provider: str, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make an API request with rate limiting"""
+    def make_request(
+        self,
+        service: str,
+        provider: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        fields: Optional[FieldSpec] = None,
+        max_items: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Make an API request with rate limiting
+
+        Responses are streamed and parsed incrementally; fields and max_items
+        limit what is kept from large bodies.
+        """
         try:
             # Get base URL and ensure it has a scheme
             base_url = get_api_url(service, provider)
@@ -38,10 +57,10 @@ class APIManager:
                 params['key'] = api_key
                 
             # Make request
-            response = requests.get(url, params=params, timeout=30)
+            response = self.transport.get(url, params=params, timeout=30, stream=True)
             
             if response.status_code == 200:
-                return response.json()
+                return read_json(response, fields, max_items, MAX_RESPONSE_BYTES)
             else:
                 return {
                     "error": f"API request failed: {response.status_code}",
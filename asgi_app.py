@@ -0,0 +1,431 @@
+"""
+ASGI Scanner Application
+Serves the scanner_app routes asynchronously with streamed deep scans, WebSocket progress and backpressure
+"""
+
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple, AsyncIterator
+from urllib.parse import parse_qs, unquote
+
+try:
+    import uvicorn
+except ImportError:  # Optional: any ASGI server can run `asgi_app:app`
+    uvicorn = None
+
+# Scans running at once; the scanners block, so each one holds an executor thread
+SCAN_CONCURRENCY = int(os.environ.get("ASGI_SCAN_CONCURRENCY", "1024"))
+# Scans allowed to wait for a free slot; beyond this requests get 503
+MAX_QUEUED_SCANS = int(os.environ.get("ASGI_MAX_QUEUED_SCANS", "8192"))
+# Seconds a queued scan waits for a slot before giving up with 503 (0 waits until one is free)
+QUEUE_TIMEOUT = float(os.environ.get("ASGI_QUEUE_TIMEOUT", "0"))
+RETRY_AFTER_SECONDS = 5
+
+# Request bodies above this size are rejected with 413
+MAX_BODY_BYTES = 1024 * 1024
+
+STATIC_ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_CHUNK_BYTES = 64 * 1024
+
+NDJSON = "application/x-ndjson"
+
+class Overloaded(Exception):
+    """No scan slot became free within the queue limits"""
+
+class ScanLimiter:
+    """
+    Bounded scan concurrency with a bounded wait queue
+
+    Scans run on a thread pool sized to the concurrency limit. Requests
+    beyond that wait on a semaphore, however slow the running scans are;
+    once MAX_QUEUED_SCANS are waiting, or a wait exceeds a non-zero
+    timeout, new scans are refused rather than queued.
+    """
+
+    def __init__(self, concurrency: int = SCAN_CONCURRENCY, max_queued: int = MAX_QUEUED_SCANS,
+                 timeout: float = QUEUE_TIMEOUT):
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scan")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {"running": 0, "queued": 0, "completed": 0, "rejected": 0}
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one scan slot, raising Overloaded if none can be had"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        if self.stats["queued"] >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise Overloaded()
+        if self._slots.locked():
+            self.stats["queued"] += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout or None)
+            except asyncio.TimeoutError:
+                self.stats["rejected"] += 1
+                raise Overloaded()
+            finally:
+                self.stats["queued"] -= 1
+        else:
+            await self._slots.acquire()
+
+        self.stats["running"] += 1
+        try:
+            yield
+        finally:
+            self.stats["running"] -= 1
+            self.stats["completed"] += 1
+            self._slots.release()
+
+    async def call(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call on the scan executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: func(*args, **kwargs))
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+def _dumps(payload: Any) -> bytes:
+    return json.dumps(payload, default=str).encode()
+
+def deep_scan_response(target: str, scan_types: Optional[List[str]], scan_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep scan body in the same shape as scanner_app's /api/deep-scan"""
+    return {
+        "timestamp": _now(),
+        "scan_types": scan_types or "all",
+        "target": target,
+        "scan_metadata": scan_result.get("scan_metadata", {}),
+        "intelligence_data": scan_result.get("intelligence_data", {}),
+        "correlation_analysis": scan_result.get("correlation_analysis", {}),
+        "risk_assessment": scan_result.get("risk_assessment", {}),
+        "recommendations": scan_result.get("recommendations", [])
+    }
+
+class HTTPError(Exception):
+    """Error answered with a JSON body"""
+
+    def __init__(self, status: int, payload: Dict[str, Any]):
+        super().__init__(payload.get("error"))
+        self.status = status
+        self.payload = {**payload, "timestamp": payload.get("timestamp", _now())}
+
+class ScannerASGI:
+    """
+    ASGI application for the scanner API and static interface
+
+    Routes match scanner_app: /api/scan/<type>, /api/deep-scan,
+    /api/scanners, /api/health and static files. /api/deep-scan streams
+    newline-delimited JSON progress when asked for application/x-ndjson
+    (or ?stream=1), and /ws/deep-scan reports the same progress over a
+    WebSocket. Blocking scanner calls run on the limiter's executor, so
+    the event loop keeps serving while scans wait on providers.
+    """
+
+    def __init__(self, scanners: Optional[Dict[str, Any]] = None,
+                 deep_scanner_factory: Optional[Callable[[], Any]] = None,
+                 limiter: Optional[ScanLimiter] = None, static_root: str = STATIC_ROOT):
+        """
+        Args:
+            scanners: Scan type -> scanner (scanner_app's scanners if omitted)
+            deep_scanner_factory: Builds the DeepScanner used for each deep scan
+            limiter: Scan concurrency and queue limits
+            static_root: Directory static files are served from
+        """
+        self._scanners = scanners
+        self._deep_scanner_factory = deep_scanner_factory
+        self.limiter = limiter or ScanLimiter()
+        self.static_root = Path(static_root).resolve()
+
+    @property
+    def scanners(self) -> Dict[str, Any]:
+        if self._scanners is None:
+            from scanner_app import scanners
+            self._scanners = scanners
+        return self._scanners
+
+    async def load_scanners(self) -> Dict[str, Any]:
+        """Scanners, imported off the event loop: building them loads the IOC feeds synchronously"""
+        if self._scanners is None:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.scanners)
+        return self._scanners
+
+    def run_deep_scan(self, target: str, scan_types: Optional[List[str]],
+                      on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Build a deep scanner and run it; called on the scan executor"""
+        if self._deep_scanner_factory is None:
+            from deep_scanner import DeepScanner
+            self._deep_scanner_factory = DeepScanner
+        return self._deep_scanner_factory().deep_scan(target, scan_types, on_progress=on_progress)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "http":
+            await self.handle_http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self.handle_websocket(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self.handle_lifespan(receive, send)
+
+    # HTTP
+
+    async def handle_http(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        method, path = scope["method"], scope["path"]
+        try:
+            if path.startswith("/api/"):
+                await self.route_api(method, path, scope, receive, send)
+            elif method in ("GET", "HEAD"):
+                await self.send_static("index.html" if path == "/" else unquote(path.lstrip("/")),
+                                       method == "HEAD", send)
+            else:
+                raise HTTPError(405, {"error": "Method not allowed"})
+        except HTTPError as e:
+            await self.send_json(send, e.status, e.payload)
+        except Overloaded:
+            await self.send_json(send, 503, {"error": "Server busy, retry later", "timestamp": _now()},
+                                 [(b"retry-after", str(RETRY_AFTER_SECONDS).encode())])
+        except Exception as e:
+            await self.send_json(send, 500, {"error": str(e), "timestamp": _now()})
+
+    async def route_api(self, method: str, path: str, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if path == "/api/health" and method == "GET":
+            await self.send_json(send, 200, {"status": "healthy", "timestamp": _now(), "version": "1.0.0",
+                                             "scans": dict(self.limiter.stats)})
+        elif path == "/api/scanners" and method == "GET":
+            await self.load_scanners()
+            await self.send_json(send, 200, {"timestamp": _now(), "scanners": self.list_scanners()})
+        elif path.startswith("/api/scan/") and method == "POST":
+            data = await self.read_json(scope, receive)
+            await self.scan(path[len("/api/scan/"):], data, send)
+        elif path == "/api/deep-scan" and method == "POST":
+            data = await self.read_json(scope, receive)
+            target, scan_types = self.validate_deep_scan(data)
+            if self.wants_stream(scope):
+                await self.stream_deep_scan(target, scan_types, send)
+            else:
+                async with self.limiter.slot():
+                    result = await self.limiter.call(self.run_deep_scan, target, scan_types)
+                await self.send_json(send, 200, deep_scan_response(target, scan_types, result))
+        else:
+            raise HTTPError(404, {"error": "Not found"})
+
+    def list_scanners(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "description": scanner.__doc__,
+                "providers": scanner.api_manager.get_providers(name.upper() + "_INTELLIGENCE")
+            }
+            for name, scanner in self.scanners.items()
+        }
+
+    async def scan(self, scan_type: str, data: Dict[str, Any], send: Callable) -> None:
+        """Single scanner endpoint, validated the same way as scanner_app"""
+        target = data.get("target")
+        if not target:
+            raise HTTPError(400, {"error": "Target is required"})
+        await self.load_scanners()
+        if scan_type not in self.scanners:
+            raise HTTPError(400, {"error": "Invalid scanner type", "valid_types": list(self.scanners)})
+
+        scanner = self.scanners[scan_type]
+        available = scanner.api_manager.get_providers(scan_type.upper() + "_INTELLIGENCE")
+        provider = data.get("provider")
+        if provider and provider not in available:
+            raise HTTPError(400, {"error": "Invalid provider", "valid_providers": list(available)})
+        provider = provider or next(iter(available), None)
+        if not provider:
+            raise HTTPError(400, {"error": "No providers available for this scanner type"})
+
+        async with self.limiter.slot():
+            result = await self.limiter.call(scanner.gather_intelligence, target, provider)
+        await self.send_json(send, 200, result)
+
+    @staticmethod
+    def validate_deep_scan(data: Dict[str, Any]) -> Tuple[str, Optional[List[str]]]:
+        target = data.get("target")
+        if not target:
+            raise HTTPError(400, {"error": "Target is required"})
+        scan_types = data.get("scan_types")
+        if scan_types and not isinstance(scan_types, list):
+            raise HTTPError(400, {"error": "scan_types must be a list"})
+        return target, scan_types
+
+    @staticmethod
+    def wants_stream(scope: Dict[str, Any]) -> bool:
+        accept = dict(scope.get("headers", [])).get(b"accept", b"").decode()
+        query = parse_qs(scope.get("query_string", b"").decode())
+        return NDJSON in accept or query.get("stream", ["0"])[0] in ("1", "true")
+
+    async def stream_deep_scan(self, target: str, scan_types: Optional[List[str]], send: Callable) -> None:
+        """Deep scan as NDJSON: one line per progress event, then the full result"""
+        # The slot is taken before the response starts so an overloaded server can still answer 503
+        async with self.limiter.slot():
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", NDJSON.encode()), (b"cache-control", b"no-cache")]})
+            async for event in self.deep_scan_events(target, scan_types):
+                await send({"type": "http.response.body", "body": _dumps(event) + b"\n", "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def deep_scan_events(self, target: str, scan_types: Optional[List[str]]) -> AsyncIterator[Dict[str, Any]]:
+        """Progress events from a deep scan running on the executor, ending with the result"""
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def on_progress(event: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        scan = asyncio.ensure_future(
+            self.limiter.call(self.run_deep_scan, target, scan_types, on_progress)
+        )
+        scan.add_done_callback(lambda _: events.put_nowait(None))
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        try:
+            result = scan.result()
+        except Exception as e:
+            yield {"stage": "error", "error": str(e), "timestamp": _now()}
+        else:
+            yield {"stage": "complete", "result": deep_scan_response(target, scan_types, result)}
+
+    async def read_json(self, scope: Dict[str, Any], receive: Callable) -> Dict[str, Any]:
+        content_type = dict(scope.get("headers", [])).get(b"content-type", b"").decode()
+        if not content_type.split(";")[0].strip().endswith("json"):
+            raise HTTPError(400, {"error": "Request must be JSON"})
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, {"error": "Client disconnected"})
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+            if len(body) > MAX_BODY_BYTES:
+                raise HTTPError(413, {"error": "Request body too large"})
+        try:
+            data = json.loads(body or b"null")
+        except ValueError as e:
+            raise HTTPError(400, {"error": "Invalid JSON format", "details": str(e)})
+        if not isinstance(data, dict):
+            raise HTTPError(400, {"error": "Invalid JSON format", "details": "Expected an object"})
+        return data
+
+    async def send_json(self, send: Callable, status: int, payload: Any,
+                        headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        body = _dumps(payload)
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())
+        ] + (headers or [])})
+        await send({"type": "http.response.body", "body": body})
+
+    async def send_static(self, relative: str, head: bool, send: Callable) -> None:
+        """Stream a file under the static root in fixed-size chunks"""
+        path = (self.static_root / relative).resolve()
+        if self.static_root not in path.parents or not path.is_file():
+            raise HTTPError(404, {"error": "Not found"})
+        size = path.stat().st_size
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", content_type.encode()), (b"content-length", str(size).encode()),
+            (b"last-modified", formatdate(path.stat().st_mtime, usegmt=True).encode()),
+        ]})
+        if head:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as f:
+            while True:
+                # File reads go to the default executor, not the scan pool, so static files never queue behind scans
+                chunk = await loop.run_in_executor(None, f.read, STATIC_CHUNK_BYTES)
+                more = len(chunk) == STATIC_CHUNK_BYTES
+                await send({"type": "http.response.body", "body": chunk, "more_body": more})
+                if not more:
+                    break
+
+    # WebSocket
+
+    async def handle_websocket(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Deep scan over a WebSocket: the client sends {"target", "scan_types"} and receives progress events"""
+        if (await receive())["type"] != "websocket.connect":
+            return
+        if scope["path"] != "/ws/deep-scan":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        await send({"type": "websocket.accept"})
+
+        message = await receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        try:
+            data = json.loads(message.get("text") or message.get("bytes") or b"null")
+            if not isinstance(data, dict):
+                raise HTTPError(400, {"error": "Invalid JSON format", "details": "Expected an object"})
+            target, scan_types = self.validate_deep_scan(data)
+        except ValueError as e:
+            await self.ws_close(send, {"stage": "error", "error": "Invalid JSON format", "details": str(e)}, 1007)
+            return
+        except HTTPError as e:
+            await self.ws_close(send, {"stage": "error", **e.payload}, 1008)
+            return
+
+        try:
+            async with self.limiter.slot():
+                async for event in self.deep_scan_events(target, scan_types):
+                    await send({"type": "websocket.send", "text": _dumps(event).decode()})
+        except Overloaded:
+            await self.ws_close(send, {"stage": "error", "error": "Server busy, retry later"}, 1013)
+            return
+        await send({"type": "websocket.close", "code": 1000})
+
+    async def ws_close(self, send: Callable, event: Dict[str, Any], code: int) -> None:
+        await send({"type": "websocket.send", "text": _dumps(event).decode()})
+        await send({"type": "websocket.close", "code": code})
+
+    # Lifespan
+
+    async def handle_lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Scanners are built before the first request rather than on it
+                try:
+                    await self.load_scanners()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.limiter.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+app = ScannerASGI()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args(argv)
+    if uvicorn is None:
+        print("uvicorn is not installed; run `pip install uvicorn` or serve asgi_app:app with another ASGI server",
+              file=sys.stderr)
+        return 1
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
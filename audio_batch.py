@@ -0,0 +1,198 @@
+"""
+Batch Audio Analysis
+Process-pool analysis of many recordings with a feature cache keyed by file content
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+import numpy as np
+from audio_streaming import StreamingAnalyzer, read_wav_chunks
+
+try:
+    import librosa
+except ImportError:  # Optional: only needed for non-PCM formats
+    librosa = None
+
+DEFAULT_CACHE_PATH = os.environ.get("AUDIO_FEATURE_CACHE_PATH", "findings/audio_features.db")
+
+# Bump when feature extraction changes so cached results are recomputed
+PIPELINE_VERSION = 1
+
+# Files handed to a worker at a time; amortizes pickling for short voicemails
+POOL_CHUNK_SIZE = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio_features (
+    content_hash TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    features TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (content_hash, version)
+) WITHOUT ROWID;
+"""
+
+def content_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_audio_blocks(path: str) -> Tuple[int, int, Iterator[np.ndarray]]:
+    """
+    Sample rate, channel count and float32 blocks (frames x channels) of a recording
+
+    PCM WAVs are read directly in blocks; other formats are decoded by librosa
+    in blocks, as mono.
+    """
+    try:
+        with wave.open(path, "rb") as wav:
+            sample_rate, channels = wav.getframerate(), wav.getnchannels()
+        return sample_rate, channels, read_wav_chunks(path)
+    except (wave.Error, EOFError):
+        if librosa is None:
+            raise
+        blocks = librosa.stream(path, block_length=16, frame_length=4096, hop_length=4096, mono=True)
+        return librosa.get_samplerate(path), 1, (block[:, None] for block in blocks)
+
+def summarize_file(path: str) -> Dict[str, Any]:
+    """
+    Whole-file voice/noise metrics for one recording
+
+    Every feature comes from one spectrum per analysis frame, computed block by block.
+    """
+    sample_rate, channels, blocks = read_audio_blocks(path)
+    streamer = StreamingAnalyzer(sample_rate, channels)
+    for block in blocks:
+        streamer.feed(block)
+    return streamer.snapshot(overall=True)
+
+def analyze_file(path: str) -> Dict[str, Any]:
+    """Pool worker: like summarize_file, but errors are returned so one bad file cannot stop a batch"""
+    try:
+        return summarize_file(path)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+class FeatureCache:
+    """SQLite cache of analysis results keyed by content hash and pipeline version"""
+
+    _default: Optional["FeatureCache"] = None
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CACHE_PATH
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def default(cls) -> "FeatureCache":
+        """Shared cache at the default path"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def get_many(self, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT content_hash, features FROM audio_features "
+                    f"WHERE version = ? AND content_hash IN ({','.join('?' * len(chunk))})",
+                    [PIPELINE_VERSION] + chunk
+                ).fetchall()
+                found.update((digest, json.loads(features)) for digest, features in rows)
+        return found
+
+    def put_many(self, results: Dict[str, Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO audio_features (content_hash, version, features, created) VALUES (?, ?, ?, ?)",
+                [(digest, PIPELINE_VERSION, json.dumps(features), now) for digest, features in results.items()]
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+class BatchAudioAnalyzer:
+    """Analyzes many recordings across a process pool, skipping content already analyzed"""
+
+    def __init__(self, workers: Optional[int] = None, cache: Optional[FeatureCache] = None):
+        """
+        Args:
+            workers: Worker processes (defaults to the number of cores)
+            cache: Feature cache (defaults to the shared cache)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache or FeatureCache.default()
+        self.stats = {"files": 0, "cache_hits": 0, "analyzed": 0, "duplicates": 0, "errors": 0}
+
+    def analyze(self, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Metrics for every path
+
+        Files are hashed first; cached and duplicate content is not analyzed
+        again. Failed analyses are reported per file and not cached.
+        """
+        paths = list(dict.fromkeys(str(path) for path in paths))
+        results: Dict[str, Dict[str, Any]] = {}
+        hashes: Dict[str, str] = {}
+        for path in paths:
+            try:
+                hashes[path] = content_hash(path)
+            except OSError as e:
+                results[path] = {"error": f"{type(e).__name__}: {e}"}
+        self.stats["files"] += len(paths)
+
+        cached = self.cache.get_many(sorted(set(hashes.values())))
+        pending: Dict[str, str] = {}
+        seen = set()
+        for path, digest in hashes.items():
+            if digest in cached:
+                self.stats["cache_hits"] += 1
+            elif digest in seen:
+                self.stats["duplicates"] += 1
+            else:
+                pending[path] = digest
+                seen.add(digest)
+
+        analyzed = dict(zip(pending.values(), self._run(list(pending))))
+        self.stats["analyzed"] += len(analyzed)
+        self.cache.put_many({digest: features for digest, features in analyzed.items() if "error" not in features})
+
+        features_by_hash = {**cached, **analyzed}
+        for path, digest in hashes.items():
+            features = dict(features_by_hash[digest], content_hash=digest)
+            if "error" in features:
+                self.stats["errors"] += 1
+            results[path] = features
+        return {path: results[path] for path in paths}
+
+    def _run(self, paths: List[str]) -> List[Dict[str, Any]]:
+        if not paths:
+            return []
+        workers = min(self.workers, len(paths))
+        if workers == 1:
+            return [analyze_file(path) for path in paths]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(analyze_file, paths, chunksize=POOL_CHUNK_SIZE))
+
+    def analyze_directory(self, directory: str, pattern: str = "*.wav") -> Dict[str, Dict[str, Any]]:
+        return self.analyze(sorted(str(path) for path in Path(directory).rglob(pattern)))
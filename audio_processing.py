@@ -1,19 +1,28 @@
-import librosa
-import numpy as np
 import sounddevice as sd
-from scipy.io.wavfile import write
-import speech_recognition as sr
 from datetime import datetime
 import threading
 import queue
+from audio_streaming import StreamingAnalyzer
+from audio_batch import BatchAudioAnalyzer, read_audio_blocks
+from transcription import Transcriber
+from voice_index import CallerMatcher, VoiceEmbedder
 
 class AudioAnalyzer:
-    def __init__(self):
+    def __init__(self, on_update=None, transcriber=None, caller_matcher=None):
+        """
+        Args:
+            on_update: Called about once a second during recording with live metrics
+            transcriber: Speech-to-text engine (defaults to the configured backend, built on first use)
+            caller_matcher: Voice fingerprint index for repeat callers (defaults to the shared index)
+        """
         self.sample_rate = 44100
         self.channels = 2
         self.is_recording = False
         self.audio_queue = queue.Queue()
-        self.recognizer = sr.Recognizer()
+        self._transcriber = transcriber
+        self._caller_matcher = caller_matcher
+        self.on_update = on_update
+        self.streamer = None
         
     def start_recording(self):
         """Start audio recording"""
@@ -30,17 +39,30 @@ class AudioAnalyzer:
         
     def _record_audio(self):
         """Internal method to handle audio recording"""
-        audio_data = []
-        with sd.InputStream(samplerate=self.sample_rate, channels=self.channels, callback=self._audio_callback):
-            while self.is_recording:
-                frame = self.audio_queue.get()
-                audio_data.extend(frame)
-                
-        # Save recording
+        # Frames go into a fixed-size ring buffer and an incrementally written
+        # WAV, so memory stays flat however long the call runs
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"recording_{timestamp}.wav"
-        write(filename, self.sample_rate, np.array(audio_data))
+        self.streamer = StreamingAnalyzer(self.sample_rate, self.channels, wav_path=filename, on_update=self.on_update)
+        try:
+            with sd.InputStream(samplerate=self.sample_rate, channels=self.channels, callback=self._audio_callback):
+                while self.is_recording:
+                    try:
+                        frame = self.audio_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    self.streamer.feed(frame)
+            while not self.audio_queue.empty():
+                self.streamer.feed(self.audio_queue.get_nowait())
+        finally:
+            self.streamer.close()
         return filename
+
+    def get_live_analysis(self):
+        """Rolling voice/noise metrics and risk flags for the recording in progress"""
+        if self.streamer is None:
+            return None
+        return self.streamer.snapshot()
         
     def _audio_callback(self, indata, frames, time, status):
         """Callback for audio stream"""
@@ -48,47 +70,47 @@ class AudioAnalyzer:
         
     def analyze_audio(self, audio_file):
         """Analyze recorded audio file"""
-        # Load audio file
-        y, sr = librosa.load(audio_file)
+        # Stream the file through the same pipeline used live instead of loading it whole
+        summary, embedding = self._stream_file(audio_file)
         
         results = {
-            "voice_analysis": self._analyze_voice(y, sr),
-            "background_noise": self._analyze_noise(y, sr),
+            "voice_analysis": summary["voice_analysis"],
+            "background_noise": summary["background_noise"],
+            "risk_flags": summary["risk_flags"],
             "accent_detection": self._detect_accent(audio_file),
+            "caller_matches": self.caller_matcher.match_embedding(embedding),
             "transcription": self._transcribe_audio(audio_file)
         }
         
         return results
-        
-    def _analyze_voice(self, y, sr):
-        """Analyze voice characteristics"""
-        # Extract voice features
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
-        
-        # Pitch detection
-        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        pitch_mean = np.mean(pitches[magnitudes > np.max(magnitudes)*0.7])
-        
-        return {
-            "pitch": float(pitch_mean),
-            "energy": float(np.mean(librosa.feature.rms(y=y))),
-            "speech_rate": self._calculate_speech_rate(y, sr)
-        }
-        
-    def _analyze_noise(self, y, sr):
-        """Analyze background noise"""
-        # Separate harmonics and percussives
-        y_harmonic, y_percussive = librosa.effects.hpss(y)
-        
-        # Calculate noise metrics
-        noise_level = np.mean(np.abs(y_percussive))
-        signal_to_noise = np.mean(np.abs(y_harmonic)) / (noise_level + 1e-10)
-        
-        return {
-            "noise_level": float(noise_level),
-            "signal_to_noise_ratio": float(signal_to_noise)
-        }
+
+    @property
+    def caller_matcher(self):
+        if self._caller_matcher is None:
+            self._caller_matcher = CallerMatcher()
+        return self._caller_matcher
+
+    def register_caller(self, audio_file, recording_id=None, label=None):
+        """Add a reported recording's voice to the fingerprint index"""
+        return self.caller_matcher.register(audio_file, recording_id, label) is not None
+
+    def match_caller(self, audio_file, k=5):
+        """Earlier reported recordings with the closest voices"""
+        return self.caller_matcher.match(audio_file, k)
+
+    def analyze_batch(self, audio_files, workers=None):
+        """Voice/noise metrics for many recordings across a process pool, cached by content"""
+        return BatchAudioAnalyzer(workers=workers).analyze(audio_files)
+
+    def _stream_file(self, audio_file):
+        """Whole-file metrics and voice embedding from one pass over fixed-size blocks"""
+        sample_rate, channels, blocks = read_audio_blocks(audio_file)
+        streamer = StreamingAnalyzer(sample_rate, channels)
+        embedder = VoiceEmbedder(sample_rate)
+        for block in blocks:
+            streamer.feed(block)
+            embedder.feed(block)
+        return streamer.snapshot(overall=True), embedder.embedding()
         
     def _detect_accent(self, audio_file):
         """Detect accent from audio"""
@@ -100,20 +122,13 @@ class AudioAnalyzer:
         }
         
     def _transcribe_audio(self, audio_file):
-        """Transcribe audio to text"""
+        """Transcribe audio to text, with segment timestamps"""
         try:
-            with sr.AudioFile(audio_file) as source:
-                audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio)
-                return {"text": text, "success": True}
+            if self._transcriber is None:
+                self._transcriber = Transcriber()
+            return self._transcriber.transcribe_file(audio_file)
         except Exception as e:
             return {"text": str(e), "success": False}
-            
-    def _calculate_speech_rate(self, y, sr):
-        """Calculate approximate speech rate"""
-        onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-        tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=sr)
-        return float(tempo[0])
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,411 @@
+"""
+Streaming Audio Analysis
+Fixed-memory ring buffers, per-window features and rolling voice/noise metrics for live calls
+"""
+
+import wave
+from typing import Dict, Any, List, Optional, Callable, Iterator
+import numpy as np
+
+# Analysis frame and hop in samples at 44.1 kHz (about 46 ms and 12 ms)
+FRAME_SIZE = 2048
+HOP_SIZE = 512
+
+N_MFCC = 13
+N_MELS = 40
+
+# Pitch search range for speech, in Hz
+MIN_PITCH = 60.0
+MAX_PITCH = 400.0
+
+# Normalized autocorrelation peak above which a frame counts as voiced
+VOICING_THRESHOLD = 0.3
+
+# Shortest gap between counted onsets; one syllable onset spans several overlapping frames
+MIN_ONSET_GAP = 0.1
+
+# Seconds of per-frame features the rolling metrics cover
+ROLLING_WINDOW = 10.0
+
+# Seconds of raw audio kept in the capture ring buffer
+CAPTURE_SECONDS = 30.0
+
+# Log10 RMS histogram used for the whole-stream noise floor percentile
+RMS_HISTOGRAM_RANGE = (-6.0, 0.0)
+RMS_HISTOGRAM_BINS = 240
+
+# Live risk flag thresholds
+NOISY_SNR = 3.0
+FLAT_PITCH_VARIATION = 0.05
+MIN_VOICED_FRAMES = 50
+
+FEATURE_NAMES = ["rms", "centroid", "flatness", "pitch", "voiced", "flux"] + [f"mfcc_{i}" for i in range(N_MFCC)]
+
+class RingBuffer:
+    """Preallocated 2-D ring buffer; rows are samples or feature frames"""
+
+    def __init__(self, capacity: int, width: int = 1, dtype: Any = np.float32):
+        self.data = np.zeros((capacity, width), dtype=dtype)
+        self.capacity = capacity
+        self.position = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def write(self, rows: np.ndarray) -> None:
+        rows = np.asarray(rows, dtype=self.data.dtype).reshape(-1, self.data.shape[1])
+        self.total += len(rows)
+        if len(rows) >= self.capacity:
+            rows = rows[-self.capacity:]
+        end = self.position + len(rows)
+        if end <= self.capacity:
+            self.data[self.position:end] = rows
+        else:
+            split = self.capacity - self.position
+            self.data[self.position:] = rows[:split]
+            self.data[:end - self.capacity] = rows[split:]
+        self.position = end % self.capacity
+
+    def latest(self, count: Optional[int] = None) -> np.ndarray:
+        """Copy of the most recent rows, oldest first"""
+        count = len(self) if count is None else min(count, len(self))
+        start = (self.position - count) % self.capacity
+        if start + count <= self.capacity:
+            return self.data[start:start + count].copy()
+        return np.concatenate((self.data[start:], self.data[:self.position]))
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int = N_MELS) -> np.ndarray:
+    """Triangular mel filters (n_mels x n_fft // 2 + 1)"""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    edges = to_hz(np.linspace(to_mel(0.0), to_mel(sample_rate / 2.0), n_mels + 2))
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins[None, :] - lower) / (center - lower)
+    falling = (upper - bins[None, :]) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+def dct_matrix(n_out: int, n_in: int) -> np.ndarray:
+    """Orthonormal DCT-II basis (n_out x n_in)"""
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    basis = np.cos(np.pi / n_in * (n + 0.5) * k) * np.sqrt(2.0 / n_in)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+class StreamingFeatureExtractor:
+    """Turns a mono sample stream into per-frame features as hops complete"""
+
+    def __init__(self, sample_rate: int, frame_size: int = FRAME_SIZE, hop_size: int = HOP_SIZE):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hop_size = hop_size
+        self.window = np.hanning(frame_size).astype(np.float32)
+        self.mel = mel_filterbank(sample_rate, frame_size)
+        self.dct = dct_matrix(N_MFCC, N_MELS)
+        self.freqs = np.fft.rfftfreq(frame_size, 1.0 / sample_rate).astype(np.float32)
+        self.min_lag = max(1, int(sample_rate / MAX_PITCH))
+        self.max_lag = min(frame_size - 1, int(sample_rate / MIN_PITCH))
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.previous_mel: Optional[np.ndarray] = None
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Features (frames x FEATURE_NAMES) for every frame completed by these samples"""
+        self.pending = np.concatenate((self.pending, np.asarray(samples, dtype=np.float32)))
+        count = 0 if len(self.pending) < self.frame_size else 1 + (len(self.pending) - self.frame_size) // self.hop_size
+        if count == 0:
+            return np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+
+        strides = (self.pending.strides[0] * self.hop_size, self.pending.strides[0])
+        frames = np.lib.stride_tricks.as_strided(self.pending, (count, self.frame_size), strides)
+        features = self._features(frames * self.window)
+        self.pending = self.pending[count * self.hop_size:].copy()
+        return features
+
+    def _features(self, frames: np.ndarray) -> np.ndarray:
+        spectrum = np.abs(np.fft.rfft(frames, axis=1)).astype(np.float32)
+        power = spectrum ** 2
+        total = spectrum.sum(axis=1) + 1e-10
+
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        centroid = (spectrum * self.freqs).sum(axis=1) / total
+        flatness = np.exp(np.mean(np.log(spectrum + 1e-10), axis=1)) / (total / spectrum.shape[1])
+
+        # Pitch from the autocorrelation (inverse FFT of the power spectrum)
+        autocorr = np.fft.irfft(power, axis=1)[:, :self.max_lag + 1]
+        search = autocorr[:, self.min_lag:self.max_lag + 1]
+        lags = np.argmax(search, axis=1) + self.min_lag
+        strength = search.max(axis=1) / (autocorr[:, 0] + 1e-10)
+        voiced = (strength > VOICING_THRESHOLD) & (rms > 1e-3)
+        pitch = np.where(voiced, self.sample_rate / lags, 0.0)
+
+        log_mel = np.log(power @ self.mel.T + 1e-10)
+        mfcc = log_mel @ self.dct.T
+
+        # Spectral flux across consecutive mel frames, carried across calls
+        previous = np.vstack(([self.previous_mel if self.previous_mel is not None else log_mel[0]], log_mel[:-1]))
+        flux = np.maximum(log_mel - previous, 0.0).mean(axis=1)
+        self.previous_mel = log_mel[-1]
+
+        return np.column_stack((rms, centroid, flatness, pitch, voiced, flux, mfcc)).astype(np.float32)
+
+class RollingMetrics:
+    """
+    Voice and noise metrics over the last ROLLING_WINDOW seconds of frames,
+    plus constant-memory accumulators covering the whole stream
+    """
+
+    def __init__(self, sample_rate: int, hop_size: int = HOP_SIZE, window_seconds: float = ROLLING_WINDOW):
+        self.frame_rate = sample_rate / hop_size
+        self.history = RingBuffer(max(1, int(window_seconds * self.frame_rate)), len(FEATURE_NAMES))
+        self.column = {name: index for index, name in enumerate(FEATURE_NAMES)}
+        self.totals = {"frames": 0, "voiced": 0, "onsets": 0, "rms": 0.0, "voiced_rms": 0.0,
+                       "pitch": 0.0, "pitch_squared": 0.0, "flatness": 0.0}
+        self.mfcc_sum = np.zeros(N_MFCC)
+        self.rms_histogram = np.zeros(RMS_HISTOGRAM_BINS, dtype=np.int64)
+        self.min_onset_gap = max(1, int(MIN_ONSET_GAP * self.frame_rate))
+        self._above = False
+        self._last_onset = -self.min_onset_gap
+
+    def update(self, features: np.ndarray) -> None:
+        if not len(features):
+            return
+        self.history.write(features)
+
+        rms = features[:, self.column["rms"]]
+        voiced = features[:, self.column["voiced"]] > 0
+        pitches = features[voiced, self.column["pitch"]]
+        totals = self.totals
+        totals["frames"] += len(features)
+        totals["voiced"] += int(voiced.sum())
+        totals["rms"] += float(rms.sum())
+        totals["voiced_rms"] += float(rms[voiced].sum())
+        totals["pitch"] += float(pitches.sum())
+        totals["pitch_squared"] += float((pitches.astype(np.float64) ** 2).sum())
+        totals["flatness"] += float(features[:, self.column["flatness"]].sum())
+        mfcc_start = self.column["mfcc_0"]
+        self.mfcc_sum += features[:, mfcc_start:mfcc_start + N_MFCC].sum(axis=0)
+        self.rms_histogram += np.histogram(np.log10(rms + 1e-10), RMS_HISTOGRAM_BINS, RMS_HISTOGRAM_RANGE)[0]
+
+        # Count onsets in the new frames against the current rolling threshold
+        above = features[:, self.column["flux"]] > self._onset_threshold(self.history.latest())
+        onsets = _onsets(above, self.min_onset_gap, self._above, self._last_onset - totals["frames"] + len(features))
+        if onsets:
+            self._last_onset = totals["frames"] - len(features) + onsets[-1]
+        totals["onsets"] += len(onsets)
+        self._above = bool(above[-1])
+
+    def _onset_threshold(self, frames: np.ndarray) -> float:
+        """Spectral flux level marking an onset: frames rising above it start a syllable"""
+        flux = frames[:, self.column["flux"]]
+        return float(np.median(flux) + 0.5 * flux.std())
+
+    def voice(self) -> Dict[str, Any]:
+        """Voice metrics over the rolling window"""
+        frames = self.history.latest()
+        if not len(frames):
+            return _empty_voice()
+        voiced = frames[:, self.column["voiced"]] > 0
+        pitches = frames[voiced, self.column["pitch"]]
+        pitch = float(pitches.mean()) if len(pitches) else 0.0
+
+        above = frames[:, self.column["flux"]] > self._onset_threshold(frames)
+        onsets = len(_onsets(above, self.min_onset_gap))
+        minutes = len(frames) / self.frame_rate / 60.0
+
+        mfcc_start = self.column["mfcc_0"]
+        return {
+            "pitch": pitch,
+            "pitch_variation": float(pitches.std() / pitch) if pitch else 0.0,
+            "energy": float(frames[:, self.column["rms"]].mean()),
+            "speech_rate": onsets / minutes if minutes else 0.0,
+            "voiced_ratio": float(voiced.mean()),
+            "voiced_frames": int(voiced.sum()),
+            "mfcc_mean": frames[:, mfcc_start:mfcc_start + N_MFCC].mean(axis=0).round(4).tolist()
+        }
+
+    def noise(self) -> Dict[str, Any]:
+        """Noise metrics over the rolling window"""
+        frames = self.history.latest()
+        if not len(frames):
+            return _empty_noise()
+        rms = frames[:, self.column["rms"]]
+        voiced = frames[:, self.column["voiced"]] > 0
+        # The quietest frames approximate the noise floor between words
+        noise_level = float(np.percentile(rms, 10))
+        signal = float(rms[voiced].mean()) if voiced.any() else float(rms.mean())
+        return {
+            "noise_level": noise_level,
+            "signal_to_noise_ratio": signal / (noise_level + 1e-10),
+            "spectral_flatness": float(frames[:, self.column["flatness"]].mean())
+        }
+
+    def overall_voice(self) -> Dict[str, Any]:
+        """Voice metrics over everything seen so far"""
+        totals = self.totals
+        if not totals["frames"]:
+            return _empty_voice()
+        pitch = totals["pitch"] / totals["voiced"] if totals["voiced"] else 0.0
+        variance = totals["pitch_squared"] / totals["voiced"] - pitch ** 2 if totals["voiced"] else 0.0
+        minutes = totals["frames"] / self.frame_rate / 60.0
+        return {
+            "pitch": pitch,
+            "pitch_variation": float(np.sqrt(max(variance, 0.0)) / pitch) if pitch else 0.0,
+            "energy": totals["rms"] / totals["frames"],
+            "speech_rate": totals["onsets"] / minutes,
+            "voiced_ratio": totals["voiced"] / totals["frames"],
+            "voiced_frames": totals["voiced"],
+            "mfcc_mean": (self.mfcc_sum / totals["frames"]).round(4).tolist()
+        }
+
+    def overall_noise(self) -> Dict[str, Any]:
+        """Noise metrics over everything seen so far"""
+        totals = self.totals
+        if not totals["frames"]:
+            return _empty_noise()
+        cumulative = np.cumsum(self.rms_histogram)
+        floor_bin = int(np.searchsorted(cumulative, 0.1 * cumulative[-1]))
+        low, high = RMS_HISTOGRAM_RANGE
+        noise_level = 10 ** (low + (floor_bin + 0.5) * (high - low) / RMS_HISTOGRAM_BINS)
+        signal = totals["voiced_rms"] / totals["voiced"] if totals["voiced"] else totals["rms"] / totals["frames"]
+        return {
+            "noise_level": noise_level,
+            "signal_to_noise_ratio": signal / (noise_level + 1e-10),
+            "spectral_flatness": totals["flatness"] / totals["frames"]
+        }
+
+def _onsets(above: np.ndarray, min_gap: int, previous_above: bool = True, last_onset: int = None) -> List[int]:
+    """Frame indices where flux rises above the threshold, at least min_gap frames apart"""
+    rising = np.flatnonzero(above & ~np.concatenate(([previous_above], above[:-1])))
+    onsets = []
+    last = -min_gap if last_onset is None else last_onset
+    for index in rising:
+        if index - last >= min_gap:
+            onsets.append(int(index))
+            last = index
+    return onsets
+
+def _empty_voice() -> Dict[str, Any]:
+    return {"pitch": 0.0, "pitch_variation": 0.0, "energy": 0.0, "speech_rate": 0.0,
+            "voiced_ratio": 0.0, "voiced_frames": 0, "mfcc_mean": []}
+
+def _empty_noise() -> Dict[str, Any]:
+    return {"noise_level": 0.0, "signal_to_noise_ratio": 0.0, "spectral_flatness": 0.0}
+
+def risk_flags(voice: Dict[str, Any], noise: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Call-risk indicators available while the call is still running"""
+    flags = []
+    if noise["noise_level"] > 0 and noise["signal_to_noise_ratio"] < NOISY_SNR:
+        flags.append({"type": "high_background_noise", "value": round(noise["signal_to_noise_ratio"], 2),
+                      "description": "Crowded background typical of call-centre operations"})
+    if voice.get("voiced_frames", 0) >= MIN_VOICED_FRAMES and voice["pitch_variation"] < FLAT_PITCH_VARIATION:
+        flags.append({"type": "flat_pitch", "value": round(voice["pitch_variation"], 4),
+                      "description": "Unusually monotone voice, possible synthetic or pre-recorded speech"})
+    return flags
+
+class StreamingAnalyzer:
+    """Consumes audio blocks as they arrive, keeping live metrics and an incremental WAV"""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        wav_path: Optional[str] = None,
+        on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        update_interval: float = 1.0,
+        capture_seconds: float = CAPTURE_SECONDS
+    ):
+        """
+        Args:
+            sample_rate: Input sample rate in Hz
+            channels: Input channel count (analysis uses the mono downmix)
+            wav_path: WAV file written incrementally as 16-bit PCM (None to skip)
+            on_update: Called with a snapshot every update_interval seconds of audio
+            update_interval: Seconds of audio between on_update calls
+            capture_seconds: Seconds of recent raw audio kept in memory
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.capture = RingBuffer(int(capture_seconds * sample_rate), channels)
+        self.extractor = StreamingFeatureExtractor(sample_rate)
+        self.metrics = RollingMetrics(sample_rate)
+        self.on_update = on_update
+        self.update_samples = int(update_interval * sample_rate)
+        self._next_update = self.update_samples
+        self.wav = None
+        if wav_path:
+            self.wav = wave.open(wav_path, "wb")
+            self.wav.setnchannels(channels)
+            self.wav.setsampwidth(2)
+            self.wav.setframerate(sample_rate)
+
+    @property
+    def samples_seen(self) -> int:
+        return self.capture.total
+
+    def feed(self, block: np.ndarray) -> None:
+        """Add a block of samples (frames x channels, float in [-1, 1])"""
+        block = np.asarray(block, dtype=np.float32).reshape(-1, self.channels)
+        self.capture.write(block)
+        if self.wav is not None:
+            self.wav.writeframes((np.clip(block, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+
+        self.metrics.update(self.extractor.process(block.mean(axis=1)))
+        if self.on_update is not None and self.samples_seen >= self._next_update:
+            self._next_update += self.update_samples
+            self.on_update(self.snapshot())
+
+    def snapshot(self, overall: bool = False) -> Dict[str, Any]:
+        """Rolling-window metrics and risk flags (whole-stream metrics if overall)"""
+        voice = self.metrics.overall_voice() if overall else self.metrics.voice()
+        noise = self.metrics.overall_noise() if overall else self.metrics.noise()
+        return {
+            "elapsed_seconds": self.samples_seen / self.sample_rate,
+            "voice_analysis": voice,
+            "background_noise": noise,
+            "risk_flags": risk_flags(voice, noise)
+        }
+
+    def recent_audio(self, seconds: float) -> np.ndarray:
+        return self.capture.latest(int(seconds * self.sample_rate))
+
+    def close(self) -> None:
+        if self.wav is not None:
+            self.wav.close()
+            self.wav = None
+
+def read_wav_chunks(path: str, chunk_frames: int = 65536) -> Iterator[np.ndarray]:
+    """Yield float32 blocks (frames x channels) from a PCM WAV without loading it whole"""
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        while True:
+            raw = wav.readframes(chunk_frames)
+            if not raw:
+                break
+            if width == 1:
+                samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+            elif width == 2:
+                samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+            elif width == 3:
+                bytes3 = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+                padded = np.zeros((len(bytes3), 4), dtype=np.uint8)
+                padded[:, 1:] = bytes3
+                samples = padded.view("<i4").ravel().astype(np.float32) / 2147483648.0
+            else:
+                samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+            yield samples.reshape(-1, channels)
+
+def analyze_wav(path: str, chunk_frames: int = 65536) -> Dict[str, Any]:
+    """Stream a WAV file through the analyzer, returning whole-file metrics"""
+    with wave.open(path, "rb") as wav:
+        sample_rate, channels = wav.getframerate(), wav.getnchannels()
+    analyzer = StreamingAnalyzer(sample_rate, channels)
+    for block in read_wav_chunks(path, chunk_frames):
+        analyzer.feed(block)
+    return analyzer.snapshot(overall=True)
@@ -0,0 +1,350 @@
+"""
+Load Benchmark
+Drives the scan endpoints at a target concurrency against the provider simulator and writes machine-readable results
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Callable
+import numpy as np
+import requests
+from provider_adapters import ADAPTER_REGISTRY
+from provider_simulator import (
+    ProviderSimulator, ProviderProfile, load_profiles, parse_quota, provider_hosts, stated_limit_profiles
+)
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "findings", "benchmarks")
+
+# Documentation-reserved targets, so nothing outside the simulator can answer for them
+TARGETS = {
+    "phone": "+14155550123",
+    "email": "billing@secure-refund.example",
+    "domain": "secure-refund.example",
+    "breach": "billing@secure-refund.example",
+    "threat": "secure-refund.example",
+    "social": "refund_support_desk",
+}
+
+# Endpoint name -> (app, path, body, weight)
+WORKLOAD = {
+    "scan": ("osint", "/api/scan", {"target": TARGETS["domain"], "type": "comprehensive"}, 1),
+    **{
+        f"scan_{scan_type}": ("scanner", f"/api/scan/{scan_type}", {"target": target}, 1)
+        for scan_type, target in TARGETS.items()
+    },
+    "deep_scan": ("scanner", "/api/deep-scan", {"target": TARGETS["email"]}, 1),
+}
+
+# Endpoints that fail whatever the server does: /api/scan has no comprehensive scan behind it
+# (500) and no provider serves social scans (400). They stay selectable with --endpoints but are
+# left out by default, so instant failures do not dilute the latency and throughput figures
+UNSERVED_ENDPOINTS = ("scan", "scan_social")
+DEFAULT_ENDPOINTS = [name for name in WORKLOAD if name not in UNSERVED_ENDPOINTS]
+
+# Fractional p95/p99 increase (or throughput drop) reported as a regression
+DEFAULT_TOLERANCE = 0.10
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles (ms), status counts and throughput for one endpoint"""
+    values = np.array(latencies) * 1000.0
+    errors = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+    }
+    if len(values):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary.update({
+            "mean_ms": round(float(values.mean()), 2), "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2), "max_ms": round(float(values.max()), 2),
+        })
+    return summary
+
+def quota_spend(host_stats: Dict[str, Dict[str, Any]], hosts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Provider calls the run would have paid for
+
+    Calls rejected with 429 are not counted. Units weight calls by adapter
+    cost; quota_fraction is the share of the provider's stated quota.
+    """
+    spend = {}
+    for host, stats in sorted(host_stats.items()):
+        info = hosts.get(host, {"providers": [], "quota": None, "cost": 1.0})
+        calls = stats["requests"] - stats["statuses"].get(429, 0)
+        quota = parse_quota(info["quota"])
+        spend[host] = {
+            "providers": info["providers"],
+            "calls": calls,
+            "units": round(calls * info["cost"], 3),
+            "quota": info["quota"],
+            "quota_fraction": round(calls / quota[0], 4) if quota else None,
+            "rate_limited": stats["statuses"].get(429, 0),
+        }
+    return spend
+
+def write_api_keys(directory: str) -> None:
+    """Simulated keys for every premium adapter so their calls are exercised"""
+    keys: Dict[str, Dict[str, str]] = {}
+    for category, adapters in ADAPTER_REGISTRY.items():
+        for name, adapter in adapters.items():
+            keys.setdefault(category, {})[name] = f"simulated-{name}"
+            if adapter.basic_auth_secret:
+                keys[category][adapter.basic_auth_secret] = "simulated-secret"
+    os.makedirs(os.path.join(directory, "config"), exist_ok=True)
+    with open(os.path.join(directory, "config", "api_keys.json"), "w") as f:
+        json.dump(keys, f, indent=2)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class LoadRunner:
+    """Closed-loop load: each worker sends its next request as soon as the last one returns"""
+
+    def __init__(self, base_urls: Dict[str, str], endpoints: List[str], concurrency: int, timeout: float = 120.0):
+        self.base_urls = base_urls
+        self.schedule = [name for name in endpoints for _ in range(WORKLOAD[name][3])]
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def run(self, duration: Optional[float] = None,
+            total: Optional[int] = None) -> Tuple[Dict[str, List[Tuple[float, int]]], float]:
+        """Samples per endpoint and the measured wall time"""
+        samples: Dict[str, List[Tuple[float, int]]] = {name: [] for name in set(self.schedule)}
+        self._next = 0
+        start = time.perf_counter()
+        self._drive(start + duration if duration else None, total, samples)
+        return samples, time.perf_counter() - start
+
+    def _drive(self, deadline: Optional[float], total: Optional[int], samples: Dict[str, list]) -> None:
+        workers = [threading.Thread(target=self._worker, args=(deadline, total, samples))
+                   for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def _take(self, deadline: Optional[float], total: Optional[int]) -> Optional[str]:
+        with self._lock:
+            if (deadline and time.perf_counter() >= deadline) or (total is not None and self._next >= total):
+                return None
+            name = self.schedule[self._next % len(self.schedule)]
+            self._next += 1
+            return name
+
+    def _worker(self, deadline: Optional[float], total: Optional[int], samples: Dict[str, list]) -> None:
+        session = requests.Session()
+        # The app servers are local; only their outbound calls go through the simulator
+        session.trust_env = False
+        while True:
+            name = self._take(deadline, total)
+            if name is None:
+                return
+            app, path, body, _ = WORKLOAD[name]
+            started = time.perf_counter()
+            try:
+                status = session.post(self.base_urls[app] + path, json=body, timeout=self.timeout).status_code
+            except requests.RequestException:
+                status = 599
+            if name in samples:
+                with self._lock:
+                    samples[name].append((time.perf_counter() - started, status))
+
+def serve_apps(workers: int = 0, threads: int = 8) -> Tuple[Dict[str, str], List[Callable[[], None]]]:
+    """
+    Serve both Flask apps locally, returning their URLs and functions that stop them
+
+    With workers each app runs under serve.py's pre-fork server (response
+    cache off, so every request does the full work); otherwise both run
+    on threaded development servers in this process.
+    """
+    if workers:
+        return _serve_prefork(workers, threads)
+
+    import logging
+    from werkzeug.serving import make_server
+    import api
+    import scanner_app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    base_urls, stops = {}, []
+    for name, app in (("osint", api.app), ("scanner", scanner_app.app)):
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_urls[name] = f"http://127.0.0.1:{server.server_port}"
+        stops.append(server.shutdown)
+    return base_urls, stops
+
+def _serve_prefork(workers: int, threads: int) -> Tuple[Dict[str, str], List[Callable[[], None]]]:
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [repo, os.environ.get("PYTHONPATH")]))}
+    base_urls, stops = {}, []
+    for name, app in (("osint", "api"), ("scanner", "scanner")):
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(repo, "serve.py"), app, "--port", "0", "--workers", str(workers),
+             "--threads", str(threads), "--no-cache"],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        # serve.py prints its address once the socket is bound
+        base_urls[name] = process.stdout.readline().split()[-1]
+
+        def stop(process: subprocess.Popen = process) -> None:
+            process.terminate()
+            process.wait(60)
+
+        stops.append(stop)
+    return base_urls, stops
+
+def run_benchmark(
+    concurrency: int = 8,
+    duration: Optional[float] = 30.0,
+    total: Optional[int] = None,
+    endpoints: Optional[List[str]] = None,
+    profiles_path: Optional[str] = None,
+    warmup: float = 0.0,
+    seed: int = 0,
+    stated_limits: bool = False,
+    workers: int = 0,
+    threads: int = 8
+) -> Dict[str, Any]:
+    """
+    Run the scan endpoints against the provider simulator
+
+    The process environment is pointed at the simulator and the working
+    directory at a scratch directory (findings/, config/api_keys.json)
+    before the apps are imported, so nothing reaches real providers or the
+    real findings store.
+    """
+    endpoints = endpoints or list(DEFAULT_ENDPOINTS)
+    default, profiles = load_profiles(profiles_path) if profiles_path else (ProviderProfile(), {})
+    if stated_limits:
+        profiles = {**stated_limit_profiles(default), **profiles}
+    workdir = tempfile.mkdtemp(prefix="bench_load_")
+    original_cwd = os.getcwd()
+
+    with ProviderSimulator(default, profiles, seed=seed) as simulator:
+        os.environ.update(simulator.environment())
+        write_api_keys(workdir)
+        os.chdir(workdir)
+        try:
+            base_urls, stops = serve_apps(workers, threads)
+            runner = LoadRunner(base_urls, endpoints, concurrency)
+            if warmup:
+                runner.run(duration=warmup)
+                simulator.reset_stats()
+            samples, elapsed = runner.run(duration=None if total else duration, total=total)
+            for stop in stops:
+                stop()
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+        host_stats = simulator.stats()
+
+    results = {name: summarize([s[0] for s in rows], Counter(s[1] for s in rows), elapsed)
+               for name, rows in sorted(samples.items())}
+    all_rows = [row for rows in samples.values() for row in rows]
+    hosts = provider_hosts()
+    return {
+        "benchmark": "load",
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"concurrency": concurrency, "duration": duration, "requests": total, "warmup": warmup,
+                   "endpoints": endpoints, "profiles": profiles_path, "seed": seed,
+                   "stated_limits": stated_limits, "workers": workers, "threads": threads},
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarize([s[0] for s in all_rows], Counter(s[1] for s in all_rows), elapsed),
+        "endpoints": results,
+        "providers": host_stats,
+        "quota_spend": quota_spend(host_stats, hosts),
+        "provider_hosts_covered": sorted(set(hosts) & set(host_stats)),
+        "provider_hosts_known": len(hosts),
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """Endpoints whose p95/p99 rose or throughput fell by more than tolerance"""
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if before.get(metric) and now.get(metric, 0) > before[metric] * (1 + tolerance):
+                regressions.append({"endpoint": name, "metric": metric, "baseline": before[metric], "current": now[metric]})
+        if before.get("throughput_rps") and now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append({"endpoint": name, "metric": "throughput_rps",
+                                "baseline": before["throughput_rps"], "current": now["throughput_rps"]})
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, help="Total requests to send instead of a duration")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of unrecorded load first")
+    parser.add_argument("--endpoints", help=f"Comma-separated subset of: {', '.join(WORKLOAD)} "
+                                            f"(default: all but {', '.join(UNSERVED_ENDPOINTS)})")
+    parser.add_argument("--profiles", help="Provider profile JSON (see provider_simulator.load_profiles)")
+    parser.add_argument("--stated-limits", action="store_true",
+                        help="Enforce each provider's rate_limit from api_config (429s once exceeded)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Serve the apps with serve.py using this many worker processes (0: in-process threads)")
+    parser.add_argument("--threads", type=int, default=8, help="Request threads per serve.py worker")
+    parser.add_argument("--output", help="Result file (default: findings/benchmarks/load_<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoints.split(",") if args.endpoints else None
+    unknown = set(endpoints or []) - set(WORKLOAD)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    output = os.path.abspath(args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    ))
+    results = run_benchmark(args.concurrency, args.duration, args.requests, endpoints,
+                            args.profiles, args.warmup, args.seed, args.stated_limits, args.workers, args.threads)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'endpoint':<14}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for name, summary in list(results["endpoints"].items()) + [("overall", results["overall"])]:
+        print(f"{name:<14}{summary['requests']:>9}{summary['errors']:>8}{summary.get('p50_ms', 0):>10.1f}"
+              f"{summary.get('p95_ms', 0):>10.1f}{summary.get('p99_ms', 0):>10.1f}{summary['throughput_rps']:>9.2f}")
+    print(f"Provider calls: {sum(item['calls'] for item in results['quota_spend'].values())} "
+          f"across {len(results['quota_spend'])} hosts; results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for item in regressions:
+            print(f"REGRESSION {item['endpoint']} {item['metric']}: {item['baseline']} -> {item['current']}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Micro Benchmarks
+Times and memory-profiles the CPU-bound correlation, risk and serialization paths on synthetic scan results
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from bench_load import git_commit
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "findings", "benchmarks")
+
+# Multiples of a realistic single-target scan result
+SCALES = {"1x": 1, "100x": 100, "10000x": 10000}
+
+# Each case is timed for at least MIN_ROUNDS rounds and MIN_TIME seconds, capped at MAX_ROUNDS
+MIN_ROUNDS = 3
+MIN_TIME = 0.5
+MAX_ROUNDS = 1000
+
+# Fractional median-time or peak-allocation increase reported as a regression
+DEFAULT_TOLERANCE = 0.20
+MEMORY_TOLERANCE = 0.10
+
+# Per-item cost at the largest scale above this multiple of the 1x cost is flagged as super-linear
+SUPERLINEAR_FACTOR = 3.0
+
+# Sizes of a realistic single-target result, multiplied by the scale
+BASE_BREACHES = 8
+BASE_PROFILES = 4
+BASE_INDICATORS = 10
+BASE_TARGETS = 64
+
+BREACH_NAMES = ["Adobe", "LinkedIn", "Dropbox", "Canva", "MyFitnessPal", "Zynga", "Dubsmash", "Wattpad"]
+DATA_CLASSES = [
+    "Email addresses", "Passwords", "Usernames", "IP addresses", "Names", "Phone numbers",
+    "Dates of birth", "Geographic locations", "Credit Cards", "Social Security Numbers",
+    "Bank Accounts", "Health Records",
+]
+PLATFORMS = ["github.com", "twitter.com", "instagram.com", "reddit.com", "t.me"]
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.randint(2008, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+def synthetic_breaches(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """HIBP-shaped breach records with repeating services and a spread of dates"""
+    return [
+        {
+            "Name": f"{rng.choice(BREACH_NAMES)}{i // len(BREACH_NAMES) or ''}",
+            "Domain": f"{rng.choice(BREACH_NAMES).lower()}.example",
+            "BreachDate": _date(rng),
+            "PwnCount": rng.randint(1000, 200_000_000),
+            "DataClasses": rng.sample(DATA_CLASSES, rng.randint(2, 5)),
+            "IsVerified": rng.random() > 0.1,
+        }
+        for i in range(count)
+    ]
+
+def synthetic_breach_results(scale: int, seed: int = 0) -> Dict[str, Any]:
+    """BreachScanner.gather_intelligence output for a target with scale x the usual breaches"""
+    rng = random.Random(seed)
+    breaches = synthetic_breaches(BASE_BREACHES * scale, rng)
+    dates = [breach["BreachDate"] for breach in breaches]
+    return {
+        "breach_count": len(breaches),
+        "exposed_data": sorted({data for breach in breaches for data in breach["DataClasses"]}),
+        "breach_details": breaches,
+        "password_exposures": [{"source": "local_breach_index", "records": rng.randint(1, 40)}],
+        "risk_level": "HIGH",
+        "earliest_breach": min(dates),
+        "latest_breach": max(dates),
+        "affected_services": sorted({breach["Name"] for breach in breaches}),
+    }
+
+def synthetic_intel(scale: int, seed: int = 0) -> Dict[str, Any]:
+    """Deep-scan intelligence for one target, every list scale x its usual length"""
+    rng = random.Random(seed)
+    profiles = [
+        {"username": f"user{i}", "url": f"https://{rng.choice(PLATFORMS)}/user{i}", "followers": rng.randint(0, 5000)}
+        for i in range(BASE_PROFILES * scale)
+    ]
+    indicators = [
+        f"host{i}.bad-{i % 97}.example" if i % 2 else
+        {"indicator": f"198.51.{(i // 256) % 256}.{i % 256}", "type": "ip", "first_seen": _date(rng)}
+        for i in range(BASE_INDICATORS * scale)
+    ]
+    return {
+        "EMAIL_INTELLIGENCE": {
+            "validation": {"email": "alice@example.com", "deliverable": True},
+            "social_profiles": profiles,
+            "domain_info": {"domain": "example.com", "ip": "192.0.2.10"},
+        },
+        "BREACH_INTELLIGENCE": synthetic_breach_results(scale, seed),
+        "THREAT_INTELLIGENCE": {
+            "indicators": indicators,
+            "threat_actors": [f"actor-{i}" for i in range(scale)],
+            "attack_patterns": [{"technique": f"T{1000 + i % 600}"} for i in range(scale)],
+        },
+        "PHONE_INTELLIGENCE": {
+            "carrier_info": {"number": "+1 (415) 555-0123", "carrier": "Example Wireless"},
+            "location_data": {"country": "US", "region": "CA"},
+        },
+        "SOCIAL_INTELLIGENCE": {
+            "activity_metrics": [{"platform": rng.choice(PLATFORMS), "posts": rng.randint(0, 300)}
+                                 for _ in range(BASE_PROFILES * scale)],
+            "connections": [f"friend{i}" for i in range(BASE_PROFILES * scale)],
+        },
+    }
+
+def synthetic_targets(scale: int, seed: int = 0) -> List[str]:
+    """Mixed target identifiers of every routed type, plus some that match none"""
+    rng = random.Random(seed)
+    makers = [
+        lambda i: f"user{i}@mail{i % 50}.example",
+        lambda i: f"+1415555{i % 10000:04d}",
+        lambda i: f"shop-{i}.example.com",
+        lambda i: f"203.0.{(i // 256) % 256}.{i % 256}",
+        lambda i: "1BoatSLRHtKNngkdXEeobR76b53LETtpyT",
+        lambda i: f"handle_{i}",
+    ]
+    return [rng.choice(makers)(i) for i in range(BASE_TARGETS * scale)]
+
+def _correlate_case(scale: int, seed: int) -> Tuple[Callable[[], Any], int]:
+    from deep_scanner import DeepScanner
+    scanner = DeepScanner()
+    intel = synthetic_intel(scale, seed)
+    return lambda: scanner._correlate_intelligence(intel, target="alice@example.com"), _count_records(intel)
+
+def _analyze_breaches_case(scale: int, seed: int) -> Tuple[Callable[[], Any], int]:
+    from breach_scanner import BreachScanner
+    scanner = BreachScanner()
+    breaches = synthetic_breach_results(scale, seed)["breach_details"]
+    return lambda: scanner.analyze_breaches(breaches), len(breaches)
+
+def _risk_metrics_case(scale: int, seed: int) -> Tuple[Callable[[], Any], int]:
+    from breach_scanner import BreachScanner
+    scanner = BreachScanner()
+    results = synthetic_breach_results(scale, seed)
+    return lambda: scanner.get_risk_metrics(results), results["breach_count"]
+
+def _target_type_case(scale: int, seed: int) -> Tuple[Callable[[], Any], int]:
+    from osint_scanner import OSINTScanner
+    scanner = OSINTScanner()
+    targets = synthetic_targets(scale, seed)
+    return lambda: [scanner._identify_target_type(target) for target in targets], len(targets)
+
+def _json_dump_case(scale: int, seed: int) -> Tuple[Callable[[], Any], int]:
+    from deep_scanner import DeepScanner
+    intel = synthetic_intel(scale, seed)
+    report = {
+        "target": "alice@example.com",
+        "timestamp": datetime(2024, 1, 1).isoformat(),
+        "intelligence": intel,
+        "correlations": DeepScanner()._correlate_intelligence(intel, target="alice@example.com"),
+    }
+
+    def dump() -> int:
+        # Same formatting the scanners use when saving results
+        out = io.StringIO()
+        json.dump(report, out, indent=2)
+        return out.tell()
+
+    return dump, _count_records(intel)
+
+def _count_records(intel: Dict[str, Any]) -> int:
+    return sum(len(value) for category in intel.values() for value in category.values() if isinstance(value, list))
+
+# Case name -> setup(scale, seed) returning the timed callable and how many records it processes
+CASES: Dict[str, Callable[[int, int], Tuple[Callable[[], Any], int]]] = {
+    "correlate_intelligence": _correlate_case,
+    "analyze_breaches": _analyze_breaches_case,
+    "get_risk_metrics": _risk_metrics_case,
+    "identify_target_type": _target_type_case,
+    "json_dump": _json_dump_case,
+}
+
+def _max_rss_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def measure(func: Callable[[], Any], min_rounds: int = MIN_ROUNDS, min_time: float = MIN_TIME,
+            max_rounds: int = MAX_ROUNDS) -> Dict[str, Any]:
+    """Timing statistics (ms) over repeated calls, then one traced call for allocations"""
+    func()  # Warm caches and lazy imports outside the timed rounds
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_rounds and (len(timings) < min_rounds or time.perf_counter() - started < min_time):
+        begin = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - begin) * 1000.0)
+
+    rss_before = _max_rss_kb()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = after.compare_to(before, "filename")
+    del result
+
+    median = statistics.median(timings)
+    return {
+        "rounds": len(timings),
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(median, 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "stddev_ms": round(statistics.stdev(timings), 4) if len(timings) > 1 else 0.0,
+        "max_ms": round(max(timings), 4),
+        "ops_per_sec": round(1000.0 / median, 3) if median else None,
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "result_kb": round(sum(stat.size_diff for stat in retained) / 1024, 1),
+        "result_blocks": sum(stat.count_diff for stat in retained),
+        "peak_rss_mb": round(_max_rss_kb() / 1024, 1),
+        "rss_growth_mb": round((_max_rss_kb() - rss_before) / 1024, 1),
+    }
+
+def run_case(name: str, scale: int, seed: int = 0, min_time: float = MIN_TIME) -> Dict[str, Any]:
+    """Build one case's inputs and measure it"""
+    func, items = CASES[name](scale, seed)
+    result = measure(func, min_time=min_time)
+    result["items"] = items
+    result["per_item_us"] = round(result["median_ms"] * 1000.0 / items, 4) if items else None
+    return result
+
+def run_benchmarks(cases: Optional[List[str]] = None, scales: Optional[List[str]] = None, seed: int = 0,
+                   min_time: float = MIN_TIME, isolate: bool = True) -> Dict[str, Any]:
+    """
+    Measure every case at every scale
+
+    With isolate each measurement runs in a fresh forked process, so peak
+    RSS is not inherited from a larger case measured before it.
+    """
+    cases = cases or list(CASES)
+    scales = scales or list(SCALES)
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in cases:
+        results[name] = {}
+        for label in scales:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("fork")) as pool:
+                    results[name][label] = pool.submit(run_case, name, SCALES[label], seed, min_time).result()
+            else:
+                results[name][label] = run_case(name, SCALES[label], seed, min_time)
+        results[name]["scaling"] = _scaling(results[name], scales)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"scales": {label: SCALES[label] for label in scales}, "seed": seed, "min_time": min_time,
+                   "isolated": isolate},
+        "cases": results,
+    }
+
+def _scaling(case: Dict[str, Any], scales: List[str]) -> Dict[str, Any]:
+    """How per-item cost changes from the smallest to the largest measured scale"""
+    ordered = sorted(scales, key=SCALES.get)
+    first, last = case[ordered[0]], case[ordered[-1]]
+    if len(ordered) < 2 or not first.get("per_item_us"):
+        return {}
+    factor = last["per_item_us"] / first["per_item_us"]
+    return {"per_item_factor": round(factor, 3), "superlinear": factor > SUPERLINEAR_FACTOR}
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE,
+            memory_tolerance: float = MEMORY_TOLERANCE) -> List[Dict[str, Any]]:
+    """Case/scale pairs whose median time or peak allocation rose by more than their tolerance"""
+    regressions = []
+    for name, scales in current["cases"].items():
+        for label, now in scales.items():
+            before = baseline.get("cases", {}).get(name, {}).get(label)
+            if not before or label == "scaling":
+                continue
+            for metric, limit in (("median_ms", tolerance), ("peak_alloc_kb", memory_tolerance)):
+                if before.get(metric) and now.get(metric, 0) > before[metric] * (1 + limit):
+                    regressions.append({"case": name, "scale": label, "metric": metric,
+                                        "baseline": before[metric], "current": now[metric]})
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--scales", help=f"Comma-separated subset of: {', '.join(SCALES)}")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="Seconds to keep timing each case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-isolate", action="store_true", help="Measure in this process instead of forking")
+    parser.add_argument("--output", help="Result file (default: findings/benchmarks/micro_<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(",") if args.cases else None
+    scales = args.scales.split(",") if args.scales else None
+    unknown = (set(cases or []) - set(CASES)) | (set(scales or []) - set(SCALES))
+    if unknown:
+        parser.error(f"Unknown cases or scales: {', '.join(sorted(unknown))}")
+
+    output = os.path.abspath(args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"micro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    ))
+    results = run_benchmarks(cases, scales, args.seed, args.min_time, not args.no_isolate)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'case':<24}{'scale':>8}{'items':>9}{'median ms':>12}{'us/item':>10}{'peak KB':>11}{'RSS MB':>9}")
+    for name, scales_run in results["cases"].items():
+        for label, summary in scales_run.items():
+            if label == "scaling":
+                continue
+            print(f"{name:<24}{label:>8}{summary['items']:>9}{summary['median_ms']:>12.3f}"
+                  f"{summary['per_item_us'] or 0:>10.3f}{summary['peak_alloc_kb']:>11.1f}{summary['peak_rss_mb']:>9.1f}")
+        if scales_run["scaling"].get("superlinear"):
+            print(f"  {name}: per-item cost grows {scales_run['scaling']['per_item_factor']}x across scales")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance, args.memory_tolerance)
+        for item in regressions:
+            print(f"REGRESSION {item['case']} {item['scale']} {item['metric']}: {item['baseline']} -> {item['current']}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
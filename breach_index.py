@@ -0,0 +1,300 @@
+"""
+Local Breach Index
+Sorted, memory-mapped SHA-1 indexes for offline password and account exposure lookups
+"""
+
+import binascii
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.environ.get("BREACH_INDEX_PATH", "findings/breach_index")
+
+MAGIC = b"BIDX0001"
+
+# Records are a 20-byte SHA-1 followed by an occurrence count
+RECORD = np.dtype([("key", "S20"), ("count", "<u4")])
+
+# The fan-out table maps each 16-bit key prefix to its record range
+FANOUT_SIZE = 65536 + 1
+HEADER_SIZE = len(MAGIC) + 8 + FANOUT_SIZE * 8
+
+# Records buffered in memory before spilling to bucket files
+SPILL_RECORDS = 1_000_000
+
+MAX_COUNT = np.iinfo(np.uint32).max
+
+def sha1_digest(value: Union[str, bytes]) -> bytes:
+    """SHA-1 of a value, or the decoded digest if the value is already a hex SHA-1"""
+    if isinstance(value, str):
+        if len(value) == 40:
+            try:
+                return binascii.unhexlify(value)
+            except binascii.Error:
+                pass
+        value = value.encode("utf-8")
+    return hashlib.sha1(value).digest()
+
+def normalize_account(account: str) -> str:
+    return account.strip().lower()
+
+class HashIndex:
+    """Read-only memory-mapped SHA-1 index with prefix-range lookup"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a breach index")
+            self.size = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        self.fanout = np.memmap(self.path, dtype="<u8", mode="r", offset=len(MAGIC) + 8, shape=(FANOUT_SIZE,))
+        if self.size:
+            self.records = np.memmap(self.path, dtype=RECORD, mode="r", offset=HEADER_SIZE, shape=(self.size,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD)
+        self.keys = self.records["key"]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _bucket(self, prefix: int) -> Tuple[int, int]:
+        return int(self.fanout[prefix]), int(self.fanout[prefix + 1])
+
+    def count(self, digest: bytes) -> int:
+        """Occurrences recorded for a 20-byte digest (0 if absent)"""
+        start, end = self._bucket((digest[0] << 8) | digest[1])
+        if start == end:
+            return 0
+        # S20 values drop trailing NUL bytes, so probe keys must too
+        key = np.bytes_(digest.rstrip(b"\0"))
+        position = start + int(np.searchsorted(self.keys[start:end], key))
+        if position < end and self.keys[position] == key:
+            return int(self.records["count"][position])
+        return 0
+
+    def range(self, prefix: str) -> List[Tuple[str, int]]:
+        """
+        All (suffix, count) pairs under a hex prefix, as served by the
+        k-anonymity range API
+
+        Args:
+            prefix: Hex digest prefix of at least 4 characters
+        """
+        prefix = prefix.upper()
+        if len(prefix) < 4:
+            raise ValueError("Range prefix must be at least 4 hex characters")
+        start, end = self._bucket(int(prefix[:4], 16))
+        matches = []
+        for key, count in zip(self.keys[start:end], self.records["count"][start:end]):
+            digest = binascii.hexlify(key.ljust(20, b"\0")).decode().upper()
+            if digest.startswith(prefix):
+                matches.append((digest[len(prefix):], int(count)))
+        return matches
+
+    def iter_chunks(self, chunk_size: int = SPILL_RECORDS) -> Iterable[np.ndarray]:
+        for start in range(0, self.size, chunk_size):
+            yield np.array(self.records[start:start + chunk_size])
+
+class HashIndexBuilder:
+    """Builds a HashIndex from unsorted digests using first-byte bucket spill files"""
+
+    def __init__(self, work_dir: Optional[str] = None):
+        self._own_work_dir = work_dir is None
+        self.work_dir = Path(work_dir or tempfile.mkdtemp(prefix="breach_index_"))
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._keys: List[bytes] = []
+        self._counts: List[int] = []
+        self.added = 0
+
+    def add(self, digest: bytes, count: int = 1) -> None:
+        self._keys.append(digest)
+        self._counts.append(count)
+        self.added += 1
+        if len(self._keys) >= SPILL_RECORDS:
+            self._spill_buffer()
+
+    def add_records(self, records: np.ndarray) -> None:
+        """Add a structured RECORD array"""
+        self.added += len(records)
+        self._spill(records)
+
+    def _spill_buffer(self) -> None:
+        if not self._keys:
+            return
+        records = np.empty(len(self._keys), dtype=RECORD)
+        records["key"] = self._keys
+        records["count"] = np.minimum(np.array(self._counts, dtype=np.uint64), MAX_COUNT)
+        self._keys, self._counts = [], []
+        self._spill(records)
+
+    def _spill(self, records: np.ndarray) -> None:
+        """Append records to per-first-byte bucket files"""
+        if not len(records):
+            return
+        first_bytes = records.view(np.uint8).reshape(-1, RECORD.itemsize)[:, 0]
+        order = np.argsort(first_bytes, kind="stable")
+        records, first_bytes = records[order], first_bytes[order]
+        bounds = np.searchsorted(first_bytes, np.arange(257))
+        for bucket in range(256):
+            start, end = bounds[bucket], bounds[bucket + 1]
+            if start < end:
+                with open(self.work_dir / f"{bucket:02x}.bin", "ab") as f:
+                    records[start:end].tofile(f)
+
+    def build(self, path: Union[str, Path]) -> HashIndex:
+        """Sort, merge duplicate digests (summing counts) and write the index atomically"""
+        self._spill_buffer()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+
+        prefix_counts = np.zeros(65536, dtype=np.uint64)
+        total = 0
+        with open(temp_path, "wb") as out:
+            out.write(b"\0" * HEADER_SIZE)
+            for bucket in range(256):
+                bucket_file = self.work_dir / f"{bucket:02x}.bin"
+                if not bucket_file.exists():
+                    continue
+                records = np.fromfile(bucket_file, dtype=RECORD)
+                records = records[np.argsort(records["key"], kind="stable")]
+
+                keys = records["key"]
+                starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+                merged = np.empty(len(starts), dtype=RECORD)
+                merged["key"] = keys[starts]
+                merged["count"] = np.minimum(np.add.reduceat(records["count"].astype(np.uint64), starts), MAX_COUNT)
+                merged.tofile(out)
+
+                raw = merged.view(np.uint8).reshape(-1, RECORD.itemsize)
+                prefixes = (raw[:, 0].astype(np.int64) << 8) | raw[:, 1]
+                prefix_counts += np.bincount(prefixes, minlength=65536).astype(np.uint64)
+                total += len(merged)
+
+            fanout = np.concatenate([[0], np.cumsum(prefix_counts)]).astype("<u8")
+            out.seek(0)
+            out.write(MAGIC)
+            out.write(np.array([total], dtype="<u8").tobytes())
+            out.write(fanout.tobytes())
+
+        os.replace(temp_path, path)
+        self.cleanup()
+        return HashIndex(path)
+
+    def cleanup(self) -> None:
+        if self._own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        else:
+            for bucket_file in self.work_dir.glob("*.bin"):
+                bucket_file.unlink()
+
+class LocalBreachIndex:
+    """Password and account exposure indexes stored side by side in one directory"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or DEFAULT_INDEX_PATH)
+        self.passwords = self._open("passwords.idx")
+        self.accounts = self._open("accounts.idx")
+
+    @classmethod
+    def open_default(cls) -> Optional["LocalBreachIndex"]:
+        """The index at the default path, or None if none has been built"""
+        index = cls()
+        return index if index.available else None
+
+    def _open(self, name: str) -> Optional[HashIndex]:
+        path = self.path / name
+        return HashIndex(path) if path.exists() else None
+
+    @property
+    def available(self) -> bool:
+        return self.passwords is not None or self.accounts is not None
+
+    def password_count(self, password: str) -> int:
+        """Times a password (or its hex SHA-1) appears in the index"""
+        return self.passwords.count(sha1_digest(password)) if self.passwords is not None else 0
+
+    def password_range(self, prefix: str) -> List[Tuple[str, int]]:
+        return self.passwords.range(prefix) if self.passwords is not None else []
+
+    def account_count(self, account: str) -> int:
+        """Credential records for an account across ingested dumps"""
+        if self.accounts is None:
+            return 0
+        return self.accounts.count(sha1_digest(normalize_account(account).encode("utf-8")))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "passwords": len(self.passwords) if self.passwords is not None else 0,
+            "accounts": len(self.accounts) if self.accounts is not None else 0
+        }
+
+    def ingest(
+        self,
+        hibp_paths: Iterable[Union[str, Path]] = (),
+        dump_paths: Iterable[Union[str, Path]] = (),
+        separator: str = ":"
+    ) -> Dict[str, Any]:
+        """
+        Merge new sources into the index, keeping everything already indexed
+
+        Args:
+            hibp_paths: Pwned Passwords range files (PREFIX.txt with SUFFIX:COUNT lines),
+                directories of them, or ordered-by-hash files with HASH:COUNT lines
+            dump_paths: Breach dumps with account<separator>password or bare password lines
+            separator: Field separator used in dumps
+        """
+        passwords, accounts = HashIndexBuilder(), HashIndexBuilder()
+        for existing, builder in ((self.passwords, passwords), (self.accounts, accounts)):
+            if existing is not None:
+                for chunk in existing.iter_chunks():
+                    builder.add_records(chunk)
+
+        for source in hibp_paths:
+            source = Path(source)
+            for range_file in sorted(source.glob("*.txt")) if source.is_dir() else [source]:
+                _read_hibp_file(range_file, passwords)
+
+        for dump in dump_paths:
+            _read_dump(Path(dump), passwords, accounts, separator)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.passwords = passwords.build(self.path / "passwords.idx") if passwords.added else self.passwords
+        self.accounts = accounts.build(self.path / "accounts.idx") if accounts.added else self.accounts
+        passwords.cleanup()
+        accounts.cleanup()
+        return self.stats()
+
+def _read_hibp_file(path: Path, builder: HashIndexBuilder) -> None:
+    """Read SUFFIX:COUNT (range file) or HASH:COUNT (ordered file) lines"""
+    prefix = path.stem.upper() if len(path.stem) == 5 else ""
+    with open(path, "r", encoding="ascii", errors="ignore") as f:
+        for line in f:
+            digest, _, count = line.strip().partition(":")
+            digest = prefix + digest if len(digest) == 35 else digest
+            if len(digest) != 40:
+                continue
+            try:
+                builder.add(binascii.unhexlify(digest), int(count or 1))
+            except (binascii.Error, ValueError):
+                continue
+
+def _read_dump(path: Path, passwords: HashIndexBuilder, accounts: HashIndexBuilder, separator: str) -> None:
+    """Read account<separator>password or bare password lines from a breach dump"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            account, found, password = line.partition(separator)
+            if found and account:
+                accounts.add(hashlib.sha1(normalize_account(account).encode("utf-8")).digest())
+            else:
+                password = line
+            if password:
+                passwords.add(hashlib.sha1(password.encode("utf-8")).digest())
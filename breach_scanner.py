@@ -3,16 +3,38 @@ Breach Intelligence Scanner Implementation
 """
 
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 from rich.console import Console
 from scanner_core import ScannerCore
+from risk_engine import RiskEngine
+from breach_store import BreachStore, BreachFrame
+from breach_index import LocalBreachIndex
+
+def storable_breaches(breaches: List[Any]) -> List[Dict[str, Any]]:
+    """Breach records worth persisting: provider errors and records without a service or date are dropped"""
+    return [
+        breach for breach in breaches
+        if isinstance(breach, dict)
+        and "error" not in breach
+        and (breach.get("Name") or breach.get("service") or breach.get("domain"))
+        and (breach.get("BreachDate") or breach.get("breach_date"))
+    ]
 
 class BreachScanner(ScannerCore):
     """Specialized scanner for breach intelligence gathering"""
 
-    def __init__(self):
+    def __init__(self, breach_store: Optional[BreachStore] = None, breach_index: Optional[LocalBreachIndex] = None):
         super().__init__()
         self.console = Console()
+        self.risk_engine = RiskEngine(profile="breach")
+        self._breach_store = breach_store
+        self.breach_index = breach_index or LocalBreachIndex.open_default()
+
+    @property
+    def breach_store(self) -> BreachStore:
+        """Columnar store every scan's breach records are appended to"""
+        if self._breach_store is None:
+            self._breach_store = BreachStore.default()
+        return self._breach_store
 
     def gather_intelligence(self, target: str, provider: str) -> Dict[str, Any]:
         """
@@ -83,21 +105,34 @@ class BreachScanner(ScannerCore):
                     results["earliest_breach"] = min(dates)
                     results["latest_breach"] = max(dates)
 
+                # Keep the records for cross-target analytics
+                try:
+                    records = storable_breaches(results["breach_details"])
+                    if records and isinstance(target, str) and target:
+                        self.breach_store.add_records(target, records)
+                except Exception as e:
+                    self.console.print(f"[red]Error storing breach records: {str(e)}[/red]")
+
                 # Set risk level based on findings
                 if results["breach_count"] > 5:
                     results["risk_level"] = "HIGH"
                 elif results["breach_count"] > 2:
                     results["risk_level"] = "MEDIUM"
 
-            # Try to get additional password exposure data
-            password_data = self.api_manager.make_request(
-                service="BREACH_INTELLIGENCE",
-                provider=provider,
-                endpoint="passwords",
-                params={"account": target}
-            )
-            if password_data:
-                results["password_exposures"] = password_data.get("exposures", [])
+            # Password exposure comes from the local index when one is installed
+            if self.breach_index is not None:
+                count = self.breach_index.account_count(target)
+                if count:
+                    results["password_exposures"] = [{"source": "local_breach_index", "records": count}]
+            else:
+                password_data = self.api_manager.make_request(
+                    service="BREACH_INTELLIGENCE",
+                    provider=provider,
+                    endpoint="passwords",
+                    params={"account": target}
+                )
+                if password_data:
+                    results["password_exposures"] = password_data.get("exposures", [])
 
             return results
 
@@ -131,26 +166,11 @@ class BreachScanner(ScannerCore):
         if not breaches:
             return analysis
 
-        # Analyze severity distribution
-        for breach in breaches:
-            severity = breach.get("severity", "unknown").lower()
-            analysis["severity_distribution"][severity] = \
-                analysis["severity_distribution"].get(severity, 0) + 1
-
-        # Analyze exposed data types
-        for breach in breaches:
-            data_types = breach.get("DataClasses", [])
-            for dtype in data_types:
-                analysis["data_type_frequency"][dtype] = \
-                    analysis["data_type_frequency"].get(dtype, 0) + 1
-
-        # Analyze temporal patterns
-        for breach in breaches:
-            date = breach.get("BreachDate")
-            if date:
-                year = date[:4]  # Extract year from date
-                analysis["temporal_pattern"][year] = \
-                    analysis["temporal_pattern"].get(year, 0) + 1
+        # Build severity, data type and yearly histograms from one columnar pass
+        frame = BreachFrame.from_records(breaches)
+        analysis["severity_distribution"] = frame.severity_distribution()
+        analysis["data_type_frequency"] = frame.data_type_frequency()
+        analysis["temporal_pattern"] = frame.temporal_pattern()
 
         # Identify risk factors
         sensitive_data_types = {
@@ -168,6 +188,28 @@ class BreachScanner(ScannerCore):
 
         return analysis
 
+    def check_password(self, password: str) -> Dict[str, Any]:
+        """
+        Check a password or its SHA-1 against the local breach index
+        
+        Args:
+            password: Plaintext password or hex SHA-1 digest
+        """
+        if self.breach_index is None:
+            return {"exposed": None, "count": 0, "source": None, "error": "No local breach index installed"}
+        count = self.breach_index.password_count(password)
+        return {"exposed": count > 0, "count": count, "source": "local_breach_index"}
+
+    def analyze_corpus(self, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze breach records stored across all scanned targets
+        
+        Args:
+            since: Only include records observed at or after this ISO timestamp
+            until: Only include records observed before this ISO timestamp
+        """
+        return self.breach_store.analyze(since=since, until=until)
+
     def get_risk_metrics(self, results: Dict[str, Any]) -> Dict[str, float]:
         """
         Calculate risk metrics from breach data
@@ -185,51 +227,12 @@ class BreachScanner(ScannerCore):
         if not results or not results.get("breach_details"):
             return metrics
 
-        # Calculate breach frequency score
-        breach_count = results["breach_count"]
-        metrics["breach_frequency_score"] = min(1.0, breach_count / 10.0)
-
-        # Calculate data sensitivity score
-        sensitive_data_types = {
-            "Passwords": 0.8,
-            "Credit Cards": 1.0,
-            "Social Security Numbers": 1.0,
-            "Bank Accounts": 1.0,
-            "Health Records": 0.9,
-            "Phone Numbers": 0.4,
-            "Email Addresses": 0.3
-        }
-
-        sensitivity_scores = []
-        for data_type in results["exposed_data"]:
-            if data_type in sensitive_data_types:
-                sensitivity_scores.append(sensitive_data_types[data_type])
-        
-        if sensitivity_scores:
-            metrics["data_sensitivity_score"] = max(sensitivity_scores)
-
-        # Calculate temporal risk score (more recent breaches = higher risk)
-        if results["latest_breach"]:
-            try:
-                latest_year = int(results["latest_breach"][:4])
-                current_year = datetime.now().year
-                years_since_breach = current_year - latest_year
-                metrics["temporal_risk_score"] = max(0.0, 1.0 - (years_since_breach * 0.1))
-            except (ValueError, TypeError):
-                metrics["temporal_risk_score"] = 0.5
-
-        # Calculate overall risk score
-        weights = {
-            "breach_frequency": 0.3,
-            "data_sensitivity": 0.4,
-            "temporal_risk": 0.3
-        }
-
-        metrics["overall_risk_score"] = (
-            weights["breach_frequency"] * metrics["breach_frequency_score"] +
-            weights["data_sensitivity"] * metrics["data_sensitivity_score"] +
-            weights["temporal_risk"] * metrics["temporal_risk_score"]
-        )
+        scored = self.risk_engine.score({"BREACH_INTELLIGENCE": results})
+        components = scored["component_scores"]
+        metrics["breach_frequency_score"] = components["breach_frequency"]
+        metrics["data_sensitivity_score"] = components["data_sensitivity"]
+        metrics["temporal_risk_score"] = components["temporal_risk"]
+        metrics["overall_risk_score"] = scored["overall_risk_score"]
 
         return metrics
 
@@ -0,0 +1,458 @@
+"""
+Columnar Breach Store
+Dictionary-encoded breach records from every scan with vectorized group-by analytics
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union, Iterator, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writers there are only serialized per process
+    fcntl = None
+
+DEFAULT_STORE_PATH = os.environ.get("BREACH_STORE_PATH", "findings/breach_store")
+
+# Segments are merged once there are more than this many on disk
+MAX_SEGMENTS = 32
+
+# Dictionary-encoded string columns
+DICTIONARY_COLUMNS = ("target", "service", "severity", "scan")
+
+# Fixed-width columns and their dtypes
+COLUMN_DTYPES = {
+    "target": np.uint32,
+    "service": np.uint32,
+    "severity": np.uint32,
+    "scan": np.uint32,
+    "year": np.int16,
+    "observed": np.int64,
+    "class_offsets": np.int64,
+    "class_codes": np.uint32
+}
+
+# Encoded columns and the dictionary each one's codes refer to
+ENCODED_COLUMNS = {
+    "target": "target",
+    "service": "service",
+    "severity": "severity",
+    "scan": "scan",
+    "class_codes": "data_class"
+}
+
+TimeBound = Optional[Union[datetime, str, int, float]]
+
+class Dictionary:
+    """Append-only string dictionary mapping values to stable integer codes"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value)
+
+def _to_epoch(value: TimeBound) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _breach_fields(breach: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize the breach record formats returned by different providers"""
+    data_classes = breach.get("DataClasses") or breach.get("data_classes") or []
+    if isinstance(data_classes, str):
+        data_classes = [data_classes]
+    date = breach.get("BreachDate") or breach.get("breach_date") or ""
+    try:
+        year = int(str(date)[:4])
+    except ValueError:
+        year = 0
+    return {
+        "service": str(breach.get("Name") or breach.get("service") or breach.get("domain") or "unknown"),
+        "severity": str(breach.get("severity", "unknown")).lower(),
+        "year": year,
+        "data_classes": [str(data_class) for data_class in data_classes]
+    }
+
+class BreachFrame:
+    """Immutable set of breach rows in columnar form"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, Dictionary]):
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    @classmethod
+    def empty(cls, dictionaries: Optional[Dict[str, Dictionary]] = None) -> "BreachFrame":
+        columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        columns["class_offsets"] = np.zeros(1, dtype=np.int64)
+        return cls(columns, dictionaries or _new_dictionaries())
+
+    @classmethod
+    def from_records(
+        cls,
+        breaches: List[Dict[str, Any]],
+        target: str = "",
+        scan_id: str = "",
+        observed_at: TimeBound = None,
+        dictionaries: Optional[Dict[str, Dictionary]] = None
+    ) -> "BreachFrame":
+        """Encode breach records for one target into a frame"""
+        dictionaries = dictionaries if dictionaries is not None else _new_dictionaries()
+        observed = _to_epoch(observed_at) if observed_at is not None else int(datetime.now(timezone.utc).timestamp())
+        target_code = dictionaries["target"].encode(target)
+        scan_code = dictionaries["scan"].encode(scan_id)
+        classes = dictionaries["data_class"]
+
+        services, severities, years, offsets, class_codes = [], [], [], [0], []
+        for breach in breaches:
+            if not isinstance(breach, dict):
+                continue
+            fields = _breach_fields(breach)
+            services.append(dictionaries["service"].encode(fields["service"]))
+            severities.append(dictionaries["severity"].encode(fields["severity"]))
+            years.append(fields["year"])
+            class_codes.extend(classes.encode(data_class) for data_class in fields["data_classes"])
+            offsets.append(len(class_codes))
+
+        rows = len(services)
+        columns = {
+            "target": np.full(rows, target_code, dtype=np.uint32),
+            "service": np.array(services, dtype=np.uint32),
+            "severity": np.array(severities, dtype=np.uint32),
+            "scan": np.full(rows, scan_code, dtype=np.uint32),
+            "year": np.array(years, dtype=np.int16),
+            "observed": np.full(rows, observed, dtype=np.int64),
+            "class_offsets": np.array(offsets, dtype=np.int64),
+            "class_codes": np.array(class_codes, dtype=np.uint32)
+        }
+        return cls(columns, dictionaries)
+
+    @classmethod
+    def concat(cls, frames: List["BreachFrame"], dictionaries: Dict[str, Dictionary]) -> "BreachFrame":
+        """Concatenate frames that share one set of dictionaries"""
+        if not frames:
+            return cls.empty(dictionaries)
+        columns = {
+            name: np.concatenate([frame.columns[name] for frame in frames])
+            for name in COLUMN_DTYPES
+            if name != "class_offsets"
+        }
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for frame in frames:
+            offsets.append(frame.columns["class_offsets"][1:] + base)
+            base += len(frame.columns["class_codes"])
+        columns["class_offsets"] = np.concatenate(offsets)
+        return cls(columns, dictionaries)
+
+    def __len__(self) -> int:
+        return len(self.columns["service"])
+
+    def _class_rows(self) -> np.ndarray:
+        """Row index for every entry of the data class column"""
+        return np.repeat(np.arange(len(self)), np.diff(self.columns["class_offsets"]))
+
+    def filter(self, mask: np.ndarray) -> "BreachFrame":
+        """Rows where mask is true"""
+        lengths = np.diff(self.columns["class_offsets"])
+        columns = {
+            name: self.columns[name][mask]
+            for name in COLUMN_DTYPES
+            if name not in ("class_offsets", "class_codes")
+        }
+        columns["class_codes"] = self.columns["class_codes"][np.repeat(mask, lengths)]
+        columns["class_offsets"] = np.concatenate([[0], np.cumsum(lengths[mask])]).astype(np.int64)
+        return BreachFrame(columns, self.dictionaries)
+
+    def select(self, target: Optional[str] = None, since: TimeBound = None, until: TimeBound = None) -> "BreachFrame":
+        """Rows for a target and/or observed within [since, until)"""
+        mask = np.ones(len(self), dtype=bool)
+        if target is not None:
+            code = self.dictionaries["target"].lookup(target)
+            if code is None:
+                return self.filter(np.zeros(len(self), dtype=bool))
+            mask &= self.columns["target"] == code
+        if since is not None:
+            mask &= self.columns["observed"] >= _to_epoch(since)
+        if until is not None:
+            mask &= self.columns["observed"] < _to_epoch(until)
+        return self.filter(mask)
+
+    def _histogram(self, codes: np.ndarray, dictionary: str) -> Dict[str, int]:
+        values = self.dictionaries[dictionary].values
+        counts = np.bincount(codes, minlength=len(values)) if len(codes) else np.zeros(0, dtype=np.int64)
+        present = np.flatnonzero(counts)
+        order = present[np.argsort(-counts[present], kind="stable")]
+        return {values[code]: int(counts[code]) for code in order}
+
+    def severity_distribution(self) -> Dict[str, int]:
+        return self._histogram(self.columns["severity"], "severity")
+
+    def data_type_frequency(self) -> Dict[str, int]:
+        return self._histogram(self.columns["class_codes"], "data_class")
+
+    def temporal_pattern(self) -> Dict[str, int]:
+        years = self.columns["year"]
+        values, counts = np.unique(years[years > 0], return_counts=True)
+        return {str(year): int(count) for year, count in zip(values, counts)}
+
+    def _distinct_targets(self, keys: np.ndarray, rows: np.ndarray, dictionary: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        """Number of distinct targets per key, largest first"""
+        if not len(keys):
+            return []
+        width = np.int64(max(len(self.dictionaries["target"]), 1))
+        pairs = np.unique(keys.astype(np.int64) * width + self.columns["target"][rows].astype(np.int64))
+        counts = np.bincount(pairs // width, minlength=len(self.dictionaries[dictionary]))
+        present = np.flatnonzero(counts)
+        order = present[np.argsort(-counts[present], kind="stable")][:limit]
+        values = self.dictionaries[dictionary].values
+        return [{"name": values[code], "targets": int(counts[code])} for code in order]
+
+    def top_services(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Breached services ranked by how many distinct targets they expose"""
+        return self._distinct_targets(self.columns["service"], np.arange(len(self)), "service", limit)
+
+    def top_data_classes(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Data classes ranked by how many distinct targets had them exposed"""
+        return self._distinct_targets(self.columns["class_codes"], self._class_rows(), "data_class", limit)
+
+    def target_count(self) -> int:
+        return int(len(np.unique(self.columns["target"])))
+
+def _new_dictionaries() -> Dict[str, Dictionary]:
+    return {name: Dictionary() for name in DICTIONARY_COLUMNS + ("data_class",)}
+
+class BreachStore:
+    """
+    Persistent columnar store of breach records across all scans
+
+    Several processes may share one store directory. Writers hold an
+    exclusive file lock while they reload the dictionaries, encode, and
+    write both the dictionaries and their segment, so codes never collide.
+    Readers hold a shared lock and reload whenever another process wrote.
+    """
+
+    _default = None
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or DEFAULT_STORE_PATH)
+        self._lock = threading.RLock()
+        self._frame: Optional[BreachFrame] = None
+        self._frame_segments: Tuple[str, ...] = ()
+        self._dictionary_version: Optional[Tuple[int, int]] = None
+        self._lock_depth = 0
+        self.dictionaries = _new_dictionaries()
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync_dictionaries()
+
+    @classmethod
+    def default(cls) -> "BreachStore":
+        """Shared store at the default path"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def segments_path(self) -> Path:
+        return self.path / "segments"
+
+    @property
+    def dictionary_file(self) -> Path:
+        return self.path / "dictionaries.json"
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = True) -> Iterator[None]:
+        """Lock the store directory against other processes; re-entrant under the thread lock"""
+        if fcntl is None or self._lock_depth or (not exclusive and not self.path.exists()):
+            yield
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _dictionary_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.dictionary_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_dictionaries(self) -> Dict[str, Dictionary]:
+        dictionaries = _new_dictionaries()
+        if self.dictionary_file.exists():
+            with open(self.dictionary_file) as f:
+                for name, values in json.load(f).items():
+                    dictionaries[name] = Dictionary(values)
+        return dictionaries
+
+    def _sync_dictionaries(self) -> None:
+        """Reload the dictionaries if another process rewrote them; call with the file lock held"""
+        version = self._dictionary_stat()
+        if version != self._dictionary_version:
+            self.dictionaries = self._load_dictionaries()
+            self._dictionary_version = version
+            self._frame = None
+
+    def _save_dictionaries(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path / f"dictionaries.json.{os.getpid()}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump({name: dictionary.values for name, dictionary in self.dictionaries.items()}, f)
+        os.replace(temp_file, self.dictionary_file)
+        self._dictionary_version = self._dictionary_stat()
+
+    def _segment_dirs(self) -> List[Path]:
+        if not self.segments_path.exists():
+            return []
+        return sorted(path for path in self.segments_path.iterdir() if path.is_dir() and not path.name.endswith(".tmp"))
+
+    def _write_segment(self, frame: BreachFrame) -> Path:
+        """Write a frame as an immutable segment of .npy columns under a name no other writer uses"""
+        # Time-ordered, and unique across processes and threads
+        name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        temp_dir = self.segments_path / f"{name}.tmp"
+        temp_dir.mkdir(parents=True)
+        for column, values in frame.columns.items():
+            np.save(temp_dir / f"{column}.npy", np.ascontiguousarray(values, dtype=COLUMN_DTYPES[column]))
+        final_dir = self.segments_path / name
+        os.rename(temp_dir, final_dir)
+        return final_dir
+
+    def _reencode(self, frame: BreachFrame) -> BreachFrame:
+        """Map a frame's codes onto the store's current dictionaries"""
+        if frame.dictionaries is self.dictionaries:
+            return frame
+        columns = dict(frame.columns)
+        for column, name in ENCODED_COLUMNS.items():
+            values = frame.dictionaries[name].values
+            mapping = np.array([self.dictionaries[name].encode(value) for value in values], dtype=np.uint32)
+            if not np.array_equal(mapping, np.arange(len(values), dtype=np.uint32)):
+                columns[column] = mapping[np.asarray(columns[column], dtype=np.int64)]
+        return BreachFrame(columns, self.dictionaries)
+
+    def _read_segment(self, segment_dir: Path) -> BreachFrame:
+        columns = {
+            column: np.load(segment_dir / f"{column}.npy", mmap_mode="r")
+            for column in COLUMN_DTYPES
+        }
+        return BreachFrame(columns, self.dictionaries)
+
+    def add_records(
+        self,
+        target: str,
+        breaches: List[Dict[str, Any]],
+        scan_id: str = "",
+        observed_at: TimeBound = None
+    ) -> int:
+        """
+        Append a target's breach records as a new segment
+
+        Args:
+            target: Target the breaches were found for
+            breaches: Provider breach records
+            scan_id: Scan that observed them
+            observed_at: Observation time (defaults to now)
+        """
+        with self._lock, self._file_lock():
+            self._sync_dictionaries()
+            frame = BreachFrame.from_records(breaches, target, scan_id, observed_at, self.dictionaries)
+            if not len(frame):
+                return 0
+            # Dictionaries are written first so every segment's codes resolve
+            self._save_dictionaries()
+            self._write_segment(frame)
+            self._frame = None
+            if len(self._segment_dirs()) > MAX_SEGMENTS:
+                self.compact()
+            return len(frame)
+
+    def add_frame(self, frame: BreachFrame) -> int:
+        """Append a frame, re-encoding it if other writers extended the dictionaries meanwhile"""
+        with self._lock, self._file_lock():
+            if not len(frame):
+                return 0
+            # Values the caller encoded but nobody saved yet survive unless another process wrote
+            self._sync_dictionaries()
+            frame = self._reencode(frame)
+            self._save_dictionaries()
+            self._write_segment(frame)
+            self._frame = None
+            return len(frame)
+
+    def compact(self) -> None:
+        """Merge all segments into one"""
+        with self._lock, self._file_lock():
+            self._sync_dictionaries()
+            segments = self._segment_dirs()
+            if len(segments) < 2:
+                return
+            merged = BreachFrame.concat([self._read_segment(segment) for segment in segments], self.dictionaries)
+            self._write_segment(merged)
+            # Only the segments that were merged are removed; the merged copy has a fresh name
+            for segment in segments:
+                shutil.rmtree(segment)
+            self._frame = None
+
+    def frame(self) -> BreachFrame:
+        """All stored rows, cached until this or another process writes"""
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync_dictionaries()
+            segments = self._segment_dirs()
+            names = tuple(segment.name for segment in segments)
+            if self._frame is None or names != self._frame_segments:
+                self._frame = BreachFrame.concat([self._read_segment(segment) for segment in segments],
+                                                 self.dictionaries)
+                self._frame_segments = names
+            return self._frame
+
+    def __len__(self) -> int:
+        return len(self.frame())
+
+    def analyze(self, target: Optional[str] = None, since: TimeBound = None, until: TimeBound = None) -> Dict[str, Any]:
+        """Histograms and cross-target aggregates over the selected rows"""
+        frame = self.frame().select(target, since, until)
+        return {
+            "breach_records": len(frame),
+            "targets": frame.target_count(),
+            "severity_distribution": frame.severity_distribution(),
+            "data_type_frequency": frame.data_type_frequency(),
+            "temporal_pattern": frame.temporal_pattern(),
+            "top_services": frame.top_services(),
+            "top_data_classes": frame.top_data_classes()
+        }
+
+    def top_services(self, since: TimeBound = None, until: TimeBound = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Breaches exposing the most monitored targets within a time window"""
+        return self.frame().select(since=since, until=until).top_services(limit)
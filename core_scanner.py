@@ -1,16 +1,18 @@
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
 from rich.console import Console
 import json
 import time
-from datetime import datetime
+from provider_adapters import run_adapters
+from target_routing import RoutingPlan
+from ioc_feeds import FeedSet, LOCAL_MATCH_SCORE
 
 class CoreScanner:
     """Core scanning functionality with premium API integrations"""
     
-    def __init__(self):
+    def __init__(self, feed_set: Optional[FeedSet] = None):
         self.console = Console()
         self.api_keys = self._load_api_keys()
+        self.feed_set = feed_set or FeedSet.default()
 
     def _load_api_keys(self) -> Dict[str, str]:
         """Load API keys from configuration"""
@@ -21,7 +23,7 @@ class CoreScanner:
             self.console.print(f"[red]Error loading API keys: {str(e)}[/red]")
             return {}
 
-    def analyze_threat_intelligence(self, target: str) -> Dict[str, Any]:
+    def analyze_threat_intelligence(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Premium threat intelligence analysis"""
         results = {
             "findings": [],
@@ -34,95 +36,17 @@ class CoreScanner:
             "threat_landscape": {}
         }
 
-        if "THREAT_INTELLIGENCE" in self.api_keys:
-            for provider, key in self.api_keys["THREAT_INTELLIGENCE"].items():
-                try:
-                    if provider == "crowdstrike":
-                        # CrowdStrike Falcon Intelligence
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "actors": "https://api.crowdstrike.com/intel/combined/actors/v1",
-                            "indicators": "https://api.crowdstrike.com/intel/combined/indicators/v1",
-                            "reports": "https://api.crowdstrike.com/intel/combined/reports/v1"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={"filter": f"target:'{target}'"}
-                            )
-                            if response.status_code == 200:
-                                results["findings"].append({
-                                    "source": f"CrowdStrike_{endpoint_name}",
-                                    "data": response.json()
-                                })
+        # Indicators published in local feeds are answered before any paid call
+        local_matches = self.feed_set.lookup(target)
+        if local_matches:
+            results["findings"].append({"source": "local_feeds", "data": local_matches})
+            results["indicators"] = local_matches
+            results["risk_scores"]["local_feeds"] = LOCAL_MATCH_SCORE
+            return results
 
-                    elif provider == "mandiant":
-                        # Mandiant Threat Intelligence
-                        headers = {"X-Auth-Token": key}
-                        endpoints = {
-                            "actors": "https://api.mandiant.com/v3/threat-actor",
-                            "malware": "https://api.mandiant.com/v3/malware",
-                            "vulnerabilities": "https://api.mandiant.com/v3/vulnerability"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={"target": target}
-                            )
-                            if response.status_code == 200:
-                                results["findings"].append({
-                                    "source": f"Mandiant_{endpoint_name}",
-                                    "data": response.json()
-                                })
+        return self._run_adapters("THREAT_INTELLIGENCE", target, results, plan)
 
-                    elif provider == "recorded_future":
-                        # Recorded Future Intelligence
-                        headers = {"X-RFToken": key}
-                        endpoints = {
-                            "risk": f"https://api.recordedfuture.com/v2/risk/{target}",
-                            "threats": f"https://api.recordedfuture.com/v2/threat/{target}",
-                            "vulnerabilities": f"https://api.recordedfuture.com/v2/vulnerability/{target}"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(url, headers=headers)
-                            if response.status_code == 200:
-                                results["findings"].append({
-                                    "source": f"RecordedFuture_{endpoint_name}",
-                                    "data": response.json()
-                                })
-
-                    elif provider == "group_ib":
-                        # Group-IB Threat Intelligence
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "attribution": "https://api.group-ib.com/v1/attribution",
-                            "campaigns": "https://api.group-ib.com/v1/campaigns",
-                            "indicators": "https://api.group-ib.com/v1/indicators"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.post(
-                                url,
-                                headers=headers,
-                                json={"query": target}
-                            )
-                            if response.status_code == 200:
-                                results["findings"].append({
-                                    "source": f"GroupIB_{endpoint_name}",
-                                    "data": response.json()
-                                })
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
-
-        return results
-
-    def analyze_dark_web(self, target: str) -> Dict[str, Any]:
+    def analyze_dark_web(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Premium dark web intelligence gathering"""
         results = {
             "marketplace_mentions": [],
@@ -135,53 +59,11 @@ class CoreScanner:
             "communication_channels": []
         }
 
-        if "DARK_WEB_INTELLIGENCE" in self.api_keys:
-            for provider, key in self.api_keys["DARK_WEB_INTELLIGENCE"].items():
-                try:
-                    if provider == "sixgill":
-                        # Cybersixgill Dark Web Intelligence
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "posts": "https://api.cybersixgill.com/search",
-                            "actors": "https://api.cybersixgill.com/actors",
-                            "markets": "https://api.cybersixgill.com/markets"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.post(
-                                url,
-                                headers=headers,
-                                json={
-                                    "query": target,
-                                    "from": "darkweb_discussions",
-                                    "size": 100
-                                }
-                            )
-                            if response.status_code == 200:
-                                results["forum_activities"][f"sixgill_{endpoint_name}"] = response.json()
-
-                    elif provider == "flashpoint":
-                        # Flashpoint Intelligence Platform
-                        headers = {"X-Auth-Token": key}
-                        endpoints = {
-                            "forums": "https://api.flashpoint-intel.com/v1/forums/search",
-                            "marketplace": "https://api.flashpoint-intel.com/v1/marketplace/search",
-                            "breaches": "https://api.flashpoint-intel.com/v1/breaches/search"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.post(
-                                url,
-                                headers=headers,
-                                json={"query": target}
-                            )
-                            if response.status_code == 200:
-                                results[f"flashpoint_{endpoint_name}"] = response.json()
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
+        return self._run_adapters("DARK_WEB_INTELLIGENCE", target, results, plan)
 
-        return results
+    def _run_adapters(self, category: str, target: str, results: Dict[str, Any], plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
+        """Run the registered provider adapters for a category into an analyzer result"""
+        return run_adapters(category, target, self.api_keys, results, self.console, plan)
 
     def _rate_limit_check(self, provider: str) -> None:
         """Implement rate limiting for API calls"""
@@ -10,14 +10,28 @@ from intelligence_apis import (
     get_api_key,
     get_api_endpoint
 )
+from target_routing import RoutingPlan
+from entity_resolution import EntityResolver
+from risk_engine import RiskEngine
+from geoip_resolver import GeoIPResolver, default_resolver
+from transport import Transport
+from provider_adapters import category_cache_ttl
+from shared_cache import SharedCache
+
+# Seconds an empty category result is cached: the providers may only be failing for now
+NEGATIVE_CACHE_TTL = 60
 
 class DeepIntelScanner:
     """Advanced Intelligence Gathering System with Agency-Grade Capabilities"""
 
-    def __init__(self):
+    def __init__(self, geoip: Optional[GeoIPResolver] = None, transport: Optional[Transport] = None,
+                 cache: Optional[SharedCache] = None):
         self.console = Console()
         self.session = requests.Session()
-        self.results_cache = {}
+        self.transport = transport if transport is not None else Transport.default()
+        self.results_cache = cache if cache is not None else SharedCache.default()
+        self.risk_engine = RiskEngine()
+        self.geoip = geoip or default_resolver()
 
     def deep_scan(self, target: str, scan_types: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -31,6 +45,7 @@ class DeepIntelScanner:
             scan_types = list(INTELLIGENCE_APIS.keys())
 
         scan_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{target}"
+        plan = RoutingPlan(target)
         
         results = {
             "scan_metadata": {
@@ -44,13 +59,15 @@ class DeepIntelScanner:
             "correlation_analysis": {}
         }
 
-        # Gather intelligence from each category
-        for category in scan_types:
+        # Gather intelligence from each category that accepts the target type
+        for category in plan.filter_categories(scan_types):
             try:
-                results["intelligence_data"][category] = self._gather_intelligence(target, category)
+                results["intelligence_data"][category] = self._cached_intelligence(target, category)
             except Exception as e:
                 self.console.print(f"[red]Error gathering {category} intelligence: {str(e)}[/red]")
 
+        results["scan_metadata"].update(plan.to_metadata())
+
         # Perform cross-source correlation
         results["correlation_analysis"] = self._correlate_intelligence(results["intelligence_data"])
         
@@ -59,6 +76,19 @@ class DeepIntelScanner:
 
         return results
 
+    def _cached_intelligence(self, target: str, category: str) -> Dict[str, Any]:
+        """Category intelligence from the shared cache, gathered and cached for the provider TTL on a miss"""
+        key = f"deep_intel:{category}:{target}"
+        data = self.results_cache.get(key)
+        if data is None:
+            data = self._gather_intelligence(target, category)
+            ttl = category_cache_ttl(category)
+            # Provider errors are swallowed while gathering, so an outage looks like an empty result
+            if not any(data.values()):
+                ttl = NEGATIVE_CACHE_TTL if ttl is None else min(ttl, NEGATIVE_CACHE_TTL)
+            self.results_cache.set(key, data, ttl)
+        return data
+
     def _gather_intelligence(self, target: str, category: str) -> Dict[str, Any]:
         """Gather intelligence from specific category"""
         results = {
@@ -112,7 +142,7 @@ class DeepIntelScanner:
                 endpoint = get_api_endpoint("PHONE_INTELLIGENCE", provider)
 
                 if provider == "twilio":
-                    response = requests.get(
+                    response = self.transport.get(
                         f"{endpoint}{phone}",
                         auth=(api_key, details["secret"]),
                         params={"Type": "carrier"}
@@ -121,7 +151,7 @@ class DeepIntelScanner:
                         results["carrier_info"][provider] = response.json()
 
                 elif provider == "numverify":
-                    response = requests.get(
+                    response = self.transport.get(
                         f"{endpoint}validate",
                         params={
                             "access_key": api_key,
@@ -156,7 +186,7 @@ class DeepIntelScanner:
                 endpoint = get_api_endpoint("EMAIL_INTELLIGENCE", provider)
 
                 if provider == "hunter":
-                    response = requests.get(
+                    response = self.transport.get(
                         f"{endpoint}email-verifier",
                         params={
                             "email": email,
@@ -188,7 +218,7 @@ class DeepIntelScanner:
             try:
                 api_key = get_api_key("PEOPLE_SEARCH", provider)
                 if provider == "pipl":
-                    response = requests.get(
+                    response = self.transport.get(
                         "https://api.pipl.com/search/",
                         params={
                             "key": api_key,
@@ -225,6 +255,33 @@ class DeepIntelScanner:
 
         return results
 
+    def _gather_location_intelligence(self, target: str) -> Dict[str, Any]:
+        """IP geolocation and ASN from the local databases, with the remote fallback on a miss"""
+        results = {
+            "geolocation": {},
+            "asn_info": {},
+            "location_history": []
+        }
+
+        try:
+            record = self.geoip.resolve(target)
+            if record:
+                results["findings"] = [{
+                    "source": record["source"],
+                    "timestamp": datetime.now().isoformat(),
+                    "data": record
+                }]
+                results["geolocation"] = {
+                    key: record[key] for key in
+                    ("country", "country_code", "region", "city", "latitude", "longitude", "timezone")
+                }
+                results["asn_info"] = {"asn": record["asn"], "organization": record["as_org"]}
+                results["location_history"].append(record)
+        except Exception as e:
+            self.console.print(f"[red]Error resolving location for {target}: {str(e)}[/red]")
+
+        return results
+
     def _correlate_intelligence(self, intel_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform advanced correlation analysis across all intelligence sources"""
         return {
@@ -237,17 +294,25 @@ class DeepIntelScanner:
 
     def _assess_risk(self, intel_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate comprehensive risk assessment"""
+        # One risk engine pass supplies both the score and its factors
+        scored = self.risk_engine.score(intel_data)
         return {
-            "overall_risk_score": self._calculate_risk_score(intel_data),
-            "risk_factors": self._identify_risk_factors(intel_data),
+            "overall_risk_score": scored["overall_risk_score"],
+            "risk_factors": scored["risk_factors"],
             "threat_levels": self._assess_threat_levels(intel_data),
             "confidence_score": self._calculate_confidence(intel_data)
         }
 
     def _correlate_identities(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Correlate identities across different sources"""
-        # Implementation for identity correlation
-        return {}
+        resolver = EntityResolver()
+        resolver.add_scan(data)
+        clusters = resolver.clusters()
+        return {
+            "identity_clusters": clusters,
+            "confidence_scores": {str(cluster["cluster_id"]): cluster["confidence"] for cluster in clusters},
+            "entity_summary": resolver.store.summary()
+        }
 
     def _correlate_locations(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Correlate location data across different sources"""
@@ -269,16 +334,6 @@ class DeepIntelScanner:
         # Implementation for pattern analysis
         return {}
 
-    def _calculate_risk_score(self, data: Dict[str, Any]) -> float:
-        """Calculate overall risk score"""
-        # Implementation for risk score calculation
-        return 0.0
-
-    def _identify_risk_factors(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Identify risk factors from intelligence data"""
-        # Implementation for risk factor identification
-        return []
-
     def _assess_threat_levels(self, data: Dict[str, Any]) -> Dict[str, str]:
         """Assess threat levels across different categories"""
         # Implementation for threat level assessment
@@ -3,36 +3,67 @@ Deep Intelligence Scanner
 Implements comprehensive intelligence gathering with advanced correlation
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 import json
 from datetime import datetime
 from rich.console import Console
 from scanner_core import ScannerCore
 from scanner_modules import get_scanner
 from api_config import FREE_APIS
+from target_routing import RoutingPlan
+from entity_model import EntityStore, parse_intelligence
+from entity_resolution import EntityResolver, IDENTITY_KINDS
+from relationship_graph import RelationshipGraph
+from risk_engine import RiskEngine
+from prefilter import (
+    Prefilter, ABSENT, KNOWN_BAD, ABSENT_SKIP_CATEGORIES, KNOWN_BAD_SKIP_CATEGORIES, BAD_RISK_THRESHOLD
+)
 
 class DeepScanner:
     """Advanced Intelligence Gathering System with Cross-Source Correlation"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        graph: Optional[RelationshipGraph] = None,
+        risk_engine: Optional[RiskEngine] = None,
+        prefilter: Optional[Prefilter] = None
+    ):
         self.console = Console()
+        self.risk_engine = risk_engine or RiskEngine()
+        self.prefilter = prefilter or Prefilter.open_default()
         self.scanners = {
             category: get_scanner(category)
             for category in FREE_APIS.keys()
         }
+        self._graph = graph
+
+    @property
+    def graph(self) -> RelationshipGraph:
+        """Relationship graph every scan is written into"""
+        if self._graph is None:
+            self._graph = RelationshipGraph.default()
+        return self._graph
 
-    def deep_scan(self, target: str, scan_types: Optional[List[str]] = None) -> Dict[str, Any]:
+    def deep_scan(
+        self,
+        target: str,
+        scan_types: Optional[List[str]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
         """
         Execute deep intelligence gathering with cross-source correlation
         
         Args:
             target: Target identifier (phone, email, domain, etc.)
             scan_types: List of intelligence categories to scan (None for all)
+            on_progress: Called with a stage event as each category and analysis step finishes
         """
+        progress = on_progress or (lambda event: None)
         if not scan_types:
             scan_types = list(FREE_APIS.keys())
 
         scan_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{target}"
+        plan = RoutingPlan(target)
         
         # Initialize scan results
         results = {
@@ -48,8 +79,19 @@ class DeepScanner:
             "recommendations": []
         }
 
-        # Gather intelligence from specialized scanners
-        for category in scan_types:
+        # Targets absent from every breach and threat source skip those categories, and
+        # known-bad targets skip discovery and go straight to enrichment
+        categories = plan.filter_categories(scan_types)
+        precheck = self.prefilter.classify(target) if self.prefilter is not None else None
+        if precheck is not None:
+            skip = {ABSENT: ABSENT_SKIP_CATEGORIES, KNOWN_BAD: KNOWN_BAD_SKIP_CATEGORIES}.get(precheck, ())
+            skipped = [category for category in categories if category in skip]
+            categories = [category for category in categories if category not in skipped]
+            results["scan_metadata"]["prefilter"] = {"status": precheck, "skipped_categories": skipped}
+        progress({"stage": "plan", "scan_id": scan_id, "categories": categories})
+
+        # Gather intelligence from specialized scanners that accept the target type
+        for category in categories:
             scanner = self.scanners.get(category)
             if scanner:
                 try:
@@ -58,16 +100,38 @@ class DeepScanner:
                         self.console.print(f"[green]Gathering {category} intelligence...[/green]")
                         data = scanner.gather_intelligence(target, provider)
                         results["intelligence_data"][category] = data
+                        progress({"stage": "category", "category": category, "status": "done", "data": data})
                 except Exception as e:
                     self.console.print(f"[red]Error gathering {category} intelligence: {str(e)}[/red]")
+                    progress({"stage": "category", "category": category, "status": "error", "error": str(e)})
+
+        results["scan_metadata"].update(plan.to_metadata())
 
         # Perform advanced correlation analysis
         self.console.print("[green]Performing correlation analysis...[/green]")
-        results["correlation_analysis"] = self._correlate_intelligence(results["intelligence_data"])
+        entity_store = parse_intelligence(results["intelligence_data"], scan_id, target)
+        results["correlation_analysis"] = self._correlate_intelligence(results["intelligence_data"], entity_store, target)
+        progress({"stage": "correlation"})
+
+        try:
+            results["scan_metadata"]["graph"] = self.graph.record_scan(scan_id, target, entity_store)
+        except Exception as e:
+            self.console.print(f"[red]Error recording relationship graph: {str(e)}[/red]")
 
         # Calculate risk assessment
         self.console.print("[green]Calculating risk assessment...[/green]")
         results["risk_assessment"] = self._assess_risk(results["intelligence_data"], results["correlation_analysis"])
+        if precheck == KNOWN_BAD:
+            # The skipped threat lookups would have confirmed the match, so the score reflects it
+            results["risk_assessment"]["overall_risk_score"] = max(
+                results["risk_assessment"]["overall_risk_score"], BAD_RISK_THRESHOLD
+            )
+            results["risk_assessment"]["risk_factors"].insert(0, {
+                "type": "known_bad_indicator",
+                "details": "Target matches a known-bad pre-filter entry",
+                "severity": "HIGH"
+            })
+        progress({"stage": "risk", "overall_risk_score": results["risk_assessment"].get("overall_risk_score")})
 
         # Generate recommendations
         self.console.print("[green]Generating recommendations...[/green]")
@@ -79,25 +143,39 @@ class DeepScanner:
 
         return results
 
-    def _correlate_intelligence(self, intel_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _correlate_intelligence(
+        self,
+        intel_data: Dict[str, Any],
+        store: Optional[EntityStore] = None,
+        target: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Perform advanced correlation across intelligence sources"""
+        # Parse provider responses into normalized entities once for all correlators
+        store = store if store is not None else parse_intelligence(intel_data, target=target)
+
         correlations = {
-            "identity_correlations": self._correlate_identities(intel_data),
+            "identity_correlations": self._correlate_identities(intel_data, store, target),
             "behavioral_patterns": self._analyze_behavior(intel_data),
             "temporal_analysis": self._analyze_temporal_data(intel_data),
             "geographic_correlations": self._correlate_locations(intel_data),
-            "relationship_mapping": self._map_relationships(intel_data),
+            "relationship_mapping": self._map_relationships(intel_data, store),
             "threat_correlations": self._correlate_threats(intel_data),
-            "exposure_analysis": self._analyze_exposures(intel_data),
+            "exposure_analysis": self._analyze_exposures(intel_data, store),
             "confidence_metrics": self._calculate_confidence_metrics(intel_data)
         }
         
         # Cross-reference findings
         correlations["cross_references"] = self._cross_reference_findings(correlations)
+        correlations["entity_summary"] = store.summary()
         
         return correlations
 
-    def _correlate_identities(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _correlate_identities(
+        self,
+        data: Dict[str, Any],
+        store: Optional[EntityStore] = None,
+        target: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Correlate identity information across sources"""
         identities = {
             "confirmed_identities": [],
@@ -106,6 +184,19 @@ class DeepScanner:
             "confidence_scores": {}
         }
 
+        # Identifiers observed anywhere in the results are potential identities
+        if store is not None:
+            for kind in IDENTITY_KINDS:
+                for entity in store.entities(kind):
+                    identities["potential_identities"].append(entity.to_dict())
+
+            # Cluster identifiers that resolve to the same actor
+            resolver = EntityResolver(store)
+            resolver.index(target)
+            for cluster in resolver.clusters():
+                identities["identity_clusters"].append(cluster)
+                identities["confidence_scores"][str(cluster["cluster_id"])] = cluster["confidence"]
+
         # Extract identity information from each source
         for category, intel in data.items():
             if category == "EMAIL_INTELLIGENCE":
@@ -174,7 +265,7 @@ class DeepScanner:
 
         return locations
 
-    def _map_relationships(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _map_relationships(self, data: Dict[str, Any], store: Optional[EntityStore] = None) -> Dict[str, Any]:
         """Map relationships between entities"""
         relationships = {
             "direct_connections": [],
@@ -183,6 +274,17 @@ class DeepScanner:
             "relationship_types": {}
         }
 
+        # Entities reported by the same source are indirectly connected
+        if store is not None:
+            for (scan_id, category), entity_ids in store.entities_by_source().items():
+                if len(entity_ids) > 1:
+                    relationships["indirect_connections"].append({
+                        "source": category,
+                        "entities": [store.entity(entity_id).to_dict() for entity_id in entity_ids]
+                    })
+            if relationships["indirect_connections"]:
+                relationships["relationship_types"]["co_observed"] = len(relationships["indirect_connections"])
+
         # Extract relationship information from each source
         for category, intel in data.items():
             if category == "SOCIAL_INTELLIGENCE" and "connections" in intel:
@@ -209,7 +311,7 @@ class DeepScanner:
 
         return threats
 
-    def _analyze_exposures(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_exposures(self, data: Dict[str, Any], store: Optional[EntityStore] = None) -> Dict[str, Any]:
         """Analyze exposure data across sources"""
         exposures = {
             "exposed_data_types": [],
@@ -218,6 +320,14 @@ class DeepScanner:
             "risk_levels": {}
         }
 
+        if store is not None:
+            for breach in store.entities("breach"):
+                exposures["exposure_sources"].append(breach.value)
+                exposures["exposed_data_types"].extend(breach.data_classes)
+                if breach.date:
+                    exposures["exposure_timeline"].append({"date": breach.date, "source": breach.value})
+            exposures["exposure_timeline"].sort(key=lambda event: event["date"])
+
         # Combine exposure information from each source
         for category, intel in data.items():
             if category == "BREACH_INTELLIGENCE":
@@ -226,6 +336,7 @@ class DeepScanner:
                         exposures["exposed_data_types"].extend(list(intel["exposed_data"]))
                     exposures["exposed_data_types"] = list(set(exposures["exposed_data_types"]))  # Remove duplicates
 
+        exposures["exposed_data_types"] = sorted(set(exposures["exposed_data_types"]))
         return exposures
 
     def _calculate_confidence_metrics(self, data: Dict[str, Any]) -> Dict[str, float]:
@@ -251,7 +362,20 @@ class DeepScanner:
             "confidence_scores": {}
         }
 
-        # Implementation for cross-referencing
+        # Clusters joining different identifier kinds corroborate each other
+        clusters = correlations.get("identity_correlations", {}).get("identity_clusters", [])
+        for cluster in clusters:
+            reference = {
+                "cluster_id": cluster["cluster_id"],
+                "kinds": cluster["kinds"],
+                "members": cluster["members"]
+            }
+            if len(cluster["kinds"]) > 1:
+                cross_refs["confirmed_correlations"].append(reference)
+            else:
+                cross_refs["potential_correlations"].append(reference)
+            cross_refs["confidence_scores"][str(cluster["cluster_id"])] = cluster["confidence"]
+
         return cross_refs
 
     def _assess_risk(self, intel_data: Dict[str, Any], correlations: Dict[str, Any]) -> Dict[str, Any]:
@@ -270,9 +394,15 @@ class DeepScanner:
             if category == "THREAT_INTELLIGENCE" and "threat_score" in intel:
                 risk["threat_levels"][category] = intel["threat_score"]
 
-        # Calculate overall risk score
-        if risk["threat_levels"]:
-            risk["overall_risk_score"] = sum(risk["threat_levels"].values()) / len(risk["threat_levels"])
+        # Calculate overall risk score from the feature matrix
+        scored = self.risk_engine.score(intel_data)
+        risk["overall_risk_score"] = scored["overall_risk_score"]
+        risk["risk_factors"] = scored["risk_factors"]
+        risk["component_scores"] = scored["component_scores"]
+        risk["risk_model"] = scored["model"]
+        # Overall confidence is the mean of the per-category confidences
+        confidence = correlations.get("confidence_metrics", {})
+        risk["confidence_score"] = sum(confidence.values()) / len(confidence) if confidence else 0.0
 
         return risk
 
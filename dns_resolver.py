@@ -0,0 +1,228 @@
+"""
+DNS Resolver
+Concurrent in-process DNS resolution with TTL-respecting positive and negative caching
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+DEFAULT_RECORD_TYPES = ("A", "AAAA", "MX", "NS", "TXT", "CNAME")
+
+# Comma-separated nameservers (optionally host:port) to use instead of the system resolver
+DNS_NAMESERVERS = os.environ.get("DNS_NAMESERVERS", "")
+
+# Queries in flight at once
+DEFAULT_CONCURRENCY = 256
+
+# Per-query time budget in seconds, including retries
+DEFAULT_TIMEOUT = 3.0
+
+# TTL used for NXDOMAIN/NODATA when the response carries no SOA
+DEFAULT_NEGATIVE_TTL = 300
+
+# Bounds applied to every cached TTL
+MIN_TTL = 0
+MAX_TTL = 86400
+
+# Cached (name, type) answers kept before the oldest are evicted
+DEFAULT_CACHE_SIZE = 500_000
+
+NOERROR = "NOERROR"
+NXDOMAIN = "NXDOMAIN"
+NODATA = "NODATA"
+SERVFAIL = "SERVFAIL"
+TIMEOUT = "TIMEOUT"
+
+# Statuses that are facts about the name and may be cached; failures are retried
+CACHEABLE_STATUSES = (NOERROR, NXDOMAIN, NODATA)
+
+def _rdata_value(rdtype: str, rdata: Any) -> Any:
+    if rdtype in ("A", "AAAA"):
+        return rdata.address
+    if rdtype == "MX":
+        return {"preference": rdata.preference, "exchange": rdata.exchange.to_text(omit_final_dot=True)}
+    if rdtype in ("NS", "CNAME"):
+        return rdata.target.to_text(omit_final_dot=True)
+    if rdtype == "TXT":
+        return b"".join(rdata.strings).decode("utf-8", "replace")
+    return rdata.to_text()
+
+def _negative_ttl(response: Any, default: int) -> int:
+    """Negative caching TTL from the SOA in a response's authority section (RFC 2308)"""
+    for rrset in getattr(response, "authority", None) or []:
+        if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+            return min(rrset.ttl, rrset[0].minimum)
+    return default
+
+def _clamp_ttl(ttl: int) -> int:
+    return max(MIN_TTL, min(int(ttl), MAX_TTL))
+
+def _parse_nameservers(spec: str) -> List[Tuple[str, int]]:
+    """Parse "host", "host:port" and "[v6]:port" entries"""
+    servers = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        if entry.startswith("["):
+            host, _, port = entry[1:].partition("]:")
+            host = host.rstrip("]")
+        elif entry.count(":") == 1:
+            host, port = entry.split(":")
+        else:
+            host, port = entry, ""
+        servers.append((host, int(port) if port else 53))
+    return servers
+
+class DNSResolver:
+    """Resolves many names concurrently, caching answers for their TTL"""
+
+    _default: Optional["DNSResolver"] = None
+
+    def __init__(
+        self,
+        nameservers: Optional[List[str]] = None,
+        port: int = 53,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        """
+        Args:
+            nameservers: Resolver addresses to query (None uses the system configuration)
+            port: Port the nameservers listen on, e.g. for a local stub resolver
+            concurrency: Maximum queries in flight
+            timeout: Time budget per query in seconds
+            negative_ttl: Cache time for negative answers without an SOA
+            cache_size: Maximum cached (name, type) answers
+        """
+        self.resolver = dns.asyncresolver.Resolver(configure=nameservers is None)
+        if nameservers is not None:
+            self.resolver.nameservers = list(nameservers)
+            self.resolver.port = port
+        self.resolver.lifetime = timeout
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"queries": 0, "cache_hits": 0, "negative_hits": 0, "failures": 0}
+
+    @classmethod
+    def default(cls) -> "DNSResolver":
+        """Shared resolver, using DNS_NAMESERVERS when set (all on the first entry's port)"""
+        if cls._default is None:
+            servers = _parse_nameservers(DNS_NAMESERVERS)
+            if servers:
+                cls._default = cls([host for host, _ in servers], servers[0][1])
+            else:
+                cls._default = cls()
+        return cls._default
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, answer = entry
+            if expires <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            if answer["status"] != NOERROR:
+                self.stats["negative_hits"] += 1
+        remaining = int(expires - time.monotonic())
+        return dict(answer, ttl=max(remaining, 0), cached=True)
+
+    def _cache_put(self, key: Tuple[str, str], answer: Dict[str, Any]) -> None:
+        if answer["status"] not in CACHEABLE_STATUSES or answer["ttl"] <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (time.monotonic() + answer["ttl"], answer)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    async def _query(self, name: str, rdtype: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        key = (name, rdtype)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        async with semaphore:
+            self.stats["queries"] += 1
+            try:
+                answer = await self.resolver.resolve(name, rdtype, raise_on_no_answer=False)
+                if answer.rrset is None:
+                    result = {"status": NODATA, "records": [],
+                              "ttl": _clamp_ttl(_negative_ttl(answer.response, self.negative_ttl))}
+                else:
+                    result = {"status": NOERROR, "records": [_rdata_value(rdtype, rdata) for rdata in answer.rrset],
+                              "ttl": _clamp_ttl(answer.rrset.ttl)}
+            except dns.resolver.NXDOMAIN as e:
+                responses = list(e.responses().values()) if hasattr(e, "responses") else []
+                ttl = _negative_ttl(responses[0], self.negative_ttl) if responses else self.negative_ttl
+                result = {"status": NXDOMAIN, "records": [], "ttl": _clamp_ttl(ttl)}
+            except dns.exception.Timeout:
+                self.stats["failures"] += 1
+                result = {"status": TIMEOUT, "records": [], "ttl": 0}
+            except dns.exception.DNSException as e:
+                self.stats["failures"] += 1
+                result = {"status": SERVFAIL, "records": [], "ttl": 0, "error": str(e)}
+
+        self._cache_put(key, result)
+        return dict(result, cached=False)
+
+    async def resolve_many_async(
+        self,
+        names: Iterable[str],
+        record_types: Iterable[str] = DEFAULT_RECORD_TYPES
+    ) -> Dict[str, Dict[str, Any]]:
+        """Resolve every (name, type) pair concurrently within the concurrency limit"""
+        record_types = [rdtype.upper() for rdtype in record_types]
+        names = list(dict.fromkeys(name.strip().rstrip(".").lower() for name in names if name and name.strip()))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pairs = [(name, rdtype) for name in names for rdtype in record_types]
+        answers = await asyncio.gather(*(self._query(name, rdtype, semaphore) for name, rdtype in pairs))
+
+        results: Dict[str, Dict[str, Any]] = {name: {} for name in names}
+        for (name, rdtype), answer in zip(pairs, answers):
+            results[name][rdtype] = answer
+        return results
+
+    def resolve_many(
+        self,
+        names: Iterable[str],
+        record_types: Iterable[str] = DEFAULT_RECORD_TYPES
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Resolve many names from synchronous code
+
+        Returns {name: {record_type: {"status", "records", "ttl", "cached"}}}
+        with names lower-cased and stripped of the trailing dot.
+        """
+        return asyncio.run(self.resolve_many_async(names, record_types))
+
+    def resolve(self, name: str, record_types: Iterable[str] = DEFAULT_RECORD_TYPES) -> Dict[str, Dict[str, Any]]:
+        results = self.resolve_many([name], record_types)
+        return next(iter(results.values()), {})
+
+def flatten_records(answers: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-type answers for one name as a flat list of {"type", "value", "ttl"} records"""
+    return [
+        {"type": rdtype, "value": value, "ttl": answer["ttl"]}
+        for rdtype, answer in answers.items()
+        for value in answer["records"]
+    ]
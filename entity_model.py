@@ -0,0 +1,314 @@
+"""
+Normalized Entity Model
+Compact typed records for identifiers found in scan results, parsed once with provenance
+"""
+
+import sys
+from array import array
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Type
+from target_routing import classify_target
+
+class Provenance:
+    """Where an observation came from"""
+
+    __slots__ = ("scan_id", "category", "path")
+
+    def __init__(self, scan_id: str, category: str, path: str):
+        self.scan_id = sys.intern(scan_id)
+        self.category = sys.intern(category)
+        self.path = sys.intern(path)
+
+    def key(self) -> Tuple[str, str, str]:
+        return (self.scan_id, self.category, self.path)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"scan_id": self.scan_id, "category": self.category, "path": self.path}
+
+class Entity:
+    """Base class for normalized entities"""
+
+    __slots__ = ("id", "value")
+    kind = "entity"
+
+    def __init__(self, entity_id: int, value: str):
+        self.id = entity_id
+        self.value = value
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return value.strip().lower()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "value": self.value}
+
+class Email(Entity):
+    __slots__ = ()
+    kind = "email"
+
+    @property
+    def domain(self) -> str:
+        return self.value.rsplit("@", 1)[-1]
+
+class Phone(Entity):
+    __slots__ = ()
+    kind = "phone"
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        digits = "".join(c for c in value if c.isdigit())
+        return "+" + digits
+
+class Domain(Entity):
+    __slots__ = ()
+    kind = "domain"
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return value.strip().lower().rstrip(".")
+
+class IP(Entity):
+    __slots__ = ()
+    kind = "ip"
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return value.strip()
+
+class Wallet(Entity):
+    __slots__ = ()
+    kind = "wallet"
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        value = value.strip()
+        # Ethereum addresses are case-insensitive; other chains are not
+        return value.lower() if value.startswith("0x") else value
+
+class Username(Entity):
+    __slots__ = ()
+    kind = "username"
+
+class Breach(Entity):
+    __slots__ = ("date", "data_classes")
+    kind = "breach"
+
+    def __init__(self, entity_id: int, value: str):
+        super().__init__(entity_id, value)
+        self.date: Optional[str] = None
+        self.data_classes: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "value": self.value,
+            "date": self.date,
+            "data_classes": list(self.data_classes)
+        }
+
+class Indicator(Entity):
+    __slots__ = ("indicator_type",)
+    kind = "indicator"
+
+    def __init__(self, entity_id: int, value: str):
+        super().__init__(entity_id, value)
+        self.indicator_type = "unknown"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "value": self.value, "indicator_type": self.indicator_type}
+
+ENTITY_TYPES: Dict[str, Type[Entity]] = {
+    cls.kind: cls for cls in (Email, Phone, Domain, IP, Wallet, Username, Breach, Indicator)
+}
+
+# Target types from target_routing mapped to entity kinds
+TARGET_TYPE_KINDS = {
+    "email": "email",
+    "phone": "phone",
+    "domain": "domain",
+    "ip": "ip",
+    "crypto_address": "wallet"
+}
+
+# Keys whose free-text values are account handles
+USERNAME_FIELDS = ("username", "login", "handle", "screen_name")
+
+class EntityStore:
+    """Deduplicated entities with array-backed observation records"""
+
+    def __init__(self):
+        self._entities: List[Entity] = []
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._provenance: List[Provenance] = []
+        self._provenance_index: Dict[Tuple[str, str, str], int] = {}
+        # One observation is (entity id, provenance id)
+        self.observation_entities = array("I")
+        self.observation_provenance = array("I")
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add(self, kind: str, value: str, provenance: Provenance) -> Entity:
+        """Add an observation of an entity, creating the entity on first sight"""
+        cls = ENTITY_TYPES[kind]
+        normalized = sys.intern(cls.normalize(value))
+        key = (kind, normalized)
+
+        entity_id = self._index.get(key)
+        if entity_id is None:
+            entity_id = len(self._entities)
+            self._entities.append(cls(entity_id, normalized))
+            self._index[key] = entity_id
+
+        provenance_id = self._provenance_index.get(provenance.key())
+        if provenance_id is None:
+            provenance_id = len(self._provenance)
+            self._provenance.append(provenance)
+            self._provenance_index[provenance.key()] = provenance_id
+
+        self.observation_entities.append(entity_id)
+        self.observation_provenance.append(provenance_id)
+        return self._entities[entity_id]
+
+    def get(self, kind: str, value: str) -> Optional[Entity]:
+        """Look up an entity by kind and raw value"""
+        cls = ENTITY_TYPES[kind]
+        entity_id = self._index.get((kind, cls.normalize(value)))
+        return None if entity_id is None else self._entities[entity_id]
+
+    def entity(self, entity_id: int) -> Entity:
+        return self._entities[entity_id]
+
+    def entities(self, kind: Optional[str] = None) -> Iterator[Entity]:
+        """Iterate entities, optionally of one kind"""
+        for entity in self._entities:
+            if kind is None or entity.kind == kind:
+                yield entity
+
+    def provenance(self, provenance_id: int) -> Provenance:
+        return self._provenance[provenance_id]
+
+    def observations(self) -> Iterator[Tuple[int, int]]:
+        """Iterate (entity id, provenance id) pairs"""
+        return zip(self.observation_entities, self.observation_provenance)
+
+    def provenance_of(self, entity_id: int) -> List[Provenance]:
+        """All provenance records for an entity"""
+        seen = set()
+        records = []
+        for observed_id, provenance_id in self.observations():
+            if observed_id == entity_id and provenance_id not in seen:
+                seen.add(provenance_id)
+                records.append(self._provenance[provenance_id])
+        return records
+
+    def entities_by_source(self) -> Dict[Tuple[str, str], List[int]]:
+        """Group entity ids by the (scan, category) they were observed in"""
+        # Dict keys dedupe in first-seen order without rescanning each group
+        groups: Dict[Tuple[str, str], Dict[int, None]] = {}
+        for entity_id, provenance_id in self.observations():
+            provenance = self._provenance[provenance_id]
+            groups.setdefault((provenance.scan_id, provenance.category), {})[entity_id] = None
+        return {source: list(members) for source, members in groups.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts per entity kind"""
+        counts: Dict[str, int] = {}
+        for entity in self._entities:
+            counts[entity.kind] = counts.get(entity.kind, 0) + 1
+        return {
+            "entity_counts": counts,
+            "observation_count": len(self.observation_entities)
+        }
+
+def parse_intelligence(
+    intel_data: Dict[str, Any],
+    scan_id: str = "",
+    target: Optional[str] = None,
+    store: Optional[EntityStore] = None
+) -> EntityStore:
+    """
+    Parse scan intelligence data into an entity store in a single pass
+
+    Args:
+        intel_data: Category -> category results, as produced by the scanners
+        scan_id: Scan the data belongs to
+        target: Scanned target, recorded as an observation of itself
+        store: Existing store to add to (a new one is created if omitted)
+    """
+    store = store if store is not None else EntityStore()
+
+    if target is not None:
+        kind = TARGET_TYPE_KINDS.get(classify_target(target))
+        if kind:
+            store.add(kind, target, Provenance(scan_id, "TARGET", "target"))
+
+    for category, intel in intel_data.items():
+        _walk(store, intel, scan_id, category, category)
+
+    return store
+
+def _walk(store: EntityStore, node: Any, scan_id: str, category: str, path: str, key: str = "") -> None:
+    """Visit every value once, extracting typed entities
+
+    Values found directly inside one object share that object's provenance, so
+    identifiers reported together in a provider record can be linked later.
+    """
+    if isinstance(node, dict):
+        record = Provenance(scan_id, category, path)
+        if _is_breach_record(node):
+            _add_breach(store, node, record)
+        for child_key, value in node.items():
+            if isinstance(value, str):
+                _add_identifier(store, value, record, child_key)
+            else:
+                _walk(store, value, scan_id, category, f"{path}.{child_key}", child_key)
+    elif isinstance(node, (list, tuple)):
+        for index, item in enumerate(node):
+            item_path = f"{path}[{index}]"
+            if key == "indicators" and isinstance(item, (str, dict)):
+                _add_indicator(store, item, Provenance(scan_id, category, item_path))
+            if isinstance(item, str):
+                _add_identifier(store, item, Provenance(scan_id, category, item_path), key)
+            else:
+                _walk(store, item, scan_id, category, item_path, key)
+    elif isinstance(node, str):
+        _add_identifier(store, node, Provenance(scan_id, category, path), key)
+
+def _add_identifier(store: EntityStore, value: str, provenance: Provenance, key: str) -> None:
+    target_type = classify_target(value)
+    kind = TARGET_TYPE_KINDS.get(target_type)
+
+    # Free-text numbers are only treated as phones when written in international form
+    if kind == "phone" and not value.strip().startswith("+"):
+        kind = None
+    if kind is None and key in USERNAME_FIELDS:
+        kind = "username"
+
+    if kind:
+        store.add(kind, value, provenance)
+
+def _is_breach_record(node: Dict[str, Any]) -> bool:
+    return ("Name" in node and "BreachDate" in node) or ("service" in node and "breach_date" in node)
+
+def _add_breach(store: EntityStore, record: Dict[str, Any], provenance: Provenance) -> None:
+    name = record.get("Name") or record.get("service")
+    if not isinstance(name, str):
+        return
+    breach = store.add("breach", name, provenance)
+    breach.date = record.get("BreachDate") or record.get("breach_date") or breach.date
+    data_classes = record.get("DataClasses") or record.get("data_classes") or ()
+    if isinstance(data_classes, str):
+        data_classes = (data_classes,)
+    if data_classes:
+        breach.data_classes = tuple(sys.intern(str(d)) for d in data_classes)
+
+def _add_indicator(store: EntityStore, item: Any, provenance: Provenance) -> None:
+    if isinstance(item, dict):
+        value = item.get("indicator") or item.get("value")
+        indicator_type = item.get("type")
+    else:
+        value, indicator_type = item, None
+    if not isinstance(value, str) or not value:
+        return
+    indicator = store.add("indicator", value, provenance)
+    indicator.indicator_type = sys.intern(str(indicator_type or classify_target(value)))
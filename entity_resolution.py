@@ -0,0 +1,257 @@
+"""
+Entity Resolution Engine
+Clusters identifiers that refer to the same actor, within one scan or across the scan store
+"""
+
+import hashlib
+import json
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from entity_model import EntityStore, Entity, parse_intelligence
+from target_routing import classify_target
+
+# Entity kinds that identify an actor (breaches, domains and IPs are infrastructure)
+IDENTITY_KINDS = ("email", "phone", "username", "wallet")
+
+# Result fields whose identifiers describe the scanned target itself
+TARGET_LINK_FIELDS = ("associated_identities", "associated_addresses", "social_profiles", "profiles")
+
+# Evidence types and the confidence each lends to a link
+LINK_CO_OBSERVED = 0
+LINK_TARGET_FIELD = 1
+LINK_SHARED_HANDLE = 2
+LINK_WEIGHTS = {LINK_CO_OBSERVED: 0.9, LINK_TARGET_FIELD: 0.8, LINK_SHARED_HANDLE: 0.6}
+LINK_NAMES = {LINK_CO_OBSERVED: "co_observed", LINK_TARGET_FIELD: "target_field", LINK_SHARED_HANDLE: "shared_handle"}
+
+_HANDLE_STRIP = re.compile(r"[^a-z0-9]")
+
+# Role and generic handles shared by unrelated organisations; never a blocking key
+GENERIC_HANDLES = frozenset({
+    "abuse", "accounts", "admin", "administrator", "billing", "careers", "contact", "enquiries",
+    "feedback", "hello", "help", "helpdesk", "hostmaster", "info", "inquiries", "jobs", "mail",
+    "mailer", "marketing", "media", "newsletter", "noreply", "donotreply", "notifications", "office",
+    "postmaster", "press", "privacy", "root", "sales", "security", "service", "support", "team",
+    "test", "user", "webmaster"
+})
+
+class UnionFind:
+    """Disjoint-set forest over integer ids with path halving and union by size"""
+
+    def __init__(self):
+        self.parent = array("I")
+        self.size = array("I")
+
+    def add(self, count: int = 1) -> None:
+        """Add new singleton sets for the next ids"""
+        for _ in range(count):
+            self.parent.append(len(self.parent))
+            self.size.append(1)
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets containing a and b; returns False if already merged"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+def blocking_keys(entity: Entity) -> List[str]:
+    """Keys under which entities are compared; entities sharing a key are linked"""
+    if entity.kind == "email":
+        handle = _HANDLE_STRIP.sub("", entity.value.split("@", 1)[0].split("+", 1)[0].lower())
+    elif entity.kind == "username":
+        handle = _HANDLE_STRIP.sub("", entity.value.lower())
+    else:
+        return []
+    if len(handle) < 4 or handle in GENERIC_HANDLES:
+        return []
+    return [f"handle:{handle}"]
+
+def cluster_id(members: List[Entity]) -> str:
+    """Identifier derived from a cluster's members, stable across runs and insertion order"""
+    digest = hashlib.sha256("\n".join(sorted(f"{entity.kind}:{entity.value}" for entity in members)).encode())
+    return digest.hexdigest()[:16]
+
+class EntityResolver:
+    """Incremental cross-source entity resolution over an entity store"""
+
+    def __init__(self, store: Optional[EntityStore] = None, max_block_size: int = 50):
+        """
+        Args:
+            store: Entity store to resolve (a new one is created if omitted)
+            max_block_size: Blocks larger than this stop producing links, since
+                very common handles are not evidence of a shared identity
+        """
+        self.store = store if store is not None else EntityStore()
+        self.max_block_size = max_block_size
+        self.union_find = UnionFind()
+        self.block_first: Dict[str, int] = {}
+        self.block_sizes: Dict[str, int] = {}
+        self.scans_by_entity: Dict[int, set] = {}
+        self.link_a = array("I")
+        self.link_b = array("I")
+        self.link_type = array("B")
+        self._indexed_entities = 0
+        self._indexed_observations = 0
+        self._cluster_cache = None
+
+    def add_scan(self, intel_data: Dict[str, Any], scan_id: str = "", target: Optional[str] = None) -> None:
+        """Parse a scan into the store and resolve its new observations"""
+        parse_intelligence(intel_data, scan_id, target, self.store)
+        self.index(target)
+
+    def index(self, target: Optional[str] = None) -> None:
+        """Resolve observations added to the store since the last call"""
+        store = self.store
+        self.union_find.add(len(store) - self._indexed_entities)
+        self._cluster_cache = None
+
+        target_entity = None
+        if target is not None:
+            target_entity = self._identity_entity(target)
+
+        # Group new observations by provenance record in one pass
+        records: Dict[int, List[int]] = {}
+        entity_ids = store.observation_entities
+        provenance_ids = store.observation_provenance
+        for position in range(self._indexed_observations, len(entity_ids)):
+            entity_id = entity_ids[position]
+            provenance_id = provenance_ids[position]
+            self.scans_by_entity.setdefault(entity_id, set()).add(store.provenance(provenance_id).scan_id)
+            if store.entity(entity_id).kind in IDENTITY_KINDS:
+                members = records.setdefault(provenance_id, [])
+                if entity_id not in members:
+                    members.append(entity_id)
+        self._indexed_observations = len(entity_ids)
+
+        for provenance_id, members in records.items():
+            for other in members[1:]:
+                self._link(members[0], other, LINK_CO_OBSERVED)
+
+            if target_entity is not None and self._is_target_field(store.provenance(provenance_id).path):
+                for member in members:
+                    self._link(target_entity.id, member, LINK_TARGET_FIELD)
+
+        # Blocking keys for entities first seen in this batch
+        for entity_id in range(self._indexed_entities, len(store)):
+            for key in blocking_keys(store.entity(entity_id)):
+                size = self.block_sizes.get(key, 0)
+                if size == 0:
+                    self.block_first[key] = entity_id
+                elif size < self.max_block_size:
+                    self._link(self.block_first[key], entity_id, LINK_SHARED_HANDLE)
+                self.block_sizes[key] = size + 1
+        self._indexed_entities = len(store)
+
+    def _identity_entity(self, target: str) -> Optional[Entity]:
+        kind = {"email": "email", "phone": "phone", "crypto_address": "wallet"}.get(classify_target(target))
+        return self.store.get(kind, target) if kind else None
+
+    @staticmethod
+    def _is_target_field(path: str) -> bool:
+        return any(f".{field}" in path for field in TARGET_LINK_FIELDS)
+
+    def _link(self, a: int, b: int, link_type: int) -> None:
+        if a != b and self.union_find.union(a, b):
+            self.link_a.append(a)
+            self.link_b.append(b)
+            self.link_type.append(link_type)
+
+    def links(self) -> Iterator[Tuple[int, int, str]]:
+        """Iterate (entity id, entity id, evidence type) links that merged clusters"""
+        for a, b, link_type in zip(self.link_a, self.link_b, self.link_type):
+            yield a, b, LINK_NAMES[link_type]
+
+    def _cluster_index(self) -> Tuple[Dict[int, List[int]], Dict[int, List[float]]]:
+        """Members and link weights per cluster root, rebuilt only after new links"""
+        if self._cluster_cache is None:
+            members: Dict[int, List[int]] = {}
+            for entity in self.store.entities():
+                if entity.kind in IDENTITY_KINDS:
+                    members.setdefault(self.union_find.find(entity.id), []).append(entity.id)
+
+            weights: Dict[int, List[float]] = {}
+            for a, link_type in zip(self.link_a, self.link_type):
+                weights.setdefault(self.union_find.find(a), []).append(LINK_WEIGHTS[link_type])
+
+            self._cluster_cache = (members, weights)
+        return self._cluster_cache
+
+    def clusters(self, min_size: int = 2) -> List[Dict[str, Any]]:
+        """All identity clusters with at least min_size members"""
+        members, weights = self._cluster_index()
+        clusters = [
+            self._describe(root, entity_ids, weights.get(root, []))
+            for root, entity_ids in members.items()
+            if len(entity_ids) >= min_size
+        ]
+        clusters.sort(key=lambda cluster: -len(cluster["members"]))
+        return clusters
+
+    def cluster_of(self, kind: str, value: str) -> Optional[Dict[str, Any]]:
+        """The identity cluster containing an identifier"""
+        entity = self.store.get(kind, value)
+        if entity is None or entity.kind not in IDENTITY_KINDS:
+            return None
+        members, weights = self._cluster_index()
+        root = self.union_find.find(entity.id)
+        return self._describe(root, members[root], weights.get(root, []))
+
+    def lookup(self, identifier: str) -> Dict[str, Any]:
+        """Find an identifier in the inverted index with its cluster and scans"""
+        kind = {
+            "email": "email", "phone": "phone", "domain": "domain",
+            "ip": "ip", "crypto_address": "wallet"
+        }.get(classify_target(identifier), "username")
+        entity = self.store.get(kind, identifier)
+        if entity is None:
+            return {"found": False, "identifier": identifier}
+        return {
+            "found": True,
+            "entity": entity.to_dict(),
+            "scans": sorted(self.scans_by_entity.get(entity.id, ())),
+            "cluster": self.cluster_of(kind, identifier) if kind in IDENTITY_KINDS else None
+        }
+
+    def _describe(self, root: int, entity_ids: List[int], weights: List[float]) -> Dict[str, Any]:
+        scans = set()
+        for entity_id in entity_ids:
+            scans.update(self.scans_by_entity.get(entity_id, ()))
+        members = [self.store.entity(entity_id) for entity_id in entity_ids]
+        return {
+            "cluster_id": cluster_id(members),
+            "members": [entity.to_dict() for entity in members],
+            "kinds": sorted({entity.kind for entity in members}),
+            "scans": sorted(scans),
+            "confidence": round(sum(weights) / len(weights), 3) if weights else 0.0
+        }
+
+def resolve_scan_store(scan_dir: str = "findings/osint_scans", resolver: Optional[EntityResolver] = None) -> EntityResolver:
+    """Resolve identities across every saved scan result"""
+    resolver = resolver or EntityResolver()
+    for result_file in sorted(Path(scan_dir).glob("*.json")):
+        try:
+            with open(result_file) as f:
+                scan_data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        metadata = scan_data.get("scan_metadata", {}) if isinstance(scan_data, dict) else {}
+        intel = scan_data.get("intelligence_data", scan_data) if isinstance(scan_data, dict) else {}
+        if isinstance(intel, dict):
+            intel = {section: data for section, data in intel.items() if section != "scan_metadata"}
+            resolver.add_scan(intel, metadata.get("scan_id", result_file.stem), metadata.get("target"))
+
+    return resolver
@@ -0,0 +1,225 @@
+"""
+GeoIP Resolver
+Local MMDB geolocation and ASN lookups with a batched remote fallback
+"""
+
+import ipaddress
+import os
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Callable
+import requests
+from api_config import get_api_url
+from transport import Transport
+
+try:
+    import maxminddb
+except ImportError:  # Optional: without it every lookup uses the remote fallback
+    maxminddb = None
+
+CITY_DB_PATH = os.environ.get("GEOIP_CITY_DB", "config/GeoLite2-City.mmdb")
+ASN_DB_PATH = os.environ.get("GEOIP_ASN_DB", "config/GeoLite2-ASN.mmdb")
+
+# ip-api batch requests accept at most this many addresses
+REMOTE_BATCH_SIZE = 100
+
+# Remote answers are kept for repeat lookups up to this many addresses
+REMOTE_CACHE_SIZE = 100_000
+
+_readers: Dict[str, Any] = {}
+_readers_lock = threading.Lock()
+
+def _packaged_city_db() -> Optional[str]:
+    """City database bundled with maxminddb-geolite2, if installed"""
+    try:
+        from _maxminddb_geolite2 import geolite2_database
+        return geolite2_database()
+    except ImportError:
+        return None
+
+def _open_mmap(path: str) -> Any:
+    """Open with the C extension's mmap reader, falling back to the pure Python one"""
+    try:
+        return maxminddb.open_database(path, maxminddb.MODE_MMAP_EXT)
+    except (ValueError, ImportError):
+        return maxminddb.open_database(path, maxminddb.MODE_MMAP)
+
+def get_reader(kind: str) -> Optional[Any]:
+    """
+    Shared memory-mapped reader for a database kind ("city" or "asn")
+
+    Readers are opened once per process and memory-mapped. Opening them before
+    forking workers (see preload) lets every worker share the same pages.
+    """
+    if maxminddb is None:
+        return None
+    with _readers_lock:
+        if kind not in _readers:
+            candidates = [CITY_DB_PATH, _packaged_city_db()] if kind == "city" else [ASN_DB_PATH]
+            reader = None
+            for path in candidates:
+                if path and os.path.exists(path):
+                    reader = _open_mmap(path)
+                    break
+            _readers[kind] = reader
+        return _readers[kind]
+
+def preload() -> Dict[str, bool]:
+    """Open the shared readers now, e.g. in a parent process before forking"""
+    return {kind: get_reader(kind) is not None for kind in ("city", "asn")}
+
+def close_readers() -> None:
+    with _readers_lock:
+        for reader in _readers.values():
+            if reader is not None:
+                reader.close()
+        _readers.clear()
+
+def normalize_ip(ip: Any) -> Optional[str]:
+    """Canonical form of a public IP address, or None for anything else"""
+    try:
+        address = ipaddress.ip_address(ip.strip())
+    except (ValueError, AttributeError):
+        return None
+    return str(address) if address.is_global else None
+
+def _names(record: Dict[str, Any], key: str) -> Optional[str]:
+    return (record.get(key) or {}).get("names", {}).get("en")
+
+def _from_mmdb(ip: str, city: Optional[Dict[str, Any]], asn: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    city = city or {}
+    location = city.get("location", {})
+    subdivisions = city.get("subdivisions") or [{}]
+    return {
+        "ip": ip,
+        "country": _names(city, "country"),
+        "country_code": city.get("country", {}).get("iso_code"),
+        "region": subdivisions[0].get("names", {}).get("en"),
+        "city": _names(city, "city"),
+        "latitude": location.get("latitude"),
+        "longitude": location.get("longitude"),
+        "timezone": location.get("time_zone"),
+        "asn": (asn or {}).get("autonomous_system_number"),
+        "as_org": (asn or {}).get("autonomous_system_organization"),
+        "source": "local_mmdb"
+    }
+
+def _from_ipapi(record: Dict[str, Any]) -> Dict[str, Any]:
+    asn_field = record.get("as") or ""
+    asn = None
+    if asn_field.startswith("AS"):
+        number = asn_field[2:].split(" ", 1)[0]
+        asn = int(number) if number.isdigit() else None
+    return {
+        "ip": record.get("query"),
+        "country": record.get("country"),
+        "country_code": record.get("countryCode"),
+        "region": record.get("regionName"),
+        "city": record.get("city"),
+        "latitude": record.get("lat"),
+        "longitude": record.get("lon"),
+        "timezone": record.get("timezone"),
+        "asn": asn,
+        "as_org": record.get("org") or record.get("isp"),
+        "source": "ipapi"
+    }
+
+def ipapi_batch(ips: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Resolve addresses through the ip-api batch endpoint"""
+    batch_url = get_api_url("LOCATION_INTELLIGENCE", "ipapi").rsplit("/json", 1)[0] + "/batch"
+    resolved = {}
+    for start in range(0, len(ips), REMOTE_BATCH_SIZE):
+        chunk = ips[start:start + REMOTE_BATCH_SIZE]
+        response = Transport.default().post(batch_url, json=[{"query": ip} for ip in chunk], timeout=30)
+        if response.status_code != 200:
+            continue
+        for record in response.json():
+            if record.get("status") == "success":
+                resolved[record["query"]] = _from_ipapi(record)
+    return resolved
+
+class GeoIPResolver:
+    """Resolves IPs from local databases first, then from the remote fallback"""
+
+    def __init__(self, remote: Optional[Callable[[List[str]], Dict[str, Dict[str, Any]]]] = ipapi_batch):
+        """
+        Args:
+            remote: Batch resolver for addresses the local databases cannot answer
+                (None disables remote lookups)
+        """
+        self.remote = remote
+        self._remote_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def local_available(self) -> bool:
+        return get_reader("city") is not None or get_reader("asn") is not None
+
+    def resolve_local(self, ip: str) -> Optional[Dict[str, Any]]:
+        """Local database record for an address, or None"""
+        ip = normalize_ip(ip)
+        city_reader, asn_reader = get_reader("city"), get_reader("asn")
+        if ip is None or (city_reader is None and asn_reader is None):
+            return None
+        city = city_reader.get(ip) if city_reader is not None else None
+        asn = asn_reader.get(ip) if asn_reader is not None else None
+        if not city and not asn:
+            return None
+        return _from_mmdb(ip, city, asn)
+
+    def resolve(self, ip: str) -> Optional[Dict[str, Any]]:
+        return self.resolve_many([ip]).get(ip)
+
+    def resolve_many(self, ips: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Resolve many addresses at once
+
+        Addresses are de-duplicated, answered from the local databases where
+        possible, and only the remainder is sent to the remote fallback in
+        batches. Invalid and private addresses resolve to None.
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        misses: Dict[str, List[str]] = {}
+        for ip in dict.fromkeys(ips):
+            address = normalize_ip(ip)
+            record = self.resolve_local(address) if address else None
+            if record is not None or address is None:
+                results[ip] = record
+            else:
+                misses.setdefault(address, []).append(ip)
+
+        if misses:
+            for address, record in self._resolve_remote(list(misses)).items():
+                for ip in misses[address]:
+                    results[ip] = record
+        return results
+
+    def _resolve_remote(self, ips: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        with self._lock:
+            results = {ip: self._remote_cache[ip] for ip in ips if ip in self._remote_cache}
+        pending = [ip for ip in ips if ip not in results]
+        if not pending or self.remote is None:
+            results.update({ip: None for ip in pending})
+            return results
+
+        try:
+            fetched = self.remote(pending)
+        except requests.RequestException:
+            fetched = {}
+        with self._lock:
+            if len(self._remote_cache) + len(pending) > REMOTE_CACHE_SIZE:
+                self._remote_cache.clear()
+            for ip in pending:
+                record = fetched.get(ip)
+                results[ip] = record
+                if record is not None:
+                    self._remote_cache[ip] = record
+        return results
+
+_default_resolver: Optional[GeoIPResolver] = None
+
+def default_resolver() -> GeoIPResolver:
+    """Process-wide resolver sharing the memory-mapped readers and remote cache"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = GeoIPResolver()
+    return _default_resolver
@@ -0,0 +1,370 @@
+"""
+IOC Feed Ingestion
+Loads STIX, CSV and plain-list indicator feeds into an in-memory indicator index
+"""
+
+import csv
+import hashlib
+import io
+import ipaddress
+import json
+import re
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from urllib.parse import urlsplit
+import requests
+from transport import Transport
+
+FEED_CONFIG_PATH = "config/ioc_feeds.json"
+
+# Seconds between source checks for the shared feed set
+REFRESH_INTERVAL = 300
+
+# Threat score reported for targets listed in a local feed
+LOCAL_MATCH_SCORE = 0.9
+
+HASH_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256"}
+DOMAIN_PATTERN = re.compile(r"^(?=.{1,253}$)([a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z][a-z0-9-]{0,62}$")
+STIX_COMPARISON = re.compile(r"([a-z0-9-]+):([\w.'-]+)\s*=\s*'((?:[^'\\]|\\.)*)'")
+STIX_TYPES = {
+    "ipv4-addr": "ip",
+    "ipv6-addr": "ip",
+    "domain-name": "domain",
+    "url": "url",
+    "email-addr": "email",
+    "file": "hash"
+}
+CSV_VALUE_COLUMNS = ("indicator", "ioc", "value", "observable", "ip", "domain", "url", "hash")
+CSV_TAG_COLUMNS = ("threat", "threat_type", "tags", "malware", "category", "description")
+
+def classify_indicator(value: str) -> Tuple[str, str]:
+    """Normalized value and indicator type (ip, cidr, domain, url, hash, email or other)"""
+    value = value.strip().strip("\"'")
+    lowered = value.lower()
+    if "://" in lowered:
+        return value, "url"
+    try:
+        if "/" in value:
+            return str(ipaddress.ip_network(value, strict=False)), "cidr"
+        return str(ipaddress.ip_address(value)), "ip"
+    except ValueError:
+        pass
+    if "@" in lowered and "." in lowered.split("@")[-1]:
+        return lowered, "email"
+    if len(lowered) in HASH_LENGTHS and all(char in "0123456789abcdef" for char in lowered):
+        return lowered, "hash"
+    domain = lowered.rstrip(".")
+    if domain.startswith("*."):
+        domain = domain[2:]
+    if DOMAIN_PATTERN.match(domain):
+        return domain, "domain"
+    return value, "other"
+
+class PrefixTrie:
+    """Binary radix trie over IP prefixes, stored in flat child arrays"""
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.left = array("i", [0])
+        self.right = array("i", [0])
+        self.records: Dict[int, List[int]] = {}
+
+    def _child(self, node: int, bit: int, create: bool) -> int:
+        children = self.right if bit else self.left
+        child = children[node]
+        if child == 0 and create:
+            child = len(self.left)
+            self.left.append(0)
+            self.right.append(0)
+            children[node] = child
+        return child
+
+    def insert(self, network: int, prefix_length: int, record_id: int) -> None:
+        node = 0
+        for depth in range(prefix_length):
+            node = self._child(node, (network >> (self.bits - 1 - depth)) & 1, True)
+        self.records.setdefault(node, []).append(record_id)
+
+    def match(self, address: int) -> List[int]:
+        """Records of every prefix containing the address"""
+        matches = list(self.records.get(0, ()))
+        node = 0
+        left, right, records = self.left, self.right, self.records
+        for depth in range(self.bits):
+            node = right[node] if (address >> (self.bits - 1 - depth)) & 1 else left[node]
+            if node == 0:
+                break
+            if node in records:
+                matches.extend(records[node])
+        return matches
+
+class SuffixTrie:
+    """Domain trie over reversed labels; a domain entry matches all of its subdomains"""
+
+    _RECORDS = ""
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, domain: str, record_id: int) -> None:
+        node = self.root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        node.setdefault(self._RECORDS, []).append(record_id)
+
+    def match(self, domain: str) -> List[int]:
+        matches = []
+        node = self.root
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            matches.extend(node.get(self._RECORDS, ()))
+        return matches
+
+class IndicatorIndex:
+    """
+    Exact, CIDR and domain-suffix indicator lookups across all loaded feeds
+
+    The index is append-only; FeedSet builds a new one when a feed changes.
+    """
+
+    def __init__(self):
+        self.records: List[Tuple[str, str, str, str]] = []
+        self.exact: Dict[str, List[int]] = {}
+        self.networks = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self.domains = SuffixTrie()
+        self.feed_records: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self.feed_records.values())
+
+    def add(self, value: str, feed: str, tags: str = "") -> Optional[int]:
+        """Index one indicator from a feed"""
+        value, indicator_type = classify_indicator(value)
+        if not value:
+            return None
+        return self._insert(value, indicator_type, feed, tags)
+
+    def copy_feed(self, other: "IndicatorIndex", feed: str) -> int:
+        """Index every indicator another index loaded from a feed, without re-parsing it"""
+        record_ids = other.feed_records.get(feed, [])
+        for record_id in record_ids:
+            self._insert(*other.records[record_id])
+        return len(record_ids)
+
+    def _insert(self, value: str, indicator_type: str, feed: str, tags: str) -> int:
+        record_id = len(self.records)
+        self.records.append((value, indicator_type, feed, tags))
+        self.feed_records.setdefault(feed, []).append(record_id)
+
+        if indicator_type == "cidr":
+            network = ipaddress.ip_network(value)
+            self.networks[network.version].insert(int(network.network_address), network.prefixlen, record_id)
+        else:
+            self.exact.setdefault(value, []).append(record_id)
+            if indicator_type == "domain":
+                self.domains.insert(value, record_id)
+        return record_id
+
+    def lookup(self, target: str) -> List[Dict[str, Any]]:
+        """All indicators matching a target, including covering CIDRs and parent domains"""
+        if not isinstance(target, str):
+            return []
+        value, indicator_type = classify_indicator(target)
+        record_ids = list(self.exact.get(value, ()))
+
+        host = None
+        if indicator_type == "url":
+            host = (urlsplit(value).hostname or "").lower()
+        elif indicator_type in ("ip", "domain"):
+            host = value
+        elif indicator_type == "email":
+            host = value.split("@", 1)[1]
+
+        if host:
+            host_value, host_type = classify_indicator(host)
+            if host_type == "ip":
+                address = ipaddress.ip_address(host_value)
+                record_ids.extend(self.networks[address.version].match(int(address)))
+                if host_value != value:
+                    record_ids.extend(self.exact.get(host_value, ()))
+            elif host_type == "domain":
+                record_ids.extend(self.domains.match(host_value))
+
+        matches = []
+        for record_id in dict.fromkeys(record_ids):
+            record = self.records[record_id]
+            matches.append({"indicator": record[0], "type": record[1], "feed": record[2], "tags": record[3]})
+        return matches
+
+    def exact_values(self, feeds: Optional[List[str]] = None) -> Iterator[str]:
+        """Exact-match indicator values (CIDRs excluded), optionally limited to some feeds"""
+        for feed in feeds if feeds is not None else list(self.feed_records):
+            for record_id in self.feed_records.get(feed, ()):
+                record = self.records[record_id]
+                if record[1] != "cidr":
+                    yield record[0]
+
+def parse_stix(text: str) -> Iterator[Tuple[str, str]]:
+    """Indicator values and labels from a STIX 2.x bundle"""
+    document = json.loads(text)
+    objects = document.get("objects", []) if isinstance(document, dict) else document
+    for item in objects:
+        if not isinstance(item, dict) or item.get("type") != "indicator":
+            continue
+        labels = item.get("indicator_types") or item.get("labels") or []
+        tags = ",".join(labels) if isinstance(labels, list) else str(labels)
+        for object_type, _, value in STIX_COMPARISON.findall(item.get("pattern", "")):
+            if object_type in STIX_TYPES:
+                yield value.replace("\\'", "'"), tags or item.get("name", "")
+
+def parse_csv(text: str) -> Iterator[Tuple[str, str]]:
+    """Indicator values from a CSV feed, using a recognized header or the first column"""
+    lines = [line for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    if not lines:
+        return
+    rows = csv.reader(io.StringIO("\n".join(lines)))
+    header = [column.strip().lower() for column in next(rows)]
+    value_column = next((header.index(name) for name in CSV_VALUE_COLUMNS if name in header), None)
+    tag_column = next((header.index(name) for name in CSV_TAG_COLUMNS if name in header), None)
+    if value_column is None:
+        # No recognizable header, so the first row is data
+        value_column = 0
+        rows = csv.reader(io.StringIO("\n".join(lines)))
+    for row in rows:
+        if len(row) > value_column and row[value_column].strip():
+            tags = row[tag_column] if tag_column is not None and len(row) > tag_column else ""
+            yield row[value_column], tags
+
+def parse_plain(text: str) -> Iterator[Tuple[str, str]]:
+    """One indicator per line; blank lines and # comments are ignored"""
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield line.split()[0], ""
+
+FEED_PARSERS = {
+    "stix": parse_stix,
+    "csv": parse_csv,
+    "plain": parse_plain
+}
+
+def detect_format(location: str, text: str) -> str:
+    suffix = Path(urlsplit(location).path).suffix.lower()
+    if suffix == ".json" or text.lstrip().startswith("{"):
+        return "stix"
+    if suffix == ".csv":
+        return "csv"
+    return "plain"
+
+class FeedSet:
+    """Configured feeds and their indicator index, refreshed feed by feed"""
+
+    _default = None
+
+    def __init__(self, feeds: Optional[List[Dict[str, Any]]] = None, transport: Optional[Transport] = None):
+        """
+        Args:
+            feeds: Feed definitions with "name", "location" (file, directory or local
+                mirror URL) and optional "format" (stix, csv or plain)
+            transport: HTTP transport for URL feeds (defaults to the shared Transport)
+        """
+        self.feeds = list(feeds or [])
+        self.transport = transport if transport is not None else Transport.default()
+        self.index = IndicatorIndex()
+        self.versions: Dict[str, Any] = {}
+        self.generation = 0
+        self.last_refresh = 0.0
+
+    @classmethod
+    def from_config(cls, path: str = FEED_CONFIG_PATH) -> "FeedSet":
+        try:
+            with open(path) as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    @classmethod
+    def default(cls) -> "FeedSet":
+        """Shared feed set from the feed configuration, re-checked every REFRESH_INTERVAL"""
+        if cls._default is None:
+            cls._default = cls.from_config()
+        if time.monotonic() - cls._default.last_refresh > REFRESH_INTERVAL:
+            cls._default.refresh()
+        return cls._default
+
+    def add_feed(self, name: str, location: str, feed_format: Optional[str] = None) -> None:
+        self.feeds.append({"name": name, "location": location, "format": feed_format})
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Reload feeds whose source changed; returns indicators loaded per refreshed feed
+
+        A changed feed means a new index: unchanged feeds are copied from the
+        current one and the result is swapped in whole, so lookups never see a
+        feed missing mid-refresh and dropped indicators do not linger.
+        """
+        refreshed = {}
+        self.last_refresh = time.monotonic()
+        fetched = {}
+        for feed in self.feeds:
+            try:
+                result = self._fetch(feed["location"], self.versions.get(feed["name"]))
+            except (OSError, requests.RequestException):
+                continue
+            if result is not None:
+                fetched[feed["name"]] = result
+        if not fetched:
+            return refreshed
+
+        current, index, versions = self.index, IndicatorIndex(), {}
+        for feed in self.feeds:
+            name = feed["name"]
+            if name not in fetched:
+                if name in self.versions:
+                    index.copy_feed(current, name)
+                    versions[name] = self.versions[name]
+                continue
+
+            version, documents = fetched[name]
+            count = 0
+            for location, text in documents:
+                parser = FEED_PARSERS[feed.get("format") or detect_format(location, text)]
+                try:
+                    for value, tags in parser(text):
+                        if index.add(value, name, tags) is not None:
+                            count += 1
+                except (ValueError, csv.Error):
+                    continue
+            versions[name] = version
+            refreshed[name] = count
+
+        self.index, self.versions = index, versions
+        self.generation += 1
+        return refreshed
+
+    def _fetch(self, location: str, known_version: Any) -> Optional[Tuple[Any, List[Tuple[str, str]]]]:
+        """Documents for a feed, or None if its version has not changed"""
+        if location.startswith(("http://", "https://")):
+            headers = {"If-None-Match": known_version} if known_version else {}
+            response = self.transport.get(location, headers=headers, timeout=30)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            version = response.headers.get("ETag") or response.headers.get("Last-Modified") or hashlib.sha256(response.content).hexdigest()
+            if version == known_version:
+                return None
+            return version, [(location, response.text)]
+
+        path = Path(location)
+        files = sorted(file for file in path.iterdir() if file.is_file()) if path.is_dir() else [path]
+        version = [[str(file), file.stat().st_size, file.stat().st_mtime_ns] for file in files]
+        if version == known_version:
+            return None
+        return version, [(str(file), file.read_text(encoding="utf-8", errors="replace")) for file in files]
+
+    def lookup(self, target: str) -> List[Dict[str, Any]]:
+        return self.index.lookup(target)
@@ -1,18 +1,43 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from rich.console import Console
 import json
 from datetime import datetime
 from core_scanner import CoreScanner
 from advanced_scanner import AdvancedScanner
 from specialized_scanner import SpecializedScanner
+from target_routing import RoutingPlan, classify_target
+from entity_model import parse_intelligence
+from relationship_graph import RelationshipGraph
+from tls_probe import TLSProber
+from shared_cache import SharedCache
+
+# Key prefix of scan results in the shared cache
+SCAN_KEY_PREFIX = "osint:scan:"
 
 class OSINTScanner:
     """Enhanced OSINT Scanner with comprehensive intelligence gathering capabilities"""
 
-    def __init__(self):
+    def __init__(self, graph: Optional[RelationshipGraph] = None, tls_prober: Optional[TLSProber] = None,
+                 cache: Optional[SharedCache] = None):
         self.console = Console()
         self.specialized_scanner = SpecializedScanner()
-        self.results_cache = {}
+        self.results_cache = cache if cache is not None else SharedCache.default()
+        self._graph = graph
+        self._tls_prober = tls_prober
+
+    @property
+    def graph(self) -> RelationshipGraph:
+        """Relationship graph every scan is written into"""
+        if self._graph is None:
+            self._graph = RelationshipGraph.default()
+        return self._graph
+
+    @property
+    def tls_prober(self) -> TLSProber:
+        """TLS prober recording into the shared fingerprint index"""
+        if self._tls_prober is None:
+            self._tls_prober = TLSProber.default()
+        return self._tls_prober
 
     def scan(self, target: str, scan_type: str = "comprehensive") -> Dict[str, Any]:
         """
@@ -33,10 +58,13 @@ class OSINTScanner:
                 results = self._perform_deep_scan(target)
 
             # Cache results
-            self.results_cache[scan_id] = results
+            self.results_cache.set(SCAN_KEY_PREFIX + scan_id, results)
             
             # Save results to file
             self._save_results(scan_id, results)
+
+            # Record entities and relationships in the graph store
+            self._record_graph(scan_id, target, results)
             
             return {
                 "scan_id": scan_id,
@@ -57,10 +85,21 @@ class OSINTScanner:
     def _perform_basic_scan(self, target: str) -> Dict[str, Any]:
         """Execute basic intelligence gathering"""
         scanner = CoreScanner()
+        plan = RoutingPlan(target)
         results = {
-            "threat_intelligence": scanner.analyze_threat_intelligence(target),
-            "dark_web_exposure": scanner.analyze_dark_web(target)
+            "scan_metadata": {
+                "timestamp": datetime.now().isoformat(),
+                "target": target,
+                "scan_type": "basic"
+            }
         }
+
+        if plan.allows_analyzer("analyze_threat_intelligence"):
+            results["threat_intelligence"] = scanner.analyze_threat_intelligence(target)
+        if plan.allows_analyzer("analyze_dark_web"):
+            results["dark_web_exposure"] = scanner.analyze_dark_web(target)
+
+        results["scan_metadata"].update(plan.to_metadata())
         return results
 
     def _perform_comprehensive_scan(self, target: str) -> Dict[str, Any]:
@@ -91,6 +130,67 @@ class OSINTScanner:
         except Exception as e:
             self.console.print(f"[red]Error saving results: {str(e)}[/red]")
 
+    def _record_graph(self, scan_id: str, target: str, results: Dict[str, Any]) -> None:
+        """Write a scan's entities and edges into the relationship graph"""
+        try:
+            intel = {section: data for section, data in results.items() if section != "scan_metadata"}
+            self.graph.record_scan(scan_id, target, parse_intelligence(intel, scan_id, target))
+        except Exception as e:
+            self.console.print(f"[red]Error recording relationship graph: {str(e)}[/red]")
+
+    def analyze_relationships(self, target: str, hops: int = 2) -> Dict[str, Any]:
+        """
+        Relationships recorded for a target across all previous scans
+        
+        Args:
+            target: Target identifier
+            hops: Neighborhood depth to return
+        """
+        neighborhood = self.graph.neighborhood(target, hops=hops)
+        return {
+            "target": target,
+            "found": neighborhood["found"],
+            "neighborhood": neighborhood,
+            "component": self.graph.component_of(target),
+            "graph_stats": self.graph.stats()
+        }
+
+    def analyze_network(self, target: str, hops: int = 2) -> Dict[str, Any]:
+        """
+        Network topology around a target from the relationship graph
+        
+        Args:
+            target: Target identifier
+            hops: Neighborhood depth to summarize
+        """
+        return {"target": target, **self.graph.topology(target, hops=hops)}
+
+    def find_connection(self, source: str, destination: str) -> Dict[str, Any]:
+        """Shortest chain of relationships linking two targets"""
+        path = self.graph.shortest_path(source, destination)
+        return {
+            "source": source,
+            "destination": destination,
+            "connected": path is not None,
+            "path": path or []
+        }
+
+    def analyze_infrastructure(self, target: str, ports: Optional[list] = None) -> Dict[str, Any]:
+        """
+        TLS and HTTP fingerprints for a host and other hosts sharing them
+
+        Args:
+            target: Domain or IP address
+            ports: TLS ports to probe (443 by default)
+        """
+        probes = self.tls_prober.probe_many([(target, port) for port in ports or [443]])
+        index = self.tls_prober.index
+        return {
+            "target": target,
+            "probes": probes,
+            "shared_infrastructure": index.related(target) if index is not None else {}
+        }
+
     def get_scan_history(self) -> Dict[str, Any]:
         """Retrieve scan history"""
         try:
@@ -122,8 +222,9 @@ class OSINTScanner:
     def get_scan_results(self, scan_id: str) -> Dict[str, Any]:
         """Retrieve results for a specific scan"""
         # First check cache
-        if scan_id in self.results_cache:
-            return self.results_cache[scan_id]
+        cached = self.results_cache.get(SCAN_KEY_PREFIX + scan_id)
+        if cached is not None:
+            return cached
         
         # If not in cache, try to load from file
         try:
@@ -158,37 +259,7 @@ class OSINTScanner:
 
     def _identify_target_type(self, target: str) -> str:
         """Identify the type of target for analysis"""
-        import re
-        
-        # Cryptocurrency address patterns
-        crypto_patterns = {
-            "bitcoin": r"^(bc1|[13])[a-zA-HJ-NP-Z0-9]{25,39}$",
-            "ethereum": r"^0x[a-fA-F0-9]{40}$",
-            "ripple": r"^r[0-9a-zA-Z]{24,34}$"
-        }
-        
-        # Email pattern
-        email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        
-        # Domain pattern
-        domain_pattern = r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$"
-        
-        # IP address pattern
-        ip_pattern = r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
-        
-        # Check patterns
-        for crypto_type, pattern in crypto_patterns.items():
-            if re.match(pattern, target):
-                return "crypto_address"
-        
-        if re.match(email_pattern, target):
-            return "email"
-        elif re.match(domain_pattern, target):
-            return "domain"
-        elif re.match(ip_pattern, target):
-            return "ip"
-        
-        return "unknown"
+        return classify_target(target)
 
 if __name__ == "__main__":
     scanner = OSINTScanner()
@@ -0,0 +1,236 @@
+"""
+Target Pre-Filter
+Bloom filters over known and known-bad identifiers, consulted before a scan fans out to providers
+"""
+
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+import numpy as np
+from breach_index import LocalBreachIndex, normalize_account
+from risk_engine import RiskEngine
+from ioc_feeds import FeedSet
+
+DEFAULT_PREFILTER_PATH = os.environ.get("PREFILTER_PATH", "findings/prefilter.npz")
+
+# Total memory for all filter bit arrays
+DEFAULT_MEMORY_BUDGET = 16 * 1024 * 1024
+
+# Share of the budget given to the known-bad filter
+BAD_FILTER_SHARE = 0.25
+
+# Item counts the hash count is tuned for
+EXPECTED_KNOWN_ITEMS = 10_000_000
+EXPECTED_BAD_ITEMS = 1_000_000
+
+# Saved scans at or above this risk score are added to the known-bad filter
+BAD_RISK_THRESHOLD = 0.7
+
+# Categories a definitely-absent target skips, since the filters are built from their data
+ABSENT_SKIP_CATEGORIES = ("BREACH_INTELLIGENCE", "THREAT_INTELLIGENCE")
+
+# Known-bad targets skip the same discovery lookups and go straight to enrichment
+KNOWN_BAD_SKIP_CATEGORIES = ABSENT_SKIP_CATEGORIES
+
+ABSENT = "absent"
+KNOWN = "known"
+KNOWN_BAD = "known_bad"
+
+def identifier_digest(identifier: str) -> bytes:
+    """Filter key for an identifier: SHA-1 of its normalized form, matching the breach index"""
+    return hashlib.sha1(normalize_account(identifier).encode("utf-8")).digest()
+
+class BloomFilter:
+    """Fixed-size Bloom filter keyed by 20-byte digests, using double hashing"""
+
+    def __init__(self, size_bytes: int, expected_items: int, bits: Optional[np.ndarray] = None,
+                 hash_count: Optional[int] = None, count: int = 0):
+        self.bits = bits if bits is not None else np.zeros(max(size_bytes, 8), dtype=np.uint8)
+        self.size = np.uint64(len(self.bits) * 8)
+        self.hash_count = hash_count or max(1, round(int(self.size) / max(expected_items, 1) * math.log(2)))
+        self.count = count
+
+    def _positions(self, digests: np.ndarray) -> np.ndarray:
+        """Bit positions (items x hashes) for an array of 20-byte digests"""
+        raw = np.ascontiguousarray(digests).view(np.uint8).reshape(-1, 20)
+        h1 = raw[:, :8].copy().view("<u8").ravel()
+        h2 = raw[:, 8:16].copy().view("<u8").ravel() | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % self.size
+
+    def add_digests(self, digests: np.ndarray) -> None:
+        if not len(digests):
+            return
+        positions = self._positions(digests).ravel()
+        np.bitwise_or.at(self.bits, (positions >> np.uint64(3)).astype(np.intp),
+                         (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+        self.count += len(digests)
+
+    def contains_digests(self, digests: np.ndarray) -> np.ndarray:
+        if not len(digests):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(digests)
+        hits = self.bits[(positions >> np.uint64(3)).astype(np.intp)] & \
+            (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        return (hits != 0).all(axis=1)
+
+    def add(self, identifiers: Iterable[str]) -> None:
+        self.add_digests(_digest_array(identifiers))
+
+    def __contains__(self, identifier: str) -> bool:
+        return bool(self.contains_digests(_digest_array([identifier]))[0])
+
+    def false_positive_rate(self) -> float:
+        """Estimated false positive rate at the current fill"""
+        return (1.0 - math.exp(-self.hash_count * self.count / float(self.size))) ** self.hash_count
+
+    def clear(self) -> None:
+        self.bits[:] = 0
+        self.count = 0
+
+def _digest_array(identifiers: Iterable[str]) -> np.ndarray:
+    return np.array([identifier_digest(identifier) for identifier in identifiers], dtype="S20")
+
+class Prefilter:
+    """Known and known-bad filters with incremental refresh under a fixed memory budget"""
+
+    def __init__(self, path: Optional[str] = None, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.path = Path(path or DEFAULT_PREFILTER_PATH)
+        self.memory_budget = memory_budget
+        self.watermarks: Dict[str, Any] = {}
+        bad_bytes = int(memory_budget * BAD_FILTER_SHARE)
+        self.known = BloomFilter(memory_budget - bad_bytes, EXPECTED_KNOWN_ITEMS)
+        self.bad = BloomFilter(bad_bytes, EXPECTED_BAD_ITEMS)
+        if self.path.exists():
+            self.load()
+
+    @classmethod
+    def open_default(cls) -> Optional["Prefilter"]:
+        """The filter at the default path, or None if none has been built"""
+        return cls() if Path(DEFAULT_PREFILTER_PATH).exists() else None
+
+    def load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as saved:
+            meta = json.loads(str(saved["meta"]))
+            if meta["memory_budget"] != self.memory_budget:
+                # A different budget needs a full rebuild from the sources
+                return
+            self.known = BloomFilter(0, 0, saved["known"].copy(), meta["known_hashes"], meta["known_count"])
+            self.bad = BloomFilter(0, 0, saved["bad"].copy(), meta["bad_hashes"], meta["bad_count"])
+            self.watermarks = meta["watermarks"]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "memory_budget": self.memory_budget,
+            "known_hashes": self.known.hash_count,
+            "known_count": self.known.count,
+            "bad_hashes": self.bad.hash_count,
+            "bad_count": self.bad.count,
+            "watermarks": self.watermarks
+        }
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            np.savez(f, known=self.known.bits, bad=self.bad.bits, meta=np.array(json.dumps(meta)))
+        os.replace(temp_path, self.path)
+
+    def classify(self, target: str) -> str:
+        """absent (in no source), known_bad, or known"""
+        digests = _digest_array([target])
+        if self.bad.contains_digests(digests)[0]:
+            return KNOWN_BAD
+        if self.known.contains_digests(digests)[0]:
+            return KNOWN
+        return ABSENT
+
+    def add_known(self, identifiers: Iterable[str]) -> None:
+        self.known.add(identifiers)
+
+    def add_known_bad(self, identifiers: Iterable[str]) -> None:
+        """Add known-bad identifiers (also marked known)"""
+        digests = _digest_array(identifiers)
+        self.bad.add_digests(digests)
+        self.known.add_digests(digests)
+
+    def refresh(
+        self,
+        breach_index: Optional[LocalBreachIndex] = None,
+        scan_dir: Optional[str] = "findings/osint_scans",
+        feeds: Optional[FeedSet] = None
+    ) -> Dict[str, Any]:
+        """
+        Add entries from sources that changed since the last refresh
+
+        Bloom filters only grow, so existing bits are kept and only new breach
+        index generations, newly saved scans and changed IOC feeds are inserted.
+        CIDR indicators cannot be represented and stay in the feed index.
+        """
+        if feeds is not None:
+            for name, version in feeds.versions.items():
+                key = f"ioc_feed:{name}"
+                if self.watermarks.get(key) != version:
+                    self.add_known_bad(feeds.index.exact_values([name]))
+                    self.watermarks[key] = version
+
+        if breach_index is not None and breach_index.accounts is not None:
+            accounts_file = breach_index.accounts.path
+            stat = accounts_file.stat()
+            generation = [stat.st_size, stat.st_mtime_ns]
+            if self.watermarks.get("breach_index") != generation:
+                for chunk in breach_index.accounts.iter_chunks():
+                    self.known.add_digests(chunk["key"])
+                self.watermarks["breach_index"] = generation
+
+        if scan_dir and Path(scan_dir).exists():
+            self._refresh_scans(Path(scan_dir))
+
+        self.save()
+        return self.stats()
+
+    def _refresh_scans(self, scan_dir: Path) -> None:
+        since = self.watermarks.get("scans", 0)
+        latest = since
+        engine = RiskEngine()
+        for result_file in scan_dir.glob("*.json"):
+            modified = result_file.stat().st_mtime_ns
+            if modified <= since:
+                continue
+            latest = max(latest, modified)
+            try:
+                with open(result_file) as f:
+                    scan_data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(scan_data, dict):
+                continue
+
+            target = scan_data.get("scan_metadata", {}).get("target")
+            if not target:
+                continue
+            intel = scan_data.get("intelligence_data", scan_data)
+            if engine.score(intel)["overall_risk_score"] >= BAD_RISK_THRESHOLD:
+                self.add_known_bad([target])
+            else:
+                self.add_known([target])
+        self.watermarks["scans"] = latest
+
+    def rebuild(self, breach_index: Optional[LocalBreachIndex] = None,
+                scan_dir: Optional[str] = "findings/osint_scans",
+                feeds: Optional[FeedSet] = None) -> Dict[str, Any]:
+        """Clear both filters and rebuild them from every source"""
+        self.known.clear()
+        self.bad.clear()
+        self.watermarks = {}
+        return self.refresh(breach_index, scan_dir, feeds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_bytes": int(self.known.bits.nbytes + self.bad.bits.nbytes),
+            "known_items": self.known.count,
+            "known_false_positive_rate": round(self.known.false_positive_rate(), 6),
+            "bad_items": self.bad.count,
+            "bad_false_positive_rate": round(self.bad.false_positive_rate(), 6)
+        }
@@ -0,0 +1,537 @@
+"""
+Provider Adapter Framework
+Declares premium intelligence providers as adapters and runs them through a single request path
+"""
+
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from datetime import datetime
+import requests
+from target_routing import RoutingPlan, classify_target
+from streaming_json import FieldSpec, read_json
+from transport import Transport, register_volatile_fields
+
+# Cap on bytes read from bulk search responses
+MAX_SEARCH_BODY_BYTES = 8 * 1024 * 1024
+
+class Endpoint:
+    """A single provider endpoint with request templates"""
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        target_types: Optional[Tuple[str, ...]] = None
+    ):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.params = params
+        self.body = body
+        self.target_types = target_types
+
+class ProviderAdapter:
+    """Declarative description of a premium intelligence provider"""
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        label: str,
+        endpoints: List[Endpoint],
+        section: Optional[str] = None,
+        auth_header: str = "Authorization",
+        auth_format: str = "Bearer {key}",
+        basic_auth_secret: Optional[str] = None,
+        cost: float = 1.0,
+        batch_size: int = 1,
+        cacheable: bool = True,
+        cache_ttl: int = 3600,
+        target_types: Optional[Tuple[str, ...]] = None,
+        normalizer: Optional[Callable[[str, Any], Any]] = None,
+        stream_fields: Optional[FieldSpec] = None,
+        max_items: Optional[int] = None,
+        max_body_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            name: Provider key as used in the API key configuration
+            category: API key category the provider belongs to
+            label: Prefix used when storing endpoint results
+            endpoints: Endpoints queried for each target
+            section: Result section to store into (None for top-level keys)
+            auth_header: Header carrying the API key
+            auth_format: Format of the header value
+            basic_auth_secret: Category key holding the secret for HTTP basic auth
+            cost: Quota units spent per endpoint call
+            batch_size: Maximum targets per request (1 if batching is unsupported)
+            cacheable: Whether responses may be cached
+            cache_ttl: Cache lifetime in seconds
+            target_types: Target types the provider accepts (None for all)
+            normalizer: Callable turning (endpoint name, payload) into stored data
+            stream_fields: Response fields to keep when streaming (None keeps all)
+            max_items: Maximum items kept from each streamed response array
+            max_body_bytes: Maximum response bytes read before parsing stops
+        """
+        self.name = name
+        self.category = category
+        self.label = label
+        self.endpoints = endpoints
+        self.section = section
+        self.auth_header = auth_header
+        self.auth_format = auth_format
+        self.basic_auth_secret = basic_auth_secret
+        self.cost = cost
+        self.batch_size = batch_size
+        self.cacheable = cacheable
+        self.cache_ttl = cache_ttl
+        self.target_types = target_types
+        self.normalizer = normalizer
+        self.stream_fields = stream_fields
+        self.max_items = max_items
+        self.max_body_bytes = max_body_bytes
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.batch_size > 1
+
+    @property
+    def streams_responses(self) -> bool:
+        return any(limit is not None for limit in (self.stream_fields, self.max_items, self.max_body_bytes))
+
+    def accepts(self, target_type: str, endpoint: Optional[Endpoint] = None) -> bool:
+        """Check whether the provider (or one endpoint) can match a target type"""
+        if target_type == "unknown":
+            return True
+        for types in (self.target_types, endpoint.target_types if endpoint else None):
+            if types is not None and target_type not in types:
+                return False
+        return True
+
+    def build_request(self, endpoint: Endpoint, key: str, target: str, category_keys: Dict[str, Any]) -> Dict[str, Any]:
+        """Build keyword arguments for a request to an endpoint"""
+        values = {"target": target, "today": datetime.now().strftime("%Y-%m-%d")}
+        request = {
+            "method": endpoint.method,
+            "url": endpoint.url.format(**values),
+            "timeout": 30
+        }
+
+        if self.basic_auth_secret:
+            request["auth"] = (key, category_keys.get(self.basic_auth_secret, ""))
+        else:
+            request["headers"] = {self.auth_header: self.auth_format.format(key=key)}
+
+        if endpoint.params:
+            request["params"] = _render(endpoint.params, values)
+        if endpoint.body:
+            request["json"] = _render(endpoint.body, values)
+        if self.streams_responses:
+            request["stream"] = True
+
+        return request
+
+    def read_response(self, response: Any) -> Any:
+        """Parse a response body, streaming it when the adapter declares limits"""
+        if self.streams_responses:
+            return read_json(response, self.stream_fields, self.max_items, self.max_body_bytes)
+        return response.json()
+
+    def normalize(self, endpoint_name: str, payload: Any) -> Any:
+        """Normalize a provider response before it is stored"""
+        if self.normalizer:
+            return self.normalizer(endpoint_name, payload)
+        return payload
+
+    def store(self, results: Dict[str, Any], endpoint_name: str, data: Any) -> None:
+        """Store normalized endpoint data in an analyzer result"""
+        key = f"{self.label}_{endpoint_name}"
+        if self.section is None:
+            results[key] = data
+        elif isinstance(results[self.section], list):
+            results[self.section].append({"source": key, "data": data})
+        else:
+            results[self.section][key] = data
+
+def _render(template: Dict[str, Any], values: Dict[str, str]) -> Dict[str, Any]:
+    """Fill string templates in a params or body dict"""
+    return {
+        name: value.format(**values) if isinstance(value, str) else value
+        for name, value in template.items()
+    }
+
+ADAPTER_REGISTRY: Dict[str, Dict[str, ProviderAdapter]] = {}
+
+# Template values that change from day to day; fields filled from them are not used for replay matching
+VOLATILE_TEMPLATE_VALUES = ("{today}",)
+
+def register_adapter(adapter: ProviderAdapter) -> ProviderAdapter:
+    """Register a provider adapter under its category"""
+    ADAPTER_REGISTRY.setdefault(adapter.category, {})[adapter.name] = adapter
+    register_volatile_fields(
+        name
+        for endpoint in adapter.endpoints
+        for template in (endpoint.params or {}, endpoint.body or {})
+        for name, value in template.items()
+        if isinstance(value, str) and any(volatile in value for volatile in VOLATILE_TEMPLATE_VALUES)
+    )
+    return adapter
+
+def get_adapter(category: str, provider: str) -> Optional[ProviderAdapter]:
+    """Get the adapter for a provider"""
+    return ADAPTER_REGISTRY.get(category, {}).get(provider)
+
+def get_adapters(category: str) -> Dict[str, ProviderAdapter]:
+    """Get all adapters registered for a category"""
+    return dict(ADAPTER_REGISTRY.get(category, {}))
+
+def category_cache_ttl(category: str) -> Optional[int]:
+    """
+    Cache lifetime for results drawn from a category's providers
+
+    The shortest declared adapter TTL wins, 0 means some provider may not be
+    cached, and None means the category declares no adapters.
+    """
+    adapters = get_adapters(category).values()
+    if any(not adapter.cacheable for adapter in adapters):
+        return 0
+    return min((adapter.cache_ttl for adapter in adapters), default=None)
+
+def execute_request(request: Dict[str, Any], transport: Optional[Transport] = None) -> requests.Response:
+    """Send a request built by an adapter"""
+    transport = transport if transport is not None else Transport.default()
+    return transport.request(**request)
+
+def run_adapters(
+    category: str,
+    target: str,
+    api_keys: Dict[str, Any],
+    results: Dict[str, Any],
+    console: Any,
+    plan: Optional[RoutingPlan] = None
+) -> Dict[str, Any]:
+    """
+    Query every configured provider in a category and store the results
+
+    Args:
+        category: API key category to run
+        target: Target identifier
+        api_keys: Loaded API key configuration
+        results: Analyzer result template to fill
+        console: Console used for error reporting
+        plan: Routing plan recording skipped calls (optional)
+    """
+    category_keys = api_keys.get(category)
+    if not category_keys:
+        return results
+
+    target_type = plan.target_type if plan else classify_target(target)
+
+    for provider, key in category_keys.items():
+        adapter = get_adapter(category, provider)
+        if not adapter:
+            continue
+
+        if not adapter.accepts(target_type):
+            if plan:
+                plan.skip(f"{category}/{provider}")
+            continue
+
+        try:
+            for endpoint in adapter.endpoints:
+                if not adapter.accepts(target_type, endpoint):
+                    if plan:
+                        plan.skip(f"{category}/{provider}/{endpoint.name}")
+                    continue
+
+                response = execute_request(adapter.build_request(endpoint, key, target, category_keys))
+                try:
+                    if response.status_code == 200:
+                        adapter.store(results, endpoint.name, adapter.normalize(endpoint.name, adapter.read_response(response)))
+                finally:
+                    # Streamed responses hold their connection until closed, including unread failures
+                    response.close()
+
+        except Exception as e:
+            console.print(f"[red]Error with {provider}: {str(e)}[/red]")
+
+    return results
+
+# Threat Intelligence
+register_adapter(ProviderAdapter(
+    name="crowdstrike",
+    category="THREAT_INTELLIGENCE",
+    label="CrowdStrike",
+    section="findings",
+    cost=3.0,
+    endpoints=[
+        Endpoint("actors", "https://api.crowdstrike.com/intel/combined/actors/v1", params={"filter": "target:'{target}'"}),
+        Endpoint("indicators", "https://api.crowdstrike.com/intel/combined/indicators/v1", params={"filter": "target:'{target}'"}),
+        Endpoint("reports", "https://api.crowdstrike.com/intel/combined/reports/v1", params={"filter": "target:'{target}'"})
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="mandiant",
+    category="THREAT_INTELLIGENCE",
+    label="Mandiant",
+    section="findings",
+    auth_header="X-Auth-Token",
+    auth_format="{key}",
+    cost=3.0,
+    endpoints=[
+        Endpoint("actors", "https://api.mandiant.com/v3/threat-actor", params={"target": "{target}"}),
+        Endpoint("malware", "https://api.mandiant.com/v3/malware", params={"target": "{target}"}),
+        Endpoint("vulnerabilities", "https://api.mandiant.com/v3/vulnerability", params={"target": "{target}"})
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="recorded_future",
+    category="THREAT_INTELLIGENCE",
+    label="RecordedFuture",
+    section="findings",
+    auth_header="X-RFToken",
+    auth_format="{key}",
+    cost=2.0,
+    endpoints=[
+        Endpoint("risk", "https://api.recordedfuture.com/v2/risk/{target}"),
+        Endpoint("threats", "https://api.recordedfuture.com/v2/threat/{target}"),
+        # Vulnerability lookups take CVE identifiers, which classify as unknown
+        Endpoint("vulnerabilities", "https://api.recordedfuture.com/v2/vulnerability/{target}", target_types=())
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="group_ib",
+    category="THREAT_INTELLIGENCE",
+    label="GroupIB",
+    section="findings",
+    cost=3.0,
+    endpoints=[
+        Endpoint("attribution", "https://api.group-ib.com/v1/attribution", method="POST", body={"query": "{target}"}),
+        Endpoint("campaigns", "https://api.group-ib.com/v1/campaigns", method="POST", body={"query": "{target}"}),
+        Endpoint("indicators", "https://api.group-ib.com/v1/indicators", method="POST", body={"query": "{target}"})
+    ]
+))
+
+# Dark Web Intelligence
+SIXGILL_QUERY = {"query": "{target}", "from": "darkweb_discussions", "size": 100}
+
+register_adapter(ProviderAdapter(
+    name="sixgill",
+    category="DARK_WEB_INTELLIGENCE",
+    label="sixgill",
+    section="forum_activities",
+    cost=5.0,
+    cache_ttl=21600,
+    max_items=100,
+    max_body_bytes=MAX_SEARCH_BODY_BYTES,
+    endpoints=[
+        Endpoint("posts", "https://api.cybersixgill.com/search", method="POST", body=SIXGILL_QUERY),
+        Endpoint("actors", "https://api.cybersixgill.com/actors", method="POST", body=SIXGILL_QUERY),
+        Endpoint("markets", "https://api.cybersixgill.com/markets", method="POST", body=SIXGILL_QUERY)
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="flashpoint",
+    category="DARK_WEB_INTELLIGENCE",
+    label="flashpoint",
+    auth_header="X-Auth-Token",
+    auth_format="{key}",
+    cost=5.0,
+    cache_ttl=21600,
+    max_items=100,
+    max_body_bytes=MAX_SEARCH_BODY_BYTES,
+    endpoints=[
+        Endpoint("forums", "https://api.flashpoint-intel.com/v1/forums/search", method="POST", body={"query": "{target}"}),
+        Endpoint("marketplace", "https://api.flashpoint-intel.com/v1/marketplace/search", method="POST", body={"query": "{target}"}),
+        Endpoint("breaches", "https://api.flashpoint-intel.com/v1/breaches/search", method="POST", body={"query": "{target}"})
+    ]
+))
+
+# Blockchain Analytics
+BLOCKCHAIN_TARGETS = ("crypto_address",)
+
+register_adapter(ProviderAdapter(
+    name="chainalysis",
+    category="BLOCKCHAIN_ANALYTICS",
+    label="chainalysis",
+    section="transaction_analysis",
+    auth_header="Token",
+    auth_format="{key}",
+    cost=4.0,
+    batch_size=100,
+    target_types=BLOCKCHAIN_TARGETS,
+    endpoints=[
+        Endpoint("risk", "https://api.chainalysis.com/api/kyt/v1/address/{target}"),
+        Endpoint("exposure", "https://api.chainalysis.com/api/exposure/v1/address/{target}"),
+        Endpoint("clusters", "https://api.chainalysis.com/api/clusters/v1/address/{target}")
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="elliptic",
+    category="BLOCKCHAIN_ANALYTICS",
+    label="elliptic",
+    section="risk_assessment",
+    cost=4.0,
+    target_types=BLOCKCHAIN_TARGETS,
+    endpoints=[
+        Endpoint("wallet", "https://api.elliptic.co/v2/wallet/{target}"),
+        Endpoint("transactions", "https://api.elliptic.co/v2/transactions/{target}"),
+        Endpoint("risk", "https://api.elliptic.co/v2/risk/{target}")
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="crystal",
+    category="BLOCKCHAIN_ANALYTICS",
+    label="crystal",
+    section="entity_clustering",
+    auth_header="X-Auth-Token",
+    auth_format="{key}",
+    cost=4.0,
+    target_types=BLOCKCHAIN_TARGETS,
+    endpoints=[
+        Endpoint("entity", "https://api.crystalblockchain.com/v1/entities/{target}"),
+        Endpoint("flow", "https://api.crystalblockchain.com/v1/flow/{target}"),
+        Endpoint("risk", "https://api.crystalblockchain.com/v1/risk/{target}")
+    ]
+))
+
+# Social Intelligence
+register_adapter(ProviderAdapter(
+    name="brandwatch",
+    category="SOCIAL_INTELLIGENCE",
+    label="brandwatch",
+    section="content_analysis",
+    auth_header="X-Auth-Token",
+    auth_format="{key}",
+    endpoints=[
+        Endpoint("mentions", "https://api.brandwatch.com/analytics/mentions", params={"query": "{target}"}),
+        Endpoint("authors", "https://api.brandwatch.com/analytics/authors", params={"query": "{target}"}),
+        Endpoint("sentiment", "https://api.brandwatch.com/analytics/sentiment", params={"query": "{target}"})
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="synthesio",
+    category="SOCIAL_INTELLIGENCE",
+    label="synthesio",
+    section="profile_analysis",
+    endpoints=[
+        Endpoint("posts", "https://api.synthesio.com/v1/posts", params={"query": "{target}"}),
+        Endpoint("profiles", "https://api.synthesio.com/v1/profiles", params={"query": "{target}"}),
+        Endpoint("metrics", "https://api.synthesio.com/v1/metrics", params={"query": "{target}"})
+    ]
+))
+
+# Financial Intelligence
+register_adapter(ProviderAdapter(
+    name="refinitiv",
+    category="FINANCIAL_INTELLIGENCE",
+    label="refinitiv",
+    section="financial_connections",
+    cost=5.0,
+    endpoints=[
+        Endpoint("screening", "https://api.refinitiv.com/screening/v2/screen", method="POST", body={"query": "{target}"}),
+        Endpoint("entities", "https://api.refinitiv.com/entities/v2/search", method="POST", body={"query": "{target}"}),
+        Endpoint("relationships", "https://api.refinitiv.com/relationships/v2/search", method="POST", body={"query": "{target}"})
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="lexisnexis",
+    category="FINANCIAL_INTELLIGENCE",
+    label="lexisnexis",
+    section="risk_indicators",
+    cost=5.0,
+    endpoints=[
+        Endpoint("risk", "https://api.lexisnexis.com/risk/v1/search", method="POST", body={"query": "{target}"}),
+        Endpoint("business", "https://api.lexisnexis.com/business/v1/search", method="POST", body={"query": "{target}"}),
+        Endpoint("compliance", "https://api.lexisnexis.com/compliance/v1/search", method="POST", body={"query": "{target}"})
+    ]
+))
+
+# Geospatial Intelligence
+register_adapter(ProviderAdapter(
+    name="maxar",
+    category="GEOSPATIAL_INTELLIGENCE",
+    label="maxar",
+    section="satellite_imagery",
+    cost=10.0,
+    cache_ttl=86400,
+    endpoints=[
+        Endpoint("imagery", "https://api.maxar.com/imagery/search",
+                 params={"location": "{target}", "start_date": "2023-01-01", "end_date": "{today}"}),
+        Endpoint("analysis", "https://api.maxar.com/analytics/detect",
+                 params={"location": "{target}", "start_date": "2023-01-01", "end_date": "{today}"}),
+        Endpoint("change", "https://api.maxar.com/analytics/change",
+                 params={"location": "{target}", "start_date": "2023-01-01", "end_date": "{today}"})
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="planet",
+    category="GEOSPATIAL_INTELLIGENCE",
+    label="planet",
+    section="terrain_analysis",
+    auth_header="X-API-Key",
+    auth_format="{key}",
+    cost=10.0,
+    cache_ttl=86400,
+    endpoints=[
+        Endpoint("daily", "https://api.planet.com/data/v1/daily", params={"location": "{target}"}),
+        Endpoint("basemaps", "https://api.planet.com/basemaps/v1/mosaic", params={"location": "{target}"}),
+        Endpoint("analytics", "https://api.planet.com/analytics/v1", params={"location": "{target}"})
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="nearmap",
+    category="GEOSPATIAL_INTELLIGENCE",
+    label="nearmap",
+    section="infrastructure_mapping",
+    cost=10.0,
+    cache_ttl=86400,
+    endpoints=[
+        Endpoint("surveys", "https://api.nearmap.com/coverage/v2/surveys", params={"point": "{target}"}),
+        Endpoint("tiles", "https://api.nearmap.com/tiles/v3", params={"point": "{target}"}),
+        Endpoint("features", "https://api.nearmap.com/ai/v4/features", params={"point": "{target}"})
+    ]
+))
+
+# Communication Intelligence
+COMMUNICATION_TARGETS = ("phone",)
+
+register_adapter(ProviderAdapter(
+    name="twilio",
+    category="COMMUNICATION_INTELLIGENCE",
+    label="twilio",
+    section="network_analysis",
+    basic_auth_secret="twilio_auth_token",
+    target_types=COMMUNICATION_TARGETS,
+    endpoints=[
+        Endpoint("lookup", "https://lookups.twilio.com/v2/PhoneNumbers/{target}"),
+        Endpoint("carrier", "https://lookups.twilio.com/v2/PhoneNumbers/{target}/carrier"),
+        Endpoint("caller-name", "https://lookups.twilio.com/v2/PhoneNumbers/{target}/caller-name")
+    ]
+))
+
+register_adapter(ProviderAdapter(
+    name="messagebird",
+    category="COMMUNICATION_INTELLIGENCE",
+    label="messagebird",
+    section="device_signatures",
+    auth_format="AccessKey {key}",
+    target_types=COMMUNICATION_TARGETS,
+    endpoints=[
+        Endpoint("lookup", "https://lookup.messagebird.com/v1/phones/{target}"),
+        Endpoint("hlr", "https://lookup.messagebird.com/v1/hlr/{target}"),
+        Endpoint("coverage", "https://lookup.messagebird.com/v1/coverage/{target}")
+    ]
+))
@@ -0,0 +1,502 @@
+"""
+Provider Simulator
+Local stand-in for every intelligence provider: a forward proxy and DNS responder with configurable latency, errors and rate limits
+"""
+
+import asyncio
+import ipaddress
+import json
+import math
+import os
+import random
+import re
+import shutil
+import ssl
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+import dns.message
+import dns.rdatatype
+import dns.rrset
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from api_config import FREE_APIS, PREMIUM_API_ENDPOINTS
+from provider_adapters import ADAPTER_REGISTRY
+
+# Largest request head accepted from a client
+MAX_HEADER_BYTES = 64 * 1024
+
+# z-score of the 99th percentile, used to fit lognormal latency to (median, p99)
+Z_99 = 2.3263
+
+# Records served for every name; 192.0.2.0/24 is documentation space and never routed
+DNS_ANSWERS = {
+    "A": "192.0.2.10",
+    "MX": "10 mx.simulator.invalid.",
+    "NS": "ns1.simulator.invalid.",
+    "TXT": '"v=spf1 -all"',
+}
+DNS_TTL = 300
+# Stats and profile key for DNS traffic; resolvers answer far faster than HTTP APIs
+DNS_HOST = "dns"
+DNS_PROFILE = {"median_ms": 2.0, "p99_ms": 10.0}
+
+# RDAP bootstrap answered for IANA so domain lookups stay on the simulator
+RDAP_BOOTSTRAP_HOST = "data.iana.org"
+SIMULATED_RDAP_BASE = "https://rdap.simulator.invalid/"
+SIMULATED_TLDS = ["com", "net", "org", "info", "io", "xyz", "shop", "online", "example", "invalid", "test"]
+
+REASONS = {200: "OK", 429: "Too Many Requests", 500: "Internal Server Error",
+           502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+class LatencyModel:
+    """Per-request latency, fixed or lognormal fitted to a median and 99th percentile"""
+
+    def __init__(self, median_ms: float = 80.0, p99_ms: float = 600.0, kind: str = "lognormal"):
+        if kind not in ("fixed", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self.kind = kind
+        self.sigma = math.log(self.p99_ms / median_ms) / Z_99 if median_ms > 0 else 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Latency in seconds"""
+        if self.kind == "fixed" or self.sigma == 0.0:
+            return self.median_ms / 1000.0
+        return self.median_ms * math.exp(self.sigma * rng.gauss(0.0, 1.0)) / 1000.0
+
+class ProviderProfile:
+    """How one simulated provider behaves"""
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        quota: Optional[int] = None,
+        retry_after: int = 1,
+        body: Any = None
+    ):
+        """
+        Args:
+            latency: Response latency distribution
+            error_rate: Fraction of requests answered with error_status
+            error_status: Status used for simulated failures
+            rate_limit: Sustained requests per second before 429s (None for unlimited)
+            burst: Requests allowed at once before rate limiting (defaults to rate_limit)
+            quota: Successful calls allowed in total before every call gets 429 (None for unlimited)
+            retry_after: Retry-After seconds sent with 429 responses
+            body: JSON body for successful responses (None for a generic echo)
+        """
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.burst = burst or (max(1, int(math.ceil(rate_limit))) if rate_limit else None)
+        self.quota = quota
+        self.retry_after = retry_after
+        self.body = body
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProviderProfile":
+        return cls(
+            latency=LatencyModel(data.get("median_ms", 80.0), data.get("p99_ms", 600.0), data.get("latency", "lognormal")),
+            error_rate=data.get("error_rate", 0.0),
+            error_status=data.get("error_status", 503),
+            rate_limit=data.get("rate_limit"),
+            burst=data.get("burst"),
+            quota=data.get("quota"),
+            retry_after=data.get("retry_after", 1),
+            body=data.get("body")
+        )
+
+def load_profiles(path: str) -> Tuple[ProviderProfile, Dict[str, ProviderProfile]]:
+    """
+    Default and per-host profiles from JSON
+
+    {"default": {...}, "hosts": {"api.shodan.io": {"median_ms": 300, "rate_limit": 1}}}
+    Host keys match the host and its subdomains.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    default = ProviderProfile.from_dict(config.get("default", {}))
+    hosts = {host: ProviderProfile.from_dict(profile) for host, profile in config.get("hosts", {}).items()}
+    return default, hosts
+
+def parse_quota(spec: Optional[str]) -> Optional[Tuple[int, str]]:
+    """("100/month") -> (100, "month")"""
+    match = re.match(r"\s*(\d+)\s*/\s*(\w+)", spec or "")
+    return (int(match.group(1)), match.group(2)) if match else None
+
+def provider_hosts() -> Dict[str, Dict[str, Any]]:
+    """Every provider host the scanners can call, with the providers behind it, quota and cost per call"""
+    hosts: Dict[str, Dict[str, Any]] = {}
+
+    def entry(url: str) -> Dict[str, Any]:
+        host = urlsplit(url).hostname
+        return hosts.setdefault(host, {"providers": [], "quota": None, "cost": 1.0})
+
+    for service, providers in FREE_APIS.items():
+        for provider, info in providers.items():
+            item = entry(info["url"])
+            item["providers"].append(f"{service}/{provider}")
+            item["quota"] = item["quota"] or info.get("rate_limit")
+    for service, urls in PREMIUM_API_ENDPOINTS.items():
+        for url in urls:
+            entry(url)["providers"].append(f"{service}/premium")
+    for category, adapters in ADAPTER_REGISTRY.items():
+        for name, adapter in adapters.items():
+            for endpoint in adapter.endpoints:
+                item = entry(endpoint.url)
+                if f"{category}/{name}" not in item["providers"]:
+                    item["providers"].append(f"{category}/{name}")
+                item["cost"] = adapter.cost
+    return hosts
+
+def stated_limit_profiles(base: Optional[ProviderProfile] = None) -> Dict[str, ProviderProfile]:
+    """
+    Profiles enforcing each provider's stated rate_limit from api_config
+
+    Per-second and per-minute limits become token buckets; hourly, daily
+    and monthly limits become a total quota for the run.
+    """
+    base = base or ProviderProfile()
+    seconds = {"second": 1, "minute": 60}
+    profiles = {}
+    for host, info in provider_hosts().items():
+        quota = parse_quota(info["quota"])
+        if not quota:
+            continue
+        count, period = quota
+        profile = ProviderProfile(base.latency, base.error_rate, base.error_status, retry_after=base.retry_after,
+                                  body=base.body)
+        if period in seconds:
+            profile.rate_limit = count / seconds[period]
+            profile.burst = count
+            profile.retry_after = seconds[period]
+        else:
+            profile.quota = count
+        profiles[host] = profile
+    return profiles
+
+class CertificateAuthority:
+    """Throwaway CA issuing a leaf certificate for each intercepted host"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Provider Simulator CA")])
+        now = datetime.now(timezone.utc)
+        self.cert = (
+            x509.CertificateBuilder()
+            .subject_name(name).issuer_name(name)
+            .public_key(self.key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=7))
+            .add_extension(x509.BasicConstraints(ca=True, path_length=0), critical=True)
+            .add_extension(x509.KeyUsage(
+                digital_signature=True, content_commitment=False, key_encipherment=False, data_encipherment=False,
+                key_agreement=False, key_cert_sign=True, crl_sign=True, encipher_only=False, decipher_only=False
+            ), critical=True)
+            .add_extension(x509.SubjectKeyIdentifier.from_public_key(self.key.public_key()), critical=False)
+            .sign(self.key, hashes.SHA256())
+        )
+        self.ca_path = os.path.join(directory, "ca.pem")
+        with open(self.ca_path, "wb") as f:
+            f.write(self.cert.public_bytes(serialization.Encoding.PEM))
+        self.leaf_key = ec.generate_private_key(ec.SECP256R1())
+        self.key_path = os.path.join(directory, "leaf.key")
+        with open(self.key_path, "wb") as f:
+            f.write(self.leaf_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                serialization.NoEncryption()))
+        self._contexts: Dict[str, ssl.SSLContext] = {}
+        self._lock = threading.Lock()
+
+    def context_for(self, host: str) -> ssl.SSLContext:
+        """Server context presenting a certificate for host"""
+        with self._lock:
+            if host not in self._contexts:
+                self._contexts[host] = self._issue(host)
+            return self._contexts[host]
+
+    def _issue(self, host: str) -> ssl.SSLContext:
+        try:
+            san = x509.IPAddress(ipaddress.ip_address(host))
+        except ValueError:
+            san = x509.DNSName(host)
+        now = datetime.now(timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host[:64])]))
+            .issuer_name(self.cert.subject)
+            .public_key(self.leaf_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=7))
+            .add_extension(x509.SubjectAlternativeName([san]), critical=False)
+            .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
+            .add_extension(x509.ExtendedKeyUsage([x509.oid.ExtendedKeyUsageOID.SERVER_AUTH]), critical=False)
+            .add_extension(x509.AuthorityKeyIdentifier.from_issuer_public_key(self.key.public_key()), critical=False)
+            .sign(self.key, hashes.SHA256())
+        )
+        cert_path = os.path.join(self.directory, f"{len(self._contexts)}.pem")
+        with open(cert_path, "wb") as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, self.key_path)
+        return context
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, simulator: "ProviderSimulator"):
+        self.simulator = simulator
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        asyncio.ensure_future(self.simulator._answer_dns(data, addr, self.transport))
+
+class ProviderSimulator:
+    """
+    Answers provider traffic locally
+
+    Runs an HTTP forward proxy (HTTPS via CONNECT, terminated with a
+    throwaway CA) and a DNS responder on its own event loop thread.
+    Pointing HTTP(S)_PROXY, REQUESTS_CA_BUNDLE and DNS_NAMESERVERS at it
+    (see environment()) keeps every provider call in-process.
+    """
+
+    def __init__(
+        self,
+        default: Optional[ProviderProfile] = None,
+        profiles: Optional[Dict[str, ProviderProfile]] = None,
+        seed: int = 0
+    ):
+        """
+        Args:
+            default: Profile for hosts without their own
+            profiles: Profiles keyed by host (also matching subdomains)
+            seed: Seed for latency and error draws
+        """
+        self.default = default or ProviderProfile()
+        self.profiles = dict(profiles or {})
+        self.profiles.setdefault(DNS_HOST, ProviderProfile.from_dict(DNS_PROFILE))
+        self.rng = random.Random(seed)
+        self.port: Optional[int] = None
+        self.dns_port: Optional[int] = None
+        self._directory = tempfile.mkdtemp(prefix="provider_simulator_")
+        self.ca = CertificateAuthority(self._directory)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[str, List[float]] = {}
+        self._served: Counter = Counter()
+        self._connections = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ProviderSimulator":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> "ProviderSimulator":
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="provider-simulator", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    async def _start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._dns_transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: _DNSProtocol(self), local_addr=("127.0.0.1", 0)
+        )
+        self.dns_port = self._dns_transport.get_extra_info("sockname")[1]
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            self._dns_transport.close()
+            # Keep-alive connections left open by clients are dropped so their handlers finish
+            handlers = list(self._connections)
+            for writer, _ in handlers:
+                writer.transport.abort()
+            await asyncio.gather(*(task for _, task in handlers), return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def environment(self) -> Dict[str, str]:
+        """Environment routing requests and dns_resolver traffic through the simulator"""
+        proxy = f"http://127.0.0.1:{self.port}"
+        return {
+            "HTTP_PROXY": proxy, "HTTPS_PROXY": proxy, "http_proxy": proxy, "https_proxy": proxy,
+            "NO_PROXY": "", "no_proxy": "",
+            "REQUESTS_CA_BUNDLE": self.ca.ca_path,
+            "DNS_NAMESERVERS": f"127.0.0.1:{self.dns_port}",
+        }
+
+    def profile_for(self, host: str) -> ProviderProfile:
+        host = (host or "").lower()
+        while host:
+            if host in self.profiles:
+                return self.profiles[host]
+            host = host.partition(".")[2]
+        return self.default
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request counts, status counts and mean simulated latency"""
+        with self._lock:
+            return {
+                host: {
+                    "requests": item["requests"],
+                    "statuses": dict(item["statuses"]),
+                    "mean_latency_ms": round(item["latency"] * 1000 / max(item["requests"], 1), 2),
+                }
+                for host, item in self._stats.items()
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _record(self, host: str, status: int, latency: float) -> None:
+        with self._lock:
+            item = self._stats.setdefault(host, {"requests": 0, "statuses": Counter(), "latency": 0.0})
+            item["requests"] += 1
+            item["statuses"][status] += 1
+            item["latency"] += latency
+
+    def _throttled(self, host: str, profile: ProviderProfile) -> Optional[Dict[str, Any]]:
+        """429 body if the call is over the host's rate limit or quota"""
+        if profile.quota is not None and self._served[host] >= profile.quota:
+            return {"error": "Quota exceeded", "quota": profile.quota}
+        if profile.rate_limit:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (float(profile.burst), now))
+            tokens = min(float(profile.burst), tokens + (now - last) * profile.rate_limit)
+            if tokens < 1.0:
+                self._buckets[host] = (tokens, now)
+                return {"error": "Rate limit exceeded", "retry_after": profile.retry_after}
+            self._buckets[host] = (tokens - 1.0, now)
+        return None
+
+    async def _respond(self, host: str, method: str, path: str) -> Tuple[int, Any, str]:
+        profile = self.profile_for(host)
+        throttled = self._throttled(host, profile)
+        if throttled:
+            self._record(host, 429, 0.0)
+            return 429, throttled, f"Retry-After: {profile.retry_after}\r\n"
+
+        latency = profile.latency.sample(self.rng)
+        await asyncio.sleep(latency)
+        if self.rng.random() < profile.error_rate:
+            self._record(host, profile.error_status, latency)
+            return profile.error_status, {"error": "Simulated provider failure"}, ""
+
+        self._served[host] += 1
+        self._record(host, 200, latency)
+        if profile.body is not None:
+            return 200, profile.body, ""
+        if host == RDAP_BOOTSTRAP_HOST:
+            return 200, {"version": "1.0", "services": [[SIMULATED_TLDS, [SIMULATED_RDAP_BASE]]]}, ""
+        return 200, {"simulated": True, "host": host, "method": method, "path": path, "data": []}, ""
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = (writer, asyncio.current_task())
+        self._connections.add(connection)
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            if method == "CONNECT":
+                host = target.rsplit(":", 1)[0].strip("[]")
+                writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+                await writer.drain()
+                await writer.start_tls(self.ca.context_for(host))
+                await self._serve(reader, writer, host, None)
+            else:
+                await self._serve(reader, writer, None, head)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ssl.SSLError, ValueError):
+            pass
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                     tunnel_host: Optional[str], head: Optional[bytes]) -> None:
+        """Answer keep-alive requests on one connection until the client closes it"""
+        while True:
+            if head is None:
+                head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length:
+                await reader.readexactly(length)
+
+            if target.startswith(("http://", "https://")):
+                parts = urlsplit(target)
+                host = parts.hostname
+                path = parts.path + (f"?{parts.query}" if parts.query else "")
+            else:
+                host = tunnel_host or headers.get("host", "").rsplit(":", 1)[0]
+                path = target
+
+            status, body, extra = await self._respond(host, method, path)
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n{extra}\r\n".encode() + payload
+            )
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                return
+            head = None
+
+    async def _answer_dns(self, data: bytes, addr: Tuple[str, int], transport: asyncio.DatagramTransport) -> None:
+        try:
+            query = dns.message.from_wire(data)
+        except Exception:
+            return
+        response = dns.message.make_response(query)
+        for question in query.question:
+            answer = DNS_ANSWERS.get(dns.rdatatype.to_text(question.rdtype))
+            if answer:
+                response.answer.append(dns.rrset.from_text(question.name, DNS_TTL, "IN", question.rdtype, answer))
+
+        latency = self.profile_for(DNS_HOST).latency.sample(self.rng)
+        await asyncio.sleep(latency)
+        self._record(DNS_HOST, 200, latency)
+        if not transport.is_closing():
+            transport.sendto(response.to_wire(), addr)
@@ -0,0 +1,367 @@
+"""
+Relationship Graph Store
+Persistent SQLite-backed graph of entities and relationships across all scans
+"""
+
+import os
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from entity_model import EntityStore, ENTITY_TYPES, TARGET_TYPE_KINDS
+from entity_resolution import EntityResolver
+from target_routing import classify_target
+
+DEFAULT_GRAPH_PATH = os.environ.get("RELATIONSHIP_GRAPH_PATH", "findings/relationship_graph.db")
+
+# Records with more entities than this are linked as a star instead of pairwise
+MAX_PAIRWISE_RECORD = 20
+
+# Node kinds describing hosting infrastructure in topology summaries
+INFRASTRUCTURE_KINDS = ("domain", "ip")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (kind, value)
+);
+CREATE TABLE IF NOT EXISTS edges (
+    src INTEGER NOT NULL,
+    dst INTEGER NOT NULL,
+    relation TEXT NOT NULL,
+    scan_id TEXT,
+    weight REAL DEFAULT 1.0,
+    PRIMARY KEY (src, dst, relation)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_dst ON edges (dst, src);
+CREATE TABLE IF NOT EXISTS components (
+    node_id INTEGER PRIMARY KEY,
+    component INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS components_component ON components (component);
+CREATE TABLE IF NOT EXISTS component_sizes (
+    component INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+class RelationshipGraph:
+    """Undirected entity graph with k-hop, shortest-path and component queries"""
+
+    _default = None
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_GRAPH_PATH
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.reopen()
+
+    def reopen(self) -> None:
+        """Open a fresh connection, e.g. in a forked worker; an inherited one is abandoned, not closed"""
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA mmap_size=1073741824")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def default(cls) -> "RelationshipGraph":
+        """Shared graph at the default path"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # Writes
+
+    def add_node(self, kind: str, value: str) -> int:
+        """Get or create a node, returning its id"""
+        with self._lock:
+            row = self.conn.execute("SELECT id FROM nodes WHERE kind = ? AND value = ?", (kind, value)).fetchone()
+            if row:
+                return row[0]
+            node_id = self.conn.execute("INSERT INTO nodes (kind, value) VALUES (?, ?)", (kind, value)).lastrowid
+            self.conn.execute("INSERT INTO components (node_id, component) VALUES (?, ?)", (node_id, node_id))
+            self.conn.execute("INSERT INTO component_sizes (component, size) VALUES (?, 1)", (node_id,))
+            return node_id
+
+    def add_edge(self, a: int, b: int, relation: str, scan_id: str = "", weight: float = 1.0) -> bool:
+        """Add an undirected edge; returns False if it already existed"""
+        if a == b:
+            return False
+        src, dst = min(a, b), max(a, b)
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO edges (src, dst, relation, scan_id, weight) VALUES (?, ?, ?, ?, ?)",
+                (src, dst, relation, scan_id, weight)
+            )
+            if cursor.rowcount:
+                self._merge_components(src, dst)
+            return bool(cursor.rowcount)
+
+    def _merge_components(self, a: int, b: int) -> None:
+        """Relabel the smaller component into the larger one"""
+        (comp_a,) = self.conn.execute("SELECT component FROM components WHERE node_id = ?", (a,)).fetchone()
+        (comp_b,) = self.conn.execute("SELECT component FROM components WHERE node_id = ?", (b,)).fetchone()
+        if comp_a == comp_b:
+            return
+        (size_a,) = self.conn.execute("SELECT size FROM component_sizes WHERE component = ?", (comp_a,)).fetchone()
+        (size_b,) = self.conn.execute("SELECT size FROM component_sizes WHERE component = ?", (comp_b,)).fetchone()
+        if size_a < size_b:
+            comp_a, comp_b = comp_b, comp_a
+        self.conn.execute("UPDATE components SET component = ? WHERE component = ?", (comp_a, comp_b))
+        self.conn.execute("UPDATE component_sizes SET size = ? WHERE component = ?", (size_a + size_b, comp_a))
+        self.conn.execute("DELETE FROM component_sizes WHERE component = ?", (comp_b,))
+
+    def record_scan(
+        self,
+        scan_id: str,
+        target: Any,
+        store: EntityStore,
+        resolver: Optional[EntityResolver] = None
+    ) -> Dict[str, int]:
+        """
+        Write a scan's entities and relationships into the graph
+
+        Args:
+            scan_id: Scan identifier stored on each edge
+            target: Scanned target
+            store: Entities parsed from the scan
+            resolver: Resolver over the same store (built if omitted)
+        """
+        if resolver is None:
+            resolver = EntityResolver(store)
+            resolver.index(target if isinstance(target, str) else None)
+
+        added = 0
+        with self._lock, self.conn:
+            node_ids = [self.add_node(entity.kind, entity.value) for entity in store.entities()]
+            target_node = self.add_node(*self._node_key(target)) if isinstance(target, str) and target else None
+
+            records: Dict[int, List[int]] = {}
+            for entity_id, provenance_id in store.observations():
+                members = records.setdefault(provenance_id, [])
+                if entity_id not in members:
+                    members.append(entity_id)
+
+            for members in records.values():
+                nodes = [node_ids[entity_id] for entity_id in members]
+                if target_node is not None:
+                    for node in nodes:
+                        added += self.add_edge(target_node, node, "observed", scan_id)
+                for pair in _record_pairs(nodes):
+                    added += self.add_edge(pair[0], pair[1], "co_observed", scan_id)
+
+            for a, b, evidence in resolver.links():
+                added += self.add_edge(node_ids[a], node_ids[b], "same_identity", scan_id)
+
+        return {"nodes": len(node_ids), "edges_added": added}
+
+    # Queries
+
+    def _node_key(self, identifier: str) -> Tuple[str, str]:
+        kind = TARGET_TYPE_KINDS.get(classify_target(identifier))
+        if kind:
+            return kind, ENTITY_TYPES[kind].normalize(identifier)
+        return "target", identifier.strip()
+
+    def find_node(self, identifier: str) -> Optional[int]:
+        """Find the node for an identifier"""
+        kind, value = self._node_key(identifier)
+        candidates = [(kind, value)]
+        if kind == "target":
+            candidates.append(("username", ENTITY_TYPES["username"].normalize(identifier)))
+        with self._lock:
+            for candidate in candidates:
+                row = self.conn.execute("SELECT id FROM nodes WHERE kind = ? AND value = ?", candidate).fetchone()
+                if row:
+                    return row[0]
+        return None
+
+    def _neighbors(self, node_ids: Iterable[int]) -> List[Tuple[int, int, str]]:
+        """Edges touching any of the given nodes, as (from, to, relation)"""
+        node_ids = list(node_ids)
+        edges = []
+        with self._lock:
+            for start in range(0, len(node_ids), 500):
+                batch = node_ids[start:start + 500]
+                marks = ",".join("?" * len(batch))
+                edges.extend(self.conn.execute(
+                    f"SELECT src, dst, relation FROM edges WHERE src IN ({marks}) "
+                    f"UNION ALL SELECT dst, src, relation FROM edges WHERE dst IN ({marks})",
+                    batch + batch
+                ).fetchall())
+        return edges
+
+    def _describe_nodes(self, node_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        node_ids = list(node_ids)
+        described = {}
+        with self._lock:
+            for start in range(0, len(node_ids), 500):
+                batch = node_ids[start:start + 500]
+                marks = ",".join("?" * len(batch))
+                for node_id, kind, value in self.conn.execute(
+                    f"SELECT id, kind, value FROM nodes WHERE id IN ({marks})", batch
+                ):
+                    described[node_id] = {"id": node_id, "kind": kind, "value": value}
+        return described
+
+    def neighborhood(self, identifier: str, hops: int = 1, limit: int = 1000) -> Dict[str, Any]:
+        """Nodes and edges within k hops of an identifier"""
+        start = self.find_node(identifier)
+        if start is None:
+            return {"found": False, "nodes": [], "edges": []}
+
+        seen = {start: 0}
+        frontier = [start]
+        edges = []
+        # Edges between two frontier nodes, or found again from the far side, are reported once
+        seen_edges = set()
+        for depth in range(1, hops + 1):
+            next_frontier = []
+            for a, b, relation in self._neighbors(frontier):
+                if b not in seen:
+                    if len(seen) >= limit:
+                        continue
+                    seen[b] = depth
+                    next_frontier.append(b)
+                key = (min(a, b), max(a, b), relation)
+                if b in seen and key not in seen_edges:
+                    seen_edges.add(key)
+                    edges.append({"source": a, "target": b, "relation": relation})
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        nodes = self._describe_nodes(seen)
+        for node_id, depth in seen.items():
+            nodes[node_id]["hops"] = depth
+        return {
+            "found": True,
+            "nodes": sorted(nodes.values(), key=lambda node: (node["hops"], node["id"])),
+            "edges": edges,
+            "truncated": len(seen) >= limit
+        }
+
+    def topology(self, identifier: str, hops: int = 2, limit: int = 1000) -> Dict[str, Any]:
+        """Shape of the graph around an identifier: size, density, hubs and infrastructure nodes"""
+        neighborhood = self.neighborhood(identifier, hops=hops, limit=limit)
+        if not neighborhood["found"]:
+            return {"found": False}
+
+        nodes = {node["id"]: node for node in neighborhood["nodes"]}
+        edges = neighborhood["edges"]
+        degrees = Counter()
+        for edge in edges:
+            degrees[edge["source"]] += 1
+            degrees[edge["target"]] += 1
+        count = len(nodes)
+        return {
+            "found": True,
+            "nodes": count,
+            "edges": len(edges),
+            "density": round(2 * len(edges) / (count * (count - 1)), 4) if count > 1 else 0.0,
+            "kinds": dict(Counter(node["kind"] for node in nodes.values())),
+            "relations": dict(Counter(edge["relation"] for edge in edges)),
+            "hubs": [{**nodes[node_id], "degree": degree} for node_id, degree in degrees.most_common(10)],
+            "infrastructure": [node for node in nodes.values() if node["kind"] in INFRASTRUCTURE_KINDS],
+            "truncated": neighborhood["truncated"]
+        }
+
+    def shortest_path(self, source: str, destination: str, max_hops: int = 6) -> Optional[List[Dict[str, Any]]]:
+        """Shortest path between two identifiers using bidirectional BFS"""
+        start, goal = self.find_node(source), self.find_node(destination)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return list(self._describe_nodes([start]).values())
+        if not self.same_component(start, goal):
+            return None
+
+        parents = [{start: None}, {goal: None}]
+        frontiers = [[start], [goal]]
+        for _ in range(max_hops):
+            # Expand the smaller frontier
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            next_frontier = []
+            for a, b, _relation in self._neighbors(frontiers[side]):
+                if b in parents[side]:
+                    continue
+                parents[side][b] = a
+                next_frontier.append(b)
+                if b in parents[1 - side]:
+                    path = self._join_paths(parents, b)
+                    nodes = self._describe_nodes(path)
+                    return [nodes[node_id] for node_id in path]
+            frontiers[side] = next_frontier
+            if not next_frontier:
+                return None
+        return None
+
+    @staticmethod
+    def _join_paths(parents: List[Dict[int, Optional[int]]], meeting: int) -> List[int]:
+        forward = []
+        node = meeting
+        while node is not None:
+            forward.append(node)
+            node = parents[0][node]
+        forward.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            forward.append(node)
+            node = parents[1][node]
+        return forward
+
+    def same_component(self, a: int, b: int) -> bool:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT component FROM components WHERE node_id IN (?, ?)", (a, b)
+            ).fetchall()
+        return len(rows) == 2 and rows[0][0] == rows[1][0]
+
+    def component_of(self, identifier: str, sample: int = 50) -> Optional[Dict[str, Any]]:
+        """Connected component containing an identifier"""
+        node = self.find_node(identifier)
+        if node is None:
+            return None
+        with self._lock:
+            (component,) = self.conn.execute(
+                "SELECT component FROM components WHERE node_id = ?", (node,)
+            ).fetchone()
+            (size,) = self.conn.execute(
+                "SELECT size FROM component_sizes WHERE component = ?", (component,)
+            ).fetchone()
+            members = [row[0] for row in self.conn.execute(
+                "SELECT node_id FROM components WHERE component = ? LIMIT ?", (component, sample)
+            )]
+        return {
+            "component_id": component,
+            "size": size,
+            "members": list(self._describe_nodes(members).values())
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "nodes": self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0],
+                "edges": self.conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0],
+                "components": self.conn.execute("SELECT COUNT(*) FROM component_sizes").fetchone()[0]
+            }
+
+def _record_pairs(nodes: List[int]) -> Iterable[Tuple[int, int]]:
+    """Pairs to link for entities reported in one record"""
+    if len(nodes) <= MAX_PAIRWISE_RECORD:
+        for i in range(len(nodes)):
+            for j in range(i + 1, len(nodes)):
+                yield nodes[i], nodes[j]
+    else:
+        for node in nodes[1:]:
+            yield nodes[0], node
@@ -0,0 +1,367 @@
+"""
+Risk Scoring Engine
+Vectorized risk scoring over feature matrices built from scan intelligence
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+import numpy as np
+
+# Exposed data classes and how sensitive each one is
+SENSITIVE_DATA_TYPES = {
+    "Passwords": 0.8,
+    "Credit Cards": 1.0,
+    "Social Security Numbers": 1.0,
+    "Bank Accounts": 1.0,
+    "Health Records": 0.9,
+    "Phone Numbers": 0.4,
+    "Email Addresses": 0.3
+}
+
+def _scale(value: Any) -> Optional[float]:
+    """Provider scores in [0, 1], accepting 0-100 scales"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if value > 1.0:
+        value /= 100.0
+    return min(1.0, max(0.0, value))
+
+def _count(value: Any, saturation: float) -> Optional[float]:
+    if not isinstance(value, (list, tuple, dict)):
+        return None
+    return min(1.0, len(value) / saturation)
+
+def _breach(intel: Dict[str, Any]) -> Dict[str, Any]:
+    breach = intel.get("BREACH_INTELLIGENCE")
+    return breach if isinstance(breach, dict) and breach.get("breach_details") else {}
+
+def _breach_frequency(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    breach = _breach(intel)
+    if not breach:
+        return None
+    return min(1.0, breach.get("breach_count", 0) / 10.0)
+
+def _data_sensitivity(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    breach = _breach(intel)
+    if not breach:
+        return None
+    scores = [SENSITIVE_DATA_TYPES[data_type] for data_type in breach.get("exposed_data", [])
+              if data_type in SENSITIVE_DATA_TYPES]
+    return max(scores) if scores else 0.0
+
+def _temporal_risk(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    """More recent breaches carry higher risk"""
+    breach = _breach(intel)
+    if not breach:
+        return None
+    if not breach.get("latest_breach"):
+        return 0.0
+    try:
+        years_since_breach = as_of - int(breach["latest_breach"][:4])
+    except (ValueError, TypeError):
+        return 0.5
+    return max(0.0, 1.0 - years_since_breach * 0.1)
+
+def _password_exposure(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    breach = intel.get("BREACH_INTELLIGENCE")
+    if not isinstance(breach, dict) or "password_exposures" not in breach:
+        return None
+    return _count(breach["password_exposures"], 5.0)
+
+def _threat_score(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    threat = intel.get("THREAT_INTELLIGENCE")
+    if not isinstance(threat, dict) or "threat_score" not in threat:
+        return None
+    return _scale(threat["threat_score"])
+
+def _indicator_density(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    threat = intel.get("THREAT_INTELLIGENCE")
+    return _count(threat.get("indicators"), 20.0) if isinstance(threat, dict) else None
+
+def _vulnerability_exposure(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    threat = intel.get("THREAT_INTELLIGENCE")
+    return _count(threat.get("vulnerabilities"), 10.0) if isinstance(threat, dict) else None
+
+def _phone_risk(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    phone = intel.get("PHONE_INTELLIGENCE")
+    if not isinstance(phone, dict) or "risk_score" not in phone:
+        return None
+    return _scale(phone["risk_score"])
+
+def _email_reputation_risk(intel: Dict[str, Any], as_of: int) -> Optional[float]:
+    email = intel.get("EMAIL_INTELLIGENCE")
+    reputation = _scale(email.get("reputation_score")) if isinstance(email, dict) else None
+    # A zero reputation is the scanner default, not a provider verdict
+    if not reputation:
+        return None
+    return 1.0 - reputation
+
+# Feature columns in matrix order; each extractor returns None when the scan has no data for it
+FEATURES = {
+    "breach_frequency": _breach_frequency,
+    "data_sensitivity": _data_sensitivity,
+    "temporal_risk": _temporal_risk,
+    "password_exposure": _password_exposure,
+    "threat_score": _threat_score,
+    "indicator_density": _indicator_density,
+    "vulnerability_exposure": _vulnerability_exposure,
+    "phone_risk": _phone_risk,
+    "email_reputation_risk": _email_reputation_risk
+}
+FEATURE_NAMES = tuple(FEATURES)
+
+# Rules raise the score of scans whose feature passes a threshold, to a floor and/or by a boost
+DEFAULT_RULES = [
+    {
+        "name": "credential_exposure", "feature": "password_exposure", "op": ">", "threshold": 0.0,
+        "floor": 0.7, "severity": "HIGH", "details": "Passwords exposed in breach data"
+    },
+    {
+        "name": "financial_data_exposure", "feature": "data_sensitivity", "op": ">=", "threshold": 1.0,
+        "floor": 0.6, "severity": "HIGH", "details": "Financial or identity records exposed"
+    },
+    {
+        "name": "active_threat", "feature": "threat_score", "op": ">=", "threshold": 0.8,
+        "floor": 0.8, "severity": "CRITICAL", "details": "High threat intelligence score"
+    },
+    {
+        "name": "recent_breach", "feature": "temporal_risk", "op": ">=", "threshold": 0.9,
+        "boost": 0.1, "severity": "MEDIUM", "details": "Breach within the last year"
+    }
+]
+
+RISK_PROFILES = {
+    "breach": {
+        "weights": {"breach_frequency": 0.3, "data_sensitivity": 0.4, "temporal_risk": 0.3},
+        "rules": []
+    },
+    "deep": {
+        "weights": {
+            "breach_frequency": 0.15,
+            "data_sensitivity": 0.2,
+            "temporal_risk": 0.1,
+            "password_exposure": 0.15,
+            "threat_score": 0.2,
+            "indicator_density": 0.05,
+            "vulnerability_exposure": 0.1,
+            "phone_risk": 0.025,
+            "email_reputation_risk": 0.025
+        },
+        "rules": DEFAULT_RULES
+    }
+}
+
+_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal
+}
+
+def extract_features(intel_data: Dict[str, Any], as_of: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Feature row and observed mask for one scan
+
+    Args:
+        intel_data: Intelligence keyed by category
+        as_of: Reference year for temporal features (defaults to the current year)
+    """
+    as_of = as_of or datetime.now().year
+    row = np.zeros(len(FEATURE_NAMES))
+    observed = np.zeros(len(FEATURE_NAMES), dtype=bool)
+    if isinstance(intel_data, dict):
+        for column, extractor in enumerate(FEATURES.values()):
+            value = extractor(intel_data, as_of)
+            if value is not None:
+                row[column] = value
+                observed[column] = True
+    return row, observed
+
+def build_matrix(scans: Iterable[Dict[str, Any]], as_of: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature matrix and observed mask for many scans"""
+    rows, masks = [], []
+    for intel_data in scans:
+        row, observed = extract_features(intel_data, as_of)
+        rows.append(row)
+        masks.append(observed)
+    if not rows:
+        return np.zeros((0, len(FEATURE_NAMES))), np.zeros((0, len(FEATURE_NAMES)), dtype=bool)
+    return np.vstack(rows), np.vstack(masks)
+
+class RiskEngine:
+    """Scores feature matrices with configurable weights and rule sets"""
+
+    def __init__(
+        self,
+        profile: str = "deep",
+        weights: Optional[Dict[str, float]] = None,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        as_of: Optional[int] = None
+    ):
+        """
+        Args:
+            profile: Named profile from RISK_PROFILES providing default weights and rules
+            weights: Feature weights overriding the profile
+            rules: Rule set overriding the profile
+            as_of: Reference year for temporal features, fixed for reproducible scores
+        """
+        config = RISK_PROFILES[profile]
+        self.profile = profile
+        self.weights = dict(weights if weights is not None else config["weights"])
+        self.rules = list(rules if rules is not None else config["rules"])
+        self.as_of = as_of or datetime.now().year
+
+        unknown = set(self.weights) - set(FEATURE_NAMES)
+        unknown.update(rule["feature"] for rule in self.rules if rule["feature"] not in FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown risk features: {', '.join(sorted(unknown))}")
+
+        self.weight_vector = np.array([self.weights.get(name, 0.0) for name in FEATURE_NAMES])
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "RiskEngine":
+        """Load weights and rules from a JSON model file"""
+        with open(path) as f:
+            config = json.load(f)
+        return cls(
+            profile=config.get("profile", kwargs.pop("profile", "deep")),
+            weights=config.get("weights"),
+            rules=config.get("rules"),
+            **kwargs
+        )
+
+    @property
+    def config_hash(self) -> str:
+        """Stable hash identifying the scoring configuration"""
+        config = json.dumps({"weights": self.weights, "rules": self.rules, "as_of": self.as_of}, sort_keys=True)
+        return hashlib.sha256(config.encode()).hexdigest()[:16]
+
+    def score_matrix(self, features: np.ndarray, observed: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score every row of a feature matrix in one pass
+
+        The weighted mean is taken over observed features only, so a scan is not
+        penalized for categories it did not collect. Rules are then applied as
+        floors and boosts, and the result is clipped to [0, 1].
+        """
+        features = np.asarray(features, dtype=np.float64)
+        observed = np.asarray(observed, dtype=bool)
+
+        weighted = features @ self.weight_vector
+        total_weight = observed @ self.weight_vector
+        scores = np.divide(weighted, total_weight, out=np.zeros(len(features)), where=total_weight > 0)
+
+        fired = np.zeros((len(features), len(self.rules)), dtype=bool)
+        for index, rule in enumerate(self.rules):
+            column = FEATURE_NAMES.index(rule["feature"])
+            hit = observed[:, column] & _OPERATORS[rule["op"]](features[:, column], rule["threshold"])
+            fired[:, index] = hit
+            if "floor" in rule:
+                scores = np.where(hit, np.maximum(scores, rule["floor"]), scores)
+            if "boost" in rule:
+                scores = scores + hit * rule["boost"]
+
+        return {"scores": np.clip(scores, 0.0, 1.0), "fired": fired}
+
+    def score(self, intel_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Score a single scan"""
+        row, observed = extract_features(intel_data, self.as_of)
+        result = self.score_matrix(row[np.newaxis, :], observed[np.newaxis, :])
+
+        return {
+            "overall_risk_score": float(result["scores"][0]),
+            "component_scores": {
+                name: float(row[column])
+                for column, name in enumerate(FEATURE_NAMES)
+                if observed[column]
+            },
+            "risk_factors": [
+                {"type": rule["name"], "details": rule.get("details", rule["name"]), "severity": rule.get("severity", "MEDIUM")}
+                for rule, hit in zip(self.rules, result["fired"][0])
+                if hit
+            ],
+            "model": {"profile": self.profile, "config_hash": self.config_hash}
+        }
+
+class RiskArchive:
+    """Persisted feature matrix for stored scans, re-scored without re-extraction"""
+
+    def __init__(self, path: str = "findings/risk_features.npz", as_of: Optional[int] = None):
+        self.path = Path(path)
+        self.as_of = as_of or datetime.now().year
+        self.scan_ids: List[str] = []
+        self.features = np.zeros((0, len(FEATURE_NAMES)))
+        self.observed = np.zeros((0, len(FEATURE_NAMES)), dtype=bool)
+        if self.path.exists():
+            self.load()
+
+    def load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as archive:
+            if tuple(archive["feature_names"]) != FEATURE_NAMES:
+                # Feature set changed, so the archive must be rebuilt
+                return
+            self.scan_ids = list(archive["scan_ids"])
+            self.features = archive["features"]
+            self.observed = archive["observed"]
+            self.as_of = int(archive["as_of"])
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            np.savez(
+                f,
+                feature_names=np.array(FEATURE_NAMES),
+                scan_ids=np.array(self.scan_ids, dtype=str),
+                features=self.features,
+                observed=self.observed,
+                as_of=np.int64(self.as_of)
+            )
+
+    def __len__(self) -> int:
+        return len(self.scan_ids)
+
+    def add(self, scans: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Append (scan id, intelligence) pairs not already in the archive"""
+        known = set(self.scan_ids)
+        new_ids, intel = [], []
+        for scan_id, intel_data in scans:
+            if scan_id not in known:
+                known.add(scan_id)
+                new_ids.append(scan_id)
+                intel.append(intel_data)
+
+        if new_ids:
+            features, observed = build_matrix(intel, self.as_of)
+            self.scan_ids.extend(new_ids)
+            self.features = np.vstack([self.features, features])
+            self.observed = np.vstack([self.observed, observed])
+        return len(new_ids)
+
+    def update(self, scan_dir: str = "findings/osint_scans") -> int:
+        """Extract features for saved scan results not yet archived"""
+        def saved_scans():
+            for result_file in sorted(Path(scan_dir).glob("*.json")):
+                try:
+                    with open(result_file) as f:
+                        scan_data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(scan_data, dict):
+                    intel = scan_data.get("intelligence_data", scan_data)
+                    yield result_file.stem, intel
+
+        return self.add(saved_scans())
+
+    def score(self, engine: RiskEngine) -> Dict[str, Any]:
+        """Re-score every archived scan with an engine's weights and rules"""
+        result = self.score_matrix(engine)
+        return dict(zip(self.scan_ids, result["scores"].tolist()))
+
+    def score_matrix(self, engine: RiskEngine) -> Dict[str, np.ndarray]:
+        return engine.score_matrix(self.features, self.observed)
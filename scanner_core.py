@@ -9,14 +9,20 @@ from datetime import datetime
 from rich.console import Console
 from api_manager import APIManager
 from api_config import FREE_APIS
+from geoip_resolver import GeoIPResolver, default_resolver
+from shared_cache import SharedCache
+
+# Key prefix of scan results in the shared cache
+SCAN_KEY_PREFIX = "scanner_core:scan:"
 
 class ScannerCore:
     """Core scanning functionality with API integration"""
 
-    def __init__(self):
+    def __init__(self, geoip: Optional[GeoIPResolver] = None, cache: Optional[SharedCache] = None):
         self.console = Console()
         self.api_manager = APIManager()
-        self.results_cache = {}
+        self.results_cache = cache if cache is not None else SharedCache.default()
+        self.geoip = geoip or default_resolver()
 
     def scan(self, target: str, scan_types: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -53,6 +59,7 @@ class ScannerCore:
             except Exception as e:
                 self.console.print(f"[red]Error gathering {category} intelligence: {str(e)}[/red]")
 
+        self.results_cache.set(SCAN_KEY_PREFIX + scan_id, results)
         return results
 
     def _gather_category_data(self, target: str, category: str, provider: str) -> Dict[str, Any]:
@@ -64,6 +71,17 @@ class ScannerCore:
             "confidence_scores": {}
         }
 
+        if category == "LOCATION_INTELLIGENCE":
+            # Answer IP targets from the local databases before spending provider quota
+            record = self.geoip.resolve_local(target)
+            if record:
+                base_results["findings"].append({
+                    "source": "local_geoip",
+                    "timestamp": datetime.now().isoformat(),
+                    "data": record
+                })
+                return base_results
+
         try:
             # Basic data gathering
             data = self.api_manager.make_request(
@@ -106,11 +124,11 @@ class ScannerCore:
 
     def get_scan_history(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get history of previous scans"""
-        return {"scans": list(self.results_cache.values())}
+        return {"scans": self.results_cache.values(SCAN_KEY_PREFIX)}
 
     def get_scan_result(self, scan_id: str) -> Optional[Dict[str, Any]]:
         """Get result of a specific scan"""
-        return self.results_cache.get(scan_id)
+        return self.results_cache.get(SCAN_KEY_PREFIX + scan_id)
 
 if __name__ == "__main__":
     # Example usage
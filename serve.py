@@ -0,0 +1,462 @@
+"""
+Production Server
+Pre-fork WSGI server for the Flask apps with preloaded shared state, graceful reload and a cross-process response cache
+"""
+
+import argparse
+import hashlib
+import importlib
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+# App name -> module exposing a Flask `app`
+APPS = {"scanner": "scanner_app", "api": "api"}
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_THREADS = 8
+# Seconds a worker gets to finish in-flight requests after being told to stop
+GRACEFUL_TIMEOUT = 30.0
+# Idle keep-alive connections are closed after this many seconds so they do not hold a thread
+KEEPALIVE_TIMEOUT = 5.0
+
+DEFAULT_CACHE_PATH = os.environ.get("SERVE_CACHE_PATH", "findings/serve_cache.db")
+DEFAULT_CACHE_TTL = float(os.environ.get("SERVE_CACHE_TTL", "300"))
+# Responses kept in each worker's memory in front of the shared cache
+LOCAL_CACHE_ENTRIES = 1024
+# Only scan and listing endpoints are cached; static files and history are served fresh
+CACHED_PREFIXES = ("/api/scan/", "/api/deep-scan", "/api/scanners")
+# Expired shared rows are purged after this many writes
+PURGE_EVERY = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+def log(message: str) -> None:
+    print(f"[serve {os.getpid()}] {message}", file=sys.stderr, flush=True)
+
+def preload_shared_state() -> Dict[str, Any]:
+    """
+    Open read-only state once in the master so forked workers share its pages
+
+    Importing the apps already loads configuration and builds the scanners;
+    this also maps the GeoIP databases and the offline indexes.
+    """
+    import geoip_resolver
+    from breach_index import LocalBreachIndex
+    from prefilter import Prefilter
+
+    return {
+        "geoip": geoip_resolver.preload(),
+        "breach_index": LocalBreachIndex.open_default() is not None,
+        "prefilter": Prefilter.open_default() is not None,
+    }
+
+def after_fork() -> None:
+    """Reopen per-process resources a worker must not share with the master"""
+    from whois_client import WhoisClient
+    from tls_probe import FingerprintIndex
+    from relationship_graph import RelationshipGraph
+
+    for cls in (WhoisClient, FingerprintIndex, RelationshipGraph):
+        if cls._default is not None:
+            cls._default.reopen()
+
+def has_provider_error(content: bytes) -> bool:
+    """Whether a JSON response embeds an "error" from a scanner or provider"""
+    try:
+        pending = [json.loads(content)]
+    except ValueError:
+        return False
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            if value.get("error"):
+                return True
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+    return False
+
+class ResponseCache:
+    """
+    WSGI middleware caching successful API responses that embed no provider errors
+
+    Each worker keeps an LRU of recent responses in front of a SQLite file
+    shared by all workers, so a scan answered by one worker is a hit for
+    the others until its TTL runs out.
+    """
+
+    def __init__(self, app: Callable, path: Optional[str] = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_CACHE_TTL,
+                 local_entries: int = LOCAL_CACHE_ENTRIES):
+        """
+        Args:
+            app: WSGI application to wrap
+            path: Shared SQLite cache file (None for a worker-local cache only)
+            ttl: Seconds a cached response stays valid
+            local_entries: Responses kept in each worker's memory
+        """
+        self.app = app
+        self.path = path
+        self.ttl = ttl
+        self.local_entries = local_entries
+        self._local: "OrderedDict[str, Tuple[float, str, list, bytes]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._writes = 0
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Opened per process: a connection inherited across fork must not be used
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Any:
+        path = environ.get("PATH_INFO", "")
+        if environ["REQUEST_METHOD"] not in ("GET", "POST") or not path.startswith(CACHED_PREFIXES):
+            return self.app(environ, start_response)
+
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        body = environ["wsgi.input"].read(length) if length else b""
+        environ["wsgi.input"] = io.BytesIO(body)
+        key = hashlib.sha256(
+            b"\0".join([environ["REQUEST_METHOD"].encode(), path.encode(),
+                        environ.get("QUERY_STRING", "").encode(), body])
+        ).hexdigest()
+
+        cached, tier = self.get(key)
+        if cached is not None:
+            status, headers, content = cached
+            start_response(status, headers + [("X-Cache", tier)])
+            return [content]
+
+        captured: Dict[str, Any] = {}
+
+        def capture(status: str, headers: list, exc_info: Any = None) -> Callable:
+            captured.update(status=status, headers=headers)
+            return start_response(status, headers + [("X-Cache", "MISS")], exc_info)
+
+        iterable = self.app(environ, capture)
+        try:
+            content = b"".join(iterable)
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+        # A 200 can still carry a provider failure, which must not be served to every worker
+        if captured.get("status", "").startswith("200") and not has_provider_error(content):
+            self.put(key, captured["status"], captured["headers"], content)
+        return [content]
+
+    def get(self, key: str) -> Tuple[Optional[Tuple[str, list, bytes]], str]:
+        """Cached (status, headers, body) and the tier it came from"""
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > now:
+                self._local.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return entry[1:], "HIT-LOCAL"
+            self._local.pop(key, None)
+            if self.path:
+                row = self.conn.execute(
+                    "SELECT status, headers, body, expires FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[3] > now:
+                    entry = (row[3], row[0], [tuple(h) for h in json.loads(row[1])], bytes(row[2]))
+                    self._remember(key, entry)
+                    self.stats["shared_hits"] += 1
+                    return entry[1:], "HIT-SHARED"
+            self.stats["misses"] += 1
+        return None, "MISS"
+
+    def put(self, key: str, status: str, headers: list, body: bytes) -> None:
+        entry = (time.time() + self.ttl, status, list(headers), body)
+        with self._lock:
+            self._remember(key, entry)
+            if self.path:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, status, headers, body, expires) VALUES (?, ?, ?, ?, ?)",
+                    (key, status, json.dumps(headers), body, entry[0])
+                )
+                self._writes += 1
+                if self._writes % PURGE_EVERY == 0:
+                    self.conn.execute("DELETE FROM response_cache WHERE expires <= ?", (time.time(),))
+                self.conn.commit()
+
+    def _remember(self, key: str, entry: Tuple[float, str, list, bytes]) -> None:
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_entries:
+            self._local.popitem(last=False)
+
+class RequestHandler(WSGIRequestHandler):
+    timeout = KEEPALIVE_TIMEOUT
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug server handling connections on a fixed thread pool
+
+    Connections are only accepted while a thread is free, so a busy worker
+    leaves new connections on the shared socket for its siblings.
+    """
+
+    multithread = True
+
+    def __init__(self, sock: socket.socket, app: Callable, threads: int):
+        host, port = sock.getsockname()[:2]
+        super().__init__(host, port, app, handler=RequestHandler, fd=sock.fileno())
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="serve")
+        self.slots = threading.BoundedSemaphore(threads)
+
+    def _handle_request_noblock(self) -> None:
+        # Wait for a free thread before accepting, then hand the connection to it
+        if not self.slots.acquire(timeout=0.5):
+            return
+        try:
+            request, client_address = self.get_request()
+        except OSError:
+            # Another worker accepted the connection first
+            self.slots.release()
+            return
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request: socket.socket, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def drain(self, timeout: float = GRACEFUL_TIMEOUT) -> None:
+        """Wait for in-flight requests after serve_forever has returned"""
+        waiter = threading.Thread(target=self.pool.shutdown, daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+
+class PreforkServer:
+    """
+    Master process forking WSGI workers that share one listening socket
+
+    The app and its read-only state are loaded in the master before
+    forking. SIGHUP reloads the app module and replaces the workers
+    without dropping requests; SIGTERM or SIGINT drains and stops them.
+    Workers that die unexpectedly are replaced.
+    """
+
+    def __init__(self, app_name: str, host: str = "127.0.0.1", port: int = 5000,
+                 workers: int = DEFAULT_WORKERS, threads: int = DEFAULT_THREADS,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH, cache_ttl: float = DEFAULT_CACHE_TTL,
+                 graceful_timeout: float = GRACEFUL_TIMEOUT):
+        """
+        Args:
+            app_name: Key of APPS to serve
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            workers: Worker processes
+            threads: Request threads per worker
+            cache_path: Shared response cache file (None disables response caching)
+            cache_ttl: Seconds cached responses stay valid
+            graceful_timeout: Seconds workers get to finish requests when stopping
+        """
+        if app_name not in APPS:
+            raise ValueError(f"Unknown app {app_name!r}; expected one of {', '.join(APPS)}")
+        self.app_name = app_name
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self.graceful_timeout = graceful_timeout
+        self.app: Optional[Callable] = None
+        self.socket: Optional[socket.socket] = None
+        self.children: Dict[int, int] = {}
+        self.generation = 0
+        self._signals: List[int] = []
+        self.preloaded: Dict[str, Any] = {}
+
+    def load_app(self) -> Callable:
+        """Import (or re-import) the app module and wrap it for serving"""
+        module_name = APPS[self.app_name]
+        if module_name in sys.modules:
+            module = importlib.reload(sys.modules[module_name])
+        else:
+            module = importlib.import_module(module_name)
+        return ResponseCache(module.app, self.cache_path, self.cache_ttl) if self.cache_path else module.app
+
+    def bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(1024)
+        # Non-blocking so a worker that loses the accept race goes back to waiting
+        sock.setblocking(False)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def run(self) -> None:
+        """Serve until SIGTERM or SIGINT"""
+        self.app = self.load_app()
+        self.preloaded = preload_shared_state()
+        self.socket = self.bind()
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, self._queue_signal)
+        print(f"Listening on http://{self.host}:{self.port}", flush=True)
+        log(f"master serving {self.app_name} with {self.workers} workers x {self.threads} threads "
+            f"(preloaded: {json.dumps(self.preloaded)})")
+        self.spawn_generation()
+
+        try:
+            while True:
+                while not self._signals:
+                    time.sleep(0.1)
+                sig = self._signals.pop(0)
+                if sig == signal.SIGHUP:
+                    self.reload()
+                elif sig == signal.SIGCHLD:
+                    self.reap(respawn=True)
+                else:
+                    break
+        finally:
+            self.stop()
+
+    def spawn_generation(self) -> None:
+        self.generation += 1
+        for _ in range(self.workers):
+            self.spawn()
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self.worker_main()
+            except BaseException:
+                logging.exception("worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = self.generation
+        return pid
+
+    def worker_main(self) -> None:
+        for sig in (signal.SIGHUP, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL if sig == signal.SIGCHLD else signal.SIG_IGN)
+        after_fork()
+        server = PooledWSGIServer(self.socket, self.app, self.threads)
+
+        def stop(signum: int, frame: Any) -> None:
+            # shutdown() waits for serve_forever, so it cannot run on the serving thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        server.serve_forever(poll_interval=0.5)
+        server.drain(self.graceful_timeout)
+
+    def reload(self) -> None:
+        """Reload the app, start a new generation of workers, then drain the old one"""
+        log("reloading")
+        try:
+            import geoip_resolver
+            geoip_resolver.close_readers()
+            self.app = self.load_app()
+            self.preloaded = preload_shared_state()
+        except Exception as e:
+            log(f"reload failed, keeping the running app: {e}")
+            return
+        old = [pid for pid, generation in self.children.items() if generation == self.generation]
+        self.spawn_generation()
+        for pid in old:
+            self._signal(pid, signal.SIGTERM)
+
+    def reap(self, respawn: bool = False) -> None:
+        """Collect exited workers, replacing current-generation ones that died"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self.children.pop(pid, None)
+            if respawn and generation == self.generation:
+                log(f"worker {pid} exited with status {status}; replacing it")
+                self.spawn()
+
+    def stop(self) -> None:
+        """Drain and stop every worker"""
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 1
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGKILL)
+        self.reap()
+        if self.socket is not None:
+            self.socket.close()
+
+    def _signal(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            self.children.pop(pid, None)
+
+    def _queue_signal(self, signum: int, frame: Any) -> None:
+        self._signals.append(signum)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument("app", choices=sorted(APPS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000, help="0 picks a free port")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Request threads per worker")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="Shared response cache file")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    parser.add_argument("--graceful-timeout", type=float, default=GRACEFUL_TIMEOUT)
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.access_log:
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    PreforkServer(
+        args.app, args.host, args.port, args.workers, args.threads,
+        None if args.no_cache else args.cache_path, args.cache_ttl, args.graceful_timeout
+    ).run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
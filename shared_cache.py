@@ -0,0 +1,195 @@
+"""
+Shared Result Cache
+Two-tier cache: a bounded in-process LRU in front of a SQLite file shared by every worker process
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", "findings/shared_cache.db")
+# Lifetime of entries stored without a provider TTL
+DEFAULT_TTL = float(os.environ.get("SHARED_CACHE_TTL", "3600"))
+# Each process keeps at most this many entries, and this many encoded bytes, in memory
+LOCAL_CACHE_ENTRIES = 1024
+LOCAL_CACHE_BYTES = 32 * 1024 * 1024
+# Rows kept in the shared file; the entries closest to expiry are dropped first
+SHARED_CACHE_ENTRIES = 100000
+# Expired and surplus shared rows are purged after this many writes
+PURGE_EVERY = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS shared_cache_expires ON shared_cache (expires);
+"""
+
+class SharedCache:
+    """
+    JSON values cached per process and across processes
+
+    Reads check the process-local LRU first, then the shared SQLite file,
+    so a result stored by one worker is a hit for every other worker until
+    its TTL runs out. Values are kept encoded in both tiers: the local tier
+    is bounded by entries and bytes, and callers get a fresh copy they can
+    modify without touching the cache.
+    """
+
+    _default: Optional["SharedCache"] = None
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 local_entries: int = LOCAL_CACHE_ENTRIES, local_bytes: int = LOCAL_CACHE_BYTES,
+                 shared_entries: int = SHARED_CACHE_ENTRIES):
+        """
+        Args:
+            path: Shared SQLite cache file (None for a process-local cache only)
+            ttl: Seconds an entry stays valid when set without a TTL
+            local_entries: Entries kept in this process's memory
+            local_bytes: Encoded bytes kept in this process's memory
+            shared_entries: Rows kept in the shared file
+        """
+        self.path = path
+        self.ttl = ttl
+        self.local_entries = local_entries
+        self.local_bytes = local_bytes
+        self.shared_entries = shared_entries
+        self._local: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._local_size = 0
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._writes = 0
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def default(cls) -> "SharedCache":
+        """Process-wide cache backed by the default shared file"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Opened per process: a connection inherited across fork must not be used
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["local_hits"] + self.stats["shared_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Cached value for a key, or the default if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > now:
+                self._local.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return json.loads(entry[1])
+            self._forget(key)
+            if self.path:
+                row = self.conn.execute(
+                    "SELECT value, expires FROM shared_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._remember(key, row[1], bytes(row[0]))
+                    self.stats["shared_hits"] += 1
+                    return json.loads(row[0])
+            self.stats["misses"] += 1
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value in both tiers
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Seconds the value stays valid (None for the cache default, 0 to skip caching)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        encoded = json.dumps(value, default=str).encode()
+        expires = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires, encoded)
+            if self.path:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO shared_cache (key, value, expires) VALUES (?, ?, ?)",
+                    (key, encoded, expires)
+                )
+                self._writes += 1
+                if self._writes % PURGE_EVERY == 0:
+                    self._purge()
+                self.conn.commit()
+
+    def values(self, prefix: str = "") -> List[Any]:
+        """Unexpired values whose keys start with a prefix, in key order"""
+        now = time.time()
+        with self._lock:
+            if not self.path:
+                return [json.loads(value) for key, (expires, value) in sorted(self._local.items())
+                        if key.startswith(prefix) and expires > now]
+            rows = self.conn.execute(
+                "SELECT value FROM shared_cache WHERE key >= ? AND key < ? AND expires > ? ORDER BY key",
+                (prefix, prefix + "\uffff", now)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def purge_expired(self) -> int:
+        """Drop expired and surplus shared rows, returning how many were removed"""
+        with self._lock:
+            if not self.path:
+                return 0
+            deleted = self._purge()
+            self.conn.commit()
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def _purge(self) -> int:
+        deleted = self.conn.execute("DELETE FROM shared_cache WHERE expires <= ?", (time.time(),)).rowcount
+        surplus = self.conn.execute("SELECT COUNT(*) FROM shared_cache").fetchone()[0] - self.shared_entries
+        if surplus > 0:
+            deleted += self.conn.execute(
+                "DELETE FROM shared_cache WHERE key IN (SELECT key FROM shared_cache ORDER BY expires LIMIT ?)",
+                (surplus,)
+            ).rowcount
+        return deleted
+
+    def _remember(self, key: str, expires: float, encoded: bytes) -> None:
+        self._forget(key)
+        if len(encoded) > self.local_bytes:
+            return
+        self._local[key] = (expires, encoded)
+        self._local_size += len(encoded)
+        while len(self._local) > self.local_entries or self._local_size > self.local_bytes:
+            _, (_, evicted) = self._local.popitem(last=False)
+            self._local_size -= len(evicted)
+
+    def _forget(self, key: str) -> None:
+        entry = self._local.pop(key, None)
+        if entry is not None:
+            self._local_size -= len(entry[1])
@@ -1,14 +1,20 @@
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
 from rich.console import Console
 from advanced_scanner import AdvancedScanner
+from target_routing import RoutingPlan
+from ioc_feeds import FeedSet
+from geoip_resolver import GeoIPResolver, default_resolver
 import json
 from datetime import datetime
 
 class SpecializedScanner(AdvancedScanner):
     """Specialized scanning capabilities for geospatial and communication intelligence"""
 
-    def analyze_geospatial(self, target: str) -> Dict[str, Any]:
+    def __init__(self, feed_set: Optional[FeedSet] = None, geoip: Optional[GeoIPResolver] = None):
+        super().__init__(feed_set)
+        self.geoip = geoip or default_resolver()
+
+    def analyze_geospatial(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Premium geospatial intelligence analysis"""
         results = {
             "location_history": [],
@@ -20,76 +26,19 @@ class SpecializedScanner(AdvancedScanner):
             "facility_identification": {},
             "pattern_of_life": {},
             "proximity_analysis": {},
-            "temporal_changes": {}
+            "temporal_changes": {},
+            "ip_geolocation": {}
         }
 
-        if "GEOSPATIAL_INTELLIGENCE" in self.api_keys:
-            for provider, key in self.api_keys["GEOSPATIAL_INTELLIGENCE"].items():
-                try:
-                    if provider == "maxar":
-                        # Maxar SecureWatch
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "imagery": "https://api.maxar.com/imagery/search",
-                            "analysis": "https://api.maxar.com/analytics/detect",
-                            "change": "https://api.maxar.com/analytics/change"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={
-                                    "location": target,
-                                    "start_date": "2023-01-01",
-                                    "end_date": datetime.now().strftime("%Y-%m-%d")
-                                }
-                            )
-                            if response.status_code == 200:
-                                results["satellite_imagery"][f"maxar_{endpoint_name}"] = response.json()
-
-                    elif provider == "planet":
-                        # Planet Labs
-                        headers = {"X-API-Key": key}
-                        endpoints = {
-                            "daily": "https://api.planet.com/data/v1/daily",
-                            "basemaps": "https://api.planet.com/basemaps/v1/mosaic",
-                            "analytics": "https://api.planet.com/analytics/v1"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={"location": target}
-                            )
-                            if response.status_code == 200:
-                                results["terrain_analysis"][f"planet_{endpoint_name}"] = response.json()
-
-                    elif provider == "nearmap":
-                        # Nearmap API
-                        headers = {"Authorization": f"Bearer {key}"}
-                        endpoints = {
-                            "surveys": "https://api.nearmap.com/coverage/v2/surveys",
-                            "tiles": "https://api.nearmap.com/tiles/v3",
-                            "features": "https://api.nearmap.com/ai/v4/features"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(
-                                url,
-                                headers=headers,
-                                params={"point": target}
-                            )
-                            if response.status_code == 200:
-                                results["infrastructure_mapping"][f"nearmap_{endpoint_name}"] = response.json()
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
+        # IP targets are placed from the local databases (remote fallback only on a miss)
+        record = self.geoip.resolve(target)
+        if record:
+            results["ip_geolocation"] = record
+            results["location_history"].append(record)
 
-        return results
+        return self._run_adapters("GEOSPATIAL_INTELLIGENCE", target, results, plan)
 
-    def analyze_communications(self, target: str) -> Dict[str, Any]:
+    def analyze_communications(self, target: str, plan: Optional[RoutingPlan] = None) -> Dict[str, Any]:
         """Advanced communication intelligence analysis"""
         results = {
             "network_analysis": {},
@@ -102,54 +51,23 @@ class SpecializedScanner(AdvancedScanner):
             "relationship_strength": {}
         }
 
-        if "COMMUNICATION_INTELLIGENCE" in self.api_keys:
-            for provider, key in self.api_keys["COMMUNICATION_INTELLIGENCE"].items():
-                try:
-                    if provider == "twilio":
-                        # Twilio Lookup & Intelligence
-                        auth = (key, self.api_keys["COMMUNICATION_INTELLIGENCE"].get("twilio_auth_token", ""))
-                        endpoints = {
-                            "lookup": f"https://lookups.twilio.com/v2/PhoneNumbers/{target}",
-                            "carrier": f"https://lookups.twilio.com/v2/PhoneNumbers/{target}/carrier",
-                            "caller-name": f"https://lookups.twilio.com/v2/PhoneNumbers/{target}/caller-name"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(url, auth=auth)
-                            if response.status_code == 200:
-                                results["network_analysis"][f"twilio_{endpoint_name}"] = response.json()
-
-                    elif provider == "messagebird":
-                        # MessageBird Insights
-                        headers = {"Authorization": f"AccessKey {key}"}
-                        endpoints = {
-                            "lookup": f"https://lookup.messagebird.com/v1/phones/{target}",
-                            "hlr": f"https://lookup.messagebird.com/v1/hlr/{target}",
-                            "coverage": f"https://lookup.messagebird.com/v1/coverage/{target}"
-                        }
-                        
-                        for endpoint_name, url in endpoints.items():
-                            response = requests.get(url, headers=headers)
-                            if response.status_code == 200:
-                                results["device_signatures"][f"messagebird_{endpoint_name}"] = response.json()
-
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider}: {str(e)}[/red]")
-
-        return results
+        return self._run_adapters("COMMUNICATION_INTELLIGENCE", target, results, plan)
 
     def deep_scan(self, target: str) -> Dict[str, Any]:
         """Execute deep specialized intelligence gathering"""
         self.console.print(f"[green]Starting specialized deep scan for target: {target}[/green]")
         
+        plan = RoutingPlan(target)
+
         # Get comprehensive results from parent class
-        results = super().comprehensive_scan(target)
+        results = super().comprehensive_scan(target, plan)
         
         # Add specialized analysis
-        results.update({
-            "geospatial_intelligence": self.analyze_geospatial(target),
-            "communication_intelligence": self.analyze_communications(target)
-        })
+        results.update(self._run_routed_analyzers(target, plan, {
+            "geospatial_intelligence": self.analyze_geospatial,
+            "communication_intelligence": self.analyze_communications
+        }))
+        results["scan_metadata"].update(plan.to_metadata())
 
         # Enhanced correlation analysis
         results["advanced_correlation"] = self._perform_advanced_correlation(results)
@@ -5,6 +5,10 @@ Implements specific scanning logic for each intelligence category
 
 from typing import Dict, Any, Optional
 from scanner_core import ScannerCore
+from ioc_feeds import FeedSet, LOCAL_MATCH_SCORE
+from dns_resolver import DNSResolver, CACHEABLE_STATUSES, flatten_records
+from whois_client import WhoisClient
+from tls_probe import TLSProber
 from datetime import datetime
 import json
 
@@ -106,6 +110,17 @@ class EmailScanner(ScannerCore):
 
 class DomainScanner(ScannerCore):
     """Domain intelligence gathering"""
+
+    def __init__(
+        self,
+        dns_resolver: Optional[DNSResolver] = None,
+        whois_client: Optional[WhoisClient] = None,
+        tls_prober: Optional[TLSProber] = None
+    ):
+        super().__init__()
+        self.dns_resolver = dns_resolver or DNSResolver.default()
+        self.whois_client = whois_client or WhoisClient.default()
+        self.tls_prober = tls_prober or TLSProber.default()
     
     def gather_intelligence(self, domain: str, provider: str) -> Dict[str, Any]:
         results = {
@@ -119,35 +134,47 @@ class DomainScanner(ScannerCore):
             "historical_records": []
         }
 
-        # WHOIS lookup
-        whois = self.api_manager.make_request(
-            service="DOMAIN_INTELLIGENCE",
-            provider=provider,
-            endpoint="whois",
-            params={"domain": domain}
-        )
+        # WHOIS lookup via RDAP/port 43; the provider quota is only spent when both fail
+        whois = self.whois_client.lookup(domain)
+        if whois is None:
+            whois = self.api_manager.make_request(
+                service="DOMAIN_INTELLIGENCE",
+                provider=provider,
+                endpoint="whois",
+                params={"domain": domain}
+            )
         if whois:
             results["whois_data"] = whois
 
-        # DNS records
-        dns = self.api_manager.make_request(
-            service="DOMAIN_INTELLIGENCE",
-            provider=provider,
-            endpoint="dns",
-            params={"domain": domain}
-        )
-        if dns:
-            results["dns_records"] = dns
+        # DNS records, resolved in-process; the provider is only asked if resolution failed
+        answers = self.dns_resolver.resolve(domain)
+        results["dns_records"] = flatten_records(answers)
+        if answers and all(answer["status"] not in CACHEABLE_STATUSES for answer in answers.values()):
+            dns = self.api_manager.make_request(
+                service="DOMAIN_INTELLIGENCE",
+                provider=provider,
+                endpoint="dns",
+                params={"domain": domain}
+            )
+            if dns:
+                results["dns_records"] = dns
 
-        # SSL certificates
-        ssl = self.api_manager.make_request(
-            service="DOMAIN_INTELLIGENCE",
-            provider=provider,
-            endpoint="ssl",
-            params={"domain": domain}
-        )
-        if ssl:
-            results["ssl_certificates"] = ssl
+        # SSL certificates from a direct handshake; the provider is only asked if it failed
+        probe = self.tls_prober.probe(domain)
+        if probe["status"] == "ok":
+            results["ssl_certificates"] = probe["chain"]
+            results["hosting_info"]["tls"] = {"handshake": probe["tls"], "fingerprints": probe["fingerprints"]}
+            if probe.get("http") and probe["http"]["server"]:
+                results["technology_stack"].append(probe["http"]["server"])
+        else:
+            ssl = self.api_manager.make_request(
+                service="DOMAIN_INTELLIGENCE",
+                provider=provider,
+                endpoint="ssl",
+                params={"domain": domain}
+            )
+            if ssl:
+                results["ssl_certificates"] = ssl
 
         return results
 
@@ -198,6 +225,10 @@ class BreachScanner(ScannerCore):
 
 class ThreatScanner(ScannerCore):
     """Threat intelligence gathering"""
+
+    def __init__(self, feed_set: Optional[FeedSet] = None):
+        super().__init__()
+        self.feed_set = feed_set or FeedSet.default()
     
     def gather_intelligence(self, target: str, provider: str) -> Dict[str, Any]:
         results = {
@@ -211,6 +242,14 @@ class ThreatScanner(ScannerCore):
             "historical_attacks": []
         }
 
+        # Indicators published in local feeds are answered without provider calls
+        local_matches = self.feed_set.lookup(target)
+        if local_matches:
+            results["threat_score"] = LOCAL_MATCH_SCORE
+            results["indicators"] = local_matches
+            results["source"] = "local_feeds"
+            return results
+
         # Threat analysis
         threats = self.api_manager.make_request(
             service="THREAT_INTELLIGENCE",
@@ -0,0 +1,274 @@
+"""
+Streaming JSON Parsing
+Incrementally parses provider response bodies, keeping only the fields a caller needs
+"""
+
+import codecs
+import json
+from typing import Dict, Any, Iterable, Optional, Tuple, Union
+
+# Field spec: top-level key -> None to keep the whole value, or item keys to keep per array item
+FieldSpec = Dict[str, Optional[Tuple[str, ...]]]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a number cut at a chunk boundary
+_NUMBER_CHARS = "0123456789.eE+-"
+
+class BodyLimitExceeded(Exception):
+    """Raised internally when a response body passes its byte cap"""
+
+class TruncatedList(list):
+    """
+    Top-level array that was cut short
+
+    Behaves as the partial list; `truncated` maps "_items" to the full item
+    count when max_items applied and "_body" to the bytes read when max_bytes
+    was hit.
+    """
+
+    def __init__(self, items: Iterable[Any] = (), truncated: Optional[Dict[str, int]] = None):
+        super().__init__(items)
+        self.truncated: Dict[str, int] = truncated or {}
+
+class _JSONStream:
+    """Character buffer over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], max_bytes: Optional[int] = None):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.max_bytes = max_bytes
+        self.buf = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping the consumed prefix"""
+        if self.exhausted:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.buf += self._decoder.decode(b"", final=True)
+            self.exhausted = True
+            return False
+
+        if isinstance(chunk, str):
+            text = chunk
+            self.bytes_read += len(chunk)
+        else:
+            text = self._decoder.decode(chunk)
+            self.bytes_read += len(chunk)
+
+        if self.max_bytes is not None and self.bytes_read > self.max_bytes:
+            self.exhausted = True
+            raise BodyLimitExceeded()
+
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += text
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at end of body)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON body, found '{found or 'end of body'}'")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        """Decode one complete JSON value at the current position"""
+        self.peek()
+        wanted = len(self.buf) - self.pos
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+                # A scalar ending exactly at the buffer edge may continue in the next chunk,
+                # and so may a number followed only by a cut-off fraction or exponent
+                if self.exhausted or (end < len(self.buf) and not self._number_cut(value, end)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            # Grow the buffer geometrically so large values are not re-parsed per chunk
+            wanted = max(wanted * 2, DEFAULT_CHUNK_SIZE)
+            while len(self.buf) - self.pos < wanted and self.fill():
+                pass
+
+    def _number_cut(self, value: Any, end: int) -> bool:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return False
+        return all(char in _NUMBER_CHARS for char in self.buf[end:])
+
+    def skip_value(self) -> None:
+        """Consume one JSON value without building it"""
+        first = self.peek()
+        depth = 0
+        in_string = False
+        escaped = False
+        scalar = first not in "[{\""
+
+        while True:
+            buf = self.buf
+            while self.pos < len(buf):
+                char = buf[self.pos]
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == "\"":
+                        in_string = False
+                        if depth == 0:
+                            self.pos += 1
+                            return
+                elif scalar:
+                    if char in ",}]" or char in _WHITESPACE:
+                        return
+                elif char == "\"":
+                    in_string = True
+                elif char in "[{":
+                    depth += 1
+                elif char in "]}":
+                    depth -= 1
+                    if depth == 0:
+                        self.pos += 1
+                        return
+                self.pos += 1
+            if not self.fill():
+                if scalar:
+                    return
+                raise ValueError("Unexpected end of JSON body")
+
+def _trim(value: Any, keys: Optional[Tuple[str, ...]]) -> Any:
+    if keys is not None and isinstance(value, dict):
+        return {key: value[key] for key in keys if key in value}
+    return value
+
+def _read_array(stream: _JSONStream, keys: Optional[Tuple[str, ...]], max_items: Optional[int],
+                items: Optional[list] = None) -> Tuple[list, int]:
+    """Read array items one at a time into items, keeping at most max_items"""
+    items = [] if items is None else items
+    total = 0
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return items, total
+
+    while True:
+        if max_items is None or total < max_items:
+            items.append(_trim(stream.decode_value(), keys))
+        else:
+            stream.skip_value()
+        total += 1
+
+        separator = stream.peek()
+        stream.pos += 1
+        if separator == "]":
+            return items, total
+        if separator != ",":
+            raise ValueError("Malformed JSON array in response body")
+
+def extract_json(
+    chunks: Iterable[Union[bytes, str]],
+    fields: Optional[FieldSpec] = None,
+    max_items: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> Any:
+    """
+    Incrementally parse a JSON body, keeping only what is needed
+
+    Args:
+        chunks: Body chunks (bytes or str)
+        fields: Top-level keys to keep, each with optional per-item keys (None keeps everything)
+        max_items: Maximum items kept from any streamed array
+        max_bytes: Maximum body bytes read before parsing stops
+
+    Objects that were cut short carry a "_truncated" entry mapping each capped field
+    to its full item count, and "_body" to the bytes read when max_bytes was hit.
+    A top-level array that was cut short is returned as a TruncatedList of the
+    items read, with the same information in its `truncated` attribute.
+    """
+    stream = _JSONStream(chunks, max_bytes)
+    truncated: Dict[str, int] = {}
+    result: Dict[str, Any] = {}
+    array: list = []
+    first = ""
+
+    try:
+        first = stream.peek()
+        if first == "[":
+            _, total = _read_array(stream, None, max_items, array)
+            if total > len(array):
+                return TruncatedList(array, {"_items": total})
+            return array
+
+        if first != "{":
+            return stream.decode_value()
+
+        stream.expect("{")
+        if stream.peek() == "}":
+            stream.pos += 1
+            return result
+
+        while True:
+            key = stream.decode_value()
+            stream.expect(":")
+
+            if fields is not None and key not in fields:
+                stream.skip_value()
+            else:
+                keys = fields.get(key) if fields is not None else None
+                if stream.peek() == "[" and (keys is not None or max_items is not None):
+                    items, total = _read_array(stream, keys, max_items)
+                    result[key] = items
+                    if total > len(items):
+                        truncated[key] = total
+                else:
+                    result[key] = _trim(stream.decode_value(), keys)
+
+            separator = stream.peek()
+            stream.pos += 1
+            if separator == "}":
+                break
+            if separator != ",":
+                raise ValueError("Malformed JSON object in response body")
+
+    except BodyLimitExceeded:
+        truncated["_body"] = stream.bytes_read
+        if first == "[":
+            return TruncatedList(array, truncated)
+        if first == "{":
+            result["_truncated"] = truncated
+            return result
+        return {"_truncated": truncated}
+
+    if truncated:
+        result["_truncated"] = truncated
+    return result
+
+def read_json(
+    response: Any,
+    fields: Optional[FieldSpec] = None,
+    max_items: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Any:
+    """Parse a streamed requests response body with extract_json"""
+    try:
+        return extract_json(response.iter_content(chunk_size=chunk_size), fields, max_items, max_bytes)
+    finally:
+        response.close()
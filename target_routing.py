@@ -0,0 +1,159 @@
+"""
+Target Routing
+Maps classified target types to the analyzers and intelligence categories that accept them
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+
+# Cryptocurrency address patterns
+CRYPTO_PATTERNS = {
+    "bitcoin": re.compile(r"^(bc1|[13])[a-zA-HJ-NP-Z0-9]{25,39}$"),
+    "ethereum": re.compile(r"^0x[a-fA-F0-9]{40}$"),
+    "ripple": re.compile(r"^r[0-9a-zA-Z]{24,34}$")
+}
+
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+DOMAIN_PATTERN = re.compile(r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
+IP_PATTERN = re.compile(
+    r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
+)
+# International numbers carry a leading +; national ones need area code, exchange and line groups
+PHONE_PATTERN = re.compile(r"^\+[0-9][0-9\s().-]{5,20}[0-9]$")
+NATIONAL_PHONE_PATTERN = re.compile(r"^(?:\(\d{2,4}\)\s?|\d{2,4}[\s.-]?)\d{3,4}[\s.-]?\d{3,4}$")
+# Digit-and-separator shapes that are not phone numbers
+DATE_PATTERN = re.compile(r"^(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})$")
+DOTTED_PATTERN = re.compile(r"^\d{1,3}(?:\.\d{1,3}){1,3}$")
+
+# Target types with no entry are routed everywhere, since nothing can be ruled out
+TARGET_ROUTES = {
+    "email": {
+        "analyzers": [
+            "analyze_threat_intelligence", "analyze_dark_web",
+            "analyze_social_intelligence"
+        ],
+        "categories": [
+            "EMAIL_INTELLIGENCE", "BREACH_INTELLIGENCE", "SOCIAL_INTELLIGENCE",
+            "THREAT_INTELLIGENCE", "PEOPLE_SEARCH", "DEEP_WEB_INTELLIGENCE"
+        ]
+    },
+    "phone": {
+        "analyzers": ["analyze_dark_web", "analyze_communications"],
+        "categories": [
+            "PHONE_INTELLIGENCE", "BREACH_INTELLIGENCE", "PEOPLE_SEARCH",
+            "DEEP_WEB_INTELLIGENCE"
+        ]
+    },
+    "domain": {
+        "analyzers": [
+            "analyze_threat_intelligence", "analyze_dark_web",
+            "analyze_financial_intelligence"
+        ],
+        "categories": [
+            "DOMAIN_INTELLIGENCE", "NETWORK_INTELLIGENCE", "THREAT_INTELLIGENCE",
+            "DEEP_WEB_INTELLIGENCE"
+        ]
+    },
+    "ip": {
+        "analyzers": [
+            "analyze_threat_intelligence", "analyze_dark_web", "analyze_geospatial"
+        ],
+        "categories": [
+            "NETWORK_INTELLIGENCE", "THREAT_INTELLIGENCE", "LOCATION_INTELLIGENCE",
+            "DEEP_WEB_INTELLIGENCE"
+        ]
+    },
+    "crypto_address": {
+        "analyzers": [
+            "analyze_threat_intelligence", "analyze_dark_web", "analyze_blockchain",
+            "analyze_financial_intelligence"
+        ],
+        "categories": [
+            "THREAT_INTELLIGENCE", "DEEP_WEB_INTELLIGENCE", "FINANCIAL_INTELLIGENCE"
+        ]
+    }
+}
+
+def classify_target(target: Any) -> str:
+    """Identify the type of a target identifier"""
+    if not isinstance(target, str):
+        return "unknown"
+
+    target = target.strip()
+
+    for pattern in CRYPTO_PATTERNS.values():
+        if pattern.match(target):
+            return "crypto_address"
+
+    if EMAIL_PATTERN.match(target):
+        return "email"
+    elif IP_PATTERN.match(target):
+        return "ip"
+    elif DOMAIN_PATTERN.match(target):
+        return "domain"
+    elif _is_phone(target):
+        return "phone"
+
+    return "unknown"
+
+def _is_phone(target: str) -> bool:
+    if DATE_PATTERN.match(target) or DOTTED_PATTERN.match(target):
+        return False
+    if not (PHONE_PATTERN.match(target) or NATIONAL_PHONE_PATTERN.match(target)):
+        return False
+    return 7 <= sum(c.isdigit() for c in target) <= 15
+
+def get_routes(target_type: str) -> Optional[Dict[str, List[str]]]:
+    """Get the routing entry for a target type (None if every route applies)"""
+    return TARGET_ROUTES.get(target_type)
+
+def accepts_analyzer(target_type: str, analyzer: str) -> bool:
+    """Check whether an analyzer can produce results for a target type"""
+    routes = get_routes(target_type)
+    return routes is None or analyzer in routes["analyzers"]
+
+def accepts_category(target_type: str, category: str) -> bool:
+    """Check whether an intelligence category can produce results for a target type"""
+    routes = get_routes(target_type)
+    return routes is None or category in routes["categories"]
+
+class RoutingPlan:
+    """Routing decisions for a single scan, including the calls that were skipped"""
+
+    def __init__(self, target: Any, target_type: Optional[str] = None):
+        self.target = target
+        self.target_type = target_type or classify_target(target)
+        self.skipped_calls: List[str] = []
+
+    def allows_analyzer(self, analyzer: str) -> bool:
+        """Check an analyzer, recording it as skipped if the target cannot match"""
+        if accepts_analyzer(self.target_type, analyzer):
+            return True
+        self._skip(analyzer)
+        return False
+
+    def allows_category(self, category: str) -> bool:
+        """Check a category, recording it as skipped if the target cannot match"""
+        if accepts_category(self.target_type, category):
+            return True
+        self._skip(category)
+        return False
+
+    def filter_categories(self, categories: List[str]) -> List[str]:
+        """Reduce a list of categories to the ones that accept this target"""
+        return [category for category in categories if self.allows_category(category)]
+
+    def skip(self, call: str) -> None:
+        """Record a call skipped by a finer-grained routing decision"""
+        self._skip(call)
+
+    def _skip(self, call: str) -> None:
+        if call not in self.skipped_calls:
+            self.skipped_calls.append(call)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """Routing summary for inclusion in scan_metadata"""
+        return {
+            "target_type": self.target_type,
+            "skipped_calls": list(self.skipped_calls)
+        }
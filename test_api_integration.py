@@ -3,7 +3,9 @@ API Integration Tests for Intelligence Scanners
 Tests live API endpoints and edge cases
 """
 
+import tempfile
 import unittest
+from unittest import mock
 import json
 from datetime import datetime
 from scanner_modules import (
@@ -11,6 +13,9 @@ from scanner_modules import (
     ThreatScanner, SocialScanner
 )
 from breach_scanner import BreachScanner
+from breach_store import BreachStore
+from whois_client import WhoisClient
+from tls_probe import TLSProber, FingerprintIndex
 from deep_scanner import DeepScanner
 
 class TestAPIIntegration(unittest.TestCase):
@@ -18,6 +23,15 @@ class TestAPIIntegration(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures"""
+        # Breach records go to a temporary store and the WHOIS and TLS stores stay in memory,
+        # rather than under findings/
+        self.breach_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.breach_dir.cleanup)
+        for cls, store in ((WhoisClient, WhoisClient(":memory:")),
+                           (TLSProber, TLSProber(index=FingerprintIndex(":memory:")))):
+            patcher = mock.patch.object(cls, "_default", store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
         self.test_data = {
             "valid": {
                 "email": "test@example.com",
@@ -42,7 +56,7 @@ class TestAPIIntegration(unittest.TestCase):
             "phone": PhoneScanner(),
             "email": EmailScanner(),
             "domain": DomainScanner(),
-            "breach": BreachScanner(),
+            "breach": BreachScanner(breach_store=BreachStore(self.breach_dir.name)),
             "threat": ThreatScanner(),
             "social": SocialScanner()
         }
@@ -0,0 +1,257 @@
+"""
+Test Suite for the ASGI Scanner Application
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+from asgi_app import ScannerASGI, ScanLimiter, STATIC_CHUNK_BYTES
+
+class FakeAPIManager:
+    def get_providers(self, service):
+        return {"fake": {"url": "https://fake.example", "capabilities": [], "rate_limit": None}}
+
+class SlowScanner:
+    """Scanner that blocks like a provider call"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.api_manager = FakeAPIManager()
+        self.threads = set()
+
+    def gather_intelligence(self, target, provider):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return {"target": target, "provider": provider}
+
+class FakeDeepScanner:
+    def deep_scan(self, target, scan_types=None, on_progress=None):
+        on_progress = on_progress or (lambda event: None)
+        for category in scan_types or ["EMAIL_INTELLIGENCE", "BREACH_INTELLIGENCE"]:
+            time.sleep(0.02)
+            on_progress({"stage": "category", "category": category, "status": "done", "data": {"hits": 1}})
+        on_progress({"stage": "risk", "overall_risk_score": 0.4})
+        return {"scan_metadata": {"target": target}, "risk_assessment": {"overall_risk_score": 0.4}}
+
+async def request(app, method, path, body=None, headers=None, query=b""):
+    """Drive one HTTP request through the ASGI app, returning (status, headers, body messages)"""
+    payload = b"" if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    header_list = [(b"content-type", b"application/json")] if body is not None else []
+    header_list += [(name.encode(), value.encode()) for name, value in (headers or {}).items()]
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": header_list}
+    incoming = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent[0]
+    return start["status"], dict(start["headers"]), sent[1:]
+
+def body_of(messages):
+    return b"".join(message.get("body", b"") for message in messages)
+
+class TestASGIApp(unittest.TestCase):
+    """Test cases for routes, backpressure, streaming, WebSockets and static files"""
+
+    def setUp(self):
+        self.scanner = SlowScanner()
+        self.app = ScannerASGI({"email": self.scanner}, FakeDeepScanner, ScanLimiter(concurrency=8))
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_scan_endpoint_and_validation(self):
+        """Test scans run on the executor and bad requests get scanner_app's errors"""
+        status, headers, messages = self.run_async(request(self.app, "POST", "/api/scan/email", {"target": "a@example.com"}))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body_of(messages)), {"target": "a@example.com", "provider": "fake"})
+        self.assertNotIn(threading.get_ident(), self.scanner.threads)
+
+        cases = [
+            ("/api/scan/email", b'{"target": "x"', "Invalid JSON format"),
+            ("/api/scan/email", {}, "Target is required"),
+            ("/api/scan/nope", {"target": "x"}, "Invalid scanner type"),
+            ("/api/scan/email", {"target": "x", "provider": "other"}, "Invalid provider"),
+            ("/api/deep-scan", {"target": "x", "scan_types": "EMAIL"}, "scan_types must be a list"),
+        ]
+        for path, body, error in cases:
+            status, _, messages = self.run_async(request(self.app, "POST", path, body))
+            self.assertEqual((status, json.loads(body_of(messages))["error"]), (400, error))
+        status, _, messages = self.run_async(request(self.app, "POST", "/api/scan/email"))
+        self.assertEqual(json.loads(body_of(messages))["error"], "Request must be JSON")
+
+    def test_thousands_of_concurrent_slow_scans(self):
+        """Test the default limits take thousands of slow scans at once, queueing rather than refusing them"""
+        scanner = SlowScanner(delay=1.0)
+        app = ScannerASGI({"email": scanner}, FakeDeepScanner, ScanLimiter())
+
+        async def burst():
+            return await asyncio.gather(*[
+                request(app, "POST", "/api/scan/email", {"target": f"user{i}@example.com"}) for i in range(2000)
+            ])
+
+        started = time.perf_counter()
+        results = self.run_async(burst())
+        elapsed = time.perf_counter() - started
+        self.assertEqual({status for status, _, _ in results}, {200})
+        self.assertEqual(app.limiter.stats["rejected"], 0)
+        # Serially these would take 2000 s; with the default 1024 threads it is two rounds
+        self.assertLess(elapsed, 15)
+        print(f"\n2000 scans of 1 s each in {elapsed:.2f} s")
+        app.limiter.shutdown()
+
+    def test_backpressure(self):
+        """Test scans beyond the concurrency and queue limits get 503 with Retry-After"""
+        scanner = SlowScanner(delay=0.3)
+        app = ScannerASGI({"email": scanner}, FakeDeepScanner, ScanLimiter(concurrency=2, max_queued=3))
+
+        async def burst():
+            return await asyncio.gather(*[
+                request(app, "POST", "/api/scan/email", {"target": str(i)}) for i in range(10)
+            ])
+
+        results = self.run_async(burst())
+        statuses = sorted(status for status, _, _ in results)
+        self.assertEqual(statuses, [200] * 5 + [503] * 5)
+        rejected = next(headers for status, headers, _ in results if status == 503)
+        self.assertEqual(rejected[b"retry-after"], b"5")
+        self.assertEqual(app.limiter.stats["rejected"], 5)
+
+        timed_out = ScannerASGI({"email": scanner}, FakeDeepScanner, ScanLimiter(concurrency=1, timeout=0.1))
+
+        async def pair():
+            return await asyncio.gather(*[request(timed_out, "POST", "/api/scan/email", {"target": "x"}) for _ in range(2)])
+
+        self.assertEqual(sorted(status for status, _, _ in self.run_async(pair())), [200, 503])
+
+    def test_deep_scan_streams_ndjson(self):
+        """Test deep scan progress is streamed line by line before the result"""
+        status, headers, messages = self.run_async(request(
+            self.app, "POST", "/api/deep-scan", {"target": "a@example.com", "scan_types": ["EMAIL_INTELLIGENCE"]},
+            headers={"accept": "application/x-ndjson"}
+        ))
+        self.assertEqual(headers[b"content-type"], b"application/x-ndjson")
+        events = [json.loads(line) for line in body_of(messages).splitlines()]
+        self.assertEqual([event["stage"] for event in events], ["category", "risk", "complete"])
+        self.assertEqual(events[-1]["result"]["scan_types"], ["EMAIL_INTELLIGENCE"])
+        self.assertGreaterEqual(sum(message.get("more_body", False) for message in messages), 3)
+
+        status, _, messages = self.run_async(request(self.app, "POST", "/api/deep-scan", {"target": "a@example.com"}))
+        result = json.loads(body_of(messages))
+        self.assertEqual((result["target"], result["scan_types"]), ("a@example.com", "all"))
+        self.assertEqual(result["risk_assessment"]["overall_risk_score"], 0.4)
+
+    def test_websocket_progress(self):
+        """Test a WebSocket deep scan reports each stage and closes normally"""
+        async def session(payload):
+            incoming = [{"type": "websocket.connect"}, {"type": "websocket.receive", "text": payload}]
+            sent = []
+
+            async def receive():
+                if incoming:
+                    return incoming.pop(0)
+                await asyncio.sleep(3600)
+
+            async def send(message):
+                sent.append(message)
+
+            await self.app({"type": "websocket", "path": "/ws/deep-scan", "headers": []}, receive, send)
+            return sent
+
+        sent = self.run_async(session(json.dumps({"target": "a@example.com"})))
+        self.assertEqual(sent[0]["type"], "websocket.accept")
+        stages = [json.loads(message["text"])["stage"] for message in sent if message["type"] == "websocket.send"]
+        self.assertEqual(stages, ["category", "category", "risk", "complete"])
+        self.assertEqual(sent[-1], {"type": "websocket.close", "code": 1000})
+
+        sent = self.run_async(session(json.dumps({"scan_types": []})))
+        self.assertEqual(json.loads(sent[1]["text"])["error"], "Target is required")
+        self.assertEqual(sent[-1]["code"], 1008)
+
+    def test_static_files_stream_in_chunks(self):
+        """Test static files are sent in chunks and paths cannot escape the root"""
+        root = tempfile.mkdtemp()
+        try:
+            content = os.urandom(STATIC_CHUNK_BYTES * 3 + 100)
+            with open(os.path.join(root, "bundle.js"), "wb") as f:
+                f.write(content)
+            with open(os.path.join(root, "index.html"), "w") as f:
+                f.write("<html></html>")
+            app = ScannerASGI({}, FakeDeepScanner, ScanLimiter(concurrency=1), static_root=root)
+
+            status, headers, messages = self.run_async(request(app, "GET", "/bundle.js"))
+            self.assertEqual(status, 200)
+            self.assertEqual(len(messages), 4)
+            self.assertEqual(body_of(messages), content)
+            self.assertEqual(headers[b"content-length"], str(len(content)).encode())
+            self.assertIn(b"javascript", headers[b"content-type"])
+
+            self.assertEqual(body_of(self.run_async(request(app, "GET", "/"))[2]), b"<html></html>")
+            self.assertEqual(body_of(self.run_async(request(app, "HEAD", "/bundle.js"))[2]), b"")
+            self.assertEqual(self.run_async(request(app, "GET", "/../etc/passwd"))[0], 404)
+            self.assertEqual(self.run_async(request(app, "GET", "/%2e%2e/etc/passwd"))[0], 404)
+        finally:
+            shutil.rmtree(root)
+
+    def test_lifespan_preloads_scanners_off_the_loop(self):
+        """Test the scanners are built at startup on an executor thread"""
+        built_on = []
+
+        class ScannerAppModule(types.ModuleType):
+            @property
+            def scanners(self):
+                built_on.append(threading.get_ident())
+                return {"email": SlowScanner()}
+
+        async def lifespan(app):
+            incoming = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+            sent = []
+
+            async def receive():
+                return incoming.pop(0)
+
+            async def send(message):
+                sent.append(message)
+
+            await app({"type": "lifespan"}, receive, send)
+            return sent, threading.get_ident()
+
+        app = ScannerASGI(deep_scanner_factory=FakeDeepScanner, limiter=ScanLimiter(concurrency=1))
+        with mock.patch.dict(sys.modules, {"scanner_app": ScannerAppModule("scanner_app")}):
+            sent, loop_thread = self.run_async(lifespan(app))
+        self.assertEqual([message["type"] for message in sent],
+                         ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.assertEqual(len(built_on), 1)
+        self.assertNotEqual(built_on[0], loop_thread)
+        self.assertIn("email", app.scanners)
+
+    def test_listing_with_configured_scanners(self):
+        """Test the default app lists scanner_app's scanners"""
+        app = ScannerASGI(limiter=ScanLimiter(concurrency=1))
+        status, _, messages = self.run_async(request(app, "GET", "/api/scanners"))
+        self.assertEqual(status, 200)
+        self.assertIn("email", json.loads(body_of(messages))["scanners"])
+        status, _, messages = self.run_async(request(app, "GET", "/api/health"))
+        self.assertEqual(json.loads(body_of(messages))["scans"]["running"], 0)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
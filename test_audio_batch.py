@@ -0,0 +1,108 @@
+"""
+Test Suite for Batch Audio Analysis
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import wave
+from unittest import mock
+import numpy as np
+import audio_batch
+from audio_batch import BatchAudioAnalyzer, FeatureCache, analyze_file, content_hash
+from test_audio_streaming import voice, RATE
+
+def write_wav(path, signal):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+
+class TestAudioBatch(unittest.TestCase):
+    """Test cases for pooled analysis, content hashing and the feature cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = FeatureCache(os.path.join(self.tmp, "features.db"))
+        self.paths = []
+        for i, pitch in enumerate([120.0, 160.0, 200.0, 240.0]):
+            path = os.path.join(self.tmp, f"voicemail_{i}.wav")
+            write_wav(path, voice(2.0, pitch=pitch, vibrato=0.1))
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp)
+
+    def test_pool_matches_serial(self):
+        """Test pooled results equal in-process analysis of each file"""
+        results = BatchAudioAnalyzer(workers=2, cache=self.cache).analyze(self.paths)
+        self.assertEqual(list(results), self.paths)
+        for path in self.paths:
+            expected = analyze_file(path)
+            self.assertEqual(results[path]["voice_analysis"], expected["voice_analysis"])
+            self.assertEqual(results[path]["content_hash"], content_hash(path))
+        self.assertAlmostEqual(results[self.paths[2]]["voice_analysis"]["pitch"], 200.0, delta=15.0)
+
+    def test_cache_and_duplicate_content(self):
+        """Test identical content is analyzed once and cached across runs"""
+        copy = os.path.join(self.tmp, "forwarded.wav")
+        shutil.copy(self.paths[0], copy)
+
+        batch = BatchAudioAnalyzer(workers=2, cache=self.cache)
+        first = batch.analyze(self.paths + [copy])
+        self.assertEqual(batch.stats["analyzed"], 4)
+        self.assertEqual(batch.stats["duplicates"], 1)
+        self.assertEqual(first[copy]["voice_analysis"], first[self.paths[0]]["voice_analysis"])
+
+        rerun = BatchAudioAnalyzer(workers=2, cache=self.cache)
+        second = rerun.analyze(self.paths + [copy])
+        self.assertEqual(rerun.stats["analyzed"], 0)
+        self.assertEqual(rerun.stats["cache_hits"], 5)
+        self.assertEqual(second, first)
+
+    def test_pipeline_version_invalidates(self):
+        """Test results from an older pipeline version are recomputed"""
+        BatchAudioAnalyzer(workers=1, cache=self.cache).analyze(self.paths[:1])
+        with mock.patch.object(audio_batch, "PIPELINE_VERSION", audio_batch.PIPELINE_VERSION + 1):
+            batch = BatchAudioAnalyzer(workers=1, cache=self.cache)
+            batch.analyze(self.paths[:1])
+        self.assertEqual(batch.stats["analyzed"], 1)
+
+    def test_bad_files_do_not_stop_batch(self):
+        """Test unreadable files are reported per path and not cached"""
+        broken = os.path.join(self.tmp, "broken.wav")
+        with open(broken, "wb") as f:
+            f.write(b"not a wav")
+        missing = os.path.join(self.tmp, "missing.wav")
+
+        with mock.patch.object(audio_batch, "librosa", None):
+            batch = BatchAudioAnalyzer(workers=2, cache=self.cache)
+            results = batch.analyze([broken, missing] + self.paths[:2])
+        self.assertIn("error", results[broken])
+        self.assertIn("error", results[missing])
+        self.assertIn("voice_analysis", results[self.paths[1]])
+        self.assertEqual(self.cache.get_many([content_hash(broken)]), {})
+
+    def test_directory_throughput(self):
+        """Test a directory of recordings is analyzed across the pool"""
+        for i in range(12):
+            write_wav(os.path.join(self.tmp, f"bulk_{i}.wav"), voice(2.0, pitch=100.0 + 10 * i, noise=0.01, seed=i))
+        batch = BatchAudioAnalyzer(cache=self.cache)
+        start = time.perf_counter()
+        results = batch.analyze_directory(self.tmp)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), 16)
+        self.assertEqual(batch.stats["errors"], 0)
+        print(f"\nAnalyzed {len(results)} recordings on {batch.workers} workers in {elapsed * 1000:.0f} ms")
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,84 @@
+"""
+Test Suite for the Micro Benchmarks
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from bench_micro import (
+    CASES, SCALES, compare, measure, run_benchmarks, synthetic_breach_results, synthetic_intel, synthetic_targets
+)
+from entity_model import EntityStore, Provenance
+
+class TestMicroBenchmarks(unittest.TestCase):
+    """Test cases for synthetic inputs, measurement and regression detection"""
+
+    def test_generators_scale(self):
+        """Test generated results are deterministic and grow with the scale"""
+        self.assertEqual(synthetic_intel(1, seed=3), synthetic_intel(1, seed=3))
+        small, large = synthetic_breach_results(1), synthetic_breach_results(100)
+        self.assertEqual(len(large["breach_details"]), 100 * len(small["breach_details"]))
+        self.assertEqual(large["breach_count"], len(large["breach_details"]))
+        self.assertEqual(len(synthetic_targets(100)), 100 * len(synthetic_targets(1)))
+        self.assertEqual(set(SCALES.values()), {1, 100, 10000})
+
+    def test_measure(self):
+        """Test timing statistics and allocation tracing"""
+        result = measure(lambda: [0] * 100_000, min_rounds=5, min_time=0.0)
+        self.assertEqual(result["rounds"], 5)
+        self.assertLessEqual(result["min_ms"], result["median_ms"])
+        self.assertGreater(result["peak_alloc_kb"], 700)
+        self.assertGreater(result["peak_rss_mb"], 0)
+
+    def test_every_case_runs_at_1x(self):
+        """Test all cases produce timing, memory and per-item figures"""
+        results = run_benchmarks(scales=["1x"], min_time=0.0, isolate=False)
+        self.assertEqual(set(results["cases"]), set(CASES))
+        for name, scales in results["cases"].items():
+            self.assertGreater(scales["1x"]["items"], 0, name)
+            self.assertGreater(scales["1x"]["median_ms"], 0, name)
+            self.assertIsNotNone(scales["1x"]["per_item_us"], name)
+
+    def test_compare(self):
+        """Test time and memory regressions use their own tolerances"""
+        baseline = {"cases": {"json_dump": {"1x": {"median_ms": 1.0, "peak_alloc_kb": 100.0}, "scaling": {}}}}
+        current = {"cases": {"json_dump": {"1x": {"median_ms": 1.15, "peak_alloc_kb": 115.0}, "scaling": {}}}}
+        self.assertEqual([item["metric"] for item in compare(baseline, current)], ["peak_alloc_kb"])
+        self.assertEqual(compare(baseline, current, memory_tolerance=0.2), [])
+
+    def test_entities_by_source_is_linear(self):
+        """Test grouping many observations of one source stays fast and ordered"""
+        store = EntityStore()
+        provenance = Provenance("scan", "THREAT_INTELLIGENCE", "indicators")
+        for i in range(20000):
+            store.add("ip", f"198.51.{i // 256 % 256}.{i % 256}", provenance)
+        result = measure(store.entities_by_source, min_rounds=1, min_time=0.0)
+        groups = store.entities_by_source()
+        self.assertEqual(groups[("scan", "THREAT_INTELLIGENCE")][:3], [0, 1, 2])
+        self.assertEqual(len(groups[("scan", "THREAT_INTELLIGENCE")]), 20000)
+        self.assertLess(result["median_ms"], 500)
+
+    def test_cli_writes_results(self):
+        """Test the command line runs isolated cases and writes JSON"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "micro.json")
+            subprocess.run(
+                [sys.executable, "bench_micro.py", "--cases", "analyze_breaches,json_dump",
+                 "--scales", "1x,100x", "--min-time", "0", "--output", output],
+                cwd=os.path.dirname(os.path.abspath(__file__)), check=True, capture_output=True, timeout=300
+            )
+            with open(output) as f:
+                results = json.load(f)
+        self.assertTrue(results["config"]["isolated"])
+        self.assertEqual(set(results["cases"]["json_dump"]), {"1x", "100x", "scaling"})
+        self.assertIn("per_item_factor", results["cases"]["analyze_breaches"]["scaling"])
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,105 @@
+"""
+Test Suite for the Local Breach Index
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from breach_index import LocalBreachIndex, HashIndexBuilder, HashIndex, sha1_digest
+from breach_scanner import BreachScanner
+
+def sha1_hex(value):
+    return hashlib.sha1(value.encode()).hexdigest().upper()
+
+class TestBreachIndex(unittest.TestCase):
+    """Test cases for offline password and account lookups"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sources = os.path.join(self.tmp.name, "sources")
+        os.makedirs(self.sources)
+
+        # Pwned Passwords range file for the "password" prefix
+        digest = sha1_hex("password")
+        with open(os.path.join(self.sources, f"{digest[:5]}.txt"), "w") as f:
+            f.write(f"{digest[5:]}:3861493\r\n")
+            f.write(f"{'0' * 35}:2\r\n")
+
+        self.dump = os.path.join(self.tmp.name, "dump.txt")
+        with open(self.dump, "w") as f:
+            f.write("Victim@Example.com:hunter2\n")
+            f.write("victim@example.com:password\n")
+            f.write("letmein\n")
+
+        self.index = LocalBreachIndex(os.path.join(self.tmp.name, "index"))
+        self.index.ingest(hibp_paths=[self.sources], dump_paths=[self.dump])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_password_lookup(self):
+        """Test range files and dumps merge with summed counts"""
+        self.assertEqual(self.index.password_count("password"), 3861494)
+        self.assertEqual(self.index.password_count("hunter2"), 1)
+        self.assertEqual(self.index.password_count(sha1_hex("letmein")), 1)
+        self.assertEqual(self.index.password_count("correct horse battery staple"), 0)
+
+    def test_account_lookup(self):
+        """Test accounts from dumps are normalized before lookup"""
+        self.assertEqual(self.index.account_count("VICTIM@example.com "), 2)
+        self.assertEqual(self.index.account_count("other@example.com"), 0)
+
+    def test_range_query(self):
+        """Test k-anonymity range queries return suffixes under a prefix"""
+        digest = sha1_hex("password")
+        self.assertIn((digest[5:], 3861494), self.index.password_range(digest[:5]))
+
+    def test_incremental_ingest(self):
+        """Test ingesting new sources keeps existing entries"""
+        extra = os.path.join(self.tmp.name, "extra.txt")
+        with open(extra, "w") as f:
+            f.write("victim@example.com:hunter2\n")
+        self.index.ingest(dump_paths=[extra])
+
+        reopened = LocalBreachIndex(self.index.path)
+        self.assertEqual(reopened.password_count("hunter2"), 2)
+        self.assertEqual(reopened.password_count("password"), 3861494)
+        self.assertEqual(reopened.account_count("victim@example.com"), 3)
+
+    def test_lookup_latency(self):
+        """Test lookups over a large index take microseconds"""
+        builder = HashIndexBuilder()
+        for i in range(200000):
+            builder.add(sha1_digest(f"pw{i}"), i + 1)
+        index = builder.build(os.path.join(self.tmp.name, "large.idx"))
+        self.assertEqual(len(index), 200000)
+
+        probes = [sha1_digest(f"pw{i}") for i in range(0, 200000, 20)]
+        start = time.perf_counter()
+        for i, digest in zip(range(0, 200000, 20), probes):
+            self.assertEqual(index.count(digest), i + 1)
+        per_lookup = (time.perf_counter() - start) / len(probes)
+
+        self.assertLess(per_lookup, 0.001)
+        print(f"\nLookup latency: {per_lookup * 1e6:.1f} microseconds")
+
+    def test_rejects_foreign_files(self):
+        """Test non-index files are rejected"""
+        with self.assertRaises(ValueError):
+            HashIndex(self.dump)
+
+    def test_breach_scanner_local_checks(self):
+        """Test BreachScanner answers password checks from the local index"""
+        scanner = BreachScanner(breach_index=self.index)
+        self.assertEqual(scanner.check_password("password"),
+                         {"exposed": True, "count": 3861494, "source": "local_breach_index"})
+        self.assertFalse(scanner.check_password("not-in-any-dump-0x91")["exposed"])
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
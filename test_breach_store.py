@@ -0,0 +1,170 @@
+"""
+Test Suite for the Columnar Breach Store
+"""
+
+import multiprocessing
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from breach_store import BreachStore, BreachFrame, Dictionary
+from breach_scanner import BreachScanner
+
+BREACHES = [
+    {"Name": "ExampleShop", "BreachDate": "2021-05-01", "DataClasses": ["Email Addresses", "Passwords"], "severity": "High"},
+    {"Name": "ForumOne", "BreachDate": "2019-02-11", "DataClasses": ["Email Addresses"]},
+    {"service": "CardVault", "breach_date": "2021-09-30", "data_classes": ["Credit Cards"], "severity": "critical"}
+]
+
+def write_services(path, worker, count):
+    """Append one distinct service per record from a separate process"""
+    store = BreachStore(path)
+    for i in range(count):
+        store.add_records(f"user{worker}-{i}@example.com", [{"Name": f"Service{worker}-{i}"}], f"scan{worker}")
+
+class TestBreachStore(unittest.TestCase):
+    """Test cases for columnar breach analytics"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BreachStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_frame_histograms(self):
+        """Test histograms over a single target's records"""
+        frame = BreachFrame.from_records(BREACHES, "a@example.com")
+        self.assertEqual(frame.severity_distribution(), {"high": 1, "unknown": 1, "critical": 1})
+        self.assertEqual(frame.data_type_frequency()["Email Addresses"], 2)
+        self.assertEqual(frame.temporal_pattern(), {"2019": 1, "2021": 2})
+
+    def test_analyze_breaches_uses_frame(self):
+        """Test BreachScanner.analyze_breaches keeps its result shape"""
+        analysis = BreachScanner(breach_store=self.store).analyze_breaches(BREACHES)
+        self.assertEqual(analysis["temporal_pattern"], {"2019": 1, "2021": 2})
+        details = {factor["details"] for factor in analysis["risk_factors"]}
+        self.assertEqual(details, {"Exposed Passwords", "Exposed Credit Cards"})
+
+    def test_scanner_stores_only_breach_records(self):
+        """Test provider errors and incomplete records are kept out of the store"""
+        scanner = BreachScanner(breach_store=self.store)
+        error = {"error": "Rate limit exceeded", "service": "BREACH_INTELLIGENCE"}
+        responses = [BREACHES + [error, {"Name": "NoDate"}, {"BreachDate": "2020-01-01"}], error]
+        with mock.patch.object(scanner.api_manager, "make_request", side_effect=responses + [None] * 2):
+            scanner.gather_intelligence("a@example.com", "haveibeenpwned")
+            scanner.gather_intelligence("invalid@", "haveibeenpwned")
+        self.assertEqual(len(self.store.frame()), 3)
+        self.assertEqual(self.store.dictionaries["target"].values, ["a@example.com"])
+        self.assertNotIn("BREACH_INTELLIGENCE", self.store.dictionaries["service"].values)
+
+    def test_cross_target_aggregates(self):
+        """Test distinct-target counts per breach within a time window"""
+        self.store.add_records("a@example.com", BREACHES, "scan1", observed_at="2024-06-03T10:00:00")
+        self.store.add_records("b@example.com", BREACHES[:1], "scan2", observed_at="2024-06-20T10:00:00")
+        self.store.add_records("a@example.com", BREACHES[:1], "scan3", observed_at="2024-06-21T10:00:00")
+        self.store.add_records("c@example.com", BREACHES[1:2], "scan4", observed_at="2024-05-01T10:00:00")
+
+        june = self.store.top_services(since="2024-06-01", until="2024-07-01")
+        self.assertEqual(june[0], {"name": "ExampleShop", "targets": 2})
+        self.assertEqual({entry["name"]: entry["targets"] for entry in self.store.top_services()}["ForumOne"], 2)
+
+        analysis = self.store.analyze(target="a@example.com")
+        self.assertEqual(analysis["breach_records"], 4)
+        self.assertEqual(analysis["data_type_frequency"]["Passwords"], 2)
+
+    def test_persistence_and_compaction(self):
+        """Test segments reload with stable dictionary codes after compaction"""
+        for i in range(5):
+            self.store.add_records(f"user{i}@example.com", BREACHES, f"scan{i}")
+        self.store.compact()
+
+        reopened = BreachStore(self.tmp.name)
+        self.assertEqual(len(reopened), 15)
+        self.assertEqual(reopened.frame().target_count(), 5)
+        self.assertEqual(reopened.analyze()["top_data_classes"][0], {"name": "Email Addresses", "targets": 5})
+
+    def test_stores_sharing_a_directory(self):
+        """Test writers with their own dictionaries neither reuse codes nor drop each other's segments"""
+        first, second = BreachStore(self.tmp.name), BreachStore(self.tmp.name)
+        self.assertEqual(len(first), 0)
+        first.add_records("x@a.com", [{"Name": "ServiceA"}], "scan1")
+        second.add_records("y@b.com", [{"Name": "ServiceB"}], "scan2")
+
+        services = {entry["name"]: entry["targets"] for entry in BreachStore(self.tmp.name).top_services()}
+        self.assertEqual(services, {"ServiceA": 1, "ServiceB": 1})
+        # The cached frame is reloaded once the other store has written
+        self.assertEqual(first.analyze(target="y@b.com")["top_services"], [{"name": "ServiceB", "targets": 1}])
+
+        # A frame encoded before the other store wrote is re-encoded on append
+        frame = BreachFrame.from_records([{"Name": "ServiceC"}], "z@c.com", dictionaries=first.dictionaries)
+        second.add_records("w@d.com", [{"Name": "ServiceD"}], "scan3")
+        first.add_frame(frame)
+        services = {entry["name"] for entry in BreachStore(self.tmp.name).top_services()}
+        self.assertEqual(services, {"ServiceA", "ServiceB", "ServiceC", "ServiceD"})
+        self.assertEqual(second.analyze(target="z@c.com")["top_services"], [{"name": "ServiceC", "targets": 1}])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "writer processes are forked")
+    def test_concurrent_writer_processes(self):
+        """Test forked writers appending and compacting at once lose no records"""
+        context = multiprocessing.get_context("fork")
+        with mock.patch("breach_store.MAX_SEGMENTS", 4):
+            processes = [context.Process(target=write_services, args=(self.tmp.name, worker, 10)) for worker in range(4)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(60)
+                self.assertEqual(process.exitcode, 0)
+
+        reader = BreachStore(self.tmp.name)
+        self.assertEqual(len(reader), 40)
+        names = {entry["name"] for entry in reader.top_services(limit=100)}
+        self.assertEqual(names, {f"Service{worker}-{i}" for worker in range(4) for i in range(10)})
+
+    def test_dictionary_codes(self):
+        """Test dictionary encoding is stable and append-only"""
+        dictionary = Dictionary(["a", "b"])
+        self.assertEqual(dictionary.encode("b"), 1)
+        self.assertEqual(dictionary.encode("c"), 2)
+        self.assertIsNone(dictionary.lookup("d"))
+
+    def test_large_corpus_group_by(self):
+        """Test group-bys over millions of rows finish in seconds"""
+        rows = 2_000_000
+        rng = np.random.default_rng(3)
+        store = self.store
+        for name in ("target", "service", "data_class"):
+            for i in range(5000):
+                store.dictionaries[name].encode(f"{name}{i}")
+        store.dictionaries["severity"].encode("unknown")
+        store.dictionaries["scan"].encode("bulk")
+
+        columns = {
+            "target": rng.integers(0, 5000, rows).astype(np.uint32),
+            "service": rng.integers(0, 5000, rows).astype(np.uint32),
+            "severity": np.zeros(rows, dtype=np.uint32),
+            "scan": np.zeros(rows, dtype=np.uint32),
+            "year": rng.integers(2010, 2025, rows).astype(np.int16),
+            "observed": rng.integers(1_700_000_000, 1_720_000_000, rows),
+            "class_offsets": np.arange(0, 2 * rows + 1, 2, dtype=np.int64),
+            "class_codes": rng.integers(0, 5000, 2 * rows).astype(np.uint32)
+        }
+        store.add_frame(BreachFrame(columns, store.dictionaries))
+
+        start = time.perf_counter()
+        analysis = store.analyze(since=1_710_000_000)
+        duration = time.perf_counter() - start
+
+        self.assertGreater(analysis["breach_records"], 0)
+        self.assertEqual(len(analysis["top_services"]), 10)
+        self.assertLess(duration, 15.0)
+        print(f"\nAnalyzed {rows} breach rows in {duration:.2f} seconds")
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -2,8 +2,14 @@
 Test Suite for Deep Intelligence Scanner
 """
 
+import tempfile
 import unittest
+from unittest import mock
 from deep_scanner import DeepScanner
+from relationship_graph import RelationshipGraph
+from whois_client import WhoisClient
+from tls_probe import TLSProber, FingerprintIndex
+from breach_store import BreachStore
 from api_manager import APIManager
 from api_config import FREE_APIS
 import json
@@ -13,7 +19,19 @@ class TestDeepScanner(unittest.TestCase):
     """Test cases for Deep Intelligence Scanner"""
 
     def setUp(self):
-        self.scanner = DeepScanner()
+        # Keep the scanners off the stores under findings/
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        stores = (
+            (WhoisClient, WhoisClient(":memory:")),
+            (TLSProber, TLSProber(index=FingerprintIndex(":memory:"))),
+            (BreachStore, BreachStore(tmp.name))
+        )
+        for cls, store in stores:
+            patcher = mock.patch.object(cls, "_default", store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.scanner = DeepScanner(graph=RelationshipGraph(":memory:"))
         self.test_email = "test@example.com"
         self.test_phone = "+1234567890"
         self.test_domain = "example.com"
@@ -99,6 +117,11 @@ class TestDeepScanner(unittest.TestCase):
         self.assertIsInstance(risk_data["overall_risk_score"], float)
         self.assertGreaterEqual(risk_data["overall_risk_score"], 0.0)
         self.assertLessEqual(risk_data["overall_risk_score"], 1.0)
+
+        # Confidence is the mean of the per-category confidences
+        metrics = results["correlation_analysis"]["confidence_metrics"]
+        self.assertTrue(metrics)
+        self.assertAlmostEqual(risk_data["confidence_score"], sum(metrics.values()) / len(metrics))
         
         print(json.dumps(risk_data, indent=2))
 
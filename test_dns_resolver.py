@@ -0,0 +1,159 @@
+"""
+Test Suite for In-Process DNS Resolution
+"""
+
+import socket
+import threading
+import time
+import unittest
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+from dns_resolver import DNSResolver, NOERROR, NXDOMAIN, NODATA, flatten_records, _parse_nameservers
+from scanner_modules import DomainScanner
+
+ZONE = {
+    ("scam.example.", "A"): (60, ["192.0.2.10", "192.0.2.11"]),
+    ("scam.example.", "MX"): (60, ["10 mail.scam.example."]),
+    ("scam.example.", "TXT"): (60, ['"v=spf1 -all"']),
+    ("www.scam.example.", "CNAME"): (60, ["scam.example."]),
+}
+ZONE.update({(f"bulk{i}.example.", "A"): (300, [f"198.51.100.{i % 250}"]) for i in range(3000)})
+
+SOA = dns.rrset.from_text("example.", 3600, "IN", "SOA", "ns.example. admin.example. 1 7200 900 1209600 120")
+
+class StubServer:
+    """Minimal authoritative UDP server answering from ZONE"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.queries = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        self.sock.settimeout(0.2)
+        while self.running:
+            try:
+                wire, address = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            self.queries += 1
+            query = dns.message.from_wire(wire)
+            question = query.question[0]
+            name = question.name.to_text().lower()
+            rdtype = dns.rdatatype.to_text(question.rdtype)
+            response = dns.message.make_response(query)
+            response.flags |= dns.flags.AA
+
+            if (name, rdtype) in ZONE:
+                ttl, values = ZONE[(name, rdtype)]
+                response.answer.append(dns.rrset.from_text_list(name, ttl, "IN", rdtype, values))
+            elif (name, "CNAME") in ZONE and rdtype == "A":
+                ttl, (target,) = ZONE[(name, "CNAME")]
+                response.answer.append(dns.rrset.from_text_list(name, ttl, "IN", "CNAME", [target]))
+                ttl, values = ZONE[(target, "A")]
+                response.answer.append(dns.rrset.from_text_list(target, ttl, "IN", "A", values))
+            else:
+                if not any(key[0] == name for key in ZONE):
+                    response.set_rcode(dns.rcode.NXDOMAIN)
+                response.authority.append(SOA)
+            self.sock.sendto(response.to_wire(), address)
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+class TestDNSResolver(unittest.TestCase):
+    """Test cases for concurrent resolution and caching"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.resolver = DNSResolver(["127.0.0.1"], port=self.server.port, timeout=2.0)
+
+    def test_record_types(self):
+        """Test answers are parsed per record type"""
+        answers = self.resolver.resolve("Scam.Example.", ["A", "MX", "TXT", "AAAA"])
+        self.assertEqual(sorted(answers["A"]["records"]), ["192.0.2.10", "192.0.2.11"])
+        self.assertEqual(answers["MX"]["records"], [{"preference": 10, "exchange": "mail.scam.example"}])
+        self.assertEqual(answers["TXT"]["records"], ["v=spf1 -all"])
+        self.assertEqual(answers["AAAA"]["status"], NODATA)
+
+        records = flatten_records(answers)
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0]["ttl"], 60)
+
+    def test_cname_chain(self):
+        """Test CNAME lookups and A lookups through a CNAME"""
+        answers = self.resolver.resolve("www.scam.example", ["CNAME", "A"])
+        self.assertEqual(answers["CNAME"]["records"], ["scam.example"])
+        self.assertEqual(sorted(answers["A"]["records"]), ["192.0.2.10", "192.0.2.11"])
+
+    def test_positive_and_negative_caching(self):
+        """Test repeat lookups, including NXDOMAIN, are served from cache"""
+        before = self.server.queries
+        first = self.resolver.resolve("missing.example", ["A"])
+        self.assertEqual(first["A"]["status"], NXDOMAIN)
+        self.assertEqual(first["A"]["ttl"], 120)
+        self.resolver.resolve("scam.example", ["A"])
+        queried = self.server.queries - before
+
+        again = self.resolver.resolve_many(["missing.example", "scam.example"], ["A"])
+        self.assertEqual(self.server.queries - before, queried)
+        self.assertTrue(again["missing.example"]["A"]["cached"])
+        self.assertEqual(again["scam.example"]["A"]["status"], NOERROR)
+        self.assertEqual(self.resolver.stats["negative_hits"], 1)
+
+    def test_expired_entries_are_refetched(self):
+        """Test cached answers expire with their TTL"""
+        self.resolver.resolve("scam.example", ["A"])
+        for key, (expires, answer) in list(self.resolver._cache.items()):
+            self.resolver._cache[key] = (time.monotonic() - 1, answer)
+        self.assertFalse(self.resolver.resolve("scam.example", ["A"])["A"]["cached"])
+
+    def test_bulk_throughput(self):
+        """Test thousands of names resolve concurrently"""
+        names = [f"bulk{i}.example" for i in range(3000)]
+        start = time.perf_counter()
+        results = self.resolver.resolve_many(names, ["A"])
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(results[name]["A"]["status"] == NOERROR for name in names))
+        self.assertLess(elapsed, 30.0)
+        print(f"\nResolved {len(names)} names in {elapsed:.2f}s ({len(names) / elapsed * 60:,.0f}/minute)")
+
+    def test_parse_nameservers(self):
+        """Test nameserver specs with and without ports"""
+        self.assertEqual(_parse_nameservers("127.0.0.1:5353, 9.9.9.9"), [("127.0.0.1", 5353), ("9.9.9.9", 53)])
+        self.assertEqual(_parse_nameservers("[::1]:5353,2001:db8::1"), [("::1", 5353), ("2001:db8::1", 53)])
+
+    def test_domain_scanner_uses_local_resolver(self):
+        """Test DomainScanner fills dns_records in-process without a provider call"""
+        scanner = DomainScanner(dns_resolver=self.resolver)
+        endpoints = []
+        scanner.api_manager.make_request = lambda **kwargs: endpoints.append(kwargs["endpoint"])
+
+        results = scanner.gather_intelligence("scam.example", "securitytrails")
+        self.assertNotIn("dns", endpoints)
+        self.assertIn({"type": "MX", "value": {"preference": 10, "exchange": "mail.scam.example"}, "ttl": 60},
+                      results["dns_records"])
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
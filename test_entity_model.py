@@ -0,0 +1,81 @@
+"""
+Test Suite for the Normalized Entity Model
+"""
+
+import unittest
+from entity_model import EntityStore, Provenance, parse_intelligence
+from deep_scanner import DeepScanner
+
+SAMPLE_INTEL = {
+    "EMAIL_INTELLIGENCE": {
+        "validation": {"email": "Alice@Example.com"},
+        "social_profiles": [{"username": "alice_w", "url": "https://github.com/alice_w"}],
+        "domain_info": {"domain": "example.com", "ip": "93.184.216.34"}
+    },
+    "BREACH_INTELLIGENCE": {
+        "breach_details": [
+            {"Name": "Adobe", "BreachDate": "2013-10-04", "DataClasses": ["Email addresses", "Passwords"]},
+            {"Name": "LinkedIn", "BreachDate": "2012-05-05", "DataClasses": ["Passwords"]}
+        ]
+    },
+    "THREAT_INTELLIGENCE": {
+        "indicators": ["evil.example.net", {"indicator": "10.0.0.1", "type": "ip"}]
+    },
+    "PHONE_INTELLIGENCE": {
+        "carrier_info": {"number": "+1 (234) 567-890", "reference": "2023-01-01"}
+    }
+}
+
+class TestEntityModel(unittest.TestCase):
+    """Test cases for entity parsing and storage"""
+
+    def test_entities_are_deduplicated_and_normalized(self):
+        """Test repeated identifiers map to one normalized entity"""
+        store = EntityStore()
+        first = store.add("email", "Alice@Example.com", Provenance("s1", "EMAIL_INTELLIGENCE", "a"))
+        second = store.add("email", " alice@example.com", Provenance("s1", "BREACH_INTELLIGENCE", "b"))
+
+        self.assertIs(first, second)
+        self.assertEqual(first.value, "alice@example.com")
+        self.assertEqual(len(store), 1)
+        self.assertEqual(len(store.provenance_of(first.id)), 2)
+        self.assertFalse(hasattr(first, "__dict__"))
+
+    def test_parse_intelligence(self):
+        """Test scan results are parsed into typed entities in one pass"""
+        store = parse_intelligence(SAMPLE_INTEL, scan_id="scan1", target="alice@example.com")
+
+        self.assertIsNotNone(store.get("email", "alice@example.com"))
+        self.assertIsNotNone(store.get("domain", "example.com"))
+        self.assertIsNotNone(store.get("ip", "93.184.216.34"))
+        self.assertIsNotNone(store.get("username", "alice_w"))
+        self.assertIsNotNone(store.get("phone", "+1234567890"))
+        self.assertIsNone(store.get("phone", "2023-01-01"))
+
+        adobe = store.get("breach", "adobe")
+        self.assertEqual(adobe.date, "2013-10-04")
+        self.assertIn("Passwords", adobe.data_classes)
+
+        indicator = store.get("indicator", "10.0.0.1")
+        self.assertEqual(indicator.indicator_type, "ip")
+        self.assertEqual(store.get("indicator", "evil.example.net").indicator_type, "domain")
+
+    def test_deep_scanner_uses_entities(self):
+        """Test DeepScanner correlations are built from the entity store"""
+        correlations = DeepScanner()._correlate_intelligence(SAMPLE_INTEL)
+
+        exposures = correlations["exposure_analysis"]
+        self.assertEqual(exposures["exposed_data_types"], ["Email addresses", "Passwords"])
+        self.assertEqual([e["date"] for e in exposures["exposure_timeline"]], ["2012-05-05", "2013-10-04"])
+        self.assertIn(
+            {"kind": "username", "value": "alice_w"},
+            correlations["identity_correlations"]["potential_identities"]
+        )
+        self.assertIn("entity_counts", correlations["entity_summary"])
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,134 @@
+"""
+Test Suite for the Entity Resolution Engine
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from entity_resolution import EntityResolver, UnionFind, resolve_scan_store
+from deep_scanner import DeepScanner
+
+SCAN_ONE = {
+    "EMAIL_INTELLIGENCE": {
+        "social_profiles": [{"username": "scam_king", "platform": "github"}],
+        "validation": {"email": "scam.king@example.com"}
+    }
+}
+
+SCAN_TWO = {
+    "PHONE_INTELLIGENCE": {
+        "associated_identities": ["scamking@mail.example.org"],
+        "carrier_info": {"name": "Example Carrier"}
+    }
+}
+
+class TestEntityResolution(unittest.TestCase):
+    """Test cases for cross-source identity clustering"""
+
+    def test_union_find(self):
+        """Test basic disjoint-set operations"""
+        forest = UnionFind()
+        forest.add(5)
+        self.assertTrue(forest.union(0, 1))
+        self.assertTrue(forest.union(3, 4))
+        self.assertFalse(forest.union(1, 0))
+        self.assertEqual(forest.find(0), forest.find(1))
+        self.assertNotEqual(forest.find(1), forest.find(3))
+
+    def test_single_scan_clusters(self):
+        """Test identifiers linked to the scan target form one cluster"""
+        resolver = EntityResolver()
+        resolver.add_scan(SCAN_ONE, "scan1", "scam.king@example.com")
+
+        cluster = resolver.cluster_of("email", "scam.king@example.com")
+        values = {member["value"] for member in cluster["members"]}
+        self.assertEqual(values, {"scam.king@example.com", "scam_king"})
+        self.assertEqual(cluster["kinds"], ["email", "username"])
+        self.assertGreater(cluster["confidence"], 0.0)
+
+    def test_cross_scan_resolution(self):
+        """Test identities from different scans are joined through blocking keys"""
+        resolver = EntityResolver()
+        resolver.add_scan(SCAN_ONE, "scan1", "scam.king@example.com")
+        resolver.add_scan(SCAN_TWO, "scan2", "+1234567890")
+
+        result = resolver.lookup("scamking@mail.example.org")
+        self.assertTrue(result["found"])
+        self.assertEqual(result["scans"], ["scan2"])
+        self.assertEqual(result["cluster"]["scans"], ["scan1", "scan2"])
+        values = {member["value"] for member in result["cluster"]["members"]}
+        self.assertIn("+1234567890", values)
+        self.assertIn("scam_king", values)
+
+    def test_common_handles_stop_linking(self):
+        """Test oversized blocks do not merge unrelated identities"""
+        resolver = EntityResolver(max_block_size=3)
+        for i in range(10):
+            resolver.add_scan({"EMAIL_INTELLIGENCE": {"validation": {"email": f"scamdesk@site{i}.example.com"}}},
+                              f"scan{i}")
+        largest = max(len(cluster["members"]) for cluster in resolver.clusters())
+        self.assertLess(largest, 10)
+
+    def test_role_handles_do_not_link(self):
+        """Test role accounts at different domains stay separate identities"""
+        resolver = EntityResolver()
+        for i, domain in enumerate(("a.example.com", "b.example.com")):
+            resolver.add_scan({"EMAIL_INTELLIGENCE": {"validation": {"email": f"info@{domain}"}}}, f"scan{i}")
+            resolver.add_scan({"EMAIL_INTELLIGENCE": {"validation": {"email": f"Support+x@{domain}"}}}, f"role{i}")
+        self.assertEqual(resolver.clusters(), [])
+
+    def test_cluster_ids_are_stable(self):
+        """Test cluster ids depend on members, not on insertion order"""
+        forward, backward = EntityResolver(), EntityResolver()
+        forward.add_scan(SCAN_ONE, "scan1", "scam.king@example.com")
+        forward.add_scan(SCAN_TWO, "scan2", "+1234567890")
+        backward.add_scan(SCAN_TWO, "scan2", "+1234567890")
+        backward.add_scan(SCAN_ONE, "scan1", "scam.king@example.com")
+        self.assertEqual(forward.cluster_of("email", "scam.king@example.com")["cluster_id"],
+                         backward.cluster_of("email", "scam.king@example.com")["cluster_id"])
+
+    def test_near_linear_scaling(self):
+        """Test resolution over many observations completes quickly"""
+        resolver = EntityResolver()
+        intel = {
+            "SOCIAL_INTELLIGENCE": {
+                "profiles": [
+                    {"username": f"user{i % 5000}", "email": f"user{i}@example.com"}
+                    for i in range(20000)
+                ]
+            }
+        }
+        start = time.perf_counter()
+        resolver.add_scan(intel, "bulk")
+        clusters = resolver.clusters()
+        duration = time.perf_counter() - start
+
+        self.assertEqual(len(clusters), 5000)
+        self.assertLess(duration, 10.0)
+        print(f"\nResolved 40000 observations in {duration:.2f} seconds")
+
+    def test_scan_store(self):
+        """Test resolution across saved scan results"""
+        with tempfile.TemporaryDirectory() as scan_dir:
+            for name, intel, target in (("a", SCAN_ONE, "scam.king@example.com"), ("b", SCAN_TWO, "+1234567890")):
+                with open(os.path.join(scan_dir, f"osint_scan_{name}.json"), "w") as f:
+                    json.dump({"scan_metadata": {"scan_id": name, "target": target}, "intelligence_data": intel}, f)
+
+            resolver = resolve_scan_store(scan_dir)
+            cluster = resolver.cluster_of("phone", "+1234567890")
+            self.assertEqual(cluster["scans"], ["a", "b"])
+
+    def test_deep_scanner_cross_references(self):
+        """Test DeepScanner reports resolved clusters"""
+        correlations = DeepScanner()._correlate_intelligence(SCAN_ONE, target="scam.king@example.com")
+        self.assertEqual(len(correlations["identity_correlations"]["identity_clusters"]), 1)
+        self.assertEqual(len(correlations["cross_references"]["confirmed_correlations"]), 1)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,103 @@
+"""
+Test Suite for Offline GeoIP Resolution
+"""
+
+import time
+import unittest
+from geoip_resolver import GeoIPResolver, get_reader, normalize_ip, _from_ipapi
+from scanner_core import ScannerCore
+from deep_intel_scanner import DeepIntelScanner
+
+IPAPI_RECORD = {
+    "status": "success", "query": "45.33.32.9", "country": "Exampleland", "countryCode": "EX",
+    "regionName": "North", "city": "Sample City", "lat": 1.5, "lon": 2.5,
+    "timezone": "UTC", "isp": "Example ISP", "org": "Example Org", "as": "AS64500 Example Networks"
+}
+
+class FakeRemote:
+    """Batch remote resolver that records each call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, ips):
+        self.calls.append(list(ips))
+        return {ip: dict(_from_ipapi(dict(IPAPI_RECORD, query=ip))) for ip in ips if ip.startswith("45.33.32.")}
+
+class TestGeoIPResolver(unittest.TestCase):
+    """Test cases for local-first geolocation with remote fallback"""
+
+    def test_normalize_ip(self):
+        """Test only public addresses are resolvable"""
+        self.assertEqual(normalize_ip(" 8.8.8.8 "), "8.8.8.8")
+        self.assertEqual(normalize_ip("2001:4860:4860:0:0:0:0:8888"), "2001:4860:4860::8888")
+        self.assertIsNone(normalize_ip("10.0.0.1"))
+        self.assertIsNone(normalize_ip("example.com"))
+        self.assertIsNone(normalize_ip(None))
+
+    def test_ipapi_normalization(self):
+        """Test remote records share the local record layout"""
+        record = _from_ipapi(IPAPI_RECORD)
+        self.assertEqual(record["asn"], 64500)
+        self.assertEqual(record["country_code"], "EX")
+        self.assertEqual(record["source"], "ipapi")
+
+    def test_remote_fallback_is_batched_and_cached(self):
+        """Test misses go to the remote in one batch and are cached"""
+        remote = FakeRemote()
+        resolver = GeoIPResolver(remote=remote)
+        resolver.resolve_local = lambda ip: None
+        ips = [f"45.33.32.{i}" for i in range(50)] + ["45.33.32.1", "192.168.1.1", "bogus"]
+
+        results = resolver.resolve_many(ips)
+        self.assertEqual(len(remote.calls), 1)
+        self.assertEqual(len(remote.calls[0]), 50)
+        self.assertEqual(results["45.33.32.7"]["city"], "Sample City")
+        self.assertIsNone(results["192.168.1.1"])
+        self.assertIsNone(results["bogus"])
+
+        resolver.resolve_many(ips[:10])
+        self.assertEqual(len(remote.calls), 1)
+
+    @unittest.skipIf(get_reader("city") is None, "no local GeoIP database available")
+    def test_local_lookup_skips_remote(self):
+        """Test addresses in the local database never reach the remote"""
+        remote = FakeRemote()
+        resolver = GeoIPResolver(remote=remote)
+        record = resolver.resolve("8.8.8.8")
+        self.assertEqual(record["source"], "local_mmdb")
+        self.assertEqual(record["country_code"], "US")
+        self.assertEqual(remote.calls, [])
+
+    @unittest.skipIf(get_reader("city") is None, "no local GeoIP database available")
+    def test_batch_throughput(self):
+        """Test thousands of addresses resolve locally in well under a second"""
+        resolver = GeoIPResolver(remote=None)
+        ips = [f"{a}.{b}.{c}.1" for a in (8, 24, 81, 151) for b in range(25) for c in range(25)]
+        start = time.perf_counter()
+        results = resolver.resolve_many(ips)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), len(ips))
+        self.assertLess(elapsed, 2.0)
+        print(f"\nLocal GeoIP batch: {len(ips)} addresses in {elapsed * 1000:.1f} ms")
+
+    @unittest.skipIf(get_reader("city") is None, "no local GeoIP database available")
+    def test_scanners_resolve_locally(self):
+        """Test location scans use the local databases"""
+        resolver = GeoIPResolver(remote=None)
+        core = ScannerCore(geoip=resolver)
+        data = core._gather_category_data("8.8.8.8", "LOCATION_INTELLIGENCE", "ipapi")
+        self.assertEqual(data["findings"][0]["source"], "local_geoip")
+
+        deep = DeepIntelScanner(geoip=resolver)
+        intel = deep._gather_intelligence("8.8.8.8", "LOCATION_INTELLIGENCE")
+        self.assertEqual(intel["geolocation"]["country_code"], "US")
+        self.assertEqual(intel["findings"][0]["source"], "local_mmdb")
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
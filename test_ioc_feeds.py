@@ -0,0 +1,126 @@
+"""
+Test Suite for IOC Feed Ingestion
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from ioc_feeds import FeedSet, IndicatorIndex, classify_indicator
+from prefilter import Prefilter, KNOWN_BAD
+from scanner_modules import ThreatScanner
+from core_scanner import CoreScanner
+
+STIX_BUNDLE = {
+    "type": "bundle",
+    "objects": [
+        {"type": "indicator", "pattern": "[domain-name:value = 'evil.example.net']", "indicator_types": ["malicious-activity"]},
+        {"type": "indicator", "pattern": "[file:hashes.'SHA-256' = '" + "ab" * 32 + "']", "labels": ["ransomware"]},
+        {"type": "malware", "name": "NotAnIndicator"}
+    ]
+}
+
+CSV_FEED = "# botnet c2 list\nip,threat\n203.0.113.7,c2\n198.51.100.0/24,scanner\n"
+
+PLAIN_FEED = "# phishing urls\nhttp://phish.example.org/login  # reported\n2001:db8::/32\n"
+
+class TestIOCFeeds(unittest.TestCase):
+    """Test cases for feed parsing and indicator lookups"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.feeds = {}
+        for name, content in (("stix.json", json.dumps(STIX_BUNDLE)), ("c2.csv", CSV_FEED), ("urls.txt", PLAIN_FEED)):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, "w") as f:
+                f.write(content)
+            self.feeds[name] = path
+
+        self.feed_set = FeedSet([{"name": name, "location": path} for name, path in self.feeds.items()])
+        self.feed_set.refresh()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_classify_indicator(self):
+        """Test indicator type detection and normalization"""
+        self.assertEqual(classify_indicator("10.0.0.0/8"), ("10.0.0.0/8", "cidr"))
+        self.assertEqual(classify_indicator("*.Evil.Example.NET."), ("evil.example.net", "domain"))
+        self.assertEqual(classify_indicator("D41D8CD98F00B204E9800998ECF8427E")[1], "hash")
+
+    def test_exact_and_suffix_matches(self):
+        """Test exact hashes and parent-domain matches"""
+        self.assertEqual(self.feed_set.lookup("ab" * 32)[0]["tags"], "ransomware")
+        matches = self.feed_set.lookup("cdn.evil.example.net")
+        self.assertEqual(matches[0]["indicator"], "evil.example.net")
+        self.assertEqual(self.feed_set.lookup("notevil.example.net"), [])
+
+    def test_cidr_matches(self):
+        """Test covering CIDR lookups for IPv4 and IPv6"""
+        self.assertEqual(self.feed_set.lookup("198.51.100.200")[0]["tags"], "scanner")
+        self.assertEqual(self.feed_set.lookup("203.0.113.7")[0]["tags"], "c2")
+        self.assertEqual(len(self.feed_set.lookup("2001:db8::1")), 1)
+        self.assertEqual(self.feed_set.lookup("192.0.2.1"), [])
+
+    def test_url_host_matches(self):
+        """Test URL lookups match exact URLs and listed hosts"""
+        self.assertEqual(len(self.feed_set.lookup("http://phish.example.org/login")), 1)
+        self.assertEqual(self.feed_set.lookup("https://a.evil.example.net/x")[0]["indicator"], "evil.example.net")
+
+    def test_incremental_refresh(self):
+        """Test only changed feeds are reloaded and stale indicators are dropped"""
+        self.assertEqual(self.feed_set.refresh(), {})
+        previous = self.feed_set.index
+        with open(self.feeds["c2.csv"], "w") as f:
+            f.write("ip,threat\n192.0.2.50,c2\n")
+        os.utime(self.feeds["c2.csv"], ns=(2 ** 62, 2 ** 62))
+
+        self.assertEqual(self.feed_set.refresh(), {"c2.csv": 1})
+        # The new index replaces the old one, which keeps answering for in-flight lookups
+        self.assertIsNot(self.feed_set.index, previous)
+        self.assertEqual(previous.lookup("203.0.113.7")[0]["tags"], "c2")
+        self.assertEqual(len(self.feed_set.index.records), len(self.feed_set.index))
+        self.assertEqual(self.feed_set.lookup("203.0.113.7"), [])
+        self.assertEqual(self.feed_set.lookup("198.51.100.1"), [])
+        self.assertEqual(len(self.feed_set.lookup("192.0.2.50")), 1)
+        self.assertEqual(len(self.feed_set.lookup("evil.example.net")), 1)
+
+    def test_lookup_latency(self):
+        """Test lookups over a large index take microseconds"""
+        index = IndicatorIndex()
+        for i in range(100000):
+            index.add(f"host{i}.bad{i % 100}.example.com", "bulk")
+            index.add(f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}/32", "bulk")
+
+        probes = [f"x.host{i}.bad{i % 100}.example.com" for i in range(0, 100000, 10)]
+        probes += [f"10.0.{(i // 256) % 256}.{i % 256}" for i in range(0, 60000, 10)]
+        start = time.perf_counter()
+        hits = sum(1 for probe in probes if index.lookup(probe))
+        per_lookup = (time.perf_counter() - start) / len(probes)
+
+        self.assertEqual(hits, len(probes))
+        self.assertLess(per_lookup, 0.001)
+        print(f"\nIndicator lookup latency: {per_lookup * 1e6:.1f} microseconds")
+
+    def test_scanners_answer_locally(self):
+        """Test threat scanners use local feeds before provider calls"""
+        result = ThreatScanner(feed_set=self.feed_set).gather_intelligence("evil.example.net", "virustotal")
+        self.assertEqual(result["source"], "local_feeds")
+        self.assertGreater(result["threat_score"], 0.8)
+
+        core = CoreScanner(feed_set=self.feed_set).analyze_threat_intelligence("203.0.113.7")
+        self.assertEqual(core["findings"][0]["source"], "local_feeds")
+
+    def test_prefilter_ingests_feeds(self):
+        """Test feed indicators are added to the known-bad pre-filter"""
+        prefilter = Prefilter(os.path.join(self.tmp.name, "prefilter.npz"), memory_budget=64 * 1024)
+        prefilter.refresh(scan_dir=None, feeds=self.feed_set)
+        self.assertEqual(prefilter.classify("evil.example.net"), KNOWN_BAD)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
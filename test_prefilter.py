@@ -0,0 +1,114 @@
+"""
+Test Suite for the Target Pre-Filter
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from breach_index import LocalBreachIndex
+from prefilter import Prefilter, BloomFilter, ABSENT, KNOWN, KNOWN_BAD
+from deep_scanner import DeepScanner
+from relationship_graph import RelationshipGraph
+from whois_client import WhoisClient
+from tls_probe import TLSProber, FingerprintIndex
+
+BUDGET = 256 * 1024
+
+class TestPrefilter(unittest.TestCase):
+    """Test cases for Bloom filter pre-checks"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "prefilter.npz")
+        # Keep DeepScanner's domain scanners off the stores under findings/
+        for cls, store in ((WhoisClient, WhoisClient(":memory:")), (TLSProber, TLSProber(index=FingerprintIndex(":memory:")))):
+            patcher = mock.patch.object(cls, "_default", store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_no_false_negatives(self):
+        """Test every inserted identifier is reported present"""
+        bloom = BloomFilter(64 * 1024, 50000)
+        identifiers = [f"user{i}@example.com" for i in range(50000)]
+        bloom.add(identifiers)
+        self.assertTrue(all(identifier in bloom for identifier in identifiers[::97]))
+
+        false_positives = sum(f"other{i}@example.org" in bloom for i in range(5000))
+        self.assertLess(false_positives / 5000, 0.05)
+        self.assertLess(bloom.false_positive_rate(), 0.05)
+
+    def test_fixed_memory_budget(self):
+        """Test filters never grow past the configured budget"""
+        prefilter = Prefilter(self.path, memory_budget=BUDGET)
+        prefilter.add_known(f"user{i}@example.com" for i in range(200000))
+        self.assertEqual(prefilter.stats()["memory_bytes"], BUDGET)
+        self.assertEqual(prefilter.stats()["known_items"], 200000)
+
+    def test_classification(self):
+        """Test absent, known and known-bad classification"""
+        prefilter = Prefilter(self.path, memory_budget=BUDGET)
+        prefilter.add_known(["victim@example.com"])
+        prefilter.add_known_bad(["Malware.Example.net"])
+
+        self.assertEqual(prefilter.classify(" VICTIM@example.com"), KNOWN)
+        self.assertEqual(prefilter.classify("malware.example.net"), KNOWN_BAD)
+        self.assertEqual(prefilter.classify("nobody@example.org"), ABSENT)
+
+    def test_incremental_refresh(self):
+        """Test refresh picks up breach index accounts and new scans, and persists"""
+        dump = os.path.join(self.tmp.name, "dump.txt")
+        with open(dump, "w") as f:
+            f.write("leaked@example.com:hunter2\n")
+        index = LocalBreachIndex(os.path.join(self.tmp.name, "index"))
+        index.ingest(dump_paths=[dump])
+
+        scan_dir = os.path.join(self.tmp.name, "scans")
+        os.makedirs(scan_dir)
+        with open(os.path.join(scan_dir, "osint_scan_1.json"), "w") as f:
+            json.dump({"scan_metadata": {"target": "seen@example.com"}}, f)
+
+        prefilter = Prefilter(self.path, memory_budget=BUDGET)
+        prefilter.refresh(index, scan_dir)
+        self.assertEqual(prefilter.classify("leaked@example.com"), KNOWN)
+        self.assertEqual(prefilter.classify("seen@example.com"), KNOWN)
+
+        with open(os.path.join(scan_dir, "osint_scan_2.json"), "w") as f:
+            json.dump({"scan_metadata": {"target": "c2.example.net"},
+                       "intelligence_data": {"THREAT_INTELLIGENCE": {"threat_score": 95}}}, f)
+        os.utime(os.path.join(scan_dir, "osint_scan_2.json"), ns=(2 ** 62, 2 ** 62))
+        count = prefilter.stats()["known_items"]
+        prefilter.refresh(index, scan_dir)
+        self.assertEqual(prefilter.stats()["known_items"], count + 1)
+
+        reloaded = Prefilter(self.path, memory_budget=BUDGET)
+        self.assertEqual(reloaded.classify("c2.example.net"), KNOWN_BAD)
+        self.assertEqual(reloaded.classify("leaked@example.com"), KNOWN)
+
+    def test_deep_scanner_fast_path(self):
+        """Test DeepScanner skips breach and threat providers for absent and known-bad targets"""
+        prefilter = Prefilter(self.path, memory_budget=BUDGET)
+        prefilter.add_known_bad(["bad.example.net"])
+        scanner = DeepScanner(graph=RelationshipGraph(":memory:"), prefilter=prefilter)
+
+        results = scanner.deep_scan("clean@example.org", ["BREACH_INTELLIGENCE", "THREAT_INTELLIGENCE"])
+        self.assertEqual(results["scan_metadata"]["prefilter"]["status"], ABSENT)
+        self.assertEqual(results["intelligence_data"], {})
+
+        results = scanner.deep_scan("bad.example.net", ["PHONE_INTELLIGENCE", "THREAT_INTELLIGENCE"])
+        self.assertEqual(results["scan_metadata"]["prefilter"],
+                         {"status": KNOWN_BAD, "skipped_categories": ["THREAT_INTELLIGENCE"]})
+        self.assertEqual(results["intelligence_data"], {})
+        self.assertEqual(results["risk_assessment"]["risk_factors"][0]["type"], "known_bad_indicator")
+        self.assertGreaterEqual(results["risk_assessment"]["overall_risk_score"], 0.7)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,114 @@
+"""
+Test Suite for Provider Adapters
+"""
+
+import json
+import unittest
+from unittest import mock
+from provider_adapters import (
+    ProviderAdapter, Endpoint, get_adapter, get_adapters, run_adapters
+)
+from target_routing import RoutingPlan
+from specialized_scanner import SpecializedScanner
+
+class FakeResponse:
+    """Minimal stand-in for a provider response"""
+
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.closed = False
+
+    def json(self):
+        return self.payload
+
+    def iter_content(self, chunk_size=None):
+        return iter([json.dumps(self.payload).encode()])
+
+    def close(self):
+        self.closed = True
+
+class TestProviderAdapters(unittest.TestCase):
+    """Test cases for the provider adapter registry"""
+
+    def setUp(self):
+        self.scanner = SpecializedScanner()
+        self.scanner.api_keys = {
+            "THREAT_INTELLIGENCE": {"crowdstrike": "cs-key", "unregistered": "x"},
+            "DARK_WEB_INTELLIGENCE": {"sixgill": "sg-key", "flashpoint": "fp-key"},
+            "BLOCKCHAIN_ANALYTICS": {"chainalysis": "ch-key"},
+            "COMMUNICATION_INTELLIGENCE": {"twilio": "AC123", "twilio_auth_token": "secret"}
+        }
+
+    def test_registry(self):
+        """Test adapters are registered by category"""
+        self.assertIsNotNone(get_adapter("THREAT_INTELLIGENCE", "crowdstrike"))
+        self.assertIn("elliptic", get_adapters("BLOCKCHAIN_ANALYTICS"))
+        self.assertIsNone(get_adapter("THREAT_INTELLIGENCE", "unregistered"))
+
+    def test_build_request(self):
+        """Test request templates, auth headers and basic auth"""
+        adapter = get_adapter("DARK_WEB_INTELLIGENCE", "sixgill")
+        request = adapter.build_request(adapter.endpoints[0], "sg-key", "test@example.com", {})
+        self.assertEqual(request["method"], "POST")
+        self.assertEqual(request["headers"], {"Authorization": "Bearer sg-key"})
+        self.assertEqual(request["json"]["query"], "test@example.com")
+        self.assertEqual(request["json"]["size"], 100)
+
+        adapter = get_adapter("COMMUNICATION_INTELLIGENCE", "twilio")
+        request = adapter.build_request(
+            adapter.endpoints[1], "AC123", "+1234567890", self.scanner.api_keys["COMMUNICATION_INTELLIGENCE"]
+        )
+        self.assertEqual(request["url"], "https://lookups.twilio.com/v2/PhoneNumbers/+1234567890/carrier")
+        self.assertEqual(request["auth"], ("AC123", "secret"))
+
+    def test_analyzers_store_results(self):
+        """Test analyzers keep their result layout when run through adapters"""
+        with mock.patch("provider_adapters.execute_request", return_value=FakeResponse({"ok": True})) as request:
+            threat = self.scanner.analyze_threat_intelligence("example.com")
+            dark_web = self.scanner.analyze_dark_web("example.com")
+
+        self.assertEqual(
+            [finding["source"] for finding in threat["findings"]],
+            ["CrowdStrike_actors", "CrowdStrike_indicators", "CrowdStrike_reports"]
+        )
+        self.assertIn("sixgill_posts", dark_web["forum_activities"])
+        self.assertEqual(dark_web["flashpoint_forums"], {"ok": True})
+        self.assertEqual(request.call_count, 9)
+
+    def test_routing_skips_adapters(self):
+        """Test adapters that cannot accept a target type are not called"""
+        plan = RoutingPlan("test@example.com")
+        with mock.patch("provider_adapters.execute_request") as request:
+            results = self.scanner.analyze_blockchain("test@example.com", plan)
+
+        request.assert_not_called()
+        self.assertEqual(results["transaction_analysis"], {})
+        self.assertIn("BLOCKCHAIN_ANALYTICS/chainalysis", plan.skipped_calls)
+
+    def test_normalizer_and_failed_responses(self):
+        """Test normalizers run on success and failed responses are dropped"""
+        adapter = ProviderAdapter(
+            name="example",
+            category="TEST",
+            label="example",
+            section="data",
+            endpoints=[Endpoint("a", "https://example.com/a"), Endpoint("b", "https://example.com/b")],
+            normalizer=lambda endpoint, payload: payload["value"]
+        )
+        responses = [FakeResponse({"value": 1}), FakeResponse({}, status_code=429)]
+        results = {"data": {}}
+
+        with mock.patch("provider_adapters.get_adapter", return_value=adapter), \
+                mock.patch("provider_adapters.execute_request", side_effect=responses):
+            run_adapters("TEST", "target", {"TEST": {"example": "key"}}, results, self.scanner.console)
+
+        self.assertEqual(results["data"], {"example_a": 1})
+        self.assertTrue(all(response.closed for response in responses))
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
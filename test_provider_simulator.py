@@ -0,0 +1,179 @@
+"""
+Test Suite for the Provider Simulator and Load Benchmark
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from collections import Counter
+import dns.message
+import dns.query
+import numpy as np
+import requests
+from api_config import FREE_APIS, PREMIUM_API_ENDPOINTS
+from provider_adapters import ADAPTER_REGISTRY
+from provider_simulator import (
+    ProviderSimulator, ProviderProfile, LatencyModel, load_profiles, parse_quota, provider_hosts,
+    stated_limit_profiles
+)
+from bench_load import summarize, compare, quota_spend, DEFAULT_ENDPOINTS, WORKLOAD
+
+def fast(**kwargs):
+    return ProviderProfile(latency=LatencyModel(1.0, 1.0, "fixed"), **kwargs)
+
+class TestProviderSimulator(unittest.TestCase):
+    """Test cases for simulated providers and benchmark reporting"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.simulator = ProviderSimulator(fast(), {
+            "api.shodan.io": fast(rate_limit=5, burst=2, retry_after=3),
+            "virustotal.com": fast(quota=3),
+            "api.hunter.io": fast(error_rate=0.5, error_status=502),
+            "slow.example": ProviderProfile(latency=LatencyModel(60.0, 60.0, "fixed"), body={"answer": 42}),
+        }).start()
+        proxy = f"http://127.0.0.1:{cls.simulator.port}"
+        cls.session = requests.Session()
+        cls.session.trust_env = False
+        cls.session.proxies = {"http": proxy, "https": proxy}
+        cls.session.verify = cls.simulator.ca.ca_path
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.simulator.stop()
+
+    def test_https_interception(self):
+        """Test HTTPS requests to any provider host are answered with a trusted certificate"""
+        response = self.session.post("https://api.group-ib.com/v1/attribution", json={"query": "x"}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["host"], "api.group-ib.com")
+        self.assertEqual(response.json()["method"], "POST")
+
+        started = time.perf_counter()
+        response = self.session.get("http://slow.example/anything?a=1", timeout=5)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+        self.assertEqual(response.json(), {"answer": 42})
+
+    def test_rate_limit_and_quota(self):
+        """Test token-bucket 429s with Retry-After and a hard quota"""
+        statuses = [self.session.get("https://api.shodan.io/host/1.2.3.4", timeout=5) for _ in range(4)]
+        self.assertEqual([r.status_code for r in statuses[:2]], [200, 200])
+        self.assertEqual(statuses[2].status_code, 429)
+        self.assertEqual(statuses[2].headers["Retry-After"], "3")
+        time.sleep(0.45)
+        self.assertEqual(self.session.get("https://api.shodan.io/host/1.2.3.4", timeout=5).status_code, 200)
+
+        codes = [self.session.get("https://www.virustotal.com/vtapi/v2/url/report", timeout=5).status_code
+                 for _ in range(5)]
+        self.assertEqual(codes, [200, 200, 200, 429, 429])
+        self.assertEqual(self.simulator.stats()["www.virustotal.com"]["statuses"], {200: 3, 429: 2})
+
+    def test_error_rate(self):
+        """Test simulated failures appear at the configured rate"""
+        codes = Counter(self.session.get("https://api.hunter.io/v2/domain-search", timeout=5).status_code
+                        for _ in range(200))
+        self.assertEqual(set(codes), {200, 502})
+        self.assertAlmostEqual(codes[502] / 200, 0.5, delta=0.12)
+
+    def test_dns_responder(self):
+        """Test every name resolves to documentation space"""
+        query = dns.message.make_query("scam-shop.example", "A")
+        response = dns.query.udp(query, "127.0.0.1", port=self.simulator.dns_port, timeout=2)
+        self.assertEqual(response.answer[0][0].to_text(), "192.0.2.10")
+
+    def test_environment(self):
+        """Test the environment routes requests and DNS through the simulator"""
+        env = self.simulator.environment()
+        self.assertEqual(env["HTTPS_PROXY"], f"http://127.0.0.1:{self.simulator.port}")
+        self.assertEqual(env["DNS_NAMESERVERS"], f"127.0.0.1:{self.simulator.dns_port}")
+        self.assertTrue(os.path.exists(env["REQUESTS_CA_BUNDLE"]))
+
+    def test_latency_model(self):
+        """Test the lognormal fit reproduces the configured median and p99"""
+        rng = random.Random(1)
+        samples = np.array([LatencyModel(100.0, 900.0).sample(rng) for _ in range(20000)]) * 1000
+        self.assertAlmostEqual(np.percentile(samples, 50), 100.0, delta=5.0)
+        self.assertAlmostEqual(np.percentile(samples, 99), 900.0, delta=90.0)
+        with self.assertRaises(ValueError):
+            LatencyModel(kind="pareto")
+
+    def test_profiles_file_and_stated_limits(self):
+        """Test profile JSON loading and limits derived from api_config"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"default": {"median_ms": 20, "p99_ms": 50}, "hosts": {"api.shodan.io": {"rate_limit": 1}}}, f)
+        try:
+            default, hosts = load_profiles(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(default.latency.median_ms, 20)
+        self.assertEqual(hosts["api.shodan.io"].burst, 1)
+
+        self.assertEqual(parse_quota("4/minute"), (4, "minute"))
+        self.assertIsNone(parse_quota("Unlimited"))
+        limits = stated_limit_profiles()
+        self.assertAlmostEqual(limits["www.virustotal.com"].rate_limit, 4 / 60)
+        self.assertEqual(limits["emailrep.io"].quota, 200)
+
+    def test_provider_hosts_cover_configuration(self):
+        """Test every configured and premium adapter host is known"""
+        hosts = provider_hosts()
+        expected = {info["url"].split("/")[2] for providers in FREE_APIS.values() for info in providers.values()}
+        expected |= {url.split("/")[2] for urls in PREMIUM_API_ENDPOINTS.values() for url in urls}
+        expected |= {endpoint.url.split("/")[2] for adapters in ADAPTER_REGISTRY.values()
+                     for adapter in adapters.values() for endpoint in adapter.endpoints}
+        self.assertEqual(set(hosts), expected)
+        self.assertIn("THREAT_INTELLIGENCE/crowdstrike", hosts["api.crowdstrike.com"]["providers"])
+
+    def test_summary_and_comparison(self):
+        """Test percentiles, quota spend and regression detection"""
+        summary = summarize([i / 1000 for i in range(1, 101)], Counter({200: 98, 503: 2}), 10.0)
+        self.assertEqual(summary["errors"], 2)
+        self.assertAlmostEqual(summary["p50_ms"], 50.5)
+        self.assertAlmostEqual(summary["p99_ms"], 99.01)
+        self.assertEqual(summary["throughput_rps"], 10.0)
+
+        spend = quota_spend({"emailrep.io": {"requests": 12, "statuses": {200: 10, 429: 2}}}, provider_hosts())
+        self.assertEqual(spend["emailrep.io"]["calls"], 10)
+        self.assertEqual(spend["emailrep.io"]["quota_fraction"], 0.05)
+
+        baseline = {"endpoints": {"deep_scan": {"p95_ms": 100.0, "p99_ms": 200.0, "throughput_rps": 10.0}}}
+        current = {"endpoints": {"deep_scan": {"p95_ms": 105.0, "p99_ms": 260.0, "throughput_rps": 8.0}}}
+        self.assertEqual([item["metric"] for item in compare(baseline, current)], ["p99_ms", "throughput_rps"])
+
+    def test_default_workload_skips_unserved_endpoints(self):
+        """Test endpoints that always fail are only run when named"""
+        self.assertNotIn("scan", DEFAULT_ENDPOINTS)
+        self.assertNotIn("scan_social", DEFAULT_ENDPOINTS)
+        self.assertIn("deep_scan", DEFAULT_ENDPOINTS)
+        self.assertIn("scan", WORKLOAD)
+
+    def test_load_benchmark_end_to_end(self):
+        """Test the harness drives the apps through the simulator and writes results"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "load.json")
+            subprocess.run(
+                [sys.executable, "bench_load.py", "--concurrency", "2", "--requests", "6",
+                 "--endpoints", "scan_email,scan_domain,deep_scan", "--output", output],
+                cwd=os.path.dirname(os.path.abspath(__file__)), check=True, capture_output=True, timeout=300
+            )
+            with open(output) as f:
+                results = json.load(f)
+
+        self.assertEqual(results["overall"]["requests"], 6)
+        self.assertEqual(results["overall"]["errors"], 0)
+        self.assertEqual(set(results["endpoints"]), {"scan_email", "scan_domain", "deep_scan"})
+        self.assertIn("emailrep.io", results["provider_hosts_covered"])
+        self.assertGreater(results["quota_spend"]["emailrep.io"]["calls"], 0)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
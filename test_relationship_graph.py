@@ -0,0 +1,124 @@
+"""
+Test Suite for the Relationship Graph Store
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from entity_model import parse_intelligence
+from relationship_graph import RelationshipGraph
+from osint_scanner import OSINTScanner
+
+SCAN_ONE = {
+    "EMAIL_INTELLIGENCE": {
+        "social_profiles": [{"username": "scam_king", "platform": "github"}],
+        "validation": {"email": "scam.king@example.com"}
+    }
+}
+
+SCAN_TWO = {
+    "DOMAIN_INTELLIGENCE": {
+        "whois": {"registrant_email": "scam.king@example.com", "domain": "scam-shop.example.net"}
+    }
+}
+
+class TestRelationshipGraph(unittest.TestCase):
+    """Test cases for graph persistence and traversal"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "graph.db")
+        self.graph = RelationshipGraph(self.path)
+
+    def tearDown(self):
+        self.graph.close()
+        self.tmp.cleanup()
+
+    def record(self, scan_id, intel, target):
+        return self.graph.record_scan(scan_id, target, parse_intelligence(intel, scan_id, target))
+
+    def test_record_and_neighborhood(self):
+        """Test scan entities become nodes within one hop of the target"""
+        self.record("scan1", SCAN_ONE, "scam.king@example.com")
+        neighborhood = self.graph.neighborhood("scam.king@example.com", hops=1)
+
+        self.assertTrue(neighborhood["found"])
+        values = {node["value"] for node in neighborhood["nodes"]}
+        self.assertIn("scam_king", values)
+        edges = [(min(e["source"], e["target"]), max(e["source"], e["target"]), e["relation"])
+                 for e in self.graph.neighborhood("scam.king@example.com", hops=3)["edges"]]
+        self.assertEqual(len(edges), len(set(edges)))
+        self.assertFalse(self.graph.neighborhood("nobody@example.org")["found"])
+
+    def test_shortest_path_across_scans(self):
+        """Test targets from separate scans are joined through shared entities"""
+        self.record("scan1", SCAN_ONE, "scam.king@example.com")
+        self.record("scan2", SCAN_TWO, "scam-shop.example.net")
+
+        path = self.graph.shortest_path("scam_king", "scam-shop.example.net")
+        self.assertIsNotNone(path)
+        self.assertEqual(path[0]["value"], "scam_king")
+        self.assertEqual(path[-1]["value"], "scam-shop.example.net")
+        self.assertIsNone(self.graph.shortest_path("scam_king", "nobody@example.org"))
+
+    def test_components_merge_and_persist(self):
+        """Test component labels merge incrementally and survive reopening"""
+        self.record("scan1", SCAN_ONE, "scam.king@example.com")
+        self.record("scan3", {"IP_INTELLIGENCE": {"hosts": ["10.1.2.3"]}}, "10.9.9.9")
+        self.assertEqual(self.graph.stats()["components"], 2)
+
+        self.record("scan2", SCAN_TWO, "scam-shop.example.net")
+        self.graph.close()
+        self.graph = RelationshipGraph(self.path)
+
+        component = self.graph.component_of("scam_king")
+        self.assertEqual(component, self.graph.component_of("scam-shop.example.net"))
+        self.assertNotEqual(component["component_id"], self.graph.component_of("10.9.9.9")["component_id"])
+
+    def test_large_graph_queries(self):
+        """Test traversal stays fast over a large edge table"""
+        graph = self.graph
+        with graph.conn:
+            nodes = [graph.add_node("username", f"user{i}") for i in range(20000)]
+            for i in range(1, len(nodes)):
+                graph.add_edge(nodes[i], nodes[(i - 1) // 2], "co_observed")
+
+        start = time.perf_counter()
+        neighborhood = graph.neighborhood("user0", hops=3)
+        path = graph.shortest_path("user19999", "user10000")
+        component = graph.component_of("user12345")
+        duration = time.perf_counter() - start
+
+        self.assertEqual(len(neighborhood["nodes"]), 15)
+        self.assertIsNotNone(path)
+        self.assertEqual(component["size"], 20000)
+        self.assertLess(duration, 1.0)
+        print(f"\nGraph queries over 20000 edges in {duration * 1000:.1f} ms")
+
+    def test_osint_scanner_relationships(self):
+        """Test OSINTScanner reports relationships recorded for a target"""
+        self.record("scan1", SCAN_ONE, "scam.king@example.com")
+        result = OSINTScanner(graph=self.graph).analyze_relationships("scam.king@example.com")
+
+        self.assertTrue(result["found"])
+        self.assertGreaterEqual(result["component"]["size"], 2)
+
+    def test_network_topology(self):
+        """Test topology summaries count nodes, hubs and infrastructure around a target"""
+        self.record("scan1", SCAN_ONE, "scam.king@example.com")
+        self.record("scan2", SCAN_TWO, "scam-shop.example.net")
+        topology = OSINTScanner(graph=self.graph).analyze_network("scam.king@example.com")
+
+        self.assertTrue(topology["found"])
+        self.assertEqual(topology["hubs"][0]["value"], "scam.king@example.com")
+        self.assertIn("scam-shop.example.net", [node["value"] for node in topology["infrastructure"]])
+        self.assertEqual(sum(topology["relations"].values()), topology["edges"])
+        self.assertFalse(self.graph.topology("nobody@example.org")["found"])
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,131 @@
+"""
+Test Suite for the Risk Scoring Engine
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from risk_engine import RiskEngine, RiskArchive, build_matrix, extract_features, FEATURE_NAMES
+from breach_scanner import BreachScanner
+from deep_scanner import DeepScanner
+from deep_intel_scanner import DeepIntelScanner
+
+BREACH_RESULTS = {
+    "breach_count": 4,
+    "breach_details": [{"Name": "ExampleShop", "BreachDate": "2022-03-01"}],
+    "exposed_data": ["Email Addresses", "Passwords"],
+    "password_exposures": [],
+    "latest_breach": "2022-03-01"
+}
+
+class TestRiskEngine(unittest.TestCase):
+    """Test cases for vectorized risk scoring"""
+
+    def test_breach_profile_matches_weighted_formula(self):
+        """Test the breach profile reproduces the weighted breach metrics"""
+        engine = RiskEngine(profile="breach", as_of=2024)
+        scored = engine.score({"BREACH_INTELLIGENCE": BREACH_RESULTS})
+
+        expected = 0.3 * 0.4 + 0.4 * 0.8 + 0.3 * 0.8
+        self.assertAlmostEqual(scored["overall_risk_score"], expected)
+        self.assertAlmostEqual(scored["component_scores"]["temporal_risk"], 0.8)
+
+    def test_unobserved_features_do_not_dilute(self):
+        """Test scores average over the categories a scan actually collected"""
+        engine = RiskEngine(weights={"threat_score": 1.0, "phone_risk": 1.0}, rules=[])
+        scored = engine.score({"THREAT_INTELLIGENCE": {"threat_score": 60}})
+        self.assertAlmostEqual(scored["overall_risk_score"], 0.6)
+        self.assertEqual(engine.score({})["overall_risk_score"], 0.0)
+
+    def test_rules_apply_floors_and_boosts(self):
+        """Test rule sets raise scores and report the factors that fired"""
+        intel = {"BREACH_INTELLIGENCE": dict(BREACH_RESULTS, password_exposures=[{"hash": "x"}])}
+        scored = RiskEngine(as_of=2022).score(intel)
+
+        factors = {factor["type"] for factor in scored["risk_factors"]}
+        self.assertEqual(factors, {"credential_exposure", "recent_breach"})
+        self.assertAlmostEqual(scored["overall_risk_score"], 0.8)
+        self.assertLessEqual(scored["overall_risk_score"], 1.0)
+
+    def test_reproducible_configuration(self):
+        """Test identical configurations produce identical hashes and scores"""
+        first, second = RiskEngine(as_of=2024), RiskEngine(as_of=2024)
+        self.assertEqual(first.config_hash, second.config_hash)
+        self.assertNotEqual(first.config_hash, RiskEngine(as_of=2024, weights={"threat_score": 1.0}).config_hash)
+        with self.assertRaises(ValueError):
+            RiskEngine(weights={"not_a_feature": 1.0})
+
+    def test_vectorized_matches_single_scores(self):
+        """Test matrix scoring agrees with per-scan scoring"""
+        scans = [
+            {"BREACH_INTELLIGENCE": BREACH_RESULTS},
+            {"THREAT_INTELLIGENCE": {"threat_score": 0.9, "indicators": ["a"] * 5}},
+            {"PHONE_INTELLIGENCE": {"risk_score": 0.2}}
+        ]
+        engine = RiskEngine(as_of=2024)
+        features, observed = build_matrix(scans, as_of=2024)
+        scores = engine.score_matrix(features, observed)["scores"]
+        for scan, score in zip(scans, scores):
+            self.assertAlmostEqual(engine.score(scan)["overall_risk_score"], score)
+
+    def test_million_row_rescore(self):
+        """Test re-scoring a million archived scans in one pass"""
+        rng = np.random.default_rng(7)
+        features = rng.random((1_000_000, len(FEATURE_NAMES)))
+        observed = rng.random((1_000_000, len(FEATURE_NAMES))) > 0.3
+
+        start = time.perf_counter()
+        scores = RiskEngine().score_matrix(features, observed)["scores"]
+        duration = time.perf_counter() - start
+
+        self.assertEqual(scores.shape, (1_000_000,))
+        self.assertTrue(((scores >= 0.0) & (scores <= 1.0)).all())
+        self.assertLess(duration, 5.0)
+        print(f"\nScored 1000000 scans in {duration:.2f} seconds")
+
+    def test_archive_persists_features(self):
+        """Test archived features are saved once and re-scored with new weights"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "features.npz")
+            archive = RiskArchive(path, as_of=2024)
+            self.assertEqual(archive.add([("a", {"BREACH_INTELLIGENCE": BREACH_RESULTS}),
+                                          ("b", {"THREAT_INTELLIGENCE": {"threat_score": 0.5}})]), 2)
+            archive.save()
+
+            reloaded = RiskArchive(path)
+            self.assertEqual(reloaded.add([("a", {})]), 0)
+            scores = reloaded.score(RiskEngine(weights={"threat_score": 1.0}, rules=[]))
+            self.assertEqual(scores, {"a": 0.0, "b": 0.5})
+
+    def test_scanner_integration(self):
+        """Test scanners report engine scores"""
+        metrics = BreachScanner().get_risk_metrics(BREACH_RESULTS)
+        self.assertGreater(metrics["overall_risk_score"], 0.0)
+        self.assertEqual(set(metrics), {"overall_risk_score", "data_sensitivity_score",
+                                        "breach_frequency_score", "temporal_risk_score"})
+
+        risk = DeepScanner()._assess_risk({"THREAT_INTELLIGENCE": {"threat_score": 0.9}}, {})
+        self.assertIsInstance(risk["overall_risk_score"], float)
+        self.assertEqual(risk["risk_factors"][0]["type"], "active_threat")
+
+        scanner = DeepIntelScanner()
+        with mock.patch.object(scanner.risk_engine, "score", wraps=scanner.risk_engine.score) as score:
+            risk = scanner._assess_risk({"THREAT_INTELLIGENCE": {"threat_score": 0.9}})
+        self.assertEqual(score.call_count, 1)
+        self.assertEqual(risk["risk_factors"][0]["type"], "active_threat")
+
+    def test_extract_features_shape(self):
+        """Test feature rows have one column per feature"""
+        row, observed = extract_features({"PHONE_INTELLIGENCE": {"risk_score": 0.5}})
+        self.assertEqual(row.shape, (len(FEATURE_NAMES),))
+        self.assertEqual(int(observed.sum()), 1)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
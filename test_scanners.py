@@ -2,32 +2,47 @@
 Test Suite for Intelligence Scanners
 """
 
+import tempfile
 import unittest
+from unittest import mock
 from datetime import datetime
 from scanner_modules import (
     PhoneScanner, EmailScanner, DomainScanner,
     ThreatScanner, SocialScanner
 )
 from breach_scanner import BreachScanner
+from breach_store import BreachStore
+from whois_client import WhoisClient
+from tls_probe import TLSProber, FingerprintIndex
 from deep_scanner import DeepScanner
+from relationship_graph import RelationshipGraph
 
 class TestScanners(unittest.TestCase):
     """Test cases for intelligence scanners"""
 
     def setUp(self):
         """Set up test fixtures"""
+        # Breach records go to a temporary store and the WHOIS and TLS stores stay in memory,
+        # rather than under findings/
+        self.breach_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.breach_dir.cleanup)
+        for cls, store in ((WhoisClient, WhoisClient(":memory:")),
+                           (TLSProber, TLSProber(index=FingerprintIndex(":memory:")))):
+            patcher = mock.patch.object(cls, "_default", store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
         self.test_data = {
             "email": "test@example.com",
             "phone": "+1234567890",
             "domain": "example.com",
             "username": "testuser"
         }
-        self.deep_scanner = DeepScanner()
+        self.deep_scanner = DeepScanner(graph=RelationshipGraph(":memory:"))
         self.scanners = {
             "phone": PhoneScanner(),
             "email": EmailScanner(),
             "domain": DomainScanner(),
-            "breach": BreachScanner(),
+            "breach": BreachScanner(breach_store=BreachStore(self.breach_dir.name)),
             "threat": ThreatScanner(),
             "social": SocialScanner()
         }
@@ -0,0 +1,171 @@
+"""
+Test Suite for the Pre-fork Production Server
+"""
+
+import io
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import requests
+import serve
+from serve import ResponseCache
+
+def children_of(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return set(map(int, f.read().split()))
+
+class CountingApp:
+    """WSGI app returning how often it has been called"""
+
+    def __init__(self, status="200 OK"):
+        self.calls = 0
+        self.status = status
+
+    def __call__(self, environ, start_response):
+        self.calls += 1
+        body = environ["wsgi.input"].read()
+        start_response(self.status, [("Content-Type", "application/json")])
+        return [json.dumps({"calls": self.calls, "body": body.decode()}).encode()]
+
+def call(app, path="/api/scan/email", body=b'{"target": "a@example.com"}', method="POST"):
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured.update(status=status, headers=dict(headers))
+
+    environ = {"REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": "",
+               "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body)}
+    content = b"".join(app(environ, start_response))
+    return captured["headers"].get("X-Cache"), json.loads(content)
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "pre-fork server tests need fork and /proc")
+class TestServe(unittest.TestCase):
+    """Test cases for the response cache and the pre-fork server lifecycle"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_cache_is_shared_between_workers(self):
+        """Test a response cached by one worker is a hit for another"""
+        app = CountingApp()
+        first, second = ResponseCache(app, self.cache_path), ResponseCache(app, self.cache_path)
+
+        self.assertEqual(call(first), ("MISS", {"calls": 1, "body": '{"target": "a@example.com"}'}))
+        self.assertEqual(call(second)[0], "HIT-SHARED")
+        self.assertEqual(call(second)[0], "HIT-LOCAL")
+        self.assertEqual(call(first, body=b'{"target": "b@example.com"}')[1]["calls"], 2)
+        self.assertEqual(call(first, path="/api/health")[0], None)
+        self.assertEqual(app.calls, 3)
+
+    def test_cache_expiry_errors_and_bounds(self):
+        """Test entries expire, failures are not cached and the local tier is bounded"""
+        app = CountingApp()
+        cache = ResponseCache(app, self.cache_path, ttl=0.2, local_entries=2)
+        call(cache)
+        time.sleep(0.25)
+        self.assertEqual(call(cache)[0], "MISS")
+
+        for i in range(5):
+            call(cache, body=f'{{"target": "{i}"}}'.encode())
+        self.assertEqual(len(cache._local), 2)
+
+        failing = ResponseCache(CountingApp("500 INTERNAL SERVER ERROR"), None)
+        self.assertEqual([call(failing)[0] for _ in range(2)], ["MISS", "MISS"])
+
+        def provider_outage(environ, start_response):
+            start_response("200 OK", [("Content-Type", "application/json")])
+            return [json.dumps({"results": {"hunter": {"error": "Request failed: timed out"}}}).encode()]
+
+        outage = ResponseCache(provider_outage, self.cache_path)
+        self.assertEqual([call(outage, body=b'{"target": "b"}')[0] for _ in range(2)], ["MISS", "MISS"])
+
+    def test_prefork_serves_reloads_and_stops(self):
+        """Test workers share the socket, SIGHUP replaces them without failed requests, SIGTERM drains"""
+        env = {**os.environ, "SERVE_CACHE_PATH": self.cache_path}
+        master = subprocess.Popen(
+            [sys.executable, "serve.py", "scanner", "--port", "0", "--workers", "2", "--threads", "4"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        try:
+            url = master.stdout.readline().split()[-1]
+            session = requests.Session()
+            session.trust_env = False
+            self.assertEqual(session.get(f"{url}/api/health", timeout=10).json()["status"], "healthy")
+            first_generation = children_of(master.pid)
+            self.assertEqual(len(first_generation), 2)
+
+            statuses, stop = [], threading.Event()
+
+            def hammer():
+                with requests.Session() as client:
+                    client.trust_env = False
+                    while not stop.is_set():
+                        try:
+                            statuses.append(client.get(f"{url}/api/health", timeout=10).status_code)
+                        except requests.RequestException:
+                            statuses.append(599)
+
+            hammer_thread = threading.Thread(target=hammer)
+            hammer_thread.start()
+            time.sleep(0.5)
+            master.send_signal(signal.SIGHUP)
+            deadline = time.monotonic() + 20
+            while time.monotonic() < deadline and children_of(master.pid) & first_generation:
+                time.sleep(0.1)
+            time.sleep(0.5)
+            stop.set()
+            hammer_thread.join()
+
+            second_generation = children_of(master.pid)
+            self.assertEqual(len(second_generation), 2)
+            self.assertFalse(second_generation & first_generation)
+            self.assertGreater(len(statuses), 10)
+            self.assertEqual(set(statuses), {200})
+
+            master.send_signal(signal.SIGTERM)
+            self.assertEqual(master.wait(30), 0)
+        finally:
+            if master.poll() is None:
+                master.kill()
+            master.stdout.close()
+
+    def test_after_fork_reconnects_default_stores(self):
+        """Test inherited SQLite connections are replaced in a worker"""
+        from whois_client import WhoisClient
+        from tls_probe import FingerprintIndex
+        from relationship_graph import RelationshipGraph
+        stores = [WhoisClient(os.path.join(self.tmp, "whois.db")),
+                  FingerprintIndex(os.path.join(self.tmp, "tls.db")),
+                  RelationshipGraph(os.path.join(self.tmp, "graph.db"))]
+        inherited = [store.conn for store in stores]
+        with mock.patch.object(WhoisClient, "_default", stores[0]), \
+                mock.patch.object(FingerprintIndex, "_default", stores[1]), \
+                mock.patch.object(RelationshipGraph, "_default", stores[2]):
+            serve.after_fork()
+        for store, connection in zip(stores, inherited):
+            self.assertIsNot(store.conn, connection)
+            connection.close()
+        self.assertEqual(stores[0].purge_expired(), 0)
+        self.assertEqual(stores[1].stats()["hosts"], 0)
+        for store in stores:
+            store.close()
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
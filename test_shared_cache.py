@@ -0,0 +1,147 @@
+"""
+Test Suite for the Shared Result Cache
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from shared_cache import SharedCache
+from provider_adapters import category_cache_ttl, get_adapters
+from scanner_core import ScannerCore
+from deep_intel_scanner import DeepIntelScanner, NEGATIVE_CACHE_TTL
+
+KEYS = [f"deep_intel:EMAIL_INTELLIGENCE:user{i}@example.com" for i in range(200)]
+
+def worker_hit_rate(path, worker, workers, barrier, queue):
+    """Fetch a share of the keys, then look up all of them, storing any misses like a scanner would"""
+    cache = SharedCache(path)
+    for key in KEYS[worker::workers]:
+        if cache.get(key) is None:
+            cache.set(key, {"key": key})
+    barrier.wait()
+    for key in KEYS:
+        if cache.get(key) is None:
+            cache.set(key, {"key": key})
+    queue.put(cache.hit_rate)
+
+class TestSharedCache(unittest.TestCase):
+    """Test cases for the two-tier cache and the scanners using it"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_tiers_are_shared_and_copies_returned(self):
+        """Test a value stored by one instance is a hit for another"""
+        first, second = SharedCache(self.path), SharedCache(self.path)
+        first.set("scan:1", {"findings": [1]})
+        value = second.get("scan:1")
+        self.assertEqual(value, {"findings": [1]})
+        value["findings"].append(2)
+        self.assertEqual(second.get("scan:1"), {"findings": [1]})
+        self.assertEqual(second.stats, {"local_hits": 1, "shared_hits": 1, "misses": 0})
+        self.assertIsNone(second.get("scan:2"))
+
+        first.set("scan:0", {"findings": [0]})
+        first.set("other:0", {})
+        self.assertEqual(second.values("scan:"), [{"findings": [0]}, {"findings": [1]}])
+
+    def test_expiry_and_bounds(self):
+        """Test TTLs expire entries, a zero TTL skips caching and both tiers are bounded"""
+        cache = SharedCache(self.path, local_entries=4, local_bytes=100, shared_entries=10)
+        cache.set("short", 1, ttl=0.1)
+        cache.set("uncacheable", 1, ttl=0)
+        time.sleep(0.15)
+        self.assertIsNone(cache.get("short"))
+        self.assertIsNone(cache.get("uncacheable"))
+
+        for i in range(20):
+            cache.set(f"key{i:02d}", "x" * 10)
+        self.assertEqual(len(cache._local), 4)
+        cache.set("large", "x" * 60)
+        self.assertLessEqual(cache._local_size, 100)
+        self.assertEqual(cache.get("large"), "x" * 60)
+
+        self.assertEqual(cache.purge_expired(), 12)
+        self.assertEqual(len(cache.values()), 10)
+        self.assertIsNone(cache.get("key00"))
+        self.assertEqual(cache.get("key19"), "x" * 10)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "worker processes are forked")
+    def test_hit_rate_holds_as_workers_are_added(self):
+        """Test the shared tier keeps the overall hit rate as the same keys spread over more workers"""
+        rates = {}
+        for workers in (1, 2, 4):
+            path = os.path.join(self.tmp, f"workers{workers}.db")
+            context = multiprocessing.get_context("fork")
+            queue, barrier = context.Queue(), context.Barrier(workers)
+            processes = [context.Process(target=worker_hit_rate, args=(path, worker, workers, barrier, queue))
+                         for worker in range(workers)]
+            for process in processes:
+                process.start()
+            results = [queue.get(timeout=60) for _ in processes]
+            for process in processes:
+                process.join()
+            rates[workers] = sum(results) / len(results)
+        # Each worker misses only on its own share of the keys
+        self.assertEqual(rates[1], 0.5)
+        self.assertAlmostEqual(rates[2], 2 / 3)
+        self.assertAlmostEqual(rates[4], 4 / 5)
+        print(f"\nHit rate by worker count: {rates}")
+
+    def test_category_ttl_follows_adapters(self):
+        """Test category TTLs come from the shortest provider TTL"""
+        threat = get_adapters("THREAT_INTELLIGENCE").values()
+        self.assertEqual(category_cache_ttl("THREAT_INTELLIGENCE"), min(a.cache_ttl for a in threat))
+        self.assertIsNone(category_cache_ttl("PHONE_INTELLIGENCE"))
+        adapter = next(iter(threat))
+        with mock.patch.object(adapter, "cacheable", False):
+            self.assertEqual(category_cache_ttl("THREAT_INTELLIGENCE"), 0)
+
+    def test_scanners_share_results(self):
+        """Test scan results and category intelligence are shared between scanner instances"""
+        with mock.patch.object(ScannerCore, "_gather_category_data", return_value={"findings": []}):
+            scan = ScannerCore(cache=SharedCache(self.path)).scan("a@example.com", ["EMAIL_INTELLIGENCE"])
+        other = ScannerCore(cache=SharedCache(self.path))
+        scan_id = scan["scan_metadata"]["scan_id"]
+        self.assertEqual(other.get_scan_result(scan_id), scan)
+        self.assertEqual(other.get_scan_history()["scans"], [scan])
+
+        gathered = {"findings": [{"source": "hunter"}]}
+        with mock.patch.object(DeepIntelScanner, "_gather_intelligence", return_value=gathered) as gather:
+            for _ in range(2):
+                result = DeepIntelScanner(cache=SharedCache(self.path)).deep_scan("a@example.com", ["EMAIL_INTELLIGENCE"])
+                self.assertEqual(result["intelligence_data"]["EMAIL_INTELLIGENCE"], gathered)
+        self.assertEqual(gather.call_count, 1)
+
+    def test_failed_intelligence_is_cached_briefly(self):
+        """Test a category whose providers all failed is cached for the negative TTL only"""
+        transport = mock.Mock()
+        transport.get.side_effect = ConnectionError("provider down")
+        cache = SharedCache(self.path)
+        with mock.patch.object(cache, "set", wraps=cache.set) as stored:
+            result = DeepIntelScanner(transport=transport, cache=cache).deep_scan("a@example.com", ["EMAIL_INTELLIGENCE"])
+        self.assertEqual(result["intelligence_data"]["EMAIL_INTELLIGENCE"]["validation_results"], {})
+        self.assertEqual(stored.call_args[0][2], NEGATIVE_CACHE_TTL)
+
+        with mock.patch("deep_intel_scanner.NEGATIVE_CACHE_TTL", 0.1):
+            DeepIntelScanner(transport=transport, cache=SharedCache(self.path)).deep_scan("b@example.com", ["EMAIL_INTELLIGENCE"])
+            calls = transport.get.call_count
+            time.sleep(0.15)
+            DeepIntelScanner(transport=transport, cache=SharedCache(self.path)).deep_scan("b@example.com", ["EMAIL_INTELLIGENCE"])
+        self.assertGreater(transport.get.call_count, calls)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,112 @@
+"""
+Test Suite for Streaming JSON Parsing
+"""
+
+import json
+import unittest
+from streaming_json import extract_json, read_json, TruncatedList
+from provider_adapters import get_adapter
+
+SEARCH_RESPONSE = {
+    "total": 250,
+    "results": [
+        {"id": i, "title": f"post {i}", "content": "x" * 200, "meta": {"tags": ["a", "b]\"}"]}}
+        for i in range(250)
+    ],
+    "aggregations": {"sites": ["forum"] * 1000},
+    "took": 12
+}
+
+def chunked(document, size):
+    raw = json.dumps(document).encode()
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+class FakeStreamingResponse:
+    """Response stand-in exposing iter_content"""
+
+    def __init__(self, document, chunk_size=512):
+        self.chunks = chunked(document, chunk_size)
+        self.status_code = 200
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+class TestStreamingJSON(unittest.TestCase):
+    """Test cases for incremental response parsing"""
+
+    def test_full_parse_matches_json(self):
+        """Test unrestricted parsing matches json.loads for any chunking"""
+        for size in (1, 13, 4096):
+            self.assertEqual(extract_json(chunked(SEARCH_RESPONSE, size)), SEARCH_RESPONSE)
+
+    def test_field_extraction(self):
+        """Test only requested fields and item keys are kept"""
+        result = extract_json(
+            chunked(SEARCH_RESPONSE, 97),
+            fields={"total": None, "results": ("id", "title")},
+            max_items=20
+        )
+
+        self.assertEqual(set(result), {"total", "results", "_truncated"})
+        self.assertEqual(len(result["results"]), 20)
+        self.assertEqual(result["results"][3], {"id": 3, "title": "post 3"})
+        self.assertEqual(result["_truncated"], {"results": 250})
+
+    def test_body_cap(self):
+        """Test parsing stops at the byte cap and reports truncation"""
+        result = extract_json(chunked(SEARCH_RESPONSE, 1024), max_bytes=4096)
+        self.assertIn("_body", result["_truncated"])
+        self.assertLessEqual(result["_truncated"]["_body"], 4096 + 1024)
+
+        items = extract_json(chunked(SEARCH_RESPONSE["results"], 1024), max_bytes=4096)
+        self.assertIsInstance(items, TruncatedList)
+        self.assertGreater(len(items), 0)
+        self.assertEqual(items[0], SEARCH_RESPONSE["results"][0])
+        self.assertIn("_body", items.truncated)
+
+    def test_scalars_split_across_chunks(self):
+        """Test scalars and arrays spanning chunk boundaries"""
+        self.assertEqual(extract_json([b'{"n": 12', b'345, "ok": tr', b'ue}']), {"n": 12345, "ok": True})
+        capped = extract_json([b"[1, 2", b"3]"], max_items=1)
+        self.assertEqual((capped, capped.truncated), ([1], {"_items": 2}))
+        self.assertNotIsInstance(extract_json([b"[1, 2", b"3]"]), TruncatedList)
+
+    def test_numbers_split_at_fraction_exponent_and_sign(self):
+        """Test numbers cut after '.', 'e' or a sign are read whole, whether kept or skipped"""
+        self.assertEqual(extract_json([b'{"a": [1.', b'5, 2]}'], max_items=10), {"a": [1.5, 2]})
+        self.assertEqual(extract_json([b'[1e', b'5, 2]']), [1e5, 2])
+        self.assertEqual(extract_json([b'[2.5e-', b'3, -', b'4, 1E+', b'2]']), [2.5e-3, -4, 1e2])
+        self.assertEqual(extract_json([b'{"x": 1.', b'5, "y": -', b'7}'], fields={"y": None}), {"y": -7})
+        skipped = extract_json([b'[1, 2.', b'5, 3e', b'1]'], max_items=1)
+        self.assertEqual((skipped, skipped.truncated), ([1], {"_items": 3}))
+        for document in ([0.125, -3.5e-7, 12e10], {"v": -0.5, "w": [1e-3] * 5}):
+            for size in (1, 2, 3):
+                self.assertEqual(extract_json(chunked(document, size)), document)
+
+    def test_adapter_streams_search_responses(self):
+        """Test dark web search adapters read through the streaming path"""
+        adapter = get_adapter("DARK_WEB_INTELLIGENCE", "sixgill")
+        request = adapter.build_request(adapter.endpoints[0], "key", "target", {})
+        self.assertTrue(request["stream"])
+
+        response = FakeStreamingResponse(SEARCH_RESPONSE)
+        data = adapter.read_response(response)
+        self.assertEqual(len(data["results"]), 100)
+        self.assertTrue(response.closed)
+
+    def test_read_json_closes_response(self):
+        """Test read_json releases the connection"""
+        response = FakeStreamingResponse({"a": 1})
+        self.assertEqual(read_json(response), {"a": 1})
+        self.assertTrue(response.closed)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,84 @@
+"""
+Test Suite for Target Routing
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from target_routing import (
+    RoutingPlan, classify_target, accepts_analyzer, accepts_category
+)
+from deep_scanner import DeepScanner
+from relationship_graph import RelationshipGraph
+from prefilter import Prefilter
+from whois_client import WhoisClient
+from tls_probe import TLSProber, FingerprintIndex
+
+class TestTargetRouting(unittest.TestCase):
+    """Test cases for target-type-aware routing"""
+
+    def test_classify_target(self):
+        """Test target classification"""
+        self.assertEqual(classify_target("test@example.com"), "email")
+        self.assertEqual(classify_target("+1234567890"), "phone")
+        self.assertEqual(classify_target("(555) 123-4567"), "phone")
+        self.assertEqual(classify_target("555.123.4567"), "phone")
+        self.assertEqual(classify_target("2023-01-01"), "unknown")
+        self.assertEqual(classify_target("01/02/2023"), "unknown")
+        self.assertEqual(classify_target("192.168.1"), "unknown")
+        self.assertEqual(classify_target("example.com"), "domain")
+        self.assertEqual(classify_target("8.8.8.8"), "ip")
+        self.assertEqual(classify_target("0x" + "a" * 40), "crypto_address")
+        self.assertEqual(classify_target("1BoatSLRHtKNngkdXEeobR76b53LETtpyT"), "crypto_address")
+        self.assertEqual(classify_target("testuser"), "unknown")
+        self.assertEqual(classify_target(None), "unknown")
+
+    def test_irrelevant_routes_are_rejected(self):
+        """Test that providers which cannot match a target type are rejected"""
+        self.assertFalse(accepts_analyzer("email", "analyze_blockchain"))
+        self.assertTrue(accepts_analyzer("crypto_address", "analyze_blockchain"))
+        self.assertFalse(accepts_category("domain", "PHONE_INTELLIGENCE"))
+        self.assertTrue(accepts_category("phone", "PHONE_INTELLIGENCE"))
+
+    def test_unknown_targets_route_everywhere(self):
+        """Test that unclassified targets are not filtered"""
+        self.assertTrue(accepts_analyzer("unknown", "analyze_blockchain"))
+        self.assertTrue(accepts_category("unknown", "PHONE_INTELLIGENCE"))
+
+    def test_plan_records_skipped_calls(self):
+        """Test that a routing plan reports what it skipped"""
+        plan = RoutingPlan("test@example.com")
+        categories = plan.filter_categories(
+            ["EMAIL_INTELLIGENCE", "PHONE_INTELLIGENCE", "DOMAIN_INTELLIGENCE"]
+        )
+        self.assertEqual(categories, ["EMAIL_INTELLIGENCE"])
+        self.assertFalse(plan.allows_analyzer("analyze_blockchain"))
+
+        metadata = plan.to_metadata()
+        self.assertEqual(metadata["target_type"], "email")
+        self.assertEqual(
+            metadata["skipped_calls"],
+            ["PHONE_INTELLIGENCE", "DOMAIN_INTELLIGENCE", "analyze_blockchain"]
+        )
+
+    def test_deep_scan_skips_irrelevant_categories(self):
+        """Test that DeepScanner does not run phone providers against a domain"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        prefilter = Prefilter(os.path.join(tmp.name, "prefilter.npz"))
+        with mock.patch.object(WhoisClient, "_default", WhoisClient(":memory:")), \
+                mock.patch.object(TLSProber, "_default", TLSProber(index=FingerprintIndex(":memory:"))):
+            scanner = DeepScanner(graph=RelationshipGraph(":memory:"), prefilter=prefilter)
+            results = scanner.deep_scan("example.com", ["PHONE_INTELLIGENCE"])
+
+        self.assertNotIn("PHONE_INTELLIGENCE", results["intelligence_data"])
+        self.assertIn("PHONE_INTELLIGENCE", results["scan_metadata"]["skipped_calls"])
+        self.assertEqual(results["scan_metadata"]["target_type"], "domain")
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
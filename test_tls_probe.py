@@ -0,0 +1,210 @@
+"""
+Test Suite for TLS Probing and Fingerprint Clustering
+"""
+
+import ipaddress
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from tls_probe import TLSProber, FingerprintIndex, parse_http_banner, parse_target, server_fingerprint
+from scanner_modules import DomainScanner
+
+def make_certificate(directory, name, sans):
+    """Self-signed certificate and key files for a test server"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, name)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(subject).issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=30))
+        .add_extension(x509.SubjectAlternativeName(
+            [x509.DNSName(san) for san in sans] + [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+        ), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, f"{name}.pem")
+    key_path = os.path.join(directory, f"{name}.key")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+class TLSServer:
+    """Threaded local TLS server answering with a fixed HTTP banner"""
+
+    def __init__(self, cert_path, key_path, server_header, delay=0.0):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert_path, key_path)
+        self.context.set_alpn_protocols(["http/1.1"])
+        self.server_header = server_header
+        self.delay = delay
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            with self.context.wrap_socket(conn, server_side=True) as tls:
+                tls.recv(4096)
+                time.sleep(self.delay)
+                tls.sendall(f"HTTP/1.1 200 OK\r\nServer: {self.server_header}\r\nX-Powered-By: PHP/7.4\r\n"
+                            f"Content-Length: 0\r\n\r\n".encode())
+        except (OSError, ssl.SSLError):
+            pass
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def close(self):
+        self.sock.close()
+
+class TestTLSProbe(unittest.TestCase):
+    """Test cases for handshakes, fingerprints and shared-infrastructure lookups"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        shared = make_certificate(cls.tmp.name, "kit", ["shop-one.example", "shop-two.example"])
+        other = make_certificate(cls.tmp.name, "other", ["unrelated.example"])
+        cls.one = TLSServer(*shared, server_header="nginx/1.18.0")
+        cls.two = TLSServer(*shared, server_header="nginx/1.18.0")
+        cls.three = TLSServer(*other, server_header="Apache")
+        cls.slow = TLSServer(*other, server_header="Apache", delay=0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in (cls.one, cls.two, cls.three, cls.slow):
+            server.close()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.index = FingerprintIndex(":memory:")
+        self.prober = TLSProber(concurrency=8, timeout=3.0, index=self.index)
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_parse_target(self):
+        """Test host and port parsing"""
+        self.assertEqual(parse_target("scam.example"), ("scam.example", 443))
+        self.assertEqual(parse_target("scam.example:8443"), ("scam.example", 8443))
+        self.assertEqual(parse_target("[::1]:8443"), ("::1", 8443))
+
+    def test_parse_http_banner(self):
+        """Test banner parsing and header-order fingerprints"""
+        banner = parse_http_banner(b"HTTP/1.1 403 Forbidden\r\nServer: cloudflare\r\nDate: x\r\n\r\nbody")
+        self.assertEqual(banner["status"], 403)
+        self.assertEqual(banner["server"], "cloudflare")
+        reordered = parse_http_banner(b"HTTP/1.1 403 Forbidden\r\nDate: x\r\nServer: cloudflare\r\n\r\n")
+        self.assertNotEqual(banner["fingerprint"], reordered["fingerprint"])
+
+    def test_probe_extracts_certificate_and_banner(self):
+        """Test a handshake yields certificate, SANs, fingerprints and banner"""
+        result = self.prober.probe(("127.0.0.1", self.one.port))
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["certificate"]["san_dns"], ["shop-one.example", "shop-two.example"])
+        self.assertEqual(result["certificate"]["san_ip"], ["127.0.0.1"])
+        self.assertTrue(result["certificate"]["self_signed"])
+        self.assertEqual(result["http"]["server"], "nginx/1.18.0")
+        tls = result["tls"]
+        self.assertEqual(result["fingerprints"]["ja3s"], server_fingerprint(tls["version"], tls["cipher"], tls["alpn"]))
+        self.assertEqual(tls["alpn"], "http/1.1")
+
+    def test_failures_are_reported(self):
+        """Test unreachable hosts give an error result instead of raising"""
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+        closed.close()
+        result = self.prober.probe(("127.0.0.1", port))
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(self.index.stats()["hosts"], 0)
+
+        results = self.prober.probe_many(["host:abc", ("127.0.0.1", port)])
+        self.assertEqual([result["status"] for result in results], ["error", "error"])
+        self.assertEqual((results[0]["host"], results[0]["port"]), ("host:abc", None))
+        self.assertIn("ValueError", results[0]["error"])
+
+    def test_shared_infrastructure_clustering(self):
+        """Test hosts serving the same key are clustered through the index"""
+        results = self.prober.probe_many([
+            ("127.0.0.1", self.one.port), ("localhost", self.two.port), ("127.0.0.1", self.three.port)
+        ])
+        self.assertTrue(all(result["status"] == "ok" for result in results))
+
+        clusters = self.index.clusters("spki")
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["hosts"], ["127.0.0.1", "localhost"])
+
+        related = self.index.related("localhost")
+        self.assertEqual(list(related["spki"].values()), [["127.0.0.1"]])
+        self.assertEqual(self.index.hosts_with("san", "shop-two.example"), ["127.0.0.1", "localhost"])
+
+    def test_bounded_parallelism(self):
+        """Test no more than `concurrency` connections are open at once"""
+        prober = TLSProber(concurrency=3, timeout=3.0)
+        start = time.perf_counter()
+        results = prober.probe_many([("127.0.0.1", self.slow.port)] * 12)
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(result["status"] == "ok" for result in results))
+        self.assertLessEqual(self.slow.peak, 3)
+        print(f"\nProbed 12 hosts at concurrency 3 in {elapsed * 1000:.0f} ms")
+
+    def test_domain_scanner_uses_probe(self):
+        """Test DomainScanner fills certificates from the handshake"""
+        prober = TLSProber(timeout=3.0)
+        prober.probe = lambda domain: TLSProber.probe(prober, ("127.0.0.1", self.one.port), domain)
+        scanner = DomainScanner(dns_resolver=NoDNS(), whois_client=NoWhois(), tls_prober=prober)
+        endpoints = []
+        scanner.api_manager.make_request = lambda **kwargs: endpoints.append(kwargs["endpoint"])
+
+        results = scanner.gather_intelligence("shop-one.example", "securitytrails")
+        self.assertEqual(results["ssl_certificates"][0]["san_dns"], ["shop-one.example", "shop-two.example"])
+        self.assertIn("nginx/1.18.0", results["technology_stack"])
+        self.assertNotIn("ssl", endpoints)
+
+class NoDNS:
+    def resolve(self, domain):
+        return {}
+
+class NoWhois:
+    def lookup(self, domain):
+        return {"domain": domain, "registered": False}
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
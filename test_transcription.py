@@ -0,0 +1,222 @@
+"""
+Test Suite for Speech Transcription
+"""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+import wave
+from unittest import mock
+import numpy as np
+import transcription
+from transcription import (
+    Transcriber, TranscriptCache, TranscriptionBackend, WhisperCppBackend, VoskBackend, GoogleBackend,
+    TranscriptionError, default_backend, load_audio, split_on_silence, MODEL_SAMPLE_RATE
+)
+
+RATE = MODEL_SAMPLE_RATE
+
+def tone(seconds, frequency, rate=RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    return (0.3 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+def silence(seconds, rate=RATE):
+    return np.zeros(int(seconds * rate), dtype=np.float32)
+
+def write_wav(path, samples, rate=RATE, channels=1):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        frames = np.repeat(samples[:, None], channels, axis=1) if channels > 1 else samples
+        wav.writeframes((np.clip(frames, -1, 1) * 32767).astype("<i2").tobytes())
+
+class ToneBackend(TranscriptionBackend):
+    """Names each segment by its dominant frequency, with the span where it is loud"""
+
+    name = "tone"
+
+    def __init__(self, fail_above=None):
+        super().__init__()
+        self.calls = 0
+        self.fail_above = fail_above
+
+    def transcribe(self, samples, sample_rate):
+        self.calls += 1
+        spectrum = np.abs(np.fft.rfft(samples))
+        frequency = int(round(np.argmax(spectrum) * sample_rate / len(samples), -2))
+        if self.fail_above and frequency > self.fail_above:
+            raise RuntimeError("model crashed")
+        loud = np.flatnonzero(np.abs(samples) > 0.05)
+        return {"text": f"tone{frequency}",
+                "spans": [{"start": loud[0] / sample_rate, "end": loud[-1] / sample_rate,
+                           "text": f"tone{frequency}", "confidence": 1.0}]}
+
+class LoadCountingBackend(ToneBackend):
+    """Records each model load in a file shared by the worker processes"""
+
+    name = "loads"
+
+    def __init__(self, log_path):
+        super().__init__()
+        self.log_path = log_path
+
+    def load(self):
+        with open(self.log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+
+FAKE_WHISPER = """#!{python}
+import json, sys, wave
+args = sys.argv[1:]
+source = args[args.index("-f") + 1]
+output = args[args.index("-of") + 1]
+with wave.open(source) as wav:
+    duration_ms = int(wav.getnframes() * 1000 / wav.getframerate())
+with open(output + ".json", "w") as f:
+    json.dump({{"transcription": [
+        {{"offsets": {{"from": 0, "to": duration_ms // 2}}, "text": " send the"}},
+        {{"offsets": {{"from": duration_ms // 2, "to": duration_ms}}, "text": " gift cards"}},
+        {{"offsets": {{"from": duration_ms, "to": duration_ms}}, "text": " "}}
+    ]}}, f)
+"""
+
+class TestTranscription(unittest.TestCase):
+    """Test cases for segmentation, parallel transcription, backends and caching"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = TranscriptCache(os.path.join(self.tmp, "transcripts.db"))
+        self.call = np.concatenate([
+            silence(0.4), tone(6.0, 200), silence(0.6), tone(6.0, 300), silence(0.6), tone(3.0, 400), silence(0.4)
+        ])
+        self.path = os.path.join(self.tmp, "voicemail.wav")
+        write_wav(self.path, self.call)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp)
+
+    def test_split_on_silence(self):
+        """Test cuts fall inside pauses and segments respect the length limits"""
+        segments = split_on_silence(self.call, RATE)
+        self.assertEqual(len(segments), 3)
+        self.assertAlmostEqual(segments[1][0] / RATE, 6.7, delta=0.1)
+        self.assertAlmostEqual(segments[2][0] / RATE, 13.3, delta=0.1)
+        self.assertEqual(segments[-1][1], len(self.call))
+
+        merged = split_on_silence(self.call, RATE, min_seconds=20.0)
+        self.assertEqual(merged, [(0, len(self.call))])
+
+        unbroken = tone(70.0, 250)
+        pieces = split_on_silence(unbroken, RATE)
+        self.assertTrue(all(end - start <= 30 * RATE for start, end in pieces))
+        self.assertEqual(pieces[0][0], 0)
+        self.assertEqual(pieces[-1][1], len(unbroken))
+
+        self.assertEqual(split_on_silence(silence(5.0), RATE), [])
+
+    def test_parallel_matches_serial(self):
+        """Test pooled segments give the same transcript, in order, with file-time stamps"""
+        serial = Transcriber(ToneBackend(), workers=1, cache=self.cache).transcribe_samples(self.call, RATE)
+        with Transcriber(ToneBackend(), workers=3, cache=self.cache) as transcriber:
+            parallel = transcriber.transcribe_samples(self.call, RATE)
+        self.assertEqual(parallel, serial)
+        self.assertEqual([segment["text"] for segment in serial], ["tone200", "tone300", "tone400"])
+        self.assertAlmostEqual(serial[1]["spans"][0]["start"], 7.0, delta=0.05)
+        self.assertAlmostEqual(serial[2]["spans"][0]["end"], 16.6, delta=0.05)
+
+    def test_pool_loads_model_once_per_worker(self):
+        """Test the worker pool outlives a call, so the model is not reloaded for every file"""
+        log_path = os.path.join(self.tmp, "loads.log")
+        with Transcriber(LoadCountingBackend(log_path), workers=2, cache=self.cache) as transcriber:
+            for _ in range(4):
+                segments = transcriber.transcribe_samples(self.call, RATE)
+                self.assertEqual([segment["text"] for segment in segments], ["tone200", "tone300", "tone400"])
+            pool = transcriber.pool
+        with open(log_path) as f:
+            loads = f.read().split()
+        self.assertLessEqual(len(loads), 2)
+        self.assertEqual(len(loads), len(set(loads)))
+        self.assertIsNone(transcriber._pool)
+        self.assertRaises(RuntimeError, pool.submit, int)
+
+    def test_transcripts_cached_by_content(self):
+        """Test the same audio under another name is served from the cache"""
+        backend = ToneBackend()
+        transcriber = Transcriber(backend, workers=1, cache=self.cache)
+        first = transcriber.transcribe_file(self.path)
+        self.assertEqual(first["text"], "tone200 tone300 tone400")
+        self.assertTrue(first["success"])
+        self.assertFalse(first["cached"])
+
+        copy = os.path.join(self.tmp, "forwarded.wav")
+        shutil.copy(self.path, copy)
+        second = transcriber.transcribe_file(copy)
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["segments"], first["segments"])
+        self.assertEqual(backend.calls, 3)
+
+    def test_failed_segments_not_cached(self):
+        """Test a crashing segment is reported and the transcript is retried next time"""
+        transcriber = Transcriber(ToneBackend(fail_above=350), workers=1, cache=self.cache)
+        result = transcriber.transcribe_file(self.path)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["text"], "tone200 tone300")
+        self.assertIn("model crashed", result["errors"][0])
+        self.assertIsNone(self.cache.get(result["content_hash"], "tone"))
+
+    def test_whisper_cpp_backend(self):
+        """Test whisper.cpp JSON output is parsed into timestamped spans"""
+        binary = os.path.join(self.tmp, "whisper-cli")
+        with open(binary, "w") as f:
+            f.write(FAKE_WHISPER.format(python=sys.executable))
+        os.chmod(binary, os.stat(binary).st_mode | stat.S_IEXEC)
+
+        backend = WhisperCppBackend(model_path="/models/ggml-base.en.bin", binary=binary)
+        self.assertEqual(backend.identity(), "whisper_cpp:ggml-base.en.bin")
+        with Transcriber(backend, workers=2, cache=self.cache) as transcriber:
+            result = transcriber.transcribe_file(self.path)
+        self.assertTrue(result["success"])
+        self.assertEqual(len(result["segments"]), 3)
+        self.assertTrue(result["text"].startswith("send the gift cards send the"))
+        spans = result["segments"][1]["spans"]
+        self.assertEqual(len(spans), 2)
+        self.assertAlmostEqual(spans[0]["start"], result["segments"][1]["start"], places=2)
+
+        missing = WhisperCppBackend(model_path="model.bin", binary="no-such-whisper")
+        with self.assertRaises(TranscriptionError):
+            missing.transcribe(tone(1.0, 200), RATE)
+
+    def test_backend_selection(self):
+        """Test the environment picks a local engine and the network service only when asked for"""
+        with mock.patch.multiple(transcription, TRANSCRIPTION_BACKEND="", VOSK_MODEL_PATH="", WHISPER_CPP_MODEL=""):
+            with self.assertRaises(TranscriptionError):
+                default_backend()
+        with mock.patch.multiple(transcription, TRANSCRIPTION_BACKEND="google", VOSK_MODEL_PATH="/models/vosk-small-en"):
+            self.assertIsInstance(default_backend(), GoogleBackend)
+        with mock.patch.multiple(transcription, TRANSCRIPTION_BACKEND="", VOSK_MODEL_PATH="/models/vosk-small-en"):
+            self.assertIsInstance(default_backend(), VoskBackend)
+        with mock.patch.multiple(transcription, TRANSCRIPTION_BACKEND="whisper_cpp", WHISPER_CPP_MODEL="base.bin"):
+            self.assertIsInstance(default_backend(), WhisperCppBackend)
+        with mock.patch.multiple(transcription, TRANSCRIPTION_BACKEND="vosk", VOSK_MODEL_PATH=""):
+            with self.assertRaises(TranscriptionError):
+                default_backend()
+
+    def test_load_audio_resamples(self):
+        """Test recordings are downmixed and resampled to the model rate"""
+        path = os.path.join(self.tmp, "stereo.wav")
+        write_wav(path, tone(2.0, 440, rate=44100), rate=44100, channels=2)
+        samples = load_audio(path)
+        self.assertEqual(len(samples), 2 * RATE)
+        spectrum = np.abs(np.fft.rfft(samples))
+        self.assertAlmostEqual(np.argmax(spectrum) * RATE / len(samples), 440, delta=2)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
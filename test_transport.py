@@ -0,0 +1,224 @@
+"""
+Test Suite for the Record and Replay Transport
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+import requests
+from api_manager import APIManager
+from geoip_resolver import ipapi_batch
+from ioc_feeds import FeedSet
+from provider_adapters import execute_request
+from transport import Transport, CassetteMiss, normalize_url, request_key, VOLATILE_FIELDS
+from whois_client import WhoisClient
+
+class ProviderHandler(BaseHTTPRequestHandler):
+    """Answers with a counter so repeated requests get different bodies"""
+
+    calls = 0
+
+    def do_GET(self):
+        ProviderHandler.calls += 1
+        if self.path.startswith("/slow"):
+            time.sleep(0.1)
+        if self.path.startswith("/feed"):
+            body = f"evil{ProviderHandler.calls}.example\n".encode()
+        elif self.path.startswith("/rdap"):
+            body = json.dumps({"status": [f"call {ProviderHandler.calls}"]}).encode()
+        else:
+            body = json.dumps({"path": self.path.split("?")[0], "call": ProviderHandler.calls}).encode()
+        self.send_response(200 if not self.path.startswith("/missing") else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Set-Cookie", "session=abc")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        if isinstance(payload, list):
+            body = json.dumps([{"status": "success", "query": item["query"], "country": "Testland"}
+                               for item in payload]).encode()
+        else:
+            body = json.dumps({"echo": payload["query"]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestTransport(unittest.TestCase):
+    """Test cases for recording, replaying and wiring into the API manager"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cassette = os.path.join(self.tmp, "cassette.jsonl.gz")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ProviderHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.session = requests.Session()
+        self.session.trust_env = False
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp)
+
+    def record(self, *requests_made):
+        recorder = Transport("record", self.cassette, session=self.session)
+        responses = [recorder.request(method, url, **kwargs) for method, url, kwargs in requests_made]
+        recorder.save()
+        return responses
+
+    def test_record_then_replay_offline(self):
+        """Test recorded pairs replay in order once the provider is gone"""
+        recorded = self.record(
+            ("GET", f"{self.base}/v1/lookup", {"params": {"q": "a@example.com", "api_key": "SECRET"}}),
+            ("GET", f"{self.base}/v1/lookup", {"params": {"q": "a@example.com", "api_key": "SECRET"}}),
+            ("GET", f"{self.base}/missing", {}),
+            ("POST", f"{self.base}/v1/search", {"json": {"query": "alice", "token": "SECRET"}}),
+        )
+        self.server.shutdown()
+
+        with gzip.open(self.cassette, "rt") as f:
+            raw = f.read()
+        self.assertNotIn("SECRET", raw)
+        self.assertNotIn("Set-Cookie", raw)
+
+        replay = Transport("replay", self.cassette, latency_scale=0)
+        self.assertEqual(len(replay), 4)
+        # Secrets are not part of the match, so a different key still replays
+        first = replay.get(f"{self.base}/v1/lookup", params={"api_key": "OTHER", "q": "a@example.com"})
+        second = replay.get(f"{self.base}/v1/lookup?q=a%40example.com")
+        third = replay.get(f"{self.base}/v1/lookup", params={"q": "a@example.com"})
+        self.assertEqual(first.json(), recorded[0].json())
+        self.assertEqual(second.json(), recorded[1].json())
+        self.assertEqual(third.json(), recorded[1].json())
+        self.assertEqual(first.headers["content-type"], "application/json")
+        self.assertEqual(replay.get(f"{self.base}/missing").status_code, 404)
+        self.assertEqual(replay.post(f"{self.base}/v1/search", json={"query": "alice"}).json(),
+                         {"echo": "alice"})
+
+        with self.assertRaises(CassetteMiss):
+            replay.post(f"{self.base}/v1/search", json={"query": "bob"})
+
+    def test_replay_latency_scaling(self):
+        """Test replays wait the recorded latency times the scale"""
+        self.record(("GET", f"{self.base}/slow", {}))
+        for scale, low, high in ((1.0, 0.09, 0.5), (0.5, 0.045, 0.09), (0.0, 0.0, 0.03)):
+            replay = Transport("replay", self.cassette, latency_scale=scale)
+            started = time.perf_counter()
+            replay.get(f"{self.base}/slow")
+            self.assertTrue(low <= time.perf_counter() - started < high, scale)
+
+    def test_connection_errors_are_replayed(self):
+        """Test a failed recorded request fails the same way on replay"""
+        port = self.server.server_port
+        self.server.shutdown()
+        self.server.server_close()
+        recorder = Transport("record", self.cassette, session=self.session)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            recorder.get(f"http://127.0.0.1:{port}/down", timeout=2)
+        recorder.save()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            Transport("replay", self.cassette, latency_scale=0).get(f"http://127.0.0.1:{port}/down")
+
+    def test_api_manager_and_adapters_use_transport(self):
+        """Test streamed API manager responses and adapter requests replay from a cassette"""
+        with mock.patch("api_manager.get_api_url", return_value=self.base), \
+                mock.patch("api_manager.get_api_key", return_value="SECRET"):
+            live = APIManager(Transport("record", self.cassette, session=self.session))
+            recorded = live.make_request("EMAIL_INTELLIGENCE", "emailrep", "v1/lookup", {"email": "a@example.com"})
+            live.transport.save()
+            self.assertEqual(execute_request({"method": "GET", "url": f"{self.base}/adapter"}, live.transport).status_code, 200)
+            live.transport.save()
+            self.server.shutdown()
+
+            replay = Transport("replay", self.cassette, latency_scale=0)
+            offline = APIManager(replay)
+            self.assertEqual(offline.make_request("EMAIL_INTELLIGENCE", "emailrep", "v1/lookup",
+                                                  {"email": "a@example.com"}), recorded)
+            self.assertIn("Request failed", offline.make_request("EMAIL_INTELLIGENCE", "emailrep", "v1/other", {})["error"])
+            self.assertEqual(execute_request({"method": "GET", "url": f"{self.base}/adapter"}, replay).json()["path"], "/adapter")
+
+    def test_configuration(self):
+        """Test modes are validated and URLs normalized"""
+        with self.assertRaises(ValueError):
+            Transport("replay")
+        with self.assertRaises(ValueError):
+            Transport("capture", self.cassette)
+        self.assertEqual(Transport.default().mode, "live")
+        self.assertEqual(normalize_url("HTTPS://API.Example.com/v1?b=2&key=x", {"a": 1}),
+                         "https://api.example.com/v1?a=1&b=2")
+        self.assertNotEqual(request_key("POST", "https://x.example/", json_body={"q": 1}),
+                            request_key("POST", "https://x.example/", json_body={"q": 2}))
+
+    def test_volatile_fields_are_not_matched(self):
+        """Test a cassette recorded one day still replays requests dated the next"""
+        # Adapters filling a field from {today} mark it volatile when registered
+        self.assertIn("end_date", VOLATILE_FIELDS)
+        self.assertEqual(request_key("GET", "https://x.example/?end_date=2024-01-01", json_body={"ts": 1}),
+                         request_key("GET", "https://x.example/?end_date=2024-01-02", json_body={"ts": 2}))
+
+        recorded = self.record(("GET", f"{self.base}/v1/imagery", {"params": {"q": "a", "end_date": "2024-01-01"}}))
+        # Cassettes keyed before a field became volatile are re-keyed on load
+        with mock.patch("transport.VOLATILE_FIELDS", VOLATILE_FIELDS - {"end_date"}):
+            old = self.record(("GET", f"{self.base}/v1/old", {"params": {"end_date": "2023-06-01"}}))
+        self.server.shutdown()
+
+        replay = Transport("replay", self.cassette, latency_scale=0)
+        response = replay.get(f"{self.base}/v1/imagery", params={"q": "a", "end_date": "2024-01-02"})
+        self.assertEqual(response.json(), recorded[0].json())
+        self.assertEqual(replay.get(f"{self.base}/v1/old", params={"end_date": "2024-01-02"}).json(), old[0].json())
+        with self.assertRaises(CassetteMiss):
+            replay.get(f"{self.base}/v1/imagery", params={"q": "b", "end_date": "2024-01-02"})
+
+    def test_whois_geoip_and_feeds_use_transport(self):
+        """Test RDAP, ip-api batches and feed downloads are recorded and then replayed offline"""
+        first = ProviderHandler.calls + 1
+
+        def lookups(transport):
+            with mock.patch.object(Transport, "_default", transport), \
+                    mock.patch("geoip_resolver.get_api_url", return_value=f"{self.base}/json"):
+                whois = WhoisClient(":memory:", bootstrap={"com": f"{self.base}/rdap/"})
+                feeds = FeedSet([{"name": "mirror", "location": f"{self.base}/feed.txt", "format": "plain"}])
+                feeds.refresh()
+                return whois.lookup("scam-shop.com"), ipapi_batch(["8.8.8.8"]), feeds.index.lookup(f"evil{first}.example")
+
+        recorder = Transport("record", self.cassette, session=self.session)
+        recorded = lookups(recorder)
+        recorder.save()
+        self.assertEqual(recorded[0]["status"], [f"call {first + 1}"])
+        self.assertEqual(recorded[1]["8.8.8.8"]["country"], "Testland")
+        self.assertTrue(recorded[2])
+
+        calls = ProviderHandler.calls
+        replayed = lookups(Transport("replay", self.cassette, latency_scale=0))
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(ProviderHandler.calls, calls)
+
+        with mock.patch.object(Transport, "_default", Transport("replay", self.cassette, latency_scale=0)):
+            whois = WhoisClient(":memory:", bootstrap={})
+            with mock.patch("socket.create_connection") as connect:
+                self.assertIsNone(whois.lookup("unrecorded.net"))
+            connect.assert_not_called()
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
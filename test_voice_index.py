@@ -0,0 +1,194 @@
+"""
+Test Suite for the Voice Fingerprint Index
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import unittest
+import wave
+from unittest import mock
+import numpy as np
+import voice_index
+from voice_index import (
+    VoiceIndex, CallerMatcher, StreamingResampler, embed_samples, embed_file, EMBEDDING_DIM, EMBEDDING_SAMPLE_RATE,
+    SAVE_EVERY
+)
+from audio_streaming import StreamingFeatureExtractor
+
+RATE = EMBEDDING_SAMPLE_RATE
+
+# Pitch and formants of a few clearly different callers
+SPEAKERS = {
+    "deep": (95.0, (550.0, 1300.0, 2900.0)),
+    "bright": (220.0, (800.0, 2300.0, 3300.0)),
+    "nasal": (150.0, (350.0, 1000.0, 2500.0)),
+    "mid": (130.0, (700.0, 1700.0, 2700.0)),
+}
+
+def speaker_voice(name, seconds=4.0, seed=0):
+    """Harmonics shaped by the speaker's formants, with per-recording intonation and rhythm"""
+    f0, formants = SPEAKERS[name]
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = f0 * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.3, 0.7) * t + rng.uniform(0, 6)))
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    signal = np.zeros_like(t)
+    for k in range(1, int(7000 / f0)):
+        amplitude = sum(np.exp(-((k * f0 - formant) / 150.0) ** 2) for formant in formants) + 0.02
+        signal += amplitude * np.sin(k * phase)
+    envelope = np.maximum(np.sin(2 * np.pi * rng.uniform(3, 5) * t + rng.uniform(0, 6)), 0.0) ** 2
+    signal = 0.2 * signal / np.abs(signal).max() * envelope + 0.003 * rng.standard_normal(len(t))
+    return signal.astype(np.float32)
+
+def write_wav(path, samples, rate=RATE):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+
+class TestVoiceIndex(unittest.TestCase):
+    """Test cases for embeddings, IVF search, persistence and caller matching"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_embedding_shape_and_silence(self):
+        """Test embeddings are compact and silence gives none"""
+        embedding = embed_samples(speaker_voice("deep"))
+        self.assertEqual(embedding.shape, (EMBEDDING_DIM,))
+        self.assertAlmostEqual(np.exp(embedding[-2]), 95.0, delta=10.0)
+        self.assertIsNone(embed_samples(np.zeros(RATE * 3, dtype=np.float32)))
+
+    def test_same_caller_matched_across_recordings(self):
+        """Test a new recording matches the same voice and not the others"""
+        index = VoiceIndex()
+        for name in SPEAKERS:
+            for take in range(3):
+                index.add(f"{name}-{take}", embed_samples(speaker_voice(name, seed=take)), label=name)
+
+        for seed, name in enumerate(SPEAKERS, start=100):
+            matches = index.search(embed_samples(speaker_voice(name, seconds=5.0, seed=seed)), k=4)
+            self.assertEqual([match["label"] for match in matches[:3]], [name] * 3)
+            self.assertTrue(matches[0]["same_voice"])
+            self.assertFalse(matches[3]["same_voice"])
+
+    def test_ivf_search_matches_flat_scan(self):
+        """Test probing lists finds the same neighbours as a full scan, quickly"""
+        rng = np.random.default_rng(0)
+        callers = rng.standard_normal((1500, EMBEDDING_DIM))
+        vectors = np.repeat(callers, 4, axis=0) + 0.3 * rng.standard_normal((6000, EMBEDDING_DIM))
+        index = VoiceIndex()
+        for i, vector in enumerate(vectors):
+            index.add(f"rec-{i}", vector, label=f"caller-{i // 4}")
+        index.train()
+        self.assertIsNotNone(index.centroids)
+
+        queries = callers[:100] + 0.3 * rng.standard_normal((100, EMBEDDING_DIM))
+        start = time.perf_counter()
+        results = [index.search(query, k=1) for query in queries]
+        elapsed = (time.perf_counter() - start) / len(queries)
+
+        hits = sum(result[0]["label"] == f"caller-{i}" for i, result in enumerate(results))
+        self.assertGreaterEqual(hits, 98)
+        self.assertLess(elapsed, 0.01)
+        print(f"\nIVF search over {len(index)} voices: {elapsed * 1000:.2f} ms/query")
+
+    def test_retrains_as_index_grows(self):
+        """Test the lists are rebuilt once the index has doubled"""
+        rng = np.random.default_rng(1)
+        index = VoiceIndex()
+        with mock.patch.object(voice_index, "IVF_MIN_VECTORS", 50):
+            for i in range(60):
+                index.add(str(i), rng.standard_normal(EMBEDDING_DIM))
+            index.search(rng.standard_normal(EMBEDDING_DIM))
+            self.assertEqual(index.trained_size, 60)
+            for i in range(60, 130):
+                index.add(str(i), rng.standard_normal(EMBEDDING_DIM))
+            index.search(rng.standard_normal(EMBEDDING_DIM))
+            self.assertEqual(index.trained_size, 130)
+            self.assertEqual(len(index.centroids), int(np.sqrt(130)))
+
+    def test_file_embedding_streams_in_fixed_memory(self):
+        """Test a long recording is embedded block by block with the same result as the whole signal"""
+        voice = np.tile(speaker_voice("deep"), 30)
+        path = os.path.join(self.tmp, "long.wav")
+        write_wav(path, voice)
+
+        tracemalloc.start()
+        try:
+            embedding = embed_file(path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # Two minutes of 16 kHz audio alone is 7.7 MB as float32; the frame matrix would be far larger
+        self.assertLess(peak, 16 * 1024 * 1024)
+
+        features = StreamingFeatureExtractor(RATE).process(voice)
+        voiced = features[features[:, voice_index._VOICED] > 0]
+        mfcc, log_pitch = voiced[:, voice_index._MFCC], np.log(voiced[:, voice_index._PITCH])
+        whole = np.concatenate([mfcc.mean(axis=0), mfcc.std(axis=0), [log_pitch.mean(), log_pitch.std()]])
+        np.testing.assert_allclose(embedding, whole, atol=0.01)
+
+        samples = np.random.default_rng(2).random(100000).astype(np.float32)
+        resampler = StreamingResampler(44100, RATE)
+        streamed = np.concatenate([resampler.process(samples[i:i + 777]) for i in range(0, len(samples), 777)])
+        positions = np.arange(int(len(samples) * RATE / 44100)) * (44100 / RATE)
+        np.testing.assert_allclose(streamed[:len(positions)], np.interp(positions, np.arange(len(samples)), samples),
+                                   atol=1e-6)
+
+    def test_persistence_and_caller_matcher(self):
+        """Test registered recordings survive a reload and match new reports"""
+        path = os.path.join(self.tmp, "voices.npz")
+        files = {}
+        for name in SPEAKERS:
+            files[name] = os.path.join(self.tmp, f"{name}.wav")
+            write_wav(files[name], speaker_voice(name, seed=7))
+
+        matcher = CallerMatcher(VoiceIndex(path))
+        self.assertEqual(matcher.register_many(list(files.values()), labels={v: k for k, v in files.items()}), 4)
+        silent = os.path.join(self.tmp, "silent.wav")
+        write_wav(silent, np.zeros(RATE * 2, dtype=np.float32))
+        self.assertIsNone(matcher.register(silent))
+
+        reloaded = CallerMatcher(VoiceIndex(path))
+        self.assertEqual(len(reloaded.index), 4)
+        report = os.path.join(self.tmp, "new_report.wav")
+        write_wav(report, speaker_voice("nasal", seconds=6.0, seed=99))
+        result = reloaded.match(report, k=2)
+        self.assertEqual(result["matches"][0]["label"], "nasal")
+        self.assertEqual([match["recording_id"] for match in result["same_voice"]], [files["nasal"]])
+        self.assertIn("error", reloaded.match(silent))
+
+    def test_single_registrations_are_saved_in_batches(self):
+        """Test one-by-one registrations rewrite the index per SAVE_EVERY, not per call"""
+        path = os.path.join(self.tmp, "voices.npz")
+        matcher = CallerMatcher(VoiceIndex(path))
+        rng = np.random.default_rng(3)
+        embeddings = iter(rng.normal(size=(260, EMBEDDING_DIM)).astype(np.float32))
+        with mock.patch("voice_index.embed_file", side_effect=lambda path: next(embeddings)), \
+                mock.patch.object(matcher.index, "save", wraps=matcher.index.save) as save:
+            for i in range(250):
+                matcher.register(f"report{i}.wav")
+            self.assertEqual(save.call_count, 250 // SAVE_EVERY)
+            self.assertEqual(len(VoiceIndex(path)), 200)
+
+            matcher.flush()
+            self.assertEqual(len(VoiceIndex(path)), 250)
+            with mock.patch("voice_index.SAVE_INTERVAL", 0.0):
+                matcher.register("late.wav")
+            self.assertEqual(save.call_count, 250 // SAVE_EVERY + 2)
+            self.assertEqual(len(VoiceIndex(path)), 251)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
@@ -3,7 +3,9 @@ Web Interface Integration Tests
 Tests integration between scanners and web frontend
 """
 
+import tempfile
 import unittest
+from unittest import mock
 import json
 from datetime import datetime
 from scanner_modules import (
@@ -11,7 +13,11 @@ from scanner_modules import (
     ThreatScanner, SocialScanner
 )
 from breach_scanner import BreachScanner
+from breach_store import BreachStore
+from whois_client import WhoisClient
+from tls_probe import TLSProber, FingerprintIndex
 from deep_scanner import DeepScanner
+from relationship_graph import RelationshipGraph
 from flask import Flask, jsonify, request
 
 class TestWebIntegration(unittest.TestCase):
@@ -19,6 +25,15 @@ class TestWebIntegration(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures"""
+        # Breach records go to a temporary store and the WHOIS and TLS stores stay in memory,
+        # rather than under findings/
+        self.breach_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.breach_dir.cleanup)
+        for cls, store in ((WhoisClient, WhoisClient(":memory:")),
+                           (TLSProber, TLSProber(index=FingerprintIndex(":memory:")))):
+            patcher = mock.patch.object(cls, "_default", store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
         self.app = Flask(__name__)
         self.client = self.app.test_client()
         
@@ -33,7 +48,7 @@ class TestWebIntegration(unittest.TestCase):
             "phone": PhoneScanner(),
             "email": EmailScanner(),
             "domain": DomainScanner(),
-            "breach": BreachScanner(),
+            "breach": BreachScanner(breach_store=BreachStore(self.breach_dir.name)),
             "threat": ThreatScanner(),
             "social": SocialScanner()
         }
@@ -126,7 +141,7 @@ class TestWebIntegration(unittest.TestCase):
                         "timestamp": datetime.now().isoformat()
                     }), 400
                     
-                scanner = DeepScanner()
+                scanner = DeepScanner(graph=RelationshipGraph(":memory:"))
                 scan_result = scanner.deep_scan(target, scan_types)
                 
                 # Extract scan_metadata and other fields from the result
@@ -0,0 +1,217 @@
+"""
+Test Suite for the RDAP/WHOIS Client
+"""
+
+import socket
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from whois_client import (
+    WhoisClient, parse_rdap, parse_whois, parse_date, registrable_domain, cache_ttl,
+    MIN_CACHE_TTL, MAX_CACHE_TTL, NOT_FOUND_TTL
+)
+from scanner_modules import DomainScanner
+
+RDAP_RESPONSE = {
+    "objectClassName": "domain",
+    "ldhName": "SCAM-SHOP.COM",
+    "status": ["client transfer prohibited"],
+    "events": [
+        {"eventAction": "registration", "eventDate": "2024-05-01T10:00:00Z"},
+        {"eventAction": "last changed", "eventDate": "2024-05-02T10:00:00Z"},
+        {"eventAction": "expiration", "eventDate": "2025-05-01T10:00:00Z"}
+    ],
+    "nameservers": [{"ldhName": "NS2.HOST.EXAMPLE"}, {"ldhName": "NS1.HOST.EXAMPLE"}],
+    "entities": [
+        {
+            "roles": ["registrar"],
+            "vcardArray": ["vcard", [["version", {}, "text", "4.0"], ["fn", {}, "text", "Cheap Names LLC"]]],
+            "entities": [{
+                "roles": ["abuse"],
+                "vcardArray": ["vcard", [["fn", {}, "text", "Abuse Desk"], ["email", {}, "text", "abuse@cheapnames.example"]]]
+            }]
+        },
+        {
+            "roles": ["registrant"],
+            "vcardArray": ["vcard", [["org", {}, "text", "Privacy Service"], ["adr", {"cc": "IS"}, "text", ["", "", "", "", "", "", ""]]]]
+        }
+    ]
+}
+
+WHOIS_TEXT = """Domain Name: FRAUD-PAY.XYZ
+Registry Domain ID: D1234-XYZ
+Updated Date: 2024-06-10T08:00:00Z
+Creation Date: 2024-06-09T08:00:00Z
+Registry Expiry Date: 2025-06-09T23:59:59Z
+Registrar: Quick Registrar Inc.
+Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+Registrant Organization: Hidden
+Registrant Country: PA
+Name Server: NS1.FRAUD-DNS.NET
+Name Server: ns2.fraud-dns.net
+>>> Last update of WHOIS database: 2024-06-11T00:00:00Z <<<
+"""
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """RDAP server stand-in that counts requests"""
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        if url.endswith("/domain/scam-shop.com"):
+            return FakeResponse(200, RDAP_RESPONSE)
+        return FakeResponse(404)
+
+class NoDNS:
+    """Resolver stand-in with no answers"""
+
+    def resolve(self, domain):
+        return {}
+
+class WhoisServer:
+    """Local port-43 server answering every query with WHOIS_TEXT"""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.queries = []
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                self.queries.append(conn.recv(1024).decode().strip())
+                text = WHOIS_TEXT if "fraud-pay" in self.queries[-1] else "No match for domain\n"
+                conn.sendall(text.encode())
+
+class TestWhoisClient(unittest.TestCase):
+    """Test cases for RDAP/WHOIS lookups, parsing and caching"""
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.whois = WhoisServer()
+        self.client = WhoisClient(":memory:", session=self.session,
+                                  bootstrap={"com": "https://rdap.registry.example/com/v1/"},
+                                  whois_port=self.whois.port)
+        self.client._whois_servers["xyz"] = "127.0.0.1"
+
+    def tearDown(self):
+        self.whois.sock.close()
+        self.client.close()
+
+    def test_registrable_domain(self):
+        """Test hosts are reduced to their registered name"""
+        self.assertEqual(registrable_domain("login.secure.scam-shop.com."), "scam-shop.com")
+        self.assertEqual(registrable_domain("www.scam.co.uk"), "scam.co.uk")
+
+    def test_parse_date(self):
+        """Test registry date formats normalize to UTC ISO 8601"""
+        self.assertEqual(parse_date("2024-06-10T08:00:00Z"), "2024-06-10T08:00:00Z")
+        self.assertEqual(parse_date("10-Jun-2024"), "2024-06-10T00:00:00Z")
+        self.assertEqual(parse_date("2024.06.10 08:00:00"), "2024-06-10T08:00:00Z")
+        self.assertIsNone(parse_date("soon"))
+
+    def test_parse_rdap(self):
+        """Test RDAP responses normalize registrar, dates, nameservers and contacts"""
+        record = parse_rdap("scam-shop.com", RDAP_RESPONSE, "rdap.registry.example")
+        self.assertEqual(record["registrar"], "Cheap Names LLC")
+        self.assertEqual(record["created"], "2024-05-01T10:00:00Z")
+        self.assertEqual(record["nameservers"], ["ns1.host.example", "ns2.host.example"])
+        self.assertEqual(record["contacts"]["abuse"]["email"], "abuse@cheapnames.example")
+        self.assertEqual(record["contacts"]["registrant"], {"organization": "Privacy Service", "country": "IS"})
+
+    def test_parse_whois(self):
+        """Test WHOIS text normalizes into the same record layout"""
+        record = parse_whois("fraud-pay.xyz", WHOIS_TEXT, "whois.nic.xyz")
+        self.assertEqual(record["registrar"], "Quick Registrar Inc.")
+        self.assertEqual(record["expires"], "2025-06-09T23:59:59Z")
+        self.assertEqual(record["status"], ["clientTransferProhibited"])
+        self.assertEqual(record["nameservers"], ["ns1.fraud-dns.net", "ns2.fraud-dns.net"])
+        self.assertEqual(record["contacts"]["registrant"], {"organization": "Hidden", "country": "PA"})
+
+    def test_rdap_lookup_is_cached(self):
+        """Test RDAP lookups go through the bootstrap base URL and are cached"""
+        record = self.client.lookup("shop.scam-shop.com")
+        self.assertEqual(record["source"], "rdap")
+        self.assertEqual(self.session.urls, ["https://rdap.registry.example/com/v1/domain/scam-shop.com"])
+
+        self.assertEqual(self.client.lookup("scam-shop.com"), record)
+        self.assertEqual(len(self.session.urls), 1)
+        self.assertEqual(self.client.stats["cache_hits"], 1)
+
+        unregistered = self.client.lookup("nothing-here.com")
+        self.assertFalse(unregistered["registered"])
+
+    def test_port43_fallback(self):
+        """Test TLDs without RDAP are looked up over port 43"""
+        record = self.client.lookup("fraud-pay.xyz")
+        self.assertEqual(record["source"], "whois")
+        self.assertEqual(record["registrar"], "Quick Registrar Inc.")
+        self.assertEqual(self.whois.queries, ["fraud-pay.xyz"])
+        self.assertFalse(self.client.lookup("free-name.xyz")["registered"])
+
+    def test_cache_ttl_follows_update_date(self):
+        """Test recently changed records expire sooner than stable ones"""
+        now = time.time()
+        def record(updated_days_ago):
+            updated = datetime.now(timezone.utc) - timedelta(days=updated_days_ago)
+            return {"registered": True, "updated": updated.strftime("%Y-%m-%dT%H:%M:%SZ"), "expires": None}
+
+        self.assertEqual(cache_ttl(record(1), now), MIN_CACHE_TTL)
+        self.assertAlmostEqual(cache_ttl(record(50), now), 5 * 86400, delta=60)
+        self.assertEqual(cache_ttl(record(3000), now), MAX_CACHE_TTL)
+        self.assertEqual(cache_ttl({"registered": False}, now), NOT_FOUND_TTL)
+
+    def test_lookup_many_limits_per_registry(self):
+        """Test parallel lookups never exceed the per-registry limit"""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+        original = self.session.get
+
+        def slow_get(url, headers=None, timeout=None):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return original(url, headers, timeout)
+
+        self.session.get = slow_get
+        results = self.client.lookup_many([f"scam{i}.com" for i in range(40)], max_workers=20)
+        self.assertEqual(len(results), 40)
+        self.assertLessEqual(peak[0], self.client.registry_concurrency)
+
+    def test_domain_scanner_skips_provider_quota(self):
+        """Test DomainScanner only calls the provider WHOIS endpoint on failure"""
+        scanner = DomainScanner(dns_resolver=NoDNS(), whois_client=self.client)
+        endpoints = []
+        scanner.api_manager.make_request = lambda **kwargs: endpoints.append(kwargs["endpoint"])
+
+        results = scanner.gather_intelligence("scam-shop.com", "whois")
+        self.assertEqual(results["whois_data"]["registrar"], "Cheap Names LLC")
+        self.assertNotIn("whois", endpoints)
+
+def run_tests():
+    """Run all test cases"""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    run_tests()
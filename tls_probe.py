@@ -0,0 +1,357 @@
+"""
+TLS Probe
+Concurrent TLS handshakes extracting certificates, server fingerprints and HTTP banners
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import os
+import sqlite3
+import ssl
+import threading
+import time
+from datetime import timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Tuple, Union
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+
+DEFAULT_INDEX_PATH = os.environ.get("TLS_FINGERPRINT_PATH", "findings/tls_fingerprints.db")
+
+# Handshakes in flight at once
+DEFAULT_CONCURRENCY = 64
+
+# Seconds allowed for connect + handshake, and again for the HTTP banner
+DEFAULT_TIMEOUT = 5.0
+
+# Bytes of HTTP response read for the banner
+MAX_BANNER_BYTES = 16384
+
+# Only HTTP/1.1 is offered so the banner request can follow the handshake
+ALPN_PROTOCOLS = ["http/1.1"]
+
+USER_AGENT = "Mozilla/5.0 (compatible; infrastructure-probe)"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (host, port, kind, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fingerprints_value ON fingerprints (kind, value);
+"""
+
+Target = Union[str, Tuple[str, int]]
+
+def parse_target(target: Target, default_port: int = 443) -> Tuple[str, int]:
+    """(host, port) from "host", "host:port", "[v6]:port" or a tuple"""
+    if isinstance(target, tuple):
+        return target[0], int(target[1])
+    target = target.strip()
+    if target.startswith("["):
+        host, _, port = target[1:].partition("]:")
+        return host.rstrip("]"), int(port or default_port)
+    if target.count(":") == 1:
+        host, port = target.split(":")
+        return host, int(port)
+    return target, default_port
+
+def _default_sni(host: str) -> Optional[str]:
+    """Hostnames are sent as SNI, IP addresses are not"""
+    try:
+        ipaddress.ip_address(host)
+        return None
+    except ValueError:
+        return host
+
+def _utc(value: Any) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def parse_certificate(der: bytes) -> Dict[str, Any]:
+    """Subject, issuer, validity, SANs and fingerprints of a DER certificate"""
+    cert = x509.load_der_x509_certificate(der)
+    try:
+        san = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        dns_names = san.get_values_for_type(x509.DNSName)
+        ip_addresses = [str(ip) for ip in san.get_values_for_type(x509.IPAddress)]
+    except x509.ExtensionNotFound:
+        dns_names, ip_addresses = [], []
+
+    spki = cert.public_key().public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {
+        "subject": cert.subject.rfc4514_string(),
+        "issuer": cert.issuer.rfc4514_string(),
+        "serial_number": format(cert.serial_number, "x"),
+        "not_before": _utc(getattr(cert, "not_valid_before_utc", None) or cert.not_valid_before),
+        "not_after": _utc(getattr(cert, "not_valid_after_utc", None) or cert.not_valid_after),
+        "san_dns": sorted(dns_names),
+        "san_ip": sorted(ip_addresses),
+        "self_signed": cert.subject == cert.issuer,
+        "sha256": hashlib.sha256(der).hexdigest(),
+        "spki_sha256": hashlib.sha256(spki).hexdigest()
+    }
+
+def server_fingerprint(version: Optional[str], cipher: Optional[str], alpn: Optional[str]) -> str:
+    """
+    JA3S-style hash of the server's handshake choices
+
+    The ssl module does not expose the ServerHello extension list, so this
+    hashes the negotiated version, cipher suite and ALPN instead. Servers
+    with the same TLS stack and configuration give the same value.
+    """
+    return hashlib.md5(f"{version},{cipher},{alpn or ''}".encode("utf-8")).hexdigest()
+
+def parse_http_banner(raw: bytes) -> Dict[str, Any]:
+    """Status, Server header and header order from an HTTP response head"""
+    head = raw.split(b"\r\n\r\n", 1)[0].decode("iso-8859-1")
+    lines = head.split("\r\n")
+    status_parts = lines[0].split(" ", 2) if lines and lines[0].startswith("HTTP/") else []
+    headers = {}
+    order = []
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+            order.append(name.strip().lower())
+
+    banner = {
+        "status": int(status_parts[1]) if len(status_parts) > 1 and status_parts[1].isdigit() else None,
+        "server": headers.get("server"),
+        "powered_by": headers.get("x-powered-by"),
+        "headers": headers
+    }
+    # Header order and server software survive content changes between sites on the same stack
+    banner["fingerprint"] = hashlib.sha256(
+        f"{banner['status']}|{banner['server']}|{','.join(order)}".encode("utf-8")
+    ).hexdigest()[:32]
+    return banner
+
+def _client_context() -> ssl.SSLContext:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    # Scam infrastructure often serves invalid certificates; collect them rather than fail
+    context.verify_mode = ssl.CERT_NONE
+    context.set_alpn_protocols(ALPN_PROTOCOLS)
+    return context
+
+class TLSProber:
+    """Probes many hosts concurrently and records fingerprints in an index"""
+
+    _default: Optional["TLSProber"] = None
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        index: Optional["FingerprintIndex"] = None,
+        fetch_banner: bool = True
+    ):
+        """
+        Args:
+            concurrency: Maximum connections open at once
+            timeout: Seconds for connect and handshake, and again for the banner
+            index: Fingerprint index every successful probe is recorded in
+            fetch_banner: Send a HEAD request after the handshake
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.index = index
+        self.fetch_banner = fetch_banner
+        self.context = _client_context()
+
+    @classmethod
+    def default(cls) -> "TLSProber":
+        """Shared prober recording into the default fingerprint index"""
+        if cls._default is None:
+            cls._default = cls(index=FingerprintIndex.default())
+        return cls._default
+
+    async def probe_async(self, target: Target, server_name: Optional[str] = None) -> Dict[str, Any]:
+        """Handshake with one host and describe what it presented"""
+        host = target[0] if isinstance(target, tuple) else target
+        result: Dict[str, Any] = {"host": host, "port": None, "server_name": server_name, "status": "ok"}
+        writer = None
+        try:
+            # A malformed target is an error for this host only, not for the whole batch
+            host, port = parse_target(target)
+            sni = server_name or _default_sni(host)
+            result.update({"host": host, "port": port, "server_name": sni})
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=self.context, server_hostname=sni),
+                self.timeout
+            )
+            ssl_object = writer.get_extra_info("ssl_object")
+            cipher_name, _, bits = ssl_object.cipher()
+            version = ssl_object.version()
+            alpn = ssl_object.selected_alpn_protocol()
+            result["tls"] = {"version": version, "cipher": cipher_name, "bits": bits, "alpn": alpn}
+
+            leaf = ssl_object.getpeercert(binary_form=True)
+            chain = [leaf]
+            # Python 3.13+ exposes the whole chain the server sent
+            if hasattr(ssl_object, "get_unverified_chain"):
+                sent = [cert for cert in ssl_object.get_unverified_chain() or [] if isinstance(cert, bytes)]
+                chain = sent or chain
+            result["chain"] = [parse_certificate(der) for der in chain if der]
+            result["certificate"] = result["chain"][0] if result["chain"] else None
+
+            result["fingerprints"] = {"ja3s": server_fingerprint(version, cipher_name, alpn)}
+            if result["certificate"]:
+                result["fingerprints"]["certificate"] = result["certificate"]["sha256"]
+                result["fingerprints"]["spki"] = result["certificate"]["spki_sha256"]
+
+            if self.fetch_banner:
+                result["http"] = await self._banner(reader, writer, sni or host)
+                if result["http"]:
+                    result["fingerprints"]["http"] = result["http"]["fingerprint"]
+
+        except (OSError, asyncio.TimeoutError, ssl.SSLError, ValueError) as e:
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await asyncio.wait_for(writer.wait_closed(), 1.0)
+                except (OSError, asyncio.TimeoutError, ssl.SSLError):
+                    pass
+
+        if self.index is not None and result["status"] == "ok":
+            self.index.add(result)
+        return result
+
+    async def _banner(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str) -> Optional[Dict[str, Any]]:
+        request = f"HEAD / HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\nAccept: */*\r\nConnection: close\r\n\r\n"
+        writer.write(request.encode("ascii"))
+        raw = b""
+        try:
+            await asyncio.wait_for(writer.drain(), self.timeout)
+            while b"\r\n\r\n" not in raw and len(raw) < MAX_BANNER_BYTES:
+                chunk = await asyncio.wait_for(reader.read(4096), self.timeout)
+                if not chunk:
+                    break
+                raw += chunk
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            pass
+        return parse_http_banner(raw) if raw.startswith(b"HTTP/") else None
+
+    async def probe_many_async(self, targets: Iterable[Target]) -> List[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(target: Target) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.probe_async(target)
+
+        return await asyncio.gather(*(bounded(target) for target in targets))
+
+    def probe_many(self, targets: Iterable[Target]) -> List[Dict[str, Any]]:
+        """Probe every target with at most `concurrency` connections open"""
+        return asyncio.run(self.probe_many_async(list(targets)))
+
+    def probe(self, target: Target, server_name: Optional[str] = None) -> Dict[str, Any]:
+        return asyncio.run(self.probe_async(target, server_name))
+
+class FingerprintIndex:
+    """Persistent index of TLS and HTTP fingerprints for shared-infrastructure clustering"""
+
+    _default: Optional["FingerprintIndex"] = None
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_INDEX_PATH
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.reopen()
+
+    def reopen(self) -> None:
+        """Open a fresh connection, e.g. in a forked worker; an inherited one is abandoned, not closed"""
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(INDEX_SCHEMA)
+
+    @classmethod
+    def default(cls) -> "FingerprintIndex":
+        """Shared index at the default path"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """Record the fingerprints and SANs of a successful probe"""
+        entries = [(kind, value) for kind, value in result.get("fingerprints", {}).items() if value]
+        if result.get("certificate"):
+            entries += [("san", name.lower()) for name in result["certificate"]["san_dns"]]
+
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT INTO fingerprints (host, port, kind, value, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (host, port, kind, value) DO UPDATE SET last_seen = excluded.last_seen
+                """,
+                [(result["host"], result["port"], kind, value, now, now) for kind, value in entries]
+            )
+            self.conn.commit()
+
+    def hosts_with(self, kind: str, value: str) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT host FROM fingerprints WHERE kind = ? AND value = ? ORDER BY host", (kind, value)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def related(self, host: str, kinds: Iterable[str] = ("certificate", "spki", "san", "http")) -> Dict[str, Dict[str, List[str]]]:
+        """Other hosts sharing each of a host's fingerprints, by kind"""
+        kinds = list(kinds)
+        placeholders = ",".join("?" * len(kinds))
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT mine.kind, mine.value, other.host
+                FROM fingerprints AS mine
+                JOIN fingerprints AS other ON other.kind = mine.kind AND other.value = mine.value
+                WHERE mine.host = ? AND other.host != mine.host AND mine.kind IN ({placeholders})
+                ORDER BY other.host
+                """,
+                [host] + kinds
+            ).fetchall()
+
+        related: Dict[str, Dict[str, List[str]]] = {}
+        for kind, value, other in rows:
+            hosts = related.setdefault(kind, {}).setdefault(value, [])
+            if other not in hosts:
+                hosts.append(other)
+        return related
+
+    def clusters(self, kind: str = "spki", min_size: int = 2) -> List[Dict[str, Any]]:
+        """Groups of hosts sharing one fingerprint value, largest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT value, GROUP_CONCAT(DISTINCT host), COUNT(DISTINCT host) AS size
+                FROM fingerprints WHERE kind = ?
+                GROUP BY value HAVING size >= ?
+                ORDER BY size DESC, value
+                """,
+                (kind, min_size)
+            ).fetchall()
+        return [{"kind": kind, "value": value, "hosts": sorted(hosts.split(",")), "size": size}
+                for value, hosts, size in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute("SELECT kind, COUNT(*) FROM fingerprints GROUP BY kind").fetchall()
+            hosts = self.conn.execute("SELECT COUNT(DISTINCT host) FROM fingerprints").fetchone()[0]
+        return dict(rows, hosts=hosts)
@@ -0,0 +1,449 @@
+"""
+Speech Transcription
+Pluggable local/remote transcription backends with silence-split parallel chunks and a transcript cache
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from audio_batch import content_hash
+from audio_streaming import read_wav_chunks
+
+try:
+    import librosa
+except ImportError:  # Optional: only needed for non-PCM formats
+    librosa = None
+
+DEFAULT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", "findings/transcripts.db")
+
+# google, vosk or whisper_cpp; unset picks the first local engine that is configured.
+# Google needs network access, so it is only used when chosen here
+TRANSCRIPTION_BACKEND = os.environ.get("TRANSCRIPTION_BACKEND", "")
+VOSK_MODEL_PATH = os.environ.get("VOSK_MODEL_PATH", "")
+WHISPER_CPP_MODEL = os.environ.get("WHISPER_CPP_MODEL", "")
+WHISPER_CPP_BINARY = os.environ.get("WHISPER_CPP_BINARY", "whisper-cli")
+
+# Both local engines expect 16 kHz mono
+MODEL_SAMPLE_RATE = 16000
+
+# Segments are cut at the first pause after MIN_SEGMENT_SECONDS, so voicemails
+# spread across cores while each model call keeps some context
+MIN_SEGMENT_SECONDS = 5.0
+MAX_SEGMENT_SECONDS = 30.0
+MIN_SILENCE_SECONDS = 0.3
+# Energy frames used to find pauses
+SILENCE_FRAME_SECONDS = 0.01
+# Frames quieter than this fraction of the loud (95th percentile) level count as silence
+SILENCE_RATIO = 0.1
+SILENCE_FLOOR = 1e-3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    content_hash TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (content_hash, backend)
+) WITHOUT ROWID;
+"""
+
+class TranscriptionError(Exception):
+    """A backend is unavailable or misconfigured"""
+
+class TranscriptionBackend:
+    """
+    Base class for engines
+
+    transcribe() receives 16 kHz mono float32 samples for one segment and
+    returns {"text": str, "spans": [{"start", "end", "text", "confidence"}]}
+    with times in seconds relative to the segment. Loaded models are not
+    pickled; each worker process loads its own copy once, when it starts.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._model = None
+
+    def identity(self) -> str:
+        """Cache key component; changes whenever output could change"""
+        return self.name
+
+    def load(self) -> None:
+        """Load the model ahead of the first segment (engines without one do nothing)"""
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_model"] = None
+        return state
+
+class VoskBackend(TranscriptionBackend):
+    """Offline Kaldi-based recognition with word timestamps"""
+
+    name = "vosk"
+
+    def __init__(self, model_path: Optional[str] = None):
+        super().__init__()
+        self.model_path = model_path or VOSK_MODEL_PATH
+        if not self.model_path:
+            raise TranscriptionError("Vosk needs a model directory (VOSK_MODEL_PATH)")
+
+    def identity(self) -> str:
+        return f"vosk:{Path(self.model_path).name}"
+
+    def _load(self):
+        if self._model is None:
+            try:
+                import vosk
+            except ImportError as e:
+                raise TranscriptionError("vosk is not installed") from e
+            vosk.SetLogLevel(-1)
+            self._model = vosk.Model(self.model_path)
+        return self._model
+
+    def load(self) -> None:
+        self._load()
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        import vosk
+        recognizer = vosk.KaldiRecognizer(self._load(), sample_rate)
+        recognizer.SetWords(True)
+        pcm = to_pcm16(samples)
+        results = []
+        for start in range(0, len(pcm), 8000):
+            if recognizer.AcceptWaveform(pcm[start:start + 8000]):
+                results.append(json.loads(recognizer.Result()))
+        results.append(json.loads(recognizer.FinalResult()))
+
+        spans = [
+            {"start": word["start"], "end": word["end"], "text": word["word"], "confidence": word.get("conf")}
+            for result in results for word in result.get("result", [])
+        ]
+        text = " ".join(result["text"] for result in results if result.get("text"))
+        return {"text": text, "spans": spans}
+
+class WhisperCppBackend(TranscriptionBackend):
+    """Offline whisper.cpp recognition through its CLI, with phrase timestamps"""
+
+    name = "whisper_cpp"
+
+    def __init__(self, model_path: Optional[str] = None, binary: Optional[str] = None, threads: int = 1):
+        """
+        Args:
+            model_path: ggml model file
+            binary: whisper.cpp CLI (whisper-cli, or main in older builds)
+            threads: Threads per call; segments already run in parallel
+        """
+        super().__init__()
+        self.model_path = model_path or WHISPER_CPP_MODEL
+        self.binary = binary or WHISPER_CPP_BINARY
+        self.threads = threads
+        if not self.model_path:
+            raise TranscriptionError("whisper.cpp needs a model file (WHISPER_CPP_MODEL)")
+
+    def identity(self) -> str:
+        return f"whisper_cpp:{Path(self.model_path).name}"
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        binary = shutil.which(self.binary)
+        if binary is None:
+            raise TranscriptionError(f"whisper.cpp binary not found: {self.binary}")
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = os.path.join(tmp, "segment.wav")
+            write_pcm16(wav_path, samples, sample_rate)
+            output = os.path.join(tmp, "segment")
+            subprocess.run(
+                [binary, "-m", self.model_path, "-f", wav_path, "-t", str(self.threads),
+                 "-oj", "-of", output, "-np"],
+                check=True, capture_output=True, timeout=600
+            )
+            with open(output + ".json", encoding="utf-8") as f:
+                result = json.load(f)
+
+        spans = [
+            {"start": item["offsets"]["from"] / 1000.0, "end": item["offsets"]["to"] / 1000.0,
+             "text": item["text"].strip(), "confidence": None}
+            for item in result.get("transcription", []) if item.get("text", "").strip()
+        ]
+        return {"text": " ".join(span["text"] for span in spans), "spans": spans}
+
+class GoogleBackend(TranscriptionBackend):
+    """Google Web Speech API through speech_recognition; needs network access"""
+
+    name = "google"
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        try:
+            import speech_recognition as sr
+        except ImportError as e:
+            raise TranscriptionError("speech_recognition is not installed") from e
+        if self._model is None:
+            self._model = sr.Recognizer()
+        audio = sr.AudioData(to_pcm16(samples), sample_rate, 2)
+        try:
+            text = self._model.recognize_google(audio)
+        except sr.UnknownValueError:
+            text = ""
+        spans = [{"start": 0.0, "end": len(samples) / sample_rate, "text": text, "confidence": None}] if text else []
+        return {"text": text, "spans": spans}
+
+def default_backend() -> TranscriptionBackend:
+    """Backend chosen by TRANSCRIPTION_BACKEND, else the first configured local engine"""
+    choice = TRANSCRIPTION_BACKEND.lower()
+    if choice == "vosk" or (not choice and VOSK_MODEL_PATH):
+        return VoskBackend()
+    if choice == "whisper_cpp" or (not choice and WHISPER_CPP_MODEL):
+        return WhisperCppBackend()
+    if choice == "google":
+        return GoogleBackend()
+    if not choice:
+        raise TranscriptionError(
+            "No local transcription engine configured (VOSK_MODEL_PATH or WHISPER_CPP_MODEL); "
+            "set TRANSCRIPTION_BACKEND=google to use the network service"
+        )
+    raise TranscriptionError(f"Unknown transcription backend: {TRANSCRIPTION_BACKEND}")
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+def write_pcm16(path: str, samples: np.ndarray, sample_rate: int) -> None:
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(to_pcm16(samples))
+
+def load_audio(path: str, sample_rate: int = MODEL_SAMPLE_RATE) -> np.ndarray:
+    """Mono float32 samples at the model rate"""
+    try:
+        with wave.open(path, "rb") as wav:
+            source_rate = wav.getframerate()
+        samples = np.concatenate([block.mean(axis=1) for block in read_wav_chunks(path)] or [np.zeros(0, np.float32)])
+    except (wave.Error, EOFError):
+        if librosa is None:
+            raise
+        samples, source_rate = librosa.load(path, sr=None, mono=True)
+    if source_rate == sample_rate or not len(samples):
+        return samples.astype(np.float32)
+    if librosa is not None:
+        return librosa.resample(samples, orig_sr=source_rate, target_sr=sample_rate).astype(np.float32)
+    # Linear interpolation is adequate for speech, whose energy sits well below 8 kHz
+    target = np.arange(int(len(samples) * sample_rate / source_rate)) * (source_rate / sample_rate)
+    return np.interp(target, np.arange(len(samples)), samples).astype(np.float32)
+
+def split_on_silence(samples: np.ndarray, sample_rate: int, max_seconds: float = MAX_SEGMENT_SECONDS,
+                     min_silence: float = MIN_SILENCE_SECONDS,
+                     min_seconds: float = MIN_SEGMENT_SECONDS) -> List[Tuple[int, int]]:
+    """
+    (start, end) sample ranges of speech, cut in the middle of pauses
+
+    A segment ends at the first pause once it is min_seconds long and never
+    runs past max_seconds; speech with no pause that long is cut at its
+    quietest frame. Segments with no speech are dropped.
+    """
+    hop = max(1, int(sample_rate * SILENCE_FRAME_SECONDS))
+    n_frames = len(samples) // hop
+    if n_frames == 0:
+        return []
+    energy = np.sqrt(np.mean(samples[:n_frames * hop].reshape(n_frames, hop) ** 2, axis=1))
+    threshold = max(SILENCE_FLOOR, SILENCE_RATIO * np.percentile(energy, 95))
+    speech = energy >= threshold
+    if not speech.any():
+        return []
+
+    # Candidate cuts at the centre of every pause long enough to be one
+    cuts = []
+    min_run = max(1, int(min_silence / SILENCE_FRAME_SECONDS))
+    edges = np.flatnonzero(np.diff(np.concatenate([[1], speech.astype(np.int8), [1]])))
+    for run_start, run_end in zip(edges[::2], edges[1::2]):
+        if run_end - run_start >= min_run and 0 < run_start and run_end < n_frames:
+            cuts.append((run_start + run_end) // 2)
+    cuts.append(n_frames)
+
+    max_frames = max(1, int(max_seconds / SILENCE_FRAME_SECONDS))
+    min_frames = int(min_seconds / SILENCE_FRAME_SECONDS)
+    segments = []
+    start = previous = 0
+    for cut in cuts:
+        if cut - start > max_frames and previous > start:
+            segments.append((start, previous))
+            start = previous
+        while cut - start > max_frames:
+            window = energy[start + max_frames // 2:start + max_frames]
+            split = start + max_frames // 2 + int(np.argmin(window))
+            segments.append((start, split))
+            start = split
+        if cut - start >= min_frames or cut == n_frames:
+            segments.append((start, cut))
+            start = cut
+        previous = cut
+
+    last = len(samples)
+    return [
+        (begin * hop, last if end == n_frames else end * hop)
+        for begin, end in segments if end > begin and speech[begin:end].any()
+    ]
+
+_worker_backend: Optional[TranscriptionBackend] = None
+
+def _init_worker(backend: TranscriptionBackend) -> None:
+    global _worker_backend
+    _worker_backend = backend
+    try:
+        backend.load()
+    except Exception:
+        # Left to transcribe(), which reports the failure per segment
+        pass
+
+def _transcribe_segment(backend: TranscriptionBackend, samples: np.ndarray, sample_rate: int,
+                        offset: float) -> Dict[str, Any]:
+    """One segment with timestamps shifted to file time"""
+    segment = {"start": round(offset, 3), "end": round(offset + len(samples) / sample_rate, 3)}
+    try:
+        result = backend.transcribe(samples, sample_rate)
+    except Exception as e:
+        return {**segment, "text": "", "spans": [], "error": f"{type(e).__name__}: {e}"}
+    spans = [
+        {**span, "start": round(span["start"] + offset, 3), "end": round(span["end"] + offset, 3)}
+        for span in result.get("spans", [])
+    ]
+    return {**segment, "text": result.get("text", "").strip(), "spans": spans}
+
+def _pool_task(args: Tuple[np.ndarray, int, float]) -> Dict[str, Any]:
+    return _transcribe_segment(_worker_backend, *args)
+
+class TranscriptCache:
+    """SQLite cache of transcripts keyed by content hash and backend identity"""
+
+    _default: Optional["TranscriptCache"] = None
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CACHE_PATH
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def default(cls) -> "TranscriptCache":
+        """Shared cache at the default path"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def get(self, digest: str, backend: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT transcript FROM transcripts WHERE content_hash = ? AND backend = ?", (digest, backend)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, digest: str, backend: str, transcript: Dict[str, Any]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO transcripts (content_hash, backend, transcript, created) VALUES (?, ?, ?, ?)",
+                (digest, backend, json.dumps(transcript), time.time())
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+class Transcriber:
+    """Splits recordings at pauses and transcribes the segments in parallel"""
+
+    def __init__(self, backend: Optional[TranscriptionBackend] = None, workers: Optional[int] = None,
+                 cache: Optional[TranscriptCache] = None, max_segment_seconds: float = MAX_SEGMENT_SECONDS):
+        """
+        Args:
+            backend: Engine (defaults to default_backend())
+            workers: Worker processes (defaults to the number of cores)
+            cache: Transcript cache (defaults to the shared cache)
+            max_segment_seconds: Longest segment handed to one worker
+        """
+        self.backend = backend or default_backend()
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache or TranscriptCache.default()
+        self.max_segment_seconds = max_segment_seconds
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+
+    def __enter__(self) -> "Transcriber":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Worker processes kept for the transcriber's lifetime, so each loads the model once"""
+        with self._lock:
+            # A pool inherited across fork belongs to the parent and must not be used
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker, initargs=(self.backend,)
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+
+    def transcribe_file(self, path: str) -> Dict[str, Any]:
+        """
+        Transcript with per-segment and per-span timestamps
+
+        Cached by file content and backend; transcripts with failed segments
+        are returned but not cached.
+        """
+        digest = content_hash(path)
+        backend_id = self.backend.identity()
+        cached = self.cache.get(digest, backend_id)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        samples = load_audio(path)
+        segments = self.transcribe_samples(samples, MODEL_SAMPLE_RATE)
+        errors = [segment["error"] for segment in segments if "error" in segment]
+        transcript = {
+            "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+            "segments": segments,
+            "duration": round(len(samples) / MODEL_SAMPLE_RATE, 3),
+            "backend": backend_id,
+            "content_hash": digest,
+            "success": not errors,
+        }
+        if errors:
+            transcript["errors"] = errors
+        else:
+            self.cache.put(digest, backend_id, transcript)
+        return {**transcript, "cached": False}
+
+    def transcribe_samples(self, samples: np.ndarray, sample_rate: int) -> List[Dict[str, Any]]:
+        """Segments in time order"""
+        ranges = split_on_silence(samples, sample_rate, self.max_segment_seconds)
+        tasks = [(samples[start:end], sample_rate, start / sample_rate) for start, end in ranges]
+        if min(self.workers, len(tasks)) <= 1:
+            return [_transcribe_segment(self.backend, *task) for task in tasks]
+        return list(self.pool.map(_pool_task, tasks))
@@ -0,0 +1,252 @@
+"""
+Provider Transport
+Sends provider HTTP requests live, or records them to and replays them from compact cassette files
+"""
+
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# live: send requests; record: send and capture them; replay: answer from the cassette only
+DEFAULT_MODE = os.environ.get("SCANNER_TRANSPORT", "live")
+DEFAULT_CASSETTE_PATH = os.environ.get("SCANNER_CASSETTE", "findings/cassettes/scanner.jsonl.gz")
+# Replayed responses wait this multiple of their recorded latency (0 replays instantly)
+DEFAULT_LATENCY_SCALE = float(os.environ.get("SCANNER_REPLAY_LATENCY", "1.0"))
+
+MODES = ("live", "record", "replay")
+
+# Query and body fields never written to a cassette or used for matching
+SECRET_FIELDS = {
+    "key", "api_key", "apikey", "access_key", "token", "api_token", "auth", "password", "secret", "client_secret"
+}
+
+# Query and body fields left out of matching because they change from run to run, such as
+# dates relative to today and cache busters; SCANNER_VOLATILE_PARAMS adds comma-separated names
+VOLATILE_FIELDS = {"today", "timestamp", "ts", "nonce", "cachebuster", "_"} | {
+    name.strip().lower() for name in os.environ.get("SCANNER_VOLATILE_PARAMS", "").split(",") if name.strip()
+}
+
+# Response headers worth keeping; the rest only inflate cassettes
+RECORDED_HEADERS = ("Content-Type", "Retry-After", "Location", "ETag", "Last-Modified")
+
+# Recorded pairs are written out in batches of this size
+FLUSH_EVERY = 100
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request the cassette has no response for"""
+
+def register_volatile_fields(names: Iterable[str]) -> None:
+    """Leave more query and body fields out of request matching"""
+    VOLATILE_FIELDS.update(name.lower() for name in names)
+
+def _matched_fields() -> Set[str]:
+    return SECRET_FIELDS | VOLATILE_FIELDS
+
+def normalize_url(url: str, params: Optional[Dict[str, Any]] = None, ignored: Optional[Set[str]] = None) -> str:
+    """URL with query parameters merged, sorted and stripped of secrets (or any ignored fields)"""
+    ignored = SECRET_FIELDS if ignored is None else ignored
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    for name, value in (params or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((name, str(item)) for item in values if item is not None)
+    query = sorted((name, value) for name, value in query if name.lower() not in ignored)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+def body_digest(json_body: Any = None, data: Any = None, ignored: Optional[Set[str]] = None) -> Optional[str]:
+    """Short digest of a request body, ignoring secret (or any ignored) fields"""
+    ignored = SECRET_FIELDS if ignored is None else ignored
+    if json_body is not None:
+        if isinstance(json_body, dict):
+            json_body = {name: value for name, value in json_body.items() if name.lower() not in ignored}
+        payload = json.dumps(json_body, sort_keys=True, default=str).encode()
+    elif data is not None:
+        if isinstance(data, dict):
+            data = urlencode(sorted((k, v) for k, v in data.items() if k.lower() not in ignored))
+        payload = data.encode() if isinstance(data, str) else bytes(data)
+    else:
+        return None
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                json_body: Any = None, data: Any = None) -> str:
+    """Identity a recorded response is replayed under; secret and volatile fields are left out"""
+    ignored = _matched_fields()
+    return f"{method.upper()} {normalize_url(url, params, ignored)} {body_digest(json_body, data, ignored) or '-'}"
+
+def _encode_body(content: bytes) -> Tuple[str, str]:
+    try:
+        return content.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode("ascii"), "base64"
+
+def _build_response(entry: Dict[str, Any]) -> requests.Response:
+    """A fully read requests.Response carrying a recorded entry"""
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = entry.get("reason", "")
+    response.url = entry["url"]
+    response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    body = entry.get("body", "")
+    response._content = base64.b64decode(body) if entry.get("encoding") == "base64" else body.encode("utf-8")
+    # Marked as consumed so iter_content slices the stored body instead of reading a socket
+    response._content_consumed = True
+    response.elapsed = timedelta(milliseconds=entry.get("latency_ms", 0.0))
+    return response
+
+class Transport:
+    """
+    HTTP transport shared by the API manager and provider scanners
+
+    Cassettes are gzip-compressed JSON lines, one request/response pair per
+    line. Requests are matched on method, secret-free URL and body digest;
+    repeated requests replay their recorded responses in order, then keep
+    returning the last one.
+    """
+
+    _default: Optional["Transport"] = None
+
+    def __init__(self, mode: str = "live", cassette: Optional[str] = None,
+                 latency_scale: float = DEFAULT_LATENCY_SCALE, session: Optional[requests.Session] = None):
+        """
+        Args:
+            mode: live, record or replay
+            cassette: Cassette file recorded to or replayed from
+            latency_scale: Multiple of the recorded latency replayed responses wait
+            session: Session used for live requests (module-level requests if omitted)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown transport mode {mode!r}; expected one of {', '.join(MODES)}")
+        if mode != "live" and not cassette:
+            raise ValueError(f"{mode} mode needs a cassette path")
+        self.mode = mode
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.session = session
+        self._lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._recorded: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        if mode == "replay":
+            self.load()
+
+    @classmethod
+    def default(cls) -> "Transport":
+        """Shared transport configured from SCANNER_TRANSPORT and SCANNER_CASSETTE"""
+        if cls._default is None:
+            cls._default = cls(DEFAULT_MODE, DEFAULT_CASSETTE_PATH if DEFAULT_MODE != "live" else None)
+            if cls._default.mode == "record":
+                atexit.register(cls._default.save)
+        return cls._default
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Same signature as requests.request"""
+        if self.mode == "live":
+            return self._send(method, url, **kwargs)
+
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        if self.mode == "replay":
+            return self._replay(key, method, url)
+        return self._record(key, method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def load(self) -> None:
+        """Index the cassette's recorded pairs by request key"""
+        recorded: Dict[str, List[Dict[str, Any]]] = {}
+        ignored = _matched_fields()
+        if Path(self.cassette).exists():
+            with gzip.open(self.cassette, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        # Re-keyed from the stored URL so fields made volatile since recording still match
+                        digest = entry["key"].rsplit(" ", 1)[-1]
+                        entry["key"] = f"{entry['method']} {normalize_url(entry['url'], ignored=ignored)} {digest}"
+                        recorded.setdefault(entry["key"], []).append(entry)
+        with self._lock:
+            self._recorded = recorded
+            self._cursors = {}
+
+    def save(self) -> None:
+        """Append recorded pairs not yet written to the cassette"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        Path(self.cassette).parent.mkdir(parents=True, exist_ok=True)
+        # Each flush adds one gzip member; readers see the members as one stream
+        with gzip.open(self.cassette, "at", encoding="utf-8") as f:
+            for entry in pending:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._recorded.values())
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        if self.session is not None:
+            return self.session.request(method, url, **kwargs)
+        return requests.request(method, url, **kwargs)
+
+    def _replay(self, key: str, method: str, url: str) -> requests.Response:
+        with self._lock:
+            entries = self._recorded.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded response for {method.upper()} {normalize_url(url)}")
+            cursor = self._cursors.get(key, 0)
+            entry = entries[min(cursor, len(entries) - 1)]
+            self._cursors[key] = cursor + 1
+
+        if self.latency_scale > 0:
+            time.sleep(entry.get("latency_ms", 0.0) / 1000.0 * self.latency_scale)
+        if "error" in entry:
+            error = getattr(requests.exceptions, entry["error"], requests.exceptions.ConnectionError)
+            raise error(entry.get("message", ""))
+        return _build_response(entry)
+
+    def _record(self, key: str, method: str, url: str, **kwargs) -> requests.Response:
+        entry: Dict[str, Any] = {"key": key, "method": method.upper(), "url": normalize_url(url, kwargs.get("params")),
+                                 "recorded_at": datetime.now().isoformat()}
+        started = time.perf_counter()
+        try:
+            response = self._send(method, url, **kwargs)
+            # Read the whole body now so the latency covers it and streamed callers still see it
+            content = response.content
+        except requests.exceptions.RequestException as e:
+            entry.update(error=type(e).__name__, message=str(e),
+                         latency_ms=round((time.perf_counter() - started) * 1000.0, 2))
+            self._append(entry)
+            raise
+
+        # Bodies are stored decoded, so Content-Encoding is deliberately not kept
+        body, encoding = _encode_body(content)
+        entry.update(
+            status=response.status_code, reason=response.reason,
+            headers={name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            body=body, encoding=encoding, latency_ms=round((time.perf_counter() - started) * 1000.0, 2)
+        )
+        self._append(entry)
+        return response
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append(entry)
+            self._recorded.setdefault(entry["key"], []).append(entry)
+            flush = len(self._pending) >= FLUSH_EVERY
+        if flush:
+            self.save()
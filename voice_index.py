@@ -0,0 +1,347 @@
+"""
+Voice Fingerprint Index
+Compact voice embeddings in an on-disk IVF nearest-neighbour index for matching repeat callers
+"""
+
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import numpy as np
+from audio_streaming import StreamingFeatureExtractor, FEATURE_NAMES, N_MFCC, MIN_VOICED_FRAMES
+from audio_batch import read_audio_blocks
+
+DEFAULT_INDEX_PATH = os.environ.get("VOICE_INDEX_PATH", "findings/voice_index.npz")
+
+# Embeddings are computed at one rate so mel bands line up across recordings
+EMBEDDING_SAMPLE_RATE = 16000
+
+# Mean and deviation of MFCC 1..12 over voiced frames, plus log-pitch mean and deviation
+EMBEDDING_DIM = 2 * (N_MFCC - 1) + 2
+
+# Input samples handed to the feature extractor at a time, so memory stays flat however long the call
+EMBED_BLOCK_SAMPLES = 65536
+
+# Below this many voices a flat scan is faster than probing lists
+IVF_MIN_VECTORS = 1024
+# Lists are rebuilt once the index has grown by this factor since training
+RETRAIN_GROWTH = 2.0
+KMEANS_ITERATIONS = 20
+DEFAULT_N_PROBE = 8
+
+# Cosine similarity above which two recordings are reported as the same voice
+SAME_VOICE_SIMILARITY = 0.9
+
+# Each save rewrites the whole index, so single registrations are saved once this many are
+# unsaved or this many seconds after the last save
+SAVE_EVERY = 100
+SAVE_INTERVAL = 60.0
+
+_MFCC = slice(FEATURE_NAMES.index("mfcc_1"), FEATURE_NAMES.index("mfcc_0") + N_MFCC)
+_PITCH = FEATURE_NAMES.index("pitch")
+_VOICED = FEATURE_NAMES.index("voiced")
+
+class StreamingResampler:
+    """Linear-interpolation resampler fed block by block; adequate for speech, whose energy sits well below 8 kHz"""
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self.step = source_rate / target_rate
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.tail_start = 0
+        self.produced = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Output samples whose source positions these samples complete"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.step == 1.0:
+            return samples
+        buffer = np.concatenate((self.tail, samples))
+        if not len(buffer):
+            return buffer
+        last = self.tail_start + len(buffer) - 1
+        count = max(0, int(last / self.step) + 1 - self.produced)
+        positions = np.arange(self.produced, self.produced + count, dtype=np.float64) * self.step - self.tail_start
+        resampled = np.interp(positions, np.arange(len(buffer)), buffer).astype(np.float32)
+        # The last source sample is kept to interpolate towards the next block
+        self.produced += count
+        self.tail, self.tail_start = buffer[-1:], last
+        return resampled
+
+class VoiceEmbedder:
+    """
+    Voice embedding accumulated from audio blocks at any sample rate
+
+    Like RollingMetrics, only running sums over the voiced frames are kept,
+    so memory is constant however long the recording.
+    """
+
+    def __init__(self, sample_rate: int = EMBEDDING_SAMPLE_RATE):
+        self.resampler = StreamingResampler(sample_rate, EMBEDDING_SAMPLE_RATE)
+        self.extractor = StreamingFeatureExtractor(EMBEDDING_SAMPLE_RATE)
+        self.voiced = 0
+        self.mfcc_sum = np.zeros(N_MFCC - 1)
+        self.mfcc_squares = np.zeros(N_MFCC - 1)
+        self.pitch_sum = 0.0
+        self.pitch_squares = 0.0
+
+    def feed(self, block: np.ndarray) -> None:
+        """Add samples (mono, or frames x channels)"""
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim == 2:
+            block = block.mean(axis=1)
+        for start in range(0, len(block), EMBED_BLOCK_SAMPLES):
+            features = self.extractor.process(self.resampler.process(block[start:start + EMBED_BLOCK_SAMPLES]))
+            voiced = features[features[:, _VOICED] > 0]
+            if not len(voiced):
+                continue
+            mfcc = voiced[:, _MFCC].astype(np.float64)
+            log_pitch = np.log(voiced[:, _PITCH].astype(np.float64))
+            self.voiced += len(voiced)
+            self.mfcc_sum += mfcc.sum(axis=0)
+            self.mfcc_squares += (mfcc ** 2).sum(axis=0)
+            self.pitch_sum += float(log_pitch.sum())
+            self.pitch_squares += float((log_pitch ** 2).sum())
+
+    def embedding(self) -> Optional[np.ndarray]:
+        """Mean and deviation of MFCCs and log-pitch so far, or None with too little voiced speech"""
+        if self.voiced < MIN_VOICED_FRAMES:
+            return None
+        mfcc_mean = self.mfcc_sum / self.voiced
+        mfcc_std = np.sqrt(np.maximum(self.mfcc_squares / self.voiced - mfcc_mean ** 2, 0.0))
+        pitch_mean = self.pitch_sum / self.voiced
+        pitch_std = np.sqrt(max(self.pitch_squares / self.voiced - pitch_mean ** 2, 0.0))
+        return np.concatenate([mfcc_mean, mfcc_std, [pitch_mean, pitch_std]]).astype(np.float32)
+
+def embed_samples(samples: np.ndarray, sample_rate: int = EMBEDDING_SAMPLE_RATE) -> Optional[np.ndarray]:
+    """Voice embedding from mono samples, or None with too little voiced speech"""
+    embedder = VoiceEmbedder(sample_rate)
+    embedder.feed(samples)
+    return embedder.embedding()
+
+def embed_file(path: str) -> Optional[np.ndarray]:
+    """Voice embedding of a recording, decoded and analyzed block by block"""
+    sample_rate, _, blocks = read_audio_blocks(path)
+    embedder = VoiceEmbedder(sample_rate)
+    for block in blocks:
+        embedder.feed(block)
+    return embedder.embedding()
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS,
+                     seed: int = 0) -> np.ndarray:
+    """Unit-length centroids of unit-length vectors"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        # Reseed empty lists from random vectors rather than dropping them
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids.astype(np.float32)
+
+class VoiceIndex:
+    """
+    Inverted-file index of voice embeddings
+
+    Raw embeddings are standardized with per-dimension statistics and
+    compared by cosine similarity. Small indexes are scanned in full; from
+    IVF_MIN_VECTORS voices the embeddings are clustered with spherical
+    k-means and a query only scans the n_probe nearest lists.
+    """
+
+    _default: Optional["VoiceIndex"] = None
+
+    def __init__(self, path: Optional[str] = None, n_probe: int = DEFAULT_N_PROBE):
+        """
+        Args:
+            path: .npz file the index is loaded from and saved to (None for memory only)
+            n_probe: Lists scanned per query once the index is clustered
+        """
+        self.path = path
+        self.n_probe = n_probe
+        self._lock = threading.RLock()
+        self.vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self.ids: List[str] = []
+        self.labels: List[str] = []
+        self.mean = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        self.scale = np.ones(EMBEDDING_DIM, dtype=np.float32)
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._pending: List[np.ndarray] = []
+        self._unit: Optional[np.ndarray] = None
+        self._lists: Optional[List[np.ndarray]] = None
+        if path and Path(path).exists():
+            self.load()
+
+    @classmethod
+    def default(cls) -> "VoiceIndex":
+        """Shared index at the default path"""
+        if cls._default is None:
+            cls._default = cls(DEFAULT_INDEX_PATH)
+        return cls._default
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, recording_id: str, embedding: np.ndarray, label: Optional[str] = None) -> None:
+        """Store a recording's embedding under an optional caller label"""
+        with self._lock:
+            self._pending.append(np.asarray(embedding, dtype=np.float32))
+            self.ids.append(recording_id)
+            self.labels.append(label or "")
+            self._unit = None
+            self._lists = None
+
+    def train(self) -> None:
+        """Freeze standardization statistics and rebuild the inverted lists"""
+        with self._lock:
+            self._flush()
+            self._fit_scale()
+            self.centroids = None
+            if len(self) >= IVF_MIN_VECTORS:
+                unit = self._normalize(self.vectors)
+                self.centroids = spherical_kmeans(unit, int(np.sqrt(len(self))))
+            self.trained_size = len(self)
+            self._unit = None
+            self._lists = None
+
+    def search(self, embedding: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Nearest stored recordings, most similar first"""
+        with self._lock:
+            if not len(self):
+                return []
+            self._flush()
+            self._refresh()
+            query = self._normalize(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+            if self.centroids is None:
+                candidates = np.arange(len(self))
+            else:
+                probe = min(n_probe or self.n_probe, len(self.centroids))
+                nearest = np.argpartition(-(self.centroids @ query), probe - 1)[:probe]
+                candidates = np.concatenate([self._lists[i] for i in nearest])
+            similarity = self._unit[candidates] @ query
+            top = np.argsort(-similarity)[:k]
+            return [
+                {"recording_id": self.ids[candidates[i]], "label": self.labels[candidates[i]] or None,
+                 "similarity": round(float(similarity[i]), 4),
+                 "same_voice": bool(similarity[i] >= SAME_VOICE_SIMILARITY)}
+                for i in top
+            ]
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._flush()
+            # Written beside the target and swapped in so readers never see a partial file
+            temp = f"{path}.tmp.npz"
+            np.savez(
+                temp, vectors=self.vectors, ids=np.array(self.ids, dtype=str), labels=np.array(self.labels, dtype=str),
+                mean=self.mean, scale=self.scale, trained_size=self.trained_size,
+                centroids=self.centroids if self.centroids is not None else np.zeros((0, EMBEDDING_DIM), np.float32)
+            )
+            os.replace(temp, path)
+
+    def load(self, path: Optional[str] = None) -> None:
+        with self._lock, np.load(path or self.path) as data:
+            self.vectors = data["vectors"].astype(np.float32)
+            self.ids = data["ids"].tolist()
+            self.labels = data["labels"].tolist()
+            self.mean, self.scale = data["mean"], data["scale"]
+            self.trained_size = int(data["trained_size"])
+            self.centroids = data["centroids"] if len(data["centroids"]) else None
+            self._pending = []
+            self._unit = None
+            self._lists = None
+
+    def _flush(self) -> None:
+        # Rows are appended in batches so bulk loads stay linear
+        if self._pending:
+            self.vectors = np.vstack([self.vectors] + [row[None, :] for row in self._pending])
+            self._pending = []
+
+    def _fit_scale(self) -> None:
+        if len(self) >= 2:
+            self.mean = self.vectors.mean(axis=0)
+            self.scale = self.vectors.std(axis=0) + 1e-6
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        standardized = (vectors - self.mean) / self.scale
+        return standardized / (np.linalg.norm(standardized, axis=1, keepdims=True) + 1e-10)
+
+    def _refresh(self) -> None:
+        """Retrain when the index has outgrown its lists, then rebuild derived arrays"""
+        if (len(self) >= IVF_MIN_VECTORS and len(self) >= RETRAIN_GROWTH * self.trained_size) or \
+                (self.centroids is None and len(self) != self.trained_size):
+            self.train()
+        if self._unit is None:
+            self._unit = self._normalize(self.vectors)
+        if self.centroids is not None and self._lists is None:
+            assignment = np.argmax(self._unit @ self.centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            bounds = np.searchsorted(assignment[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+
+class CallerMatcher:
+    """Registers recordings and finds earlier reports by the same voice"""
+
+    def __init__(self, index: Optional[VoiceIndex] = None):
+        self.index = index if index is not None else VoiceIndex.default()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        if index is None:
+            # Registrations still held back are written when the process exits
+            atexit.register(self.flush)
+
+    def register(self, audio_file: str, recording_id: Optional[str] = None,
+                 label: Optional[str] = None, save: bool = True) -> Optional[np.ndarray]:
+        """
+        Embed and store a recording; None if it has too little voiced speech
+
+        With save, the index is written once SAVE_EVERY registrations are
+        unsaved or SAVE_INTERVAL seconds have passed since the last write;
+        flush() writes it at once.
+        """
+        embedding = embed_file(audio_file)
+        if embedding is not None:
+            self.index.add(recording_id or audio_file, embedding, label)
+            with self._lock:
+                self._unsaved += 1
+                due = save and (self._unsaved >= SAVE_EVERY or time.monotonic() - self._saved_at >= SAVE_INTERVAL)
+            if due:
+                self.flush()
+        return embedding
+
+    def register_many(self, audio_files: List[str], labels: Optional[Dict[str, str]] = None) -> int:
+        """Register a batch of recordings with one save; returns how many had usable speech"""
+        labels = labels or {}
+        added = sum(
+            self.register(path, label=labels.get(path), save=False) is not None for path in audio_files
+        )
+        if added:
+            self.flush()
+        return added
+
+    def flush(self) -> None:
+        """Save registrations not yet written to the index file"""
+        with self._lock:
+            if self._unsaved and self.index.path:
+                self.index.save()
+            self._unsaved = 0
+            self._saved_at = time.monotonic()
+
+    def match(self, audio_file: str, k: int = 5) -> Dict[str, Any]:
+        """Stored recordings closest to this one, with a same-voice verdict"""
+        return self.match_embedding(embed_file(audio_file), k)
+
+    def match_embedding(self, embedding: Optional[np.ndarray], k: int = 5) -> Dict[str, Any]:
+        """Like match, for an embedding already computed from the recording"""
+        if embedding is None:
+            return {"matches": [], "same_voice": [], "error": "Not enough voiced speech"}
+        matches = self.index.search(embedding, k)
+        return {"matches": matches, "same_voice": [match for match in matches if match["same_voice"]]}
@@ -0,0 +1,454 @@
+"""
+WHOIS Client
+Native RDAP and port-43 WHOIS lookups normalized into one record, with a persistent cache
+"""
+
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable
+from urllib.parse import urlparse
+import requests
+from transport import Transport
+
+DEFAULT_CACHE_PATH = os.environ.get("WHOIS_CACHE_PATH", "findings/whois_cache.db")
+
+IANA_RDAP_BOOTSTRAP = "https://data.iana.org/rdap/dns.json"
+IANA_WHOIS_SERVER = "whois.iana.org"
+
+# Local copy of the RDAP bootstrap registry and how long it is trusted
+BOOTSTRAP_CACHE_PATH = os.environ.get("RDAP_BOOTSTRAP_PATH", "findings/rdap_dns_bootstrap.json")
+BOOTSTRAP_MAX_AGE = 86400
+
+# Concurrent requests allowed against any one registry or registrar server
+REGISTRY_CONCURRENCY = 4
+
+REQUEST_TIMEOUT = 15
+
+# Cache lifetime: a fraction of the time since the record last changed, within bounds.
+# Recently updated records (typical of fresh scam domains) are re-checked soon,
+# records untouched for years are kept for weeks.
+UPDATE_AGE_FRACTION = 0.1
+MIN_CACHE_TTL = 6 * 3600
+MAX_CACHE_TTL = 30 * 86400
+DEFAULT_CACHE_TTL = 86400
+NOT_FOUND_TTL = 3600
+
+# Public suffixes with two labels, enough to find the registrable domain for common ccTLDs
+MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "com.au", "net.au", "org.au",
+    "co.nz", "co.jp", "ne.jp", "or.jp", "co.za", "com.br", "com.cn", "com.mx",
+    "co.in", "com.tr", "com.sg", "co.kr", "com.ar", "com.ua", "co.id"
+}
+
+CONTACT_ROLES = {"registrant": "registrant", "administrative": "admin", "technical": "technical", "abuse": "abuse"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS whois_cache (
+    domain TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+WHOIS_FIELDS = {
+    "registrar": ("registrar", "sponsoring registrar", "registrar name"),
+    "created": ("creation date", "created", "created on", "registered on", "registration time", "domain registration date"),
+    "updated": ("updated date", "last updated", "last modified", "changed", "modified", "last updated on"),
+    "expires": ("registry expiry date", "registrar registration expiration date", "expiration date",
+                "expiry date", "expires", "expires on", "paid-till", "expiration time"),
+    "nameservers": ("name server", "nameserver", "nserver", "name servers"),
+    "status": ("domain status", "status", "state"),
+    "referral": ("registrar whois server", "whois server", "refer", "whois")
+}
+
+WHOIS_CONTACT_PREFIXES = {"registrant": "registrant", "admin": "admin", "tech": "technical"}
+
+WHOIS_NOT_FOUND = re.compile(r"no match|not found|no data found|no entries found|status:\s*free|available for registration",
+                             re.IGNORECASE)
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%b-%Y", "%Y.%m.%d", "%d.%m.%Y", "%Y/%m/%d", "%d/%m/%Y",
+                "%Y-%m-%d %H:%M:%S", "%Y.%m.%d %H:%M:%S", "%d-%b-%Y %H:%M:%S")
+
+def registrable_domain(domain: str) -> str:
+    """Registered name for a host, e.g. login.scam.co.uk -> scam.co.uk"""
+    labels = domain.strip().rstrip(".").lower().split(".")
+    if labels and labels[0] == "www":
+        labels = labels[1:]
+    keep = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-keep:])
+
+def parse_date(value: Optional[str]) -> Optional[str]:
+    """ISO 8601 UTC timestamp for the date formats registries use"""
+    if not value:
+        return None
+    value = value.strip().split(" (")[0]
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = None
+        for date_format in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, date_format)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _empty_record(domain: str, source: str, server: str) -> Dict[str, Any]:
+    return {
+        "domain": domain,
+        "registered": True,
+        "registrar": None,
+        "created": None,
+        "updated": None,
+        "expires": None,
+        "nameservers": [],
+        "status": [],
+        "contacts": {},
+        "source": source,
+        "server": server
+    }
+
+def _vcard_contact(entity: Dict[str, Any]) -> Dict[str, Any]:
+    contact = {}
+    vcard = entity.get("vcardArray")
+    for prop in (vcard[1] if isinstance(vcard, list) and len(vcard) > 1 else []):
+        name, params, _, value = (prop + [None] * 4)[:4]
+        if name == "fn" and value:
+            contact["name"] = value
+        elif name == "org" and value:
+            contact["organization"] = value if isinstance(value, str) else " ".join(value)
+        elif name == "email" and value:
+            contact["email"] = value
+        elif name == "tel" and value:
+            contact["phone"] = value
+        elif name == "adr":
+            country = (params or {}).get("cc") or (value[-1] if isinstance(value, list) and value else None)
+            if country:
+                contact["country"] = country
+    return contact
+
+def _walk_entities(entities: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    for entity in entities or []:
+        yield entity
+        yield from _walk_entities(entity.get("entities"))
+
+def parse_rdap(domain: str, data: Dict[str, Any], server: str) -> Dict[str, Any]:
+    """Normalized record from an RDAP domain response"""
+    record = _empty_record(domain, "rdap", server)
+    events = {event.get("eventAction"): event.get("eventDate") for event in data.get("events", [])}
+    record["created"] = parse_date(events.get("registration"))
+    record["updated"] = parse_date(events.get("last changed"))
+    record["expires"] = parse_date(events.get("expiration"))
+    record["nameservers"] = sorted(
+        ns["ldhName"].lower().rstrip(".") for ns in data.get("nameservers", []) if ns.get("ldhName")
+    )
+    record["status"] = list(data.get("status", []))
+
+    for entity in _walk_entities(data.get("entities")):
+        roles = entity.get("roles", [])
+        contact = _vcard_contact(entity)
+        if "registrar" in roles and record["registrar"] is None:
+            record["registrar"] = contact.get("name") or contact.get("organization")
+        for role in roles:
+            key = CONTACT_ROLES.get(role)
+            if key and contact and key not in record["contacts"]:
+                record["contacts"][key] = contact
+    return record
+
+def parse_whois(domain: str, text: str, server: str) -> Dict[str, Any]:
+    """Normalized record from port-43 WHOIS text"""
+    record = _empty_record(domain, "whois", server)
+    field_for = {alias: field for field, aliases in WHOIS_FIELDS.items() for alias in aliases}
+
+    for line in text.splitlines():
+        key, sep, value = line.strip().partition(":")
+        value = value.strip()
+        if not sep or not value or key.startswith(("%", "#", ">>>")):
+            continue
+        key = key.strip().lower()
+
+        field = field_for.get(key)
+        if field == "nameservers":
+            host = value.split()[0].lower().rstrip(".")
+            if host not in record["nameservers"]:
+                record["nameservers"].append(host)
+        elif field == "status":
+            record["status"].append(value.split()[0])
+        elif field == "referral":
+            record.setdefault("referral", value.lower().replace("whois://", "").strip("/"))
+        elif field in ("created", "updated", "expires"):
+            record[field] = record[field] or parse_date(value)
+        elif field == "registrar":
+            record["registrar"] = record["registrar"] or value
+        else:
+            prefix, _, attribute = key.partition(" ")
+            role = WHOIS_CONTACT_PREFIXES.get(prefix)
+            attribute = {"name": "name", "organization": "organization", "email": "email",
+                         "phone": "phone", "country": "country"}.get(attribute)
+            if role and attribute:
+                record["contacts"].setdefault(role, {}).setdefault(attribute, value)
+
+    record["nameservers"].sort()
+    return record
+
+def unregistered_record(domain: str, source: str, server: str) -> Dict[str, Any]:
+    return dict(_empty_record(domain, source, server), registered=False)
+
+def cache_ttl(record: Dict[str, Any], now: Optional[float] = None) -> float:
+    """Seconds a record stays cached, derived from when it was last updated"""
+    now = now or time.time()
+    if not record.get("registered"):
+        return NOT_FOUND_TTL
+    updated = record.get("updated") or record.get("created")
+    if not updated:
+        return DEFAULT_CACHE_TTL
+
+    age = now - datetime.fromisoformat(updated.replace("Z", "+00:00")).timestamp()
+    ttl = min(max(age * UPDATE_AGE_FRACTION, MIN_CACHE_TTL), MAX_CACHE_TTL)
+    if record.get("expires"):
+        until_expiry = datetime.fromisoformat(record["expires"].replace("Z", "+00:00")).timestamp() - now
+        if until_expiry > 0:
+            ttl = min(ttl, max(until_expiry, MIN_CACHE_TTL))
+    return ttl
+
+class WhoisClient:
+    """RDAP-first registration lookups with port-43 fallback and a persistent cache"""
+
+    _default: Optional["WhoisClient"] = None
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        session: Optional[Any] = None,
+        bootstrap: Optional[Dict[str, str]] = None,
+        whois_port: int = 43,
+        registry_concurrency: int = REGISTRY_CONCURRENCY
+    ):
+        """
+        Args:
+            cache_path: SQLite cache location (":memory:" for a private cache)
+            session: HTTP client used for RDAP and the bootstrap registry (defaults to the shared Transport)
+            bootstrap: TLD -> RDAP base URL map (loaded from IANA when None)
+            whois_port: Port used for WHOIS queries
+            registry_concurrency: Concurrent requests allowed per server
+        """
+        self.cache_path = cache_path or DEFAULT_CACHE_PATH
+        if self.cache_path != ":memory:":
+            Path(self.cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self.reopen()
+
+        self.session = session if session is not None else Transport.default()
+        self._bootstrap = bootstrap
+        self.whois_port = whois_port
+        self.registry_concurrency = registry_concurrency
+        self._registry_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._whois_servers: Dict[str, Optional[str]] = {}
+        self.stats = {"cache_hits": 0, "rdap": 0, "whois": 0, "failures": 0}
+
+    @classmethod
+    def default(cls) -> "WhoisClient":
+        """Shared client with the cache at the default path"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def reopen(self) -> None:
+        """Open a fresh cache connection, e.g. in a forked worker; an inherited one is abandoned, not closed"""
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # Cache
+
+    def _cache_get(self, domain: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT record, expires FROM whois_cache WHERE domain = ?", (domain,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        self.stats["cache_hits"] += 1
+        return json.loads(row[0])
+
+    def _cache_put(self, domain: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO whois_cache (domain, record, expires) VALUES (?, ?, ?)",
+                (domain, json.dumps(record), time.time() + cache_ttl(record))
+            )
+            self.conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            deleted = self.conn.execute("DELETE FROM whois_cache WHERE expires <= ?", (time.time(),)).rowcount
+            self.conn.commit()
+        return deleted
+
+    # Servers
+
+    def _slot(self, server: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if server not in self._registry_slots:
+                self._registry_slots[server] = threading.BoundedSemaphore(self.registry_concurrency)
+            return self._registry_slots[server]
+
+    @property
+    def bootstrap(self) -> Dict[str, str]:
+        """TLD -> RDAP base URL, from the IANA bootstrap registry"""
+        if self._bootstrap is None:
+            self._bootstrap = self._load_bootstrap()
+        return self._bootstrap
+
+    def _load_bootstrap(self) -> Dict[str, str]:
+        path = Path(BOOTSTRAP_CACHE_PATH)
+        data = None
+        if path.exists() and time.time() - path.stat().st_mtime < BOOTSTRAP_MAX_AGE:
+            with open(path) as f:
+                data = json.load(f)
+        if data is None:
+            try:
+                response = self.session.get(IANA_RDAP_BOOTSTRAP, timeout=REQUEST_TIMEOUT)
+                if response.status_code == 200:
+                    data = response.json()
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, "w") as f:
+                        json.dump(data, f)
+            except (requests.RequestException, ValueError, OSError):
+                data = None
+        if data is None and path.exists():
+            # A stale copy beats none
+            with open(path) as f:
+                data = json.load(f)
+
+        services = {}
+        for tlds, urls in (data or {}).get("services", []):
+            base = next((url for url in urls if url.startswith("https://")), urls[0] if urls else None)
+            for tld in tlds:
+                services[tld.lower()] = base
+        return services
+
+    def _whois_server(self, tld: str) -> Optional[str]:
+        if tld not in self._whois_servers:
+            server = None
+            try:
+                text = self.whois_query(IANA_WHOIS_SERVER, tld)
+                server = parse_whois(tld, text, IANA_WHOIS_SERVER).get("referral")
+            except OSError:
+                pass
+            self._whois_servers[tld] = server
+        return self._whois_servers[tld]
+
+    # Transports
+
+    def whois_query(self, server: str, query: str) -> str:
+        """Raw port-43 response for a query"""
+        # Port-43 traffic cannot be recorded, so replayed scans rely on RDAP alone
+        if getattr(self.session, "mode", "live") == "replay":
+            raise OSError(f"WHOIS query to {server} not available in replay mode")
+        with self._slot(server):
+            with socket.create_connection((server, self.whois_port), timeout=REQUEST_TIMEOUT) as sock:
+                sock.sendall(f"{query}\r\n".encode("utf-8"))
+                chunks = []
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+        return b"".join(chunks).decode("utf-8", "replace")
+
+    def _lookup_rdap(self, domain: str, base: str) -> Dict[str, Any]:
+        server = urlparse(base).netloc
+        with self._slot(server):
+            response = self.session.get(
+                f"{base.rstrip('/')}/domain/{domain}",
+                headers={"Accept": "application/rdap+json"},
+                timeout=REQUEST_TIMEOUT
+            )
+        self.stats["rdap"] += 1
+        if response.status_code == 404:
+            return unregistered_record(domain, "rdap", server)
+        if response.status_code != 200:
+            raise requests.RequestException(f"RDAP request failed: {response.status_code}")
+        return parse_rdap(domain, response.json(), server)
+
+    def _lookup_whois(self, domain: str, tld: str) -> Dict[str, Any]:
+        server = self._whois_server(tld)
+        if not server:
+            raise requests.RequestException(f"No WHOIS server known for .{tld}")
+        text = self.whois_query(server, domain)
+        self.stats["whois"] += 1
+        if WHOIS_NOT_FOUND.search(text) and "domain name:" not in text.lower():
+            return unregistered_record(domain, "whois", server)
+        record = parse_whois(domain, text, server)
+
+        # Thin registries only hold the referral; the registrar's server has the contacts
+        referral = record.pop("referral", None)
+        if referral and referral != server:
+            try:
+                detailed = parse_whois(domain, self.whois_query(referral, domain), referral)
+                detailed.pop("referral", None)
+                for key, value in detailed.items():
+                    if value and not record.get(key):
+                        record[key] = value
+                record["contacts"] = detailed["contacts"] or record["contacts"]
+            except OSError:
+                pass
+        return record
+
+    # Lookups
+
+    def lookup(self, domain: str) -> Optional[Dict[str, Any]]:
+        """
+        Normalized registration record for a domain, or None if every source failed
+
+        Hosts are reduced to their registrable domain. RDAP is used when the
+        bootstrap registry lists the TLD, port-43 WHOIS otherwise or when RDAP
+        fails. Unregistered domains give a record with registered=False.
+        Records are cached with a lifetime tied to their last update.
+        """
+        domain = registrable_domain(domain)
+        cached = self._cache_get(domain)
+        if cached is not None:
+            return cached
+
+        tld = domain.rsplit(".", 1)[-1]
+        record = None
+        base = self.bootstrap.get(tld)
+        if base:
+            try:
+                record = self._lookup_rdap(domain, base)
+            except (requests.RequestException, ValueError):
+                record = None
+        if record is None:
+            try:
+                record = self._lookup_whois(domain, tld)
+            except (requests.RequestException, OSError):
+                self.stats["failures"] += 1
+                return None
+
+        self._cache_put(domain, record)
+        return record
+
+    def lookup_many(self, domains: Iterable[str], max_workers: int = 32) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Look up many domains in parallel; per-server limits still apply"""
+        domains = list(dict.fromkeys(domains))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(domains, executor.map(self.lookup, domains)))